@@ -0,0 +1,262 @@
+# backends.py
+# Motores de armazenamento suportados por db_utils: o servidor MySQL (configuração original)
+# e um SQLite embutido (modo WAL), usado em cabines de portaria e para rodar sem servidor.
+# Cada backend sabe abrir conexões, criar cursores, adaptar o SQL e reconhecer seus erros;
+# o restante do sistema continua usando apenas executar_query e companhia.
+
+import os
+import sqlite3
+from datetime import datetime
+from functools import lru_cache
+
+try:
+    import mysql.connector
+    from mysql.connector import errorcode
+    from mysql.connector.constants import ClientFlag
+except ImportError: # Sem o conector MySQL, apenas o backend SQLite fica disponível
+    mysql = None
+    errorcode = None
+    ClientFlag = None
+
+from db_config import DB_BACKEND, DB_CONFIG, SQLITE_CONFIG
+from mensagens import informar
+
+# Categorias de erro reconhecidas pelas funções do CRUD (ver db_utils.ultimo_erro)
+ERRO_DUPLICADO = 'duplicado'                            # Violação de UNIQUE (CPF ou placa já cadastrados)
+ERRO_REFERENCIA_INEXISTENTE = 'referencia_inexistente'  # Chave estrangeira aponta para um registro que não existe
+ERRO_REFERENCIADO = 'referenciado'                      # Registro ainda referenciado por outra tabela
+ERRO_CONEXAO = 'conexao'                                # Banco inacessível ou conexão perdida
+ERRO_OUTRO = 'outro'
+
+# O SQLite não conhece DATETIME: as datas são gravadas em texto ISO e convertidas de volta na leitura
+sqlite3.register_adapter(datetime, lambda momento: momento.isoformat(" "))
+sqlite3.register_converter("DATETIME", lambda valor: datetime.fromisoformat(valor.decode()))
+
+
+class BackendMySQL:
+    """Backend padrão: servidor MySQL acessado com mysql.connector."""
+
+    nome = 'mysql'
+    suporta_preparados = True
+    # Códigos de erro do cliente MySQL que indicam que o socket com o servidor caiu
+    # (CR_SERVER_GONE_ERROR, CR_SERVER_LOST, CR_SERVER_LOST_EXTENDED).
+    erros_conexao_perdida = {2006, 2013, 2055}
+    # ER_DUP_ENTRY, ER_NO_REFERENCED_ROW(_2), ER_ROW_IS_REFERENCED(_2)
+    categorias_erro = {1062: ERRO_DUPLICADO, 1216: ERRO_REFERENCIA_INEXISTENTE, 1452: ERRO_REFERENCIA_INEXISTENTE,
+                       1217: ERRO_REFERENCIADO, 1451: ERRO_REFERENCIADO}
+
+    def __init__(self, config=None):
+        self.config = config or DB_CONFIG
+        self.erros = (mysql.connector.Error,) if mysql else ()
+
+    def conectar(self):
+        if mysql is None:
+            informar("Erro (db_utils): O pacote mysql-connector-python não está instalado.")
+            return None
+        try:
+            # FOUND_ROWS: o rowcount de um UPDATE conta as linhas encontradas, mesmo que os valores não mudem,
+            # para que "0 linhas" signifique sempre "registro não encontrado"
+            return mysql.connector.connect(**{'client_flags': [ClientFlag.FOUND_ROWS], **self.config})
+        except mysql.connector.Error as err:
+            if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
+                informar("Erro de acesso (db_utils): Usuário ou senha do banco incorretos.")
+            elif err.errno == errorcode.ER_BAD_DB_ERROR:
+                informar(f"Banco de dados '{self.config.get('database', 'N/A')}' não existe (db_utils).")
+            else:
+                informar(f"Erro ao conectar ao MySQL (db_utils): {err}")
+            return None
+
+    def sql(self, texto):
+        return texto
+
+    def cursor(self, conexao, bufferizado=True, dicionario=True):
+        return conexao.cursor(dictionary=dicionario, buffered=bufferizado)
+
+    def cursor_preparado(self, conexao):
+        return conexao.cursor(prepared=True)
+
+    def encerrar_cursor(self, cursor):
+        """Fecha um cursor não-bufferizado, consumindo antes as linhas não lidas (exigência do protocolo MySQL)."""
+        try:
+            cursor.fetchall()
+            cursor.close()
+        except mysql.connector.Error:
+            pass
+
+    def verificar(self, conexao):
+        """Testa a conexão com ping, reconectando se o socket caiu. Retorna False se não há servidor."""
+        try:
+            conexao.ping(reconnect=True, attempts=1, delay=0)
+            return True
+        except mysql.connector.Error:
+            return False
+
+    def reconectar(self, conexao):
+        conexao.reconnect(attempts=1, delay=0)
+
+    def iniciar_transacao(self, conexao):
+        conexao.start_transaction()
+
+    def iniciar_sequencia(self, conexao, tabela, inicio):
+        """Faz o próximo ID automático de 'tabela' ser pelo menos 'inicio' (não reduz um contador maior)."""
+        cursor = conexao.cursor()
+        try:
+            cursor.execute(f"ALTER TABLE {tabela} AUTO_INCREMENT = {int(inicio)}")
+        finally:
+            cursor.close()
+
+    def conexao_perdida(self, err):
+        return getattr(err, 'errno', None) in self.erros_conexao_perdida
+
+    def classificar_erro(self, err, tipo):
+        """Converte o código de erro do MySQL em uma das categorias ERRO_* (tipo é o comando: INSERT, DELETE, ...)."""
+        if self.conexao_perdida(err):
+            return ERRO_CONEXAO
+        return self.categorias_erro.get(getattr(err, 'errno', None), ERRO_OUTRO)
+
+
+class BackendSQLite:
+    """
+    Backend embutido: arquivo SQLite local em modo WAL, com o esquema de estacionamento_db_sqlite.sql
+    (equivalente ao de estacionamento_db.sql). Leituras não bloqueiam a escrita e vice-versa.
+    """
+
+    nome = 'sqlite'
+    # O módulo sqlite3 já guarda os comandos compilados por conexão (cached_statements),
+    # então os ComandoSQL registrados são executados pelo caminho comum.
+    suporta_preparados = False
+    erros = (sqlite3.Error,)
+
+    def __init__(self, config=None):
+        self.config = config or SQLITE_CONFIG
+        self.caminho = self.config['caminho']
+        self._esquema_verificado = False
+
+    def conectar(self):
+        try:
+            em_memoria = self.caminho == ":memory:"
+            # Em memória, as conexões do pool compartilham o mesmo banco (cache compartilhado)
+            alvo = f"file:estacionamento_{id(self)}?mode=memory&cache=shared" if em_memoria else self.caminho
+            # check_same_thread=False: o pool garante que cada conexão seja usada por uma thread por vez
+            conexao = sqlite3.connect(alvo, detect_types=sqlite3.PARSE_DECLTYPES, uri=em_memoria,
+                                      check_same_thread=False, cached_statements=256)
+            conexao.row_factory = _linha_como_dict
+            conexao.execute("PRAGMA foreign_keys = ON")
+            if not em_memoria:
+                conexao.execute("PRAGMA journal_mode = WAL")
+                conexao.execute("PRAGMA synchronous = NORMAL")
+            if not self._esquema_verificado:
+                self._criar_esquema(conexao)
+            return conexao
+        except sqlite3.Error as err:
+            informar(f"Erro ao abrir o banco SQLite '{self.caminho}' (db_utils): {err}")
+            return None
+
+    def _criar_esquema(self, conexao):
+        """Cria as tabelas na primeira conexão, se o arquivo ainda estiver vazio."""
+        existe = conexao.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'clientes'").fetchone()
+        if not existe:
+            caminho_esquema = self.config.get('esquema') or os.path.join(
+                os.path.dirname(os.path.abspath(__file__)), "estacionamento_db_sqlite.sql")
+            with open(caminho_esquema, encoding="utf-8") as arquivo:
+                conexao.executescript(arquivo.read())
+        self._esquema_verificado = True
+
+    def sql(self, texto):
+        return _sql_para_sqlite(texto)
+
+    def cursor(self, conexao, bufferizado=True, dicionario=True):
+        # Cursores do SQLite já entregam as linhas sob demanda
+        cursor = conexao.cursor()
+        if not dicionario:
+            cursor.row_factory = None # Tuplas, sem o _linha_como_dict da conexão
+        return cursor
+
+    def cursor_preparado(self, conexao):
+        return conexao.cursor()
+
+    def encerrar_cursor(self, cursor):
+        try:
+            cursor.close()
+        except sqlite3.Error:
+            pass
+
+    def verificar(self, conexao):
+        try:
+            conexao.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reconectar(self, conexao):
+        raise sqlite3.OperationalError("Conexões SQLite não podem ser reconectadas.")
+
+    def iniciar_transacao(self, conexao):
+        # Sem BEGIN explícito, o módulo sqlite3 só abre a transação no primeiro INSERT/UPDATE/DELETE,
+        # e um SAVEPOINT aberto antes disso seria a própria transação (confirmada no RELEASE)
+        conexao.execute("BEGIN")
+
+    def iniciar_sequencia(self, conexao, tabela, inicio):
+        """Faz o próximo ID automático de 'tabela' ser pelo menos 'inicio' (não reduz um contador maior)."""
+        # Com AUTOINCREMENT, o SQLite guarda o último ID usado em sqlite_sequence
+        conexao.execute("INSERT INTO sqlite_sequence (name, seq) SELECT ?, 0 "
+                        "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = ?)", (tabela, tabela))
+        conexao.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = ? AND seq < ?",
+                        (int(inicio) - 1, tabela, int(inicio) - 1))
+
+    def conexao_perdida(self, err):
+        return False # Um arquivo local não "cai" como um socket
+
+    def classificar_erro(self, err, tipo):
+        """
+        Converte um erro do SQLite em uma das categorias ERRO_*. O SQLite não tem códigos distintos para
+        os dois lados de uma chave estrangeira: em DELETE a falha significa registro referenciado.
+        """
+        if isinstance(err, sqlite3.IntegrityError):
+            mensagem = str(err)
+            if mensagem.startswith("UNIQUE"):
+                return ERRO_DUPLICADO
+            if mensagem.startswith("FOREIGN KEY"):
+                return ERRO_REFERENCIADO if tipo == "DELETE" else ERRO_REFERENCIA_INEXISTENTE
+        return ERRO_OUTRO
+
+
+def _linha_como_dict(cursor, linha):
+    """row_factory do SQLite que produz dicionários, como o cursor(dictionary=True) do MySQL."""
+    return {coluna[0]: valor for coluna, valor in zip(cursor.description, linha)}
+
+
+@lru_cache(maxsize=512)
+def _sql_para_sqlite(texto):
+    """Troca os marcadores %s (estilo MySQL) por ? (estilo SQLite)."""
+    return texto.replace("%s", "?")
+
+
+_backends = {'mysql': BackendMySQL, 'sqlite': BackendSQLite}
+
+def criar_backend(nome=None, config=None):
+    """
+    Cria o backend pelo nome ('mysql' ou 'sqlite'); sem nome, usa DB_BACKEND de db_config.
+
+    Args:
+        nome (str, optional): Nome do backend. Defaults to None.
+        config (dict, optional): Configuração específica; sem ela, usa DB_CONFIG ou SQLITE_CONFIG.
+
+    Returns:
+        BackendMySQL or BackendSQLite: O backend configurado.
+    """
+    nome = nome or DB_BACKEND
+    if nome not in _backends:
+        raise ValueError(f"Backend de banco desconhecido: '{nome}'. Use 'mysql' ou 'sqlite'.")
+    return _backends[nome](config)
+
+def backend_da_conexao(conexao):
+    """Descobre o backend de uma conexão avulsa (não obtida de um pool)."""
+    if isinstance(conexao, sqlite3.Connection):
+        return _backend_sqlite_avulso
+    return _backend_mysql_avulso
+
+
+_backend_sqlite_avulso = BackendSQLite()
+_backend_mysql_avulso = BackendMySQL()
@@ -0,0 +1,80 @@
+# benchmark_async.py
+# Compara a vazão das consultas por placa feitas em sequência (veiculo_crud)
+# com as mesmas consultas feitas de forma concorrente (crud_async).
+# Uso: python benchmark_async.py [--consultas N] [--concorrencia C]
+
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+
+import crud_async
+import veiculo_crud
+from cache_consultas import cache_cadastro
+from db_utils import criar_pool
+
+def carregar_placas(pool, quantidade):
+    """Busca até 'quantidade' placas cadastradas para usar nas consultas do benchmark."""
+    placas = []
+    ultimo_id = 0
+    while len(placas) < quantidade:
+        pagina = veiculo_crud.listar_veiculos_pagina(pool, ultimo_id, min(500, quantidade - len(placas)))
+        if not pagina:
+            break
+        placas.extend(veiculo['placa'] for veiculo in pagina)
+        ultimo_id = pagina[-1]['id']
+    return placas
+
+def medir_sincrono(pool, placas):
+    """Executa as consultas uma após a outra e retorna o tempo total em segundos."""
+    inicio = time.perf_counter()
+    for placa in placas:
+        veiculo_crud.consultar_veiculo_por_placa(pool, placa)
+    return time.perf_counter() - inicio
+
+async def medir_assincrono(pool, placas, concorrencia):
+    """Executa as consultas com até 'concorrencia' chamadas em andamento e retorna o tempo total."""
+    limite = asyncio.Semaphore(concorrencia)
+
+    async def consultar(placa):
+        async with limite:
+            await crud_async.consultar_veiculo_por_placa(pool, placa)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(consultar(placa) for placa in placas))
+    return time.perf_counter() - inicio
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark síncrono x assíncrono da consulta por placa.")
+    parser.add_argument("--consultas", type=int, default=2000, help="Quantidade de consultas por placa.")
+    parser.add_argument("--concorrencia", type=int, default=50, help="Consultas simultâneas no modo assíncrono.")
+    args = parser.parse_args()
+
+    pool_db = criar_pool()
+    if not pool_db:
+        print("Falha ao conectar ao banco de dados.")
+        raise SystemExit(1)
+
+    # Sem cache, para que as duas medições façam as mesmas idas ao banco
+    cache_cadastro.ttl_segundos = 0
+    try:
+        placas = carregar_placas(pool_db, args.consultas)
+        if not placas:
+            print("Nenhum veículo cadastrado para consultar.")
+            raise SystemExit(1)
+
+        # As funções do CRUD imprimem cada resultado; a saída é descartada durante a medição
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            tempo_sync = medir_sincrono(pool_db, placas)
+            tempo_async = asyncio.run(medir_assincrono(pool_db, placas, args.concorrencia))
+
+        print(f"\n--- Benchmark: {len(placas)} consultas por placa ---")
+        print(f"Síncrono:   {tempo_sync:.3f}s  ({len(placas) / tempo_sync:.0f} consultas/s)")
+        print(f"Assíncrono: {tempo_async:.3f}s  ({len(placas) / tempo_async:.0f} consultas/s, "
+              f"concorrência {args.concorrencia}, pool de {pool_db.tamanho} conexões)")
+        print(f"Ganho: {tempo_sync / tempo_async:.2f}x")
+        print("------------------------")
+    finally:
+        crud_async.encerrar()
+        pool_db.fechar()
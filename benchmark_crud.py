@@ -0,0 +1,317 @@
+# benchmark_crud.py
+# Benchmark reproduzível das funções de cliente_crud e veiculo_crud.
+# Semeia uma base sintética (dados_sinteticos.py) e mede, para cada função e para 1..N threads
+# simultâneas, a vazão (operações/s) e a latência (p50/p90/p99/máx). Os resultados são gravados
+# em JSON e podem ser comparados com uma execução anterior para detectar regressões.
+# Por padrão usa o SQLite embutido (sem rede); --backend mysql usa o servidor de DB_CONFIG.
+#
+# Uso: python benchmark_crud.py [--linhas 10k|1m|10m] [--trabalhadores 1,2,4,8] [--operacoes N]
+#                               [--saida resultados.json] [--comparar referencia.json]
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import cliente_crud
+import veiculo_crud
+from backends import criar_backend
+from cache_consultas import cache_cadastro
+from dados_sinteticos import (NOMES, contar_semeados, cpf_numero, gerar_cliente, gerar_veiculo, placa_do_veiculo,
+                              remover_excedentes, semear)
+from db_utils import criar_pool, executar_muitos
+from metricas import HistogramaLatencia
+
+TAMANHOS = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+# Listagens completas imprimem a tabela inteira: só são medidas em bases pequenas
+LIMITE_LISTAGEM_COMPLETA = 10_000
+# Queda de vazão (ou aumento do p99) acima desta fração é apontada como regressão
+TOLERANCIA_REGRESSAO = 0.10
+
+
+class Cenario:
+    """Uma função do CRUD medida pelo benchmark, com a forma de gerar os argumentos de cada chamada."""
+
+    def __init__(self, nome, chamar, preparar=None, completa=False):
+        self.nome = nome
+        self.chamar = chamar        # (pool, rng, contexto) -> resultado da função do CRUD
+        self.preparar = preparar    # (pool, contexto, operacoes) -> None; cria os registros que serão excluídos
+        self.completa = completa    # True para listagens da tabela inteira
+
+
+class ContextoBenchmark:
+    """Estado compartilhado pelas threads: tamanho da base, IDs novos e registros a excluir."""
+
+    def __init__(self, total):
+        self.total = total
+        # Números dos registros criados na medição (CPFs e placas inéditos); ao final eles são removidos
+        self._proximo = itertools.count(total + 1)
+        self.para_excluir = {'clientes': [], 'veiculos': []}
+        self._lock = threading.Lock()
+
+    def novo_numero(self):
+        return next(self._proximo)
+
+    def guardar(self, tabela, registro_id):
+        """Guarda um registro criado pela medição para ser usado pelas exclusões."""
+        if registro_id:
+            with self._lock:
+                self.para_excluir[tabela].append(registro_id)
+
+    def retirar(self, tabela):
+        with self._lock:
+            return self.para_excluir[tabela].pop() if self.para_excluir[tabela] else None
+
+
+def _existente(rng, contexto):
+    return rng.randint(1, contexto.total)
+
+def _preparar_exclusao(tabela):
+    """Garante, antes da medição, um registro novo para cada exclusão que será medida."""
+    def preparar(pool, contexto, operacoes):
+        faltam = operacoes - len(contexto.para_excluir[tabela])
+        if faltam <= 0:
+            return
+        rng = random.Random(operacoes)
+        numeros = [contexto.novo_numero() for _ in range(faltam)]
+        if tabela == 'clientes':
+            query = "INSERT INTO clientes (id, nome, endereco, cpf, telefone) VALUES (%s, %s, %s, %s, %s)"
+            linhas = [(n, *gerar_cliente(n, rng)) for n in numeros]
+        else:
+            query = "INSERT INTO veiculos (id, marca, modelo, ano, placa, cliente_id) VALUES (%s, %s, %s, %s, %s, %s)"
+            linhas = [(n, *gerar_veiculo(n, _existente(rng, contexto), rng)) for n in numeros]
+        executar_muitos(pool, query, linhas)
+        contexto.para_excluir[tabela].extend(numeros)
+    return preparar
+
+def _novo_cliente(pool, rng, contexto):
+    cliente_id = cliente_crud.adicionar_cliente(pool, *gerar_cliente(contexto.novo_numero(), rng))
+    contexto.guardar('clientes', cliente_id)
+    return cliente_id
+
+def _novo_veiculo(pool, rng, contexto):
+    marca, modelo, ano, placa, cliente_id = gerar_veiculo(contexto.novo_numero(), _existente(rng, contexto), rng)
+    veiculo_id = veiculo_crud.adicionar_veiculo(pool, marca, modelo, ano, placa, cliente_id)
+    contexto.guardar('veiculos', veiculo_id)
+    return veiculo_id
+
+def _placa_existente(rng, contexto):
+    return placa_do_veiculo(_existente(rng, contexto))
+
+CENARIOS = (
+    Cenario('consultar_cliente_por_cpf',
+            lambda pool, rng, ctx: cliente_crud.consultar_cliente_por_cpf(pool, cpf_numero(_existente(rng, ctx)))),
+    Cenario('consultar_cliente_por_id',
+            lambda pool, rng, ctx: cliente_crud.consultar_cliente_por_id(pool, _existente(rng, ctx))),
+    Cenario('buscar_clientes_por_nome',
+            lambda pool, rng, ctx: cliente_crud.buscar_clientes_por_nome(pool, rng.choice(NOMES)[:3])),
+    Cenario('listar_clientes_pagina',
+            lambda pool, rng, ctx: cliente_crud.listar_clientes_pagina(pool, _existente(rng, ctx), 50)),
+    Cenario('consultar_clientes_existentes',
+            lambda pool, rng, ctx: cliente_crud.consultar_clientes_existentes(
+                pool, [_existente(rng, ctx) for _ in range(100)])),
+    Cenario('consultar_ids_por_cpfs',
+            lambda pool, rng, ctx: cliente_crud.consultar_ids_por_cpfs(
+                pool, [cpf_numero(_existente(rng, ctx)) for _ in range(100)])),
+    Cenario('listar_clientes', lambda pool, rng, ctx: cliente_crud.listar_clientes(pool), completa=True),
+    Cenario('adicionar_cliente', _novo_cliente),
+    Cenario('atualizar_cliente',
+            lambda pool, rng, ctx: cliente_crud.atualizar_cliente(
+                pool, _existente(rng, ctx), telefone=f"{rng.randint(11, 99)}9{rng.randint(10_000_000, 99_999_999)}")),
+    Cenario('excluir_cliente',
+            lambda pool, rng, ctx: cliente_crud.excluir_cliente(pool, ctx.retirar('clientes')),
+            preparar=_preparar_exclusao('clientes')),
+    Cenario('consultar_veiculo_por_placa',
+            lambda pool, rng, ctx: veiculo_crud.consultar_veiculo_por_placa(pool, _placa_existente(rng, ctx))),
+    Cenario('consultar_veiculo_por_id',
+            lambda pool, rng, ctx: veiculo_crud.consultar_veiculo_por_id(pool, _existente(rng, ctx))),
+    Cenario('listar_veiculos_pagina',
+            lambda pool, rng, ctx: veiculo_crud.listar_veiculos_pagina(pool, _existente(rng, ctx), 50)),
+    Cenario('consultar_placas_existentes',
+            lambda pool, rng, ctx: veiculo_crud.consultar_placas_existentes(
+                pool, [_placa_existente(rng, ctx) for _ in range(100)])),
+    Cenario('listar_veiculos', lambda pool, rng, ctx: veiculo_crud.listar_veiculos(pool), completa=True),
+    Cenario('adicionar_veiculo', _novo_veiculo),
+    Cenario('atualizar_veiculo',
+            lambda pool, rng, ctx: veiculo_crud.atualizar_veiculo(pool, _existente(rng, ctx), ano=rng.randint(1995, 2025))),
+    Cenario('excluir_veiculo',
+            lambda pool, rng, ctx: veiculo_crud.excluir_veiculo(pool, ctx.retirar('veiculos')),
+            preparar=_preparar_exclusao('veiculos')),
+)
+
+
+@contextlib.contextmanager
+def _sem_saida():
+    """Descarta o que o CRUD imprime durante a medição."""
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        yield
+
+def medir_cenario(pool, cenario, contexto, trabalhadores, operacoes, semente):
+    """
+    Executa 'operacoes' chamadas do cenário divididas entre 'trabalhadores' threads.
+
+    Returns:
+        dict: Vazão, latências (ms) e quantidade de chamadas que retornaram None/False.
+    """
+    if cenario.preparar:
+        cenario.preparar(pool, contexto, operacoes)
+
+    histogramas = [HistogramaLatencia() for _ in range(trabalhadores)]
+    falhas = [0] * trabalhadores
+    barreira = threading.Barrier(trabalhadores + 1)
+
+    def trabalhar(indice):
+        rng = random.Random(semente * 1000 + indice)
+        quantidade = operacoes // trabalhadores + (indice < operacoes % trabalhadores)
+        histograma = histogramas[indice]
+        barreira.wait()
+        for _ in range(quantidade):
+            inicio = time.perf_counter()
+            resultado = cenario.chamar(pool, rng, contexto)
+            histograma.registrar((time.perf_counter() - inicio) * 1_000_000)
+            if resultado is None or resultado is False:
+                falhas[indice] += 1
+
+    threads = [threading.Thread(target=trabalhar, args=(indice,)) for indice in range(trabalhadores)]
+    for thread in threads:
+        thread.start()
+    barreira.wait()
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    total = HistogramaLatencia()
+    for histograma in histogramas:
+        total.mesclar(histograma)
+    return {
+        'funcao': cenario.nome,
+        'trabalhadores': trabalhadores,
+        'operacoes': total.contagem,
+        'falhas': sum(falhas),
+        'duracao_s': round(duracao, 4),
+        'ops_por_s': round(total.contagem / duracao, 1) if duracao else 0,
+        'p50_ms': total.quantil(0.5) / 1000,
+        'p90_ms': total.quantil(0.9) / 1000,
+        'p99_ms': total.quantil(0.99) / 1000,
+        'max_ms': total.maximo / 1000,
+    }
+
+def preparar_base(pool, total, semente):
+    """Semeia a base, ou reaproveita uma base já semeada com pelo menos 'total' clientes e veículos."""
+    contagem = contar_semeados(pool)
+    if contagem is None:
+        return False
+    clientes, veiculos = contagem
+    if clientes >= total and veiculos >= total:
+        print(f"Reaproveitando a base existente ({clientes} clientes, {veiculos} veículos).")
+        return True
+    if clientes or veiculos:
+        print("A base já tem registros, mas menos do que o pedido; use uma base vazia (--caminho novo).")
+        return False
+    print(f"Semeando {total} clientes e {total} veículos...")
+    inicio = time.perf_counter()
+    if not semear(pool, total, semente=semente):
+        return False
+    print(f"Base semeada em {time.perf_counter() - inicio:.1f}s.")
+    return True
+
+def comparar(resultados, caminho_referencia):
+    """Compara com uma execução anterior e lista as regressões acima de TOLERANCIA_REGRESSAO."""
+    with open(caminho_referencia, encoding="utf-8") as arquivo:
+        referencia = {(item['funcao'], item['trabalhadores']): item for item in json.load(arquivo)['resultados']}
+    regressoes = []
+    for item in resultados:
+        anterior = referencia.get((item['funcao'], item['trabalhadores']))
+        if not anterior:
+            continue
+        if item['ops_por_s'] < anterior['ops_por_s'] * (1 - TOLERANCIA_REGRESSAO):
+            regressoes.append(f"{item['funcao']} ({item['trabalhadores']} threads): vazão "
+                              f"{anterior['ops_por_s']:.0f} -> {item['ops_por_s']:.0f} ops/s")
+        if anterior['p99_ms'] and item['p99_ms'] > anterior['p99_ms'] * (1 + TOLERANCIA_REGRESSAO):
+            regressoes.append(f"{item['funcao']} ({item['trabalhadores']} threads): p99 "
+                              f"{anterior['p99_ms']:.3f} -> {item['p99_ms']:.3f} ms")
+    return regressoes
+
+def _tamanho(texto):
+    return TAMANHOS[texto.lower()] if texto.lower() in TAMANHOS else int(texto)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark das funções de cliente_crud e veiculo_crud.")
+    parser.add_argument("--linhas", type=_tamanho, default=TAMANHOS['10k'],
+                        help="Clientes e veículos semeados: 10k, 1m, 10m ou um número.")
+    parser.add_argument("--trabalhadores", default="1,2,4,8", help="Threads simultâneas, separadas por vírgula.")
+    parser.add_argument("--operacoes", type=int, default=2000, help="Chamadas medidas por função e nº de threads.")
+    parser.add_argument("--funcoes", help="Mede só estas funções (separadas por vírgula).")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--caminho", help="Arquivo SQLite da base (padrão: bench_<linhas>.db na pasta temporária).")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--com-cache", action="store_true", help="Mantém o cache de consultas ligado.")
+    parser.add_argument("--saida", default="resultados_benchmark.json", help="Arquivo JSON com os resultados.")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior, para apontar regressões.")
+    args = parser.parse_args()
+
+    lista_trabalhadores = [int(valor) for valor in args.trabalhadores.split(",")]
+    if args.backend == "sqlite":
+        caminho = args.caminho or os.path.join(tempfile.gettempdir(), f"bench_{args.linhas}.db")
+        backend = criar_backend("sqlite", {'caminho': caminho, 'esquema': None})
+    else:
+        caminho = None
+        backend = criar_backend("mysql")
+    pool_db = criar_pool(tamanho=max(lista_trabalhadores), backend=backend)
+    if not pool_db or not preparar_base(pool_db, args.linhas, args.semente):
+        print("Falha ao preparar a base do benchmark.")
+        raise SystemExit(1)
+
+    if not args.com_cache:
+        # Sem cache, cada chamada vai ao banco; o objetivo é medir o caminho até o banco
+        cache_cadastro.ttl_segundos = 0
+    selecionadas = set(args.funcoes.split(",")) if args.funcoes else None
+    cenarios = [cenario for cenario in CENARIOS
+                if (selecionadas is None or cenario.nome in selecionadas)
+                and (not cenario.completa or args.linhas <= LIMITE_LISTAGEM_COMPLETA or selecionadas)]
+
+    contexto = ContextoBenchmark(args.linhas)
+    resultados = []
+    try:
+        remover_excedentes(pool_db, args.linhas) # Sobras de uma execução interrompida
+        for cenario in cenarios:
+            for trabalhadores in lista_trabalhadores:
+                # Cada listagem completa percorre a tabela inteira: bastam poucas chamadas
+                operacoes = max(trabalhadores, args.operacoes // 100) if cenario.completa else args.operacoes
+                with _sem_saida():
+                    resultado = medir_cenario(pool_db, cenario, contexto, trabalhadores, operacoes, args.semente)
+                resultados.append(resultado)
+                print(f"{resultado['funcao']:<30} {trabalhadores:>3} threads  {resultado['ops_por_s']:>10.0f} ops/s  "
+                      f"p50 {resultado['p50_ms']:.3f} ms  p99 {resultado['p99_ms']:.3f} ms  falhas {resultado['falhas']}")
+    finally:
+        remover_excedentes(pool_db, args.linhas)
+        pool_db.fechar()
+
+    documento = {
+        'momento': datetime.now().isoformat(" ", "seconds"),
+        'ambiente': {'python': platform.python_version(), 'plataforma': platform.platform(),
+                     'processador': platform.processor() or platform.machine(), 'cpus': os.cpu_count()},
+        'parametros': {'backend': args.backend, 'caminho': caminho, 'linhas': args.linhas,
+                       'operacoes': args.operacoes, 'semente': args.semente, 'com_cache': args.com_cache},
+        'resultados': resultados,
+    }
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(documento, arquivo, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em '{args.saida}'.")
+
+    if args.comparar:
+        regressoes = comparar(resultados, args.comparar)
+        for regressao in regressoes:
+            print(f"REGRESSÃO: {regressao}")
+        if regressoes:
+            raise SystemExit(2)
+        print("Nenhuma regressão acima de "
+              f"{TOLERANCIA_REGRESSAO:.0%} em relação a '{args.comparar}'.")
@@ -0,0 +1,261 @@
+# cache_consultas.py
+# Cache em memória (LRU com tempo de expiração) para as consultas por placa, CPF e ID.
+# As funções de escrita de cliente_crud e veiculo_crud invalidam as entradas afetadas.
+# Cada banco tem o seu cache (ver CacheCadastro): o mesmo ID, CPF ou placa pode existir com
+# dados diferentes nos fragmentos (fragmentos.py) e na réplica local da cabine (replica_local.py).
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from db_config import CACHE_CONFIG
+
+class CacheConsultas:
+    """
+    Cache LRU com TTL para resultados das consultas pontuais de clientes e veículos.
+
+    As chaves são tuplas ('cpf', cpf), ('cliente_id', id), ('placa', placa) e ('veiculo_id', id).
+    Índices reversos (veículo -> placa, cliente -> veículos) permitem invalidar com precisão
+    tudo o que depende de um registro alterado, inclusive os veículos de um cliente excluído
+    (espelhando o ON DELETE CASCADE da tabela 'veiculos').
+    """
+
+    def __init__(self, tamanho_maximo=None, ttl_segundos=None):
+        self.tamanho_maximo = tamanho_maximo or CACHE_CONFIG['tamanho_maximo']
+        self.ttl_segundos = ttl_segundos if ttl_segundos is not None else CACHE_CONFIG['ttl_segundos']
+        self._itens = OrderedDict() # chave -> (valor, instante_de_expiracao)
+        self._lock = threading.Lock()
+        self._placa_por_veiculo = {}     # veiculo_id -> placa
+        self._veiculos_por_cliente = {}  # cliente_id -> {veiculo_id, ...}
+        self._cpf_por_cliente = {}       # cliente_id -> cpf
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave):
+        """
+        Retorna o valor guardado para a chave, ou None se ausente ou expirado.
+
+        Args:
+            chave (tuple): Chave da consulta, ex.: ('placa', 'ABC1D23').
+        """
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.falhas += 1
+                return None
+            valor, expira_em = item
+            if time.monotonic() >= expira_em:
+                self._remover(chave)
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def guardar_cliente(self, cliente):
+        """Guarda um cliente (resultado de consulta por CPF ou ID) sob as chaves de CPF e de ID."""
+        with self._lock:
+            self._cpf_por_cliente[cliente['id']] = cliente['cpf']
+            self._inserir(('cpf', cliente['cpf']), cliente)
+            self._inserir(('cliente_id', cliente['id']), cliente)
+
+    def guardar_veiculo(self, chave, veiculo):
+        """
+        Guarda um veículo sob a chave da consulta que o produziu.
+
+        Args:
+            chave (tuple): ('placa', placa) ou ('veiculo_id', id).
+            veiculo (dict): Linha retornada pela consulta (precisa de 'id', 'placa' e 'cliente_id').
+        """
+        with self._lock:
+            self._placa_por_veiculo[veiculo['id']] = veiculo['placa']
+            self._veiculos_por_cliente.setdefault(veiculo['cliente_id'], set()).add(veiculo['id'])
+            self._inserir(chave, veiculo)
+
+    def invalidar_veiculo(self, veiculo_id):
+        """Remove todas as entradas de um veículo (por ID e por placa)."""
+        with self._lock:
+            self._invalidar_veiculo(veiculo_id)
+
+    def invalidar_cliente(self, cliente_id):
+        """
+        Remove as entradas de um cliente e as de todos os seus veículos, já que a consulta
+        por placa traz nome e CPF do proprietário e a exclusão do cliente apaga seus veículos.
+        """
+        with self._lock:
+            cpf = self._cpf_por_cliente.pop(cliente_id, None)
+            if cpf is not None:
+                self._itens.pop(('cpf', cpf), None)
+            self._itens.pop(('cliente_id', cliente_id), None)
+            for veiculo_id in list(self._veiculos_por_cliente.get(cliente_id, ())):
+                self._invalidar_veiculo(veiculo_id)
+            self._veiculos_por_cliente.pop(cliente_id, None)
+
+    def limpar(self):
+        """Esvazia o cache e zera os contadores."""
+        with self._lock:
+            self._itens.clear()
+            self._placa_por_veiculo.clear()
+            self._veiculos_por_cliente.clear()
+            self._cpf_por_cliente.clear()
+            self.acertos = 0
+            self.falhas = 0
+
+    def estatisticas(self):
+        """
+        Returns:
+            dict: Contadores de acertos e falhas, taxa de acerto e quantidade de itens guardados.
+        """
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': self.acertos / total if total else 0.0,
+                'itens': len(self._itens),
+            }
+
+    # Os métodos abaixo assumem que o lock já está adquirido.
+
+    def _inserir(self, chave, valor):
+        self._itens[chave] = (valor, time.monotonic() + self.ttl_segundos)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.tamanho_maximo:
+            chave_antiga = next(iter(self._itens))
+            self._remover(chave_antiga)
+
+    def _remover(self, chave):
+        """Remove uma chave e limpa os índices reversos que não têm mais entradas associadas."""
+        item = self._itens.pop(chave, None)
+        if item is None:
+            return
+        valor = item[0]
+        if chave[0] in ('placa', 'veiculo_id'):
+            veiculo_id = valor['id']
+            if ('veiculo_id', veiculo_id) not in self._itens and ('placa', valor['placa']) not in self._itens:
+                self._placa_por_veiculo.pop(veiculo_id, None)
+                veiculos = self._veiculos_por_cliente.get(valor['cliente_id'])
+                if veiculos is not None:
+                    veiculos.discard(veiculo_id)
+                    if not veiculos:
+                        del self._veiculos_por_cliente[valor['cliente_id']]
+        elif ('cpf', valor['cpf']) not in self._itens and ('cliente_id', valor['id']) not in self._itens:
+            self._cpf_por_cliente.pop(valor['id'], None)
+
+    def _invalidar_veiculo(self, veiculo_id):
+        placa = self._placa_por_veiculo.pop(veiculo_id, None)
+        item = self._itens.pop(('veiculo_id', veiculo_id), None)
+        if placa is not None:
+            item = self._itens.pop(('placa', placa), None) or item
+        if item is not None:
+            veiculos = self._veiculos_por_cliente.get(item[0]['cliente_id'])
+            if veiculos is not None:
+                veiculos.discard(veiculo_id)
+                if not veiculos:
+                    del self._veiculos_por_cliente[item[0]['cliente_id']]
+
+
+class CacheCadastro:
+    """
+    Os caches de consulta do processo, um CacheConsultas por banco. O banco de um PoolConexoes é
+    identificado pelo seu backend, compartilhado pelo RoteadorConexoes e pelo pool do primário.
+
+    Consultas feitas com uma conexão avulsa (fora de um pool, ex.: a de conexao_dedicada) não usam
+    o cache, já que não se sabe a qual banco ela pertence; pelo mesmo motivo, uma escrita feita com
+    ela invalida o registro no cache de todos os bancos.
+    """
+
+    def __init__(self, tamanho_maximo=None, ttl_segundos=None):
+        self.tamanho_maximo = tamanho_maximo
+        self._ttl_segundos = ttl_segundos
+        self._por_banco = weakref.WeakKeyDictionary() # backend -> CacheConsultas
+        self._lock = threading.Lock()
+
+    @property
+    def ttl_segundos(self):
+        return CACHE_CONFIG['ttl_segundos'] if self._ttl_segundos is None else self._ttl_segundos
+
+    @ttl_segundos.setter
+    def ttl_segundos(self, valor):
+        """Altera o tempo de expiração dos caches existentes e dos criados depois (0 desliga o cache)."""
+        with self._lock:
+            self._ttl_segundos = valor
+            for cache in self._por_banco.values():
+                cache.ttl_segundos = valor
+
+    def do_banco(self, conexao):
+        """
+        Cache do banco de 'conexao'.
+
+        Args:
+            conexao: PoolConexoes (ou RoteadorConexoes), ou uma conexão avulsa.
+
+        Returns:
+            CacheConsultas or None: O cache do banco, criado no primeiro uso; None para uma conexão avulsa.
+        """
+        backend = getattr(conexao, 'backend', None)
+        if backend is None:
+            return None
+        cache = self._por_banco.get(backend)
+        if cache is None:
+            with self._lock:
+                cache = self._por_banco.setdefault(backend, CacheConsultas(self.tamanho_maximo, self.ttl_segundos))
+        return cache
+
+    def _afetados(self, conexao):
+        cache = self.do_banco(conexao)
+        if cache is not None:
+            return [cache]
+        with self._lock:
+            return list(self._por_banco.values())
+
+    def obter(self, conexao, chave):
+        """Valor guardado para a chave no cache do banco de 'conexao' (ver CacheConsultas.obter)."""
+        cache = self.do_banco(conexao)
+        return cache.obter(chave) if cache is not None else None
+
+    def guardar_cliente(self, conexao, cliente):
+        cache = self.do_banco(conexao)
+        if cache is not None:
+            cache.guardar_cliente(cliente)
+
+    def guardar_veiculo(self, conexao, chave, veiculo):
+        cache = self.do_banco(conexao)
+        if cache is not None:
+            cache.guardar_veiculo(chave, veiculo)
+
+    def invalidar_veiculo(self, conexao, veiculo_id):
+        """Remove as entradas de um veículo no cache do banco de 'conexao' (em todos, se ela é avulsa)."""
+        for cache in self._afetados(conexao):
+            cache.invalidar_veiculo(veiculo_id)
+
+    def invalidar_cliente(self, conexao, cliente_id):
+        """Remove as entradas de um cliente e de seus veículos no cache do banco de 'conexao' (em todos, se ela é avulsa)."""
+        for cache in self._afetados(conexao):
+            cache.invalidar_cliente(cliente_id)
+
+    def limpar(self):
+        """Esvazia os caches de todos os bancos."""
+        with self._lock:
+            caches = list(self._por_banco.values())
+        for cache in caches:
+            cache.limpar()
+
+    def estatisticas(self):
+        """
+        Returns:
+            dict: Contadores somados de todos os bancos, como em CacheConsultas.estatisticas.
+        """
+        with self._lock:
+            caches = list(self._por_banco.values())
+        acertos = falhas = itens = 0
+        for cache in caches:
+            parcial = cache.estatisticas()
+            acertos, falhas, itens = acertos + parcial['acertos'], falhas + parcial['falhas'], itens + parcial['itens']
+        total = acertos + falhas
+        return {'acertos': acertos, 'falhas': falhas, 'taxa_acerto': acertos / total if total else 0.0, 'itens': itens}
+
+
+# Instância compartilhada pelos módulos CRUD do processo
+cache_cadastro = CacheCadastro()
@@ -0,0 +1,176 @@
+# carga_portaria.py
+# Gerador de carga para o serviço HTTP da portaria (servidor_portaria.py).
+# Abre N conexões keep-alive, cada uma em sua thread, e dispara consultas GET /portao/<placa>
+# durante o tempo pedido, como várias cancelas consultando ao mesmo tempo. As placas vêm da base
+# sintética (dados_sinteticos.py), com uma fração de placas não cadastradas.
+# Ao final mostra a vazão (requisições/s) e a latência (p50/p90/p99/máx) vista pelo cliente,
+# comparada com a meta de META_P99_MS.
+#
+# Uso: python carga_portaria.py [--url http://127.0.0.1:8080] [--linhas 10k] [--conexoes 8] [--duracao 10]
+#      python carga_portaria.py --iniciar-servidor [--caminho base.db]
+# Com --iniciar-servidor, semeia (se preciso) uma base SQLite e sobe o serviço em outro processo,
+# para que gerador e servidor não disputem o mesmo interpretador.
+
+import argparse
+import http.client
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from backends import criar_backend
+from benchmark_crud import TAMANHOS, _tamanho, preparar_base
+from dados_sinteticos import placa_do_veiculo, placa_numero
+from db_config import PORTARIA_CONFIG
+from db_utils import criar_pool
+from metricas import HistogramaLatencia
+
+META_P99_MS = 10 # Latência máxima aceitável (p99) para a resposta à cancela
+
+
+def _placa_sorteada(rng, linhas, fracao_inexistentes):
+    """Sorteia a placa de um veículo semeado ou, na fração pedida, uma placa que não está na base."""
+    if rng.random() < fracao_inexistentes:
+        return placa_numero(linhas + 1 + rng.randrange(linhas), False) # Números acima de N não foram semeados
+    return placa_do_veiculo(rng.randint(1, linhas))
+
+def gerar_carga(url, linhas, conexoes, duracao, fracao_inexistentes=0.1, semente=42):
+    """
+    Dispara consultas de placa contra o serviço durante 'duracao' segundos.
+
+    Args:
+        url (str): Endereço base do serviço (ex.: http://127.0.0.1:8080).
+        linhas (int): Quantidade de veículos semeados (define as placas cadastradas).
+        conexoes (int): Conexões keep-alive simultâneas (uma thread cada).
+        duracao (float): Segundos de medição.
+        fracao_inexistentes (float, optional): Fração das consultas com placa não cadastrada. Defaults to 0.1.
+        semente (int, optional): Semente do sorteio das placas. Defaults to 42.
+
+    Returns:
+        dict: Requisições, falhas, vazão e latências (ms).
+    """
+    partes = urlsplit(url)
+    histogramas = [HistogramaLatencia() for _ in range(conexoes)]
+    falhas = [0] * conexoes
+    barreira = threading.Barrier(conexoes + 1)
+    parar = threading.Event()
+
+    def trabalhar(indice):
+        rng = random.Random(semente * 1000 + indice)
+        histograma = histogramas[indice]
+        conexao = http.client.HTTPConnection(partes.hostname, partes.port or 80, timeout=10)
+        barreira.wait()
+        while not parar.is_set():
+            caminho = f"/portao/{_placa_sorteada(rng, linhas, fracao_inexistentes)}"
+            inicio = time.perf_counter()
+            try:
+                conexao.request("GET", caminho)
+                resposta = conexao.getresponse()
+                resposta.read()
+            except (OSError, http.client.HTTPException):
+                falhas[indice] += 1
+                conexao.close() # A próxima requisição reabre a conexão
+                continue
+            histograma.registrar((time.perf_counter() - inicio) * 1_000_000)
+            if resposta.status != 200:
+                falhas[indice] += 1
+        conexao.close()
+
+    threads = [threading.Thread(target=trabalhar, args=(indice,)) for indice in range(conexoes)]
+    for thread in threads:
+        thread.start()
+    barreira.wait()
+    inicio = time.perf_counter()
+    time.sleep(duracao)
+    parar.set()
+    for thread in threads:
+        thread.join()
+    decorrido = time.perf_counter() - inicio
+
+    total = HistogramaLatencia()
+    for histograma in histogramas:
+        total.mesclar(histograma)
+    return {
+        'conexoes': conexoes,
+        'requisicoes': total.contagem,
+        'falhas': sum(falhas),
+        'duracao_s': round(decorrido, 2),
+        'req_por_s': round(total.contagem / decorrido, 1) if decorrido else 0,
+        'p50_ms': total.quantil(0.5) / 1000,
+        'p90_ms': total.quantil(0.9) / 1000,
+        'p99_ms': total.quantil(0.99) / 1000,
+        'max_ms': total.maximo / 1000,
+    }
+
+def _aguardar_servico(url, limite_segundos=30):
+    """Espera o serviço responder em /saude; retorna False se não subir a tempo."""
+    partes = urlsplit(url)
+    prazo = time.monotonic() + limite_segundos
+    while time.monotonic() < prazo:
+        conexao = http.client.HTTPConnection(partes.hostname, partes.port or 80, timeout=1)
+        try:
+            conexao.request("GET", "/saude")
+            if conexao.getresponse().status == 200:
+                return True
+        except OSError:
+            pass
+        finally:
+            conexao.close()
+        time.sleep(0.2)
+    return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gerador de carga para o serviço HTTP da portaria.")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{PORTARIA_CONFIG['porta']}")
+    parser.add_argument("--linhas", type=_tamanho, default=TAMANHOS['10k'],
+                        help="Veículos semeados na base do serviço: 10k, 1m, 10m ou um número.")
+    parser.add_argument("--conexoes", type=int, default=8, help="Conexões keep-alive simultâneas.")
+    parser.add_argument("--duracao", type=float, default=10, help="Segundos de medição.")
+    parser.add_argument("--inexistentes", type=float, default=0.1, help="Fração de placas não cadastradas.")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--iniciar-servidor", action="store_true",
+                        help="Semeia uma base SQLite e sobe o serviço em outro processo antes da carga.")
+    parser.add_argument("--caminho", help="Base SQLite usada com --iniciar-servidor "
+                                          "(padrão: bench_<linhas>.db na pasta temporária).")
+    args = parser.parse_args()
+
+    processo_servidor = None
+    if args.iniciar_servidor:
+        caminho = args.caminho or os.path.join(tempfile.gettempdir(), f"bench_{args.linhas}.db")
+        pool_db = criar_pool(backend=criar_backend("sqlite", {'caminho': caminho, 'esquema': None}))
+        base_pronta = pool_db is not None and preparar_base(pool_db, args.linhas, args.semente)
+        if pool_db:
+            pool_db.fechar()
+        if not base_pronta:
+            print("Falha ao preparar a base do serviço.")
+            raise SystemExit(1)
+        porta = urlsplit(args.url).port or PORTARIA_CONFIG['porta']
+        processo_servidor = subprocess.Popen(
+            [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "servidor_portaria.py"),
+             "--backend", "sqlite", "--caminho", caminho, "--porta", str(porta), "--endereco", "127.0.0.1"],
+            stdout=subprocess.DEVNULL)
+        if not _aguardar_servico(args.url):
+            processo_servidor.terminate()
+            print("O serviço da portaria não respondeu.")
+            raise SystemExit(1)
+
+    try:
+        print(f"Consultando {args.url}/portao/<placa> com {args.conexoes} conexões por {args.duracao:.0f}s...")
+        resultado = gerar_carga(args.url, args.linhas, args.conexoes, args.duracao, args.inexistentes, args.semente)
+    finally:
+        if processo_servidor:
+            processo_servidor.terminate()
+            processo_servidor.wait()
+
+    print(f"Requisições: {resultado['requisicoes']}  falhas: {resultado['falhas']}  "
+          f"vazão: {resultado['req_por_s']:.0f} req/s")
+    print(f"Latência: p50 {resultado['p50_ms']:.2f} ms  p90 {resultado['p90_ms']:.2f} ms  "
+          f"p99 {resultado['p99_ms']:.2f} ms  máx {resultado['max_ms']:.2f} ms")
+    situacao = "dentro" if resultado['p99_ms'] <= META_P99_MS else "ACIMA"
+    print(f"p99 {situacao} da meta de {META_P99_MS} ms.")
+    raise SystemExit(0 if resultado['falhas'] == 0 and resultado['p99_ms'] <= META_P99_MS else 2)
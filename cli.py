@@ -0,0 +1,200 @@
+# cli.py
+# Modo não interativo (em lote) do sistema de estacionamento, separado do menu de main.py.
+# Executa comandos do CRUD de clientes, veículos e sessões em um único processo, com uma única
+# conexão, e devolve cada resultado como uma linha JSON na saída padrão.
+#
+# Uso:
+#   python cli.py consultar_cliente_por_cpf cpf=12345678901
+#   python cli.py adicionar_veiculo marca=Fiat modelo=Uno ano:=2010 placa=ABC1234 cliente_id:=1
+#   python cli.py < comandos.jsonl        (uma linha por comando: {"id": 1, "comando": "...", "args": {...}})
+#   python cli.py --listar                (comandos disponíveis e seus parâmetros)
+#   python cli.py --transacao < comandos.jsonl   (tudo em uma transação: se um comando falhar, nada é gravado)
+#
+# No argv, "nome=valor" passa o valor como texto e "nome:=valor" o interpreta como JSON (números,
+# listas, null...). Cada linha de saída tem: id, comando, ok, resultado, mensagens (as mensagens de
+# status que o menu imprimiria) e erro (categoria do último erro de banco, ou null).
+
+import argparse
+import inspect
+import json
+import sys
+from contextlib import contextmanager, redirect_stdout
+
+from backends import criar_backend
+from db_config import SQLITE_CONFIG
+from db_utils import conectar_db, limpar_erro, transacao, ultimo_erro
+from mapa_placas import mapa_placas
+from mensagens import coletar_mensagens
+from registros import Registro
+import cliente_crud
+import veiculo_crud
+import sessao_crud
+
+# Comandos disponíveis: nome -> função. As funções iterar_* ficam de fora (o resultado
+# completo está em listar_* e nas páginas de listar_*_pagina).
+COMANDOS = {
+    funcao.__name__: funcao for funcao in (
+        cliente_crud.adicionar_cliente, cliente_crud.listar_clientes, cliente_crud.listar_clientes_pagina,
+        cliente_crud.buscar_clientes_por_nome, cliente_crud.buscar_clientes, cliente_crud.consultar_cliente_por_cpf,
+        cliente_crud.consultar_cliente_por_id, cliente_crud.consultar_clientes_existentes,
+        cliente_crud.consultar_ids_por_cpfs, cliente_crud.atualizar_cliente,
+        cliente_crud.excluir_cliente, cliente_crud.excluir_clientes,
+        veiculo_crud.adicionar_veiculo, veiculo_crud.adicionar_veiculos, veiculo_crud.listar_veiculos,
+        veiculo_crud.listar_veiculos_pagina, veiculo_crud.consultar_veiculo_por_placa,
+        veiculo_crud.consultar_veiculo_por_id, veiculo_crud.consultar_placas_existentes,
+        veiculo_crud.atualizar_veiculo, veiculo_crud.excluir_veiculo, veiculo_crud.excluir_veiculos,
+        sessao_crud.registrar_entrada, sessao_crud.registrar_saida,
+        sessao_crud.veiculo_esta_dentro, sessao_crud.consultar_ocupacao,
+    )
+}
+# Comandos cuja resposta False é um resultado válido ("não"), e não uma falha
+_RESPOSTAS_BOOLEANAS = {'veiculo_esta_dentro'}
+
+def _usa_conexao(funcao):
+    """Indica se a função recebe a conexão como primeiro parâmetro."""
+    parametros = list(inspect.signature(funcao).parameters)
+    return bool(parametros) and parametros[0] == 'conexao'
+
+def _para_json(valor):
+    """Converte o que json não serializa sozinho (registros, datetime, Decimal, conjuntos) em valores equivalentes."""
+    if isinstance(valor, Registro):
+        return valor.como_dict()
+    if isinstance(valor, (set, frozenset)):
+        return sorted(valor)
+    return str(valor)
+
+def executar_comando(conexao, comando, args=None, id_comando=None):
+    """
+    Executa um comando do registro COMANDOS e monta o registro de resposta.
+
+    Args:
+        conexao: Objeto de conexão com o banco (compartilhado por todos os comandos).
+        comando (str): Nome do comando (ver COMANDOS).
+        args (dict or list, optional): Argumentos nomeados (dict) ou posicionais (list). Defaults to None.
+        id_comando (optional): Identificador devolvido na resposta, para casar pedido e resultado.
+
+    Returns:
+        dict: id, comando, ok, resultado, mensagens e erro.
+    """
+    resposta = {'id': id_comando, 'comando': comando, 'ok': False, 'resultado': None, 'mensagens': [], 'erro': None}
+    funcao = COMANDOS.get(comando)
+    if funcao is None:
+        resposta['mensagens'].append(f"Comando desconhecido: '{comando}'.")
+        return resposta
+
+    limpar_erro() # O erro da resposta deve ser o deste comando, não o de um anterior
+    posicionais, nomeados = (list(args), {}) if isinstance(args, list) else ([], dict(args or {}))
+    if _usa_conexao(funcao):
+        posicionais.insert(0, conexao)
+    with coletar_mensagens() as mensagens, redirect_stdout(sys.stderr):
+        try:
+            resultado = funcao(*posicionais, **nomeados)
+        except TypeError as err: # Argumentos que não correspondem à assinatura do comando
+            mensagens.append(f"Argumentos inválidos para '{comando}': {err}")
+        else:
+            resposta['resultado'] = resultado
+            # None e False são as respostas de falha das funções do CRUD
+            resposta['ok'] = resultado is not None and (resultado is not False or comando in _RESPOSTAS_BOOLEANAS)
+    resposta['mensagens'] = mensagens
+    resposta['erro'] = ultimo_erro()
+    return resposta
+
+def _argumentos_argv(itens):
+    """Converte ["nome=valor", "nome:=json", ...] em um dicionário de argumentos nomeados."""
+    args = {}
+    for item in itens:
+        nome, separador, valor = item.partition("=")
+        if not separador:
+            raise ValueError(f"Argumento sem '=': '{item}'")
+        if nome.endswith(":"):
+            args[nome[:-1]] = json.loads(valor)
+        else:
+            args[nome] = valor
+    return args
+
+def _comandos_stdin(entrada):
+    """Lê os comandos em JSON lines; gera tuplas (id, comando, args), ou (id, None, mensagem) se a linha for inválida."""
+    for numero, linha in enumerate(entrada, start=1):
+        linha = linha.strip()
+        if not linha:
+            continue
+        try:
+            pedido = json.loads(linha)
+            yield pedido.get('id', numero), pedido['comando'], pedido.get('args')
+        except (ValueError, KeyError, AttributeError) as err:
+            yield numero, None, f"Linha {numero} inválida: {err}"
+
+def _escrever(resposta):
+    """Escreve a resposta como uma linha JSON e a libera imediatamente (o consumidor pode ler em fluxo)."""
+    sys.stdout.write(json.dumps(resposta, ensure_ascii=False, default=_para_json) + "\n")
+    sys.stdout.flush()
+
+@contextmanager
+def _transacao_opcional(conexao, ativa):
+    """transacao(conexao) se 'ativa' (senão um bloco comum), com as mensagens do commit na saída de erros."""
+    if not ativa:
+        yield None
+        return
+    saida = sys.stdout
+    with redirect_stdout(sys.stderr), transacao(conexao) as tx, redirect_stdout(saida):
+        yield tx
+
+def _listar_comandos():
+    """Imprime os comandos disponíveis com os parâmetros que aceitam (sem a conexão)."""
+    for nome, funcao in COMANDOS.items():
+        parametros = [str(p) for p in inspect.signature(funcao).parameters.values() if p.name != 'conexao']
+        print(f"{nome}({', '.join(parametros)})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Executa comandos do estacionamento sem o menu interativo; "
+                                                 "sem comando no argv, lê JSON lines da entrada padrão.")
+    parser.add_argument("comando", nargs="?", help="Comando a executar (ver --listar).")
+    parser.add_argument("args", nargs="*", help="Argumentos nome=texto ou nome:=json.")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), help="Padrão: DB_BACKEND de db_config.")
+    parser.add_argument("--caminho", help="Arquivo da base SQLite (padrão: SQLITE_CONFIG).")
+    parser.add_argument("--listar", action="store_true", help="Lista os comandos disponíveis e sai.")
+    parser.add_argument("--transacao", action="store_true",
+                        help="Executa todos os comandos em uma única transação, desfeita se algum comando falhar.")
+    parser.add_argument("--mapa-placas", metavar="ARQUIVO",
+                        help="Consulta as placas das entradas no mapa compartilhado (ver mapa_placas.py), sem o banco.")
+    args = parser.parse_args()
+
+    if args.listar:
+        _listar_comandos()
+        sys.exit(0)
+
+    config = {**SQLITE_CONFIG, 'caminho': args.caminho} if args.caminho else None
+    with redirect_stdout(sys.stderr): # Mensagens de conexão não se misturam às linhas JSON
+        conexao = conectar_db(criar_backend(args.backend or 'sqlite', config) if args.backend or config else None)
+        if conexao is None:
+            sys.exit(1)
+        sessao_crud.carregar_sessoes_abertas(conexao) # Índice de ocupação usado por entradas e saídas
+        if args.mapa_placas and mapa_placas.abrir(args.mapa_placas) is None:
+            sys.exit(1)
+
+    falhas = 0
+    try:
+        if args.comando:
+            try:
+                pedidos = [(None, args.comando, _argumentos_argv(args.args))]
+            except ValueError as err:
+                parser.error(str(err))
+        else:
+            pedidos = _comandos_stdin(sys.stdin)
+        with _transacao_opcional(conexao, args.transacao) as tx:
+            for id_comando, comando, argumentos in pedidos:
+                if comando is None:
+                    resposta = {'id': id_comando, 'comando': None, 'ok': False, 'resultado': None,
+                                'mensagens': [argumentos], 'erro': None}
+                else:
+                    resposta = executar_comando(conexao, comando, argumentos, id_comando)
+                falhas += not resposta['ok']
+                _escrever(resposta)
+            if tx and falhas:
+                tx.desfazer()
+                print(f"{falhas} comando(s) falharam: a transação foi desfeita e nada foi gravado.", file=sys.stderr)
+        if tx and not falhas and not tx.confirmada:
+            falhas += 1 # O commit final falhou (mensagem já enviada à saída de erros)
+    finally:
+        conexao.close()
+    sys.exit(1 if falhas else 0)
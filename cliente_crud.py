@@ -1,184 +1,370 @@
-# cliente_crud.py
-# Este arquivo contém as funções CRUD (Create, Read, Update, Delete) para a entidade 'clientes'.
-
-from db_utils import executar_query  # Importa a função para executar queries
-
-def adicionar_cliente(conexao, nome, endereco, cpf, telefone):
-    """
-    Adiciona um novo cliente ao banco de dados.
-
-    Args:
-        conexao: Objeto de conexão com o banco.
-        nome (str): Nome do cliente.
-        endereco (str): Endereço do cliente.
-        cpf (str): CPF do cliente (deve ser único).
-        telefone (str): Telefone do cliente.
-
-    Returns:
-        int or None: O ID do cliente adicionado se sucesso, None caso contrário.
-    """
-    query = "INSERT INTO clientes (nome, endereco, cpf, telefone) VALUES (%s, %s, %s, %s)"
-    params = (nome, endereco, cpf, telefone)
-    try:
-        cliente_id = executar_query(conexao, query, params, commit=True)
-        if cliente_id:
-            print(f"Cliente '{nome}' adicionado com sucesso (ID: {cliente_id}).")
-            return cliente_id
-        else:
-            # Isso pode acontecer se o CPF já existir (devido à restrição UNIQUE)
-            # ou outro erro na execução da query.
-            print(f"Falha ao adicionar cliente '{nome}'. Verifique se o CPF já está cadastrado.")
-            return None
-    except Exception as e:
-        print(f"Erro inesperado ao adicionar cliente: {e}")
-        return None
-
-def listar_clientes(conexao):
-    """
-    Lista todos os clientes cadastrados no banco de dados.
-
-    Args:
-        conexao: Objeto de conexão com o banco.
-
-    Returns:
-        list or None: Uma lista de dicionários representando os clientes, ou None se não houver clientes ou erro.
-    """
-    query = "SELECT id, nome, cpf, telefone, endereco FROM clientes"
-    clientes = executar_query(conexao, query, fetch_all=True)
-    if clientes:
-        print("\n--- Lista de Clientes ---")
-        for cliente in clientes:
-            print(f"ID: {cliente['id']}, Nome: {cliente['nome']}, CPF: {cliente['cpf']}, "
-                  f"Tel: {cliente['telefone']}, End: {cliente['endereco']}")
-        print("------------------------")
-    elif clientes == []: # Lista vazia significa que não há clientes
-        print("Nenhum cliente cadastrado.")
-    else: # None significa que houve um erro na consulta
-        print("Falha ao listar clientes.")
-    return clientes
-
-def consultar_cliente_por_cpf(conexao, cpf):
-    """
-    Consulta um cliente específico pelo seu CPF.
-
-    Args:
-        conexao: Objeto de conexão com o banco.
-        cpf (str): CPF do cliente a ser consultado.
-
-    Returns:
-        dict or None: Um dicionário com os dados do cliente se encontrado, None caso contrário.
-    """
-    query = "SELECT id, nome, cpf, telefone, endereco FROM clientes WHERE cpf = %s"
-    params = (cpf,)
-    cliente = executar_query(conexao, query, params, fetch_one=True)
-    if cliente:
-        print("\n--- Cliente Encontrado ---")
-        print(f"ID: {cliente['id']}, Nome: {cliente['nome']}, CPF: {cliente['cpf']}, "
-              f"Tel: {cliente['telefone']}, End: {cliente['endereco']}")
-        print("------------------------")
-    else:
-        print(f"Cliente com CPF '{cpf}' não encontrado.")
-    return cliente
-
-def consultar_cliente_por_id(conexao, cliente_id):
-    """
-    Consulta um cliente específico pelo seu ID.
-    Esta função é útil internamente, por exemplo, para verificar se um cliente existe antes de uma atualização ou exclusão.
-
-    Args:
-        conexao: Objeto de conexão com o banco.
-        cliente_id (int): ID do cliente a ser consultado.
-
-    Returns:
-        dict or None: Um dicionário com os dados do cliente se encontrado, None caso contrário.
-    """
-    query = "SELECT id, nome, cpf, telefone, endereco FROM clientes WHERE id = %s"
-    params = (cliente_id,)
-    return executar_query(conexao, query, params, fetch_one=True)
-
-
-def atualizar_cliente(conexao, cliente_id, nome=None, endereco=None, telefone=None):
-    """
-    Atualiza os dados de um cliente existente.
-    O CPF não é atualizável por ser um identificador único importante.
-
-    Args:
-        conexao: Objeto de conexão com o banco.
-        cliente_id (int): ID do cliente a ser atualizado.
-        nome (str, optional): Novo nome do cliente.
-        endereco (str, optional): Novo endereço do cliente.
-        telefone (str, optional): Novo telefone do cliente.
-
-    Returns:
-        bool: True se a atualização foi bem-sucedida, False caso contrário.
-    """
-    cliente_existente = consultar_cliente_por_id(conexao, cliente_id)
-    if not cliente_existente:
-        print(f"Cliente com ID {cliente_id} não encontrado. Não é possível atualizar.")
-        return False
-
-    campos_para_atualizar = []
-    params_valores = []
-
-    if nome is not None and nome.strip() != "":
-        campos_para_atualizar.append("nome = %s")
-        params_valores.append(nome)
-    if endereco is not None and endereco.strip() != "":
-        campos_para_atualizar.append("endereco = %s")
-        params_valores.append(endereco)
-    if telefone is not None and telefone.strip() != "":
-        campos_para_atualizar.append("telefone = %s")
-        params_valores.append(telefone)
-
-    if not campos_para_atualizar:
-        print("Nenhum dado fornecido para atualização ou os dados fornecidos estão vazios.")
-        return False
-
-    query = f"UPDATE clientes SET {', '.join(campos_para_atualizar)} WHERE id = %s"
-    params_valores.append(cliente_id) # Adiciona o ID do cliente ao final da lista de parâmetros
-
-    # A função executar_query para UPDATE/DELETE retorna rowcount (>=0 se sucesso) ou None se erro.
-    resultado_update = executar_query(conexao, query, tuple(params_valores), commit=True)
-    if resultado_update is not None: # Se não for None, a query foi executada (mesmo que 0 linhas afetadas)
-        print(f"Dados do cliente ID {cliente_id} atualizados com sucesso.")
-        return True
-    else:
-        print(f"Falha ao atualizar dados do cliente ID {cliente_id}.")
-        return False
-
-
-def excluir_cliente(conexao, cliente_id):
-    """
-    Exclui um cliente do banco de dados.
-    Devido à configuração 'ON DELETE CASCADE' na tabela 'veiculos',
-    todos os veículos associados a este cliente também serão excluídos.
-
-    Args:
-        conexao: Objeto de conexão com o banco.
-        cliente_id (int): ID do cliente a ser excluído.
-
-    Returns:
-        bool: True se a exclusão foi bem-sucedida, False caso contrário.
-    """
-    cliente_existente = consultar_cliente_por_id(conexao, cliente_id)
-    if not cliente_existente:
-        print(f"Cliente com ID {cliente_id} não encontrado. Não é possível excluir.")
-        return False
-
-    # Confirmação do usuário antes de excluir
-    confirmacao = input(f"Tem certeza que deseja excluir o cliente '{cliente_existente['nome']}' (ID: {cliente_id}) "
-                        f"e todos os seus veículos associados? (s/N): ").strip().lower()
-    if confirmacao != 's':
-        print("Exclusão cancelada pelo usuário.")
-        return False
-
-    query = "DELETE FROM clientes WHERE id = %s"
-    params = (cliente_id,)
-    # A função executar_query para UPDATE/DELETE retorna rowcount (>=0 se sucesso) ou None se erro.
-    resultado_delete = executar_query(conexao, query, params, commit=True)
-    if resultado_delete is not None:
-        print(f"Cliente ID {cliente_id} ('{cliente_existente['nome']}') e seus veículos foram excluídos com sucesso.")
-        return True
-    else:
-        print(f"Falha ao excluir cliente ID {cliente_id}.")
-        return False
\ No newline at end of file
+# cliente_crud.py
+# Este arquivo contém as funções CRUD (Create, Read, Update, Delete) para a entidade 'clientes'.
+
+from db_utils import executar_query, iterar_query, registrar_comando  # Importa as funções para executar queries
+from db_utils import ultimo_erro, ERRO_DUPLICADO, ERRO_REFERENCIADO  # Motivo de uma escrita recusada pelo banco
+from db_utils import ao_desfazer, apos_confirmar  # Índice e cache acompanham o commit (ou o rollback) de transacao()
+from cache_consultas import cache_cadastro  # Cache das consultas por CPF e ID
+from log_alteracoes import executar_com_log, executar_conjunto_com_log  # Escritas gravadas também no log de alterações
+from mensagens import informar  # Mensagens de status (impressas no menu, coletadas no modo em lote)
+from indice_clientes import indice_clientes  # Busca por trechos de nome, telefone e CPF
+from indice_placas import indice_placas  # Os veículos excluídos em cascata saem também da busca aproximada de placas
+from registros import Cliente  # Linhas de cliente com __slots__ (acesso por atributo ou por chave)
+
+# Comandos de texto fixo, registrados uma vez e preparados no servidor em cada conexão.
+# As consultas pontuais por CPF e ID são o caminho mais quente na portaria.
+INSERIR_CLIENTE = registrar_comando("INSERT INTO clientes (nome, endereco, cpf, telefone) VALUES (%s, %s, %s, %s)")
+CONSULTA_CLIENTE_POR_CPF = registrar_comando("SELECT id, nome, cpf, telefone, endereco FROM clientes WHERE cpf = %s")
+CONSULTA_CLIENTE_POR_ID = registrar_comando("SELECT id, nome, cpf, telefone, endereco FROM clientes WHERE id = %s")
+EXCLUIR_CLIENTE = registrar_comando("DELETE FROM clientes WHERE id = %s")
+VEICULOS_DO_CLIENTE = registrar_comando("SELECT id FROM veiculos WHERE cliente_id = %s")
+
+def adicionar_cliente(conexao, nome, endereco, cpf, telefone):
+    """
+    Adiciona um novo cliente ao banco de dados.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        nome (str): Nome do cliente.
+        endereco (str): Endereço do cliente.
+        cpf (str): CPF do cliente (deve ser único).
+        telefone (str): Telefone do cliente.
+
+    Returns:
+        int or None: O ID do cliente adicionado se sucesso, None caso contrário.
+    """
+    query = INSERIR_CLIENTE
+    params = (nome, endereco, cpf, telefone)
+    try:
+        cliente_id = executar_com_log(conexao, query, params, 'clientes', 'INSERT', chave=cpf)
+        if cliente_id:
+            apos_confirmar(indice_clientes.adicionar, cliente_id, nome, cpf, telefone)
+            informar(f"Cliente '{nome}' adicionado com sucesso (ID: {cliente_id}).")
+            return cliente_id
+        elif ultimo_erro() == ERRO_DUPLICADO:
+            # A restrição UNIQUE do CPF recusou o INSERT: não é preciso consultar antes de inserir
+            informar(f"Falha ao adicionar cliente '{nome}': o CPF {cpf} já está cadastrado.")
+            return None
+        else:
+            informar(f"Falha ao adicionar cliente '{nome}'.")
+            return None
+    except Exception as e:
+        informar(f"Erro inesperado ao adicionar cliente: {e}")
+        return None
+
+def listar_clientes(conexao):
+    """
+    Lista todos os clientes cadastrados no banco de dados.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+
+    Returns:
+        list or None: Uma lista de Cliente (registros.py), ou None se não houver clientes ou erro.
+    """
+    query = "SELECT id, nome, cpf, telefone, endereco FROM clientes"
+    clientes = executar_query(conexao, query, fetch_all=True, formato=Cliente)
+    if clientes == []: # Lista vazia significa que não há clientes
+        informar("Nenhum cliente cadastrado.")
+    elif clientes is None: # None significa que houve um erro na consulta
+        informar("Falha ao listar clientes.")
+    return clientes
+
+def listar_clientes_pagina(conexao, ultimo_id=0, limite=50):
+    """
+    Busca uma página de clientes usando paginação por chave (WHERE id > ultimo_id).
+    Diferente de OFFSET, o custo de cada página não cresce com a posição na tabela.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        ultimo_id (int, optional): Maior ID da página anterior (0 para a primeira página). Defaults to 0.
+        limite (int, optional): Quantidade máxima de clientes na página. Defaults to 50.
+
+    Returns:
+        list or None: Lista de Cliente ordenada por ID (vazia ao fim da tabela), ou None em caso de erro.
+    """
+    query = "SELECT id, nome, cpf, telefone, endereco FROM clientes WHERE id > %s ORDER BY id LIMIT %s"
+    return executar_query(conexao, query, (ultimo_id, limite), fetch_all=True, formato=Cliente)
+
+def iterar_clientes(conexao, tamanho_lote=500):
+    """
+    Percorre todos os clientes em ordem de ID sem carregar a tabela inteira na memória.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        tamanho_lote (int, optional): Linhas trazidas do servidor por vez. Defaults to 500.
+
+    Yields:
+        Cliente: Um cliente por vez.
+    """
+    query = "SELECT id, nome, cpf, telefone, endereco FROM clientes ORDER BY id"
+    return iterar_query(conexao, query, tamanho_lote=tamanho_lote, formato=Cliente)
+
+def buscar_clientes_por_nome(conexao, inicio_nome, limite=20):
+    """
+    Busca clientes cujo nome começa com o texto informado (usa o índice idx_nome).
+    Usado na escolha do proprietário de um veículo, para não listar a tabela inteira.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        inicio_nome (str): Início do nome do cliente.
+        limite (int, optional): Quantidade máxima de resultados. Defaults to 20.
+
+    Returns:
+        list or None: Lista de Cliente ordenada por nome, ou None em caso de erro.
+    """
+    # Escapa os curingas do LIKE para que '%' e '_' digitados sejam tratados literalmente.
+    # O caractere de escape '!' é declarado no SQL porque MySQL e SQLite têm padrões diferentes.
+    termo = inicio_nome.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+    query = ("SELECT id, nome, cpf, telefone, endereco FROM clientes "
+             "WHERE nome LIKE %s ESCAPE '!' ORDER BY nome LIMIT %s")
+    return executar_query(conexao, query, (termo + "%", limite), fetch_all=True, formato=Cliente)
+
+def buscar_clientes(conexao, texto, pagina=1, limite=20):
+    """
+    Busca clientes por qualquer trecho do nome, do telefone ou do CPF, sem diferenciar maiúsculas,
+    minúsculas e acentos (ex.: 'joao silv', '98765', '123.456'), usando o índice em memória de
+    indice_clientes.py (carregado na primeira busca e sincronizado com o log de alterações).
+    Buscas com menos de 3 caracteres procuram apenas o início do nome.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        texto (str): Texto buscado; com várias palavras, o cliente deve conter todas.
+        pagina (int, optional): Página do resultado, a partir de 1. Defaults to 1.
+        limite (int, optional): Clientes por página. Defaults to 20.
+
+    Returns:
+        list or None: Clientes (Cliente) da página, do mais relevante (CPF/telefone exatos, nome
+        igual, nome iniciando pelo texto, palavra iniciando pelo texto, trecho) ao menos relevante e,
+        nos empates, por nome; None se o índice não pôde ser carregado ou em caso de erro.
+    """
+    try:
+        if not indice_clientes.carregado:
+            carregados = indice_clientes.carregar(conexao)
+        else:
+            carregados = indice_clientes.sincronizar(conexao) # Alterações feitas por outros processos
+    except ImportError as err:
+        informar(f"Busca de clientes indisponível: {err}")
+        return None
+    if carregados is None:
+        informar("Falha ao atualizar o índice de busca de clientes.")
+        return None
+
+    encontrados, _ = indice_clientes.buscar(texto, pagina, limite)
+    if not encontrados:
+        if pagina <= 1:
+            informar(f"Nenhum cliente encontrado para '{texto}'.")
+        return []
+    ids = [cliente_id for cliente_id, _ in encontrados]
+    marcadores = ", ".join(["%s"] * len(ids))
+    query = f"SELECT id, nome, cpf, telefone, endereco FROM clientes WHERE id IN ({marcadores})"
+    linhas = executar_query(conexao, query, tuple(ids), fetch_all=True, formato=Cliente)
+    if linhas is None:
+        informar("Falha ao buscar clientes.")
+        return None
+    por_id = {linha.id: linha for linha in linhas}
+    return [por_id[cliente_id] for cliente_id in ids if cliente_id in por_id] # Na ordem de relevância
+
+def consultar_cliente_por_cpf(conexao, cpf):
+    """
+    Consulta um cliente específico pelo seu CPF.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        cpf (str): CPF do cliente a ser consultado.
+
+    Returns:
+        Cliente or None: Os dados do cliente se encontrado, None caso contrário.
+    """
+    query = CONSULTA_CLIENTE_POR_CPF
+    params = (cpf,)
+    cliente = cache_cadastro.obter(conexao, ('cpf', cpf))
+    if cliente is None:
+        cliente = executar_query(conexao, query, params, fetch_one=True, formato=Cliente)
+        if cliente:
+            cache_cadastro.guardar_cliente(conexao, cliente)
+    if not cliente:
+        informar(f"Cliente com CPF '{cpf}' não encontrado.")
+    return cliente
+
+def consultar_cliente_por_id(conexao, cliente_id):
+    """
+    Consulta um cliente específico pelo seu ID.
+    Usada pela interface, por exemplo, para mostrar os dados atuais antes de uma atualização ou exclusão.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        cliente_id (int): ID do cliente a ser consultado.
+
+    Returns:
+        Cliente or None: Os dados do cliente se encontrado, None caso contrário.
+    """
+    query = CONSULTA_CLIENTE_POR_ID
+    params = (cliente_id,)
+    cliente = cache_cadastro.obter(conexao, ('cliente_id', cliente_id))
+    if cliente is None:
+        cliente = executar_query(conexao, query, params, fetch_one=True, formato=Cliente)
+        if cliente:
+            cache_cadastro.guardar_cliente(conexao, cliente)
+    return cliente
+
+def consultar_clientes_existentes(conexao, ids_clientes):
+    """
+    Verifica de uma só vez quais IDs de cliente existem no banco.
+    Usado para validar lotes de registros com uma única consulta (WHERE id IN (...)).
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        ids_clientes (iterable): IDs de cliente a verificar.
+
+    Returns:
+        set or None: Conjunto com os IDs encontrados, ou None em caso de erro.
+    """
+    ids = list(set(ids_clientes))
+    if not ids:
+        return set()
+    marcadores = ", ".join(["%s"] * len(ids))
+    query = f"SELECT id FROM clientes WHERE id IN ({marcadores})"
+    linhas = executar_query(conexao, query, tuple(ids), fetch_all=True, formato='tupla')
+    if linhas is None:
+        return None
+    return {cliente_id for cliente_id, in linhas}
+
+def consultar_ids_por_cpfs(conexao, cpfs):
+    """
+    Busca de uma só vez os IDs dos clientes com os CPFs informados.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        cpfs (iterable): CPFs a procurar.
+
+    Returns:
+        dict or None: Mapeamento {cpf: id} dos CPFs cadastrados, ou None em caso de erro.
+    """
+    lista_cpfs = list(set(cpfs))
+    if not lista_cpfs:
+        return {}
+    marcadores = ", ".join(["%s"] * len(lista_cpfs))
+    query = f"SELECT id, cpf FROM clientes WHERE cpf IN ({marcadores})"
+    linhas = executar_query(conexao, query, tuple(lista_cpfs), fetch_all=True, formato='tupla')
+    if linhas is None:
+        return None
+    return {cpf: cliente_id for cliente_id, cpf in linhas}
+
+
+def atualizar_cliente(conexao, cliente_id, nome=None, endereco=None, telefone=None):
+    """
+    Atualiza os dados de um cliente existente.
+    O CPF não é atualizável por ser um identificador único importante.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        cliente_id (int): ID do cliente a ser atualizado.
+        nome (str, optional): Novo nome do cliente.
+        endereco (str, optional): Novo endereço do cliente.
+        telefone (str, optional): Novo telefone do cliente.
+
+    Returns:
+        bool: True se a atualização foi bem-sucedida, False caso contrário (inclusive cliente inexistente).
+    """
+    campos_para_atualizar = []
+    params_valores = []
+
+    if nome is not None and nome.strip() != "":
+        campos_para_atualizar.append("nome = %s")
+        params_valores.append(nome)
+    if endereco is not None and endereco.strip() != "":
+        campos_para_atualizar.append("endereco = %s")
+        params_valores.append(endereco)
+    if telefone is not None and telefone.strip() != "":
+        campos_para_atualizar.append("telefone = %s")
+        params_valores.append(telefone)
+
+    if not campos_para_atualizar:
+        informar("Nenhum dado fornecido para atualização ou os dados fornecidos estão vazios.")
+        return False
+
+    query = f"UPDATE clientes SET {', '.join(campos_para_atualizar)} WHERE id = %s"
+    params_valores.append(cliente_id) # Adiciona o ID do cliente ao final da lista de parâmetros
+
+    # Um único comando: rowcount 0 significa que o cliente não existe, sem consultá-lo antes.
+    resultado_update = executar_com_log(conexao, query, tuple(params_valores), 'clientes', 'UPDATE', registro_id=cliente_id)
+    cache_cadastro.invalidar_cliente(conexao, cliente_id)
+    ao_desfazer(cache_cadastro.limpar) # Leituras feitas na transação podem ter guardado dados desfeitos
+    if resultado_update is None:
+        informar(f"Falha ao atualizar dados do cliente ID {cliente_id}.")
+        return False
+    if resultado_update == 0:
+        informar(f"Cliente com ID {cliente_id} não encontrado. Não é possível atualizar.")
+        return False
+    apos_confirmar(indice_clientes.atualizar, cliente_id, nome, telefone)
+    informar(f"Dados do cliente ID {cliente_id} atualizados com sucesso.")
+    return True
+
+
+def excluir_cliente(conexao, cliente_id):
+    """
+    Exclui um cliente do banco de dados.
+    Devido à configuração 'ON DELETE CASCADE' na tabela 'veiculos',
+    todos os veículos associados a este cliente também serão excluídos.
+    A confirmação com o usuário fica a cargo da interface (ver main.py).
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        cliente_id (int): ID do cliente a ser excluído.
+
+    Returns:
+        bool: True se a exclusão foi bem-sucedida, False caso contrário (inclusive cliente inexistente).
+    """
+    # Veículos que o ON DELETE CASCADE vai excluir, para retirá-los também do índice de placas
+    veiculos = executar_query(conexao, VEICULOS_DO_CLIENTE, (cliente_id,), fetch_all=True, formato='tupla') or []
+    # Um único comando: rowcount 0 significa que o cliente não existe.
+    resultado_delete = executar_com_log(conexao, EXCLUIR_CLIENTE, (cliente_id,), 'clientes', 'DELETE', registro_id=cliente_id)
+    cache_cadastro.invalidar_cliente(conexao, cliente_id) # Também remove os veículos do cliente (ON DELETE CASCADE)
+    ao_desfazer(cache_cadastro.limpar)
+    if resultado_delete:
+        apos_confirmar(indice_clientes.remover, cliente_id)
+        for veiculo_id, in veiculos:
+            apos_confirmar(indice_placas.remover, veiculo_id)
+    if resultado_delete is None:
+        if ultimo_erro() == ERRO_REFERENCIADO:
+            informar(f"Cliente ID {cliente_id} ainda é referenciado por outros registros e não pode ser excluído.")
+        else:
+            informar(f"Falha ao excluir cliente ID {cliente_id}.")
+        return False
+    if resultado_delete == 0:
+        informar(f"Cliente com ID {cliente_id} não encontrado. Não é possível excluir.")
+        return False
+    informar(f"Cliente ID {cliente_id} e seus veículos foram excluídos com sucesso.")
+    return True
+
+def excluir_clientes(conexao, ids_clientes):
+    """
+    Exclui vários clientes (e seus veículos) com um único comando DELETE ... WHERE id IN (...).
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        ids_clientes (iterable): IDs dos clientes a excluir.
+
+    Returns:
+        int or None: Quantidade de clientes excluídos (IDs inexistentes são ignorados), ou None em caso de erro.
+    """
+    ids = list(set(ids_clientes))
+    if not ids:
+        return 0
+    marcadores = ", ".join(["%s"] * len(ids))
+    veiculos = executar_query(conexao, f"SELECT id FROM veiculos WHERE cliente_id IN ({marcadores})", tuple(ids),
+                              fetch_all=True, formato='tupla') or []
+    query = f"DELETE FROM clientes WHERE id IN ({marcadores})"
+    excluidos = executar_conjunto_com_log(conexao, query, tuple(ids), 'clientes', 'DELETE', ids)
+    for cliente_id in ids:
+        cache_cadastro.invalidar_cliente(conexao, cliente_id)
+        if excluidos:
+            apos_confirmar(indice_clientes.remover, cliente_id)
+    if excluidos:
+        for veiculo_id, in veiculos:
+            apos_confirmar(indice_placas.remover, veiculo_id)
+    ao_desfazer(cache_cadastro.limpar)
+    if excluidos is None:
+        informar("Falha ao excluir os clientes informados.")
+    return excluidos
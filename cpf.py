@@ -0,0 +1,10 @@
+# cpf.py
+# Validação de CPF compartilhada pelo console (main.py), pela importação em lote e pelo servidor da portaria.
+# Fica fora de main.py para que os módulos de biblioteca não precisem importar o menu de console.
+
+def validar_cpf(cpf):
+    """
+    Valida o formato do CPF: exatamente 11 dígitos numéricos, sem pontos ou hífen.
+    Retorna True se válido, False caso contrário.
+    """
+    return len(cpf) == 11 and cpf.isdigit()
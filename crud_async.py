@@ -0,0 +1,167 @@
+# crud_async.py
+# Versão assíncrona (asyncio) das funções de cliente_crud e veiculo_crud.
+# Cada chamada é executada em uma thread de um executor dimensionado pelo pool de conexões,
+# de modo que várias consultas simultâneas (câmeras, totens) sobrepõem a espera pelo banco.
+# As assinaturas e os valores de retorno são os mesmos das funções síncronas.
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cliente_crud
+import veiculo_crud
+from db_config import POOL_CONFIG
+from db_utils import PoolConexoes
+
+# Uma thread por conexão do pool: mais threads do que conexões só ficariam esperando na fila do pool
+_executor = ThreadPoolExecutor(max_workers=POOL_CONFIG['tamanho'], thread_name_prefix="crud_async")
+
+# Uma conexão avulsa (não-pool) não pode ser usada por duas threads ao mesmo tempo
+_lock_conexao_unica = threading.Lock()
+
+def _chamar_serializado(funcao, *args, **kwargs):
+    with _lock_conexao_unica:
+        return funcao(*args, **kwargs)
+
+async def _em_thread(funcao, conexao, *args, **kwargs):
+    """
+    Executa uma função síncrona do CRUD no executor sem bloquear o loop de eventos.
+    Com um PoolConexoes as chamadas rodam em paralelo; com uma conexão avulsa são serializadas.
+    """
+    if not isinstance(conexao, PoolConexoes):
+        funcao = functools.partial(_chamar_serializado, funcao)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(funcao, conexao, *args, **kwargs))
+
+def encerrar():
+    """Encerra o executor de threads (chamar ao finalizar a aplicação)."""
+    _executor.shutdown(wait=True)
+
+# --- Clientes ---
+
+async def adicionar_cliente(conexao, nome, endereco, cpf, telefone):
+    """Versão assíncrona de cliente_crud.adicionar_cliente."""
+    return await _em_thread(cliente_crud.adicionar_cliente, conexao, nome, endereco, cpf, telefone)
+
+async def listar_clientes(conexao):
+    """Versão assíncrona de cliente_crud.listar_clientes."""
+    return await _em_thread(cliente_crud.listar_clientes, conexao)
+
+async def listar_clientes_pagina(conexao, ultimo_id=0, limite=50):
+    """Versão assíncrona de cliente_crud.listar_clientes_pagina."""
+    return await _em_thread(cliente_crud.listar_clientes_pagina, conexao, ultimo_id, limite)
+
+async def iterar_clientes(conexao, tamanho_lote=500):
+    """
+    Percorre todos os clientes página por página (paginação por chave), sem bloquear o loop.
+
+    Yields:
+        dict: Um cliente por vez.
+    """
+    ultimo_id = 0
+    while True:
+        pagina = await listar_clientes_pagina(conexao, ultimo_id, tamanho_lote)
+        if not pagina:
+            return
+        for cliente in pagina:
+            yield cliente
+        ultimo_id = pagina[-1]['id']
+
+async def buscar_clientes_por_nome(conexao, inicio_nome, limite=20):
+    """Versão assíncrona de cliente_crud.buscar_clientes_por_nome."""
+    return await _em_thread(cliente_crud.buscar_clientes_por_nome, conexao, inicio_nome, limite)
+
+async def buscar_clientes(conexao, texto, pagina=1, limite=20):
+    """Versão assíncrona de cliente_crud.buscar_clientes."""
+    return await _em_thread(cliente_crud.buscar_clientes, conexao, texto, pagina, limite)
+
+async def consultar_cliente_por_cpf(conexao, cpf):
+    """Versão assíncrona de cliente_crud.consultar_cliente_por_cpf."""
+    return await _em_thread(cliente_crud.consultar_cliente_por_cpf, conexao, cpf)
+
+async def consultar_cliente_por_id(conexao, cliente_id):
+    """Versão assíncrona de cliente_crud.consultar_cliente_por_id."""
+    return await _em_thread(cliente_crud.consultar_cliente_por_id, conexao, cliente_id)
+
+async def consultar_clientes_existentes(conexao, ids_clientes):
+    """Versão assíncrona de cliente_crud.consultar_clientes_existentes."""
+    return await _em_thread(cliente_crud.consultar_clientes_existentes, conexao, ids_clientes)
+
+async def consultar_ids_por_cpfs(conexao, cpfs):
+    """Versão assíncrona de cliente_crud.consultar_ids_por_cpfs."""
+    return await _em_thread(cliente_crud.consultar_ids_por_cpfs, conexao, cpfs)
+
+async def atualizar_cliente(conexao, cliente_id, nome=None, endereco=None, telefone=None):
+    """Versão assíncrona de cliente_crud.atualizar_cliente."""
+    return await _em_thread(cliente_crud.atualizar_cliente, conexao, cliente_id, nome, endereco, telefone)
+
+async def excluir_cliente(conexao, cliente_id):
+    """Versão assíncrona de cliente_crud.excluir_cliente."""
+    return await _em_thread(cliente_crud.excluir_cliente, conexao, cliente_id)
+
+async def excluir_clientes(conexao, ids_clientes):
+    """Versão assíncrona de cliente_crud.excluir_clientes."""
+    return await _em_thread(cliente_crud.excluir_clientes, conexao, ids_clientes)
+
+# --- Veículos ---
+
+async def adicionar_veiculo(conexao, marca, modelo, ano, placa, cliente_id):
+    """Versão assíncrona de veiculo_crud.adicionar_veiculo."""
+    return await _em_thread(veiculo_crud.adicionar_veiculo, conexao, marca, modelo, ano, placa, cliente_id)
+
+async def adicionar_veiculos(conexao, veiculos):
+    """Versão assíncrona de veiculo_crud.adicionar_veiculos."""
+    return await _em_thread(veiculo_crud.adicionar_veiculos, conexao, veiculos)
+
+async def listar_veiculos(conexao):
+    """Versão assíncrona de veiculo_crud.listar_veiculos."""
+    return await _em_thread(veiculo_crud.listar_veiculos, conexao)
+
+async def listar_veiculos_pagina(conexao, ultimo_id=0, limite=50):
+    """Versão assíncrona de veiculo_crud.listar_veiculos_pagina."""
+    return await _em_thread(veiculo_crud.listar_veiculos_pagina, conexao, ultimo_id, limite)
+
+async def iterar_veiculos(conexao, tamanho_lote=500):
+    """
+    Percorre todos os veículos página por página (paginação por chave), sem bloquear o loop.
+
+    Yields:
+        dict: Um veículo por vez.
+    """
+    ultimo_id = 0
+    while True:
+        pagina = await listar_veiculos_pagina(conexao, ultimo_id, tamanho_lote)
+        if not pagina:
+            return
+        for veiculo in pagina:
+            yield veiculo
+        ultimo_id = pagina[-1]['id']
+
+async def consultar_veiculo_por_placa(conexao, placa):
+    """Versão assíncrona de veiculo_crud.consultar_veiculo_por_placa."""
+    return await _em_thread(veiculo_crud.consultar_veiculo_por_placa, conexao, placa)
+
+async def consultar_veiculos_por_placa_aproximada(conexao, placa_lida, distancia_maxima=None, limite=None):
+    """Versão assíncrona de veiculo_crud.consultar_veiculos_por_placa_aproximada."""
+    return await _em_thread(veiculo_crud.consultar_veiculos_por_placa_aproximada, conexao, placa_lida, distancia_maxima, limite)
+
+async def consultar_veiculo_por_id(conexao, veiculo_id):
+    """Versão assíncrona de veiculo_crud.consultar_veiculo_por_id."""
+    return await _em_thread(veiculo_crud.consultar_veiculo_por_id, conexao, veiculo_id)
+
+async def consultar_placas_existentes(conexao, placas):
+    """Versão assíncrona de veiculo_crud.consultar_placas_existentes."""
+    return await _em_thread(veiculo_crud.consultar_placas_existentes, conexao, placas)
+
+async def atualizar_veiculo(conexao, veiculo_id, marca=None, modelo=None, ano=None, cliente_id_novo=None):
+    """Versão assíncrona de veiculo_crud.atualizar_veiculo."""
+    return await _em_thread(veiculo_crud.atualizar_veiculo, conexao, veiculo_id, marca, modelo, ano, cliente_id_novo)
+
+async def excluir_veiculo(conexao, veiculo_id):
+    """Versão assíncrona de veiculo_crud.excluir_veiculo."""
+    return await _em_thread(veiculo_crud.excluir_veiculo, conexao, veiculo_id)
+
+async def excluir_veiculos(conexao, ids_veiculos):
+    """Versão assíncrona de veiculo_crud.excluir_veiculos."""
+    return await _em_thread(veiculo_crud.excluir_veiculos, conexao, ids_veiculos)
@@ -0,0 +1,135 @@
+# dados_sinteticos.py
+# Gerador de clientes e veículos fictícios para benchmarks e testes de carga.
+# CPFs têm dígitos verificadores válidos e as placas são sorteadas no padrão antigo (ABC1234)
+# ou no Mercosul (ABC1D23) e gravadas na forma canônica (placas.py), como faz o cadastro. Os dados são determinísticos: a mesma semente gera sempre as mesmas linhas,
+# e o registro de número i é sempre o mesmo, o que permite escolher chaves existentes sem consultar o banco.
+
+import random
+
+from db_utils import conexao_dedicada, executar_muitos, executar_query
+from placas import normalizar_placa
+
+NOMES = ("Ana", "Bruno", "Carla", "Diego", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela", "João",
+         "Karina", "Lucas", "Mariana", "Nicolas", "Olívia", "Paulo", "Quitéria", "Rafael", "Sofia", "Tiago")
+SOBRENOMES = ("Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira",
+              "Lima", "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes")
+RUAS = ("Rua das Flores", "Avenida Brasil", "Rua XV de Novembro", "Avenida Paulista", "Rua da Praia")
+MODELOS = (("Fiat", "Uno"), ("Fiat", "Argo"), ("Volkswagen", "Gol"), ("Volkswagen", "Polo"),
+           ("Chevrolet", "Onix"), ("Chevrolet", "Celta"), ("Ford", "Ka"), ("Hyundai", "HB20"),
+           ("Toyota", "Corolla"), ("Honda", "Civic"), ("Renault", "Kwid"), ("Jeep", "Renegade"))
+
+LETRAS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# Constante ímpar e não múltipla de 5 (coprima com 10^9): espalha os números-base dos CPFs
+# sem repetição, para que CPFs consecutivos não fiquem parecidos
+_MULTIPLICADOR_CPF = 387_420_489
+_TOTAL_PLACAS = 26 ** 3 * 10 ** 4 # Combinações possíveis no padrão antigo
+_MULTIPLICADOR_PLACA = 48_271     # Coprimo com _TOTAL_PLACAS
+PROPORCAO_MERCOSUL = 0.5          # Fração dos veículos sintéticos com placa no padrão Mercosul
+
+
+def digitos_verificadores_cpf(base):
+    """Calcula os dois dígitos verificadores de uma base de 9 dígitos (texto) do CPF."""
+    digitos = [int(digito) for digito in base]
+    for tamanho in (9, 10):
+        soma = sum(digito * peso for digito, peso in zip(digitos, range(tamanho + 1, 1, -1)))
+        resto = soma * 10 % 11
+        digitos.append(0 if resto == 10 else resto)
+    return f"{digitos[9]}{digitos[10]}"
+
+def cpf_numero(i):
+    """Retorna o CPF (11 dígitos, válido) de número i; números distintos geram CPFs distintos (até 10^9)."""
+    base = f"{(i * _MULTIPLICADOR_CPF) % 10 ** 9:09d}"
+    return base + digitos_verificadores_cpf(base)
+
+def placa_numero(i, mercosul):
+    """
+    Retorna a placa de número i, no padrão Mercosul (ABC1D23) ou antigo (ABC1234).
+
+    As duas formas de um mesmo número correspondem à conversão oficial (a segunda letra do Mercosul
+    é o dígito antigo: 0=A, 1=B, ...), então números distintos nunca geram a mesma placa,
+    nem após converter todas para um único padrão.
+    """
+    n = (i * _MULTIPLICADOR_PLACA) % _TOTAL_PLACAS
+    n, numeros = divmod(n, 10 ** 4)
+    letras = LETRAS[n // 676] + LETRAS[n // 26 % 26] + LETRAS[n % 26]
+    numeros = f"{numeros:04d}"
+    if mercosul:
+        return f"{letras}{numeros[0]}{LETRAS[int(numeros[1])]}{numeros[2:]}"
+    return f"{letras}{numeros}"
+
+def gerar_cliente(i, rng):
+    """Retorna a tupla (nome, endereco, cpf, telefone) do cliente de número i."""
+    nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+    endereco = f"{rng.choice(RUAS)}, {rng.randint(1, 9999)}"
+    telefone = f"{rng.randint(11, 99)}9{rng.randint(10_000_000, 99_999_999)}"
+    return nome, endereco, cpf_numero(i), telefone
+
+def placa_do_veiculo(i):
+    """
+    Retorna a placa do veículo de número i. O padrão (antigo ou Mercosul) depende só de i,
+    então a placa de qualquer veículo semeado pode ser calculada sem consultar o banco.
+    """
+    mercosul = (i * 2_654_435_761) % 1000 < PROPORCAO_MERCOSUL * 1000
+    return placa_numero(i, mercosul)
+
+def gerar_veiculo(i, cliente_id, rng):
+    """Retorna a tupla (marca, modelo, ano, placa, cliente_id) do veículo de número i, com a placa canônica."""
+    marca, modelo = rng.choice(MODELOS)
+    placa = placa_do_veiculo(i)
+    # Veículos emplacados a partir de 2018 já saíram com placa Mercosul
+    ano = rng.randint(1995, 2025) if placa[4].isalpha() else rng.randint(1995, 2017)
+    return marca, modelo, ano, normalizar_placa(placa), cliente_id
+
+def semear(conexao, total_clientes, total_veiculos=None, semente=42, tamanho_lote=10000):
+    """
+    Insere clientes e veículos sintéticos em tabelas vazias, em lotes (executemany).
+    Os IDs são explícitos (1..N), então o cliente de número i tem ID i. As linhas não passam pelo
+    log de alterações: a semeadura representa uma carga inicial, não alterações de cadastro.
+
+    Args:
+        conexao: Objeto de conexão com o banco ou PoolConexoes.
+        total_clientes (int): Quantidade de clientes.
+        total_veiculos (int, optional): Quantidade de veículos; sem valor, um por cliente. Defaults to None.
+        semente (int, optional): Semente do gerador. Defaults to 42.
+        tamanho_lote (int, optional): Linhas por comando executemany. Defaults to 10000.
+
+    Returns:
+        bool: True se todas as linhas foram inseridas, False caso contrário.
+    """
+    total_veiculos = total_clientes if total_veiculos is None else total_veiculos
+    rng = random.Random(semente)
+    tarefas = (
+        ("INSERT INTO clientes (id, nome, endereco, cpf, telefone) VALUES (%s, %s, %s, %s, %s)",
+         total_clientes, lambda i: (i, *gerar_cliente(i, rng))),
+        ("INSERT INTO veiculos (id, marca, modelo, ano, placa, cliente_id) VALUES (%s, %s, %s, %s, %s, %s)",
+         total_veiculos, lambda i: (i, *gerar_veiculo(i, rng.randint(1, total_clientes), rng))),
+    )
+    with conexao_dedicada(conexao) as conexao_carga:
+        for query, total, gerar in tarefas:
+            for inicio in range(1, total + 1, tamanho_lote):
+                lote = [gerar(i) for i in range(inicio, min(inicio + tamanho_lote, total + 1))]
+                if executar_muitos(conexao_carga, query, lote) is None:
+                    return False
+    return True
+
+def remover_excedentes(conexao, total_clientes, total_veiculos=None):
+    """
+    Remove os registros criados depois da semeadura (IDs acima dos semeados), devolvendo a base
+    ao estado semeado; assim os números de CPF e placa acima de N ficam livres para a próxima execução.
+
+    Returns:
+        bool: True se sucesso, False caso contrário.
+    """
+    total_veiculos = total_clientes if total_veiculos is None else total_veiculos
+    veiculos = executar_query(conexao, "DELETE FROM veiculos WHERE id > %s", (total_veiculos,), commit=True)
+    clientes = executar_query(conexao, "DELETE FROM clientes WHERE id > %s", (total_clientes,), commit=True)
+    return veiculos is not None and clientes is not None
+
+def contar_semeados(conexao):
+    """Retorna (clientes, veiculos) já cadastrados, para decidir se uma base semeada pode ser reaproveitada."""
+    clientes = executar_query(conexao, "SELECT COUNT(*) AS total FROM clientes", fetch_one=True)
+    veiculos = executar_query(conexao, "SELECT COUNT(*) AS total FROM veiculos", fetch_one=True)
+    if clientes is None or veiculos is None:
+        return None
+    return clientes['total'], veiculos['total']
@@ -1,6 +1,121 @@
-DB_CONFIG = {
-    'host': 'localhost',  # Endereço do servidor MySQL (geralmente 'localhost' para desenvolvimento local)
-    'user': 'root',       # Nome de usuário do MySQL (pode ser 'root' ou outro usuário que você tenha criado)
-    'password': 'Estudante@1',  # !! IMPORTANTE: Substitua pela senha do seu usuário MySQL !!
-    'database': 'estacionamento_db'  # Nome do banco de dados que será utilizado
-}
\ No newline at end of file
+DB_CONFIG = {
+    'host': 'localhost',  # Endereço do servidor MySQL (geralmente 'localhost' para desenvolvimento local)
+    'user': 'root',       # Nome de usuário do MySQL (pode ser 'root' ou outro usuário que você tenha criado)
+    'password': 'Estudante@1',  # !! IMPORTANTE: Substitua pela senha do seu usuário MySQL !!
+    'database': 'estacionamento_db'  # Nome do banco de dados que será utilizado
+}
+
+DB_BACKEND = 'mysql'  # Motor de banco usado pelo sistema: 'mysql' (servidor) ou 'sqlite' (arquivo local, sem servidor)
+
+SQLITE_CONFIG = {
+    'caminho': 'estacionamento.db',  # Arquivo do banco SQLite (':memory:' para um banco temporário em memória)
+    'esquema': None                  # Script de criação das tabelas; None usa o estacionamento_db_sqlite.sql do projeto
+}
+
+POOL_CONFIG = {
+    'tamanho': 5,            # Número máximo de conexões abertas ao mesmo tempo pelo processo
+    'timeout_espera': 10,    # Segundos que uma operação aguarda por uma conexão livre antes de desistir
+    'ping_apos_ocioso': 30   # Conexões paradas há mais segundos que isso são testadas (ping) antes de serem reutilizadas
+}
+
+CACHE_CONFIG = {
+    'tamanho_maximo': 10000,  # Quantidade máxima de consultas (placa, CPF, ID) guardadas em memória
+    'ttl_segundos': 60        # Tempo máximo que um resultado fica no cache antes de ser buscado de novo no banco
+}
+
+ESTACIONAMENTO_CONFIG = {
+    'total_vagas': 200  # Capacidade do estacionamento, usada no cálculo de vagas livres
+}
+
+TARIFA_CONFIG = {
+    'tolerancia_minutos': 15,   # Permanências até este tempo não são cobradas
+    # Faixas horárias (hora_inicio, hora_fim, centavos por hora iniciada); devem cobrir as 24 horas
+    'faixas': [
+        (0, 6, 400),    # Madrugada
+        (6, 20, 800),   # Diurno
+        (20, 24, 500),  # Noturno
+    ],
+    'teto_diario': 5000,        # Valor máximo (centavos) cobrado a cada 24 horas de permanência
+    'desconto_assinante': 20,   # Desconto (%) para veículos de clientes cadastrados
+    'descontos_por_cliente': {} # Descontos (%) específicos por cliente_id, ex.: {42: 50}
+}
+
+REPLICA_CONFIG = {
+    'caminho': 'replica_portaria.db',     # Arquivo SQLite com a réplica local de clientes e veículos da cabine
+    'intervalo_sincronizacao': 30,        # Segundos entre sincronizações com o banco central
+    'politica_conflito': 'servidor'       # Em CPF/placa duplicados ao reenviar escritas offline: 'servidor' ou 'local' vence
+}
+
+METRICAS_CONFIG = {
+    'habilitado': False,                  # Mede o tempo de cada consulta ao banco (desligado não tem custo perceptível)
+    'limite_consulta_lenta_ms': 100,      # Consultas que demoram mais que isso entram no registro de consultas lentas
+    'arquivo_consultas_lentas': None,     # Arquivo (JSON por linha) onde gravar as consultas lentas; None só guarda em memória
+    'consultas_lentas_em_memoria': 200,   # Quantidade de consultas lentas mais recentes mantidas em memória
+    'porta_http': 9108                    # Porta do servidor de métricas (/metrics para o Prometheus, /metricas.json)
+}
+
+PORTARIA_CONFIG = {
+    'endereco': '0.0.0.0',   # Endereço de escuta do serviço HTTP da portaria (servidor_portaria.py)
+    'porta': 8080,           # Porta TCP do serviço
+    'trabalhadores': 32,     # Threads que atendem as conexões; cada conexão keep-alive ocupa uma enquanto está aberta
+    'conexoes_banco': 8,     # Tamanho do pool de conexões com o banco compartilhado pelas threads
+    'tempo_ocioso': 30,      # Segundos sem requisições após os quais uma conexão keep-alive é fechada, liberando a thread
+    'busca_aproximada': True # Placa não encontrada na cancela: procura placas parecidas (erros de leitura da câmera)
+}
+
+INDICE_PLACAS_CONFIG = {
+    'distancia_maxima': 2,        # Caracteres errados aceitos na busca aproximada de placas (fora trocas como O/0, I/1, B/8)
+    'limite_candidatos': 5,       # Quantidade máxima de placas candidatas devolvidas por busca
+    'limite_alteracoes': 50000,   # Inclusões acumuladas após a carga antes de o índice ser recompactado
+    'intervalo_sincronizacao': 5  # Segundos entre as leituras do log de alterações pelo serviço da portaria
+}
+
+INDICE_CLIENTES_CONFIG = {
+    'limite_alteracoes': 10000    # Clientes incluídos/alterados após a carga antes de o índice de busca ser recompactado
+}
+
+COMMIT_AGRUPADO_CONFIG = {
+    'operacoes_por_commit': 200,  # Máximo de operações confirmadas em um único commit (db_utils.CommitAgrupado)
+    'espera_maxima': 0            # Segundos que um grupo aguarda mais operações antes do commit; 0 agrupa só as que
+                                  # chegaram durante o commit anterior (sem latência extra)
+}
+
+REPLICAS_CONFIG = {
+    'replicas': [],                   # Réplicas de leitura: uma configuração por réplica, no formato de DB_CONFIG
+                                      # (ou de SQLITE_CONFIG com o backend SQLite); vazio desliga o roteamento
+    'politica': 'alternado',          # Escolha da réplica de cada leitura: 'alternado' (rodízio) ou 'menor_latencia'
+    'janela_leitura_propria': 5,      # Segundos após uma escrita em que a mesma thread lê do primário (0 desliga)
+    'pausa_replica_falha': 30         # Segundos que uma réplica inacessível fica fora do rodízio
+}
+
+FRAGMENTOS_CONFIG = {
+    'fragmentos': {},                 # Fragmentos (shards) do cadastro: número -> configuração no formato de DB_CONFIG
+                                      # (ou de SQLITE_CONFIG com o backend SQLite); ver fragmentos.py
+    'catalogo': None,                 # Banco do diretório de placas e dos IDs realocados; None usa o fragmento de menor número
+    'nos_virtuais': 64,               # Pontos de cada fragmento no anel de hash consistente dos CPFs
+    'bloco_ids': 10_000_000,          # IDs por fragmento: os do fragmento N começam em N * bloco_ids + 1 (colunas INT
+                                      # do MySQL comportam até o fragmento 213)
+    'tamanho_lote_rebalanceamento': 500  # Clientes movidos por transação ao incluir um fragmento
+}
+
+MAPA_PLACAS_CONFIG = {
+    'caminho': 'mapa_placas.idx',      # Arquivo que aponta a geração atual do mapa de placas (mapa_placas.py);
+                                       # cada geração fica ao lado, em 'mapa_placas.idx.<geração>'
+    'bits_bloom_por_placa': 16,        # Tamanho do filtro de Bloom (~0,5% de placas desconhecidas passam por ele)
+    'carga_maxima': 0.5,               # Ocupação máxima da tabela de hash (mais vazia = menos sondagens por consulta)
+    'intervalo_verificacao': 1,        # Segundos entre verificações, pelos leitores, de uma geração nova
+    'consultar_banco_se_ausente': True # Placa fora do mapa: confirma no banco (False responde "avulso" sem o banco,
+                                       # ao custo de não reconhecer veículos cadastrados depois da última geração)
+}
+
+FILA_EVENTOS_CONFIG = {
+    'diario': 'fila_eventos.jsonl',    # Diário local dos eventos aceitos e ainda não gravados (fila_eventos.py)
+    'capacidade': 10000,               # Eventos na fila à espera da thread escritora; cheia, enviar() espera
+    'espera_maxima': 5,                # Segundos que enviar() espera por uma vaga antes de recusar o evento
+    'tamanho_lote': 500,               # Máximo de eventos gravados por transação
+    'intervalo': 0.2,                  # Segundos que um lote aguarda mais eventos antes da gravação
+    'pausa_apos_falha': 5,             # Segundos entre as tentativas de gravar um lote com o banco indisponível
+    'sincronizar_diario': False,       # fsync a cada evento: sobrevive também a uma queda de energia, ao custo
+                                       # de uma escrita em disco por evento (False sobrevive à queda do processo)
+    'tamanho_maximo_diario': 16 * 1024 * 1024  # Bytes do diário a partir dos quais ele é reescrito sem os já aplicados
+}
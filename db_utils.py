@@ -1,85 +1,1071 @@
-# db_utils.py
-# Este arquivo contém funções utilitárias para interagir com o banco de dados.
-
-import mysql.connector
-from mysql.connector import errorcode
-from db_config import DB_CONFIG # Importa as configurações do banco
-
-def conectar_db():
-    """
-    Estabelece uma conexão com o banco de dados MySQL.
-
-    Returns:
-        mysql.connector.connection_cext.CMySQLConnection or None:
-        Objeto de conexão se sucesso, None caso contrário.
-    """
-    try:
-        conexao = mysql.connector.connect(**DB_CONFIG)
-        return conexao
-    except mysql.connector.Error as err:
-        if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
-            print("Erro de acesso (db_utils): Usuário ou senha do banco incorretos.")
-        elif err.errno == errorcode.ER_BAD_DB_ERROR:
-            print(f"Banco de dados '{DB_CONFIG.get('database', 'N/A')}' não existe (db_utils).")
-        else:
-            print(f"Erro ao conectar ao MySQL (db_utils): {err}")
-        return None
-
-def executar_query(conexao, query, params=None, commit=False, fetch_one=False, fetch_all=False):
-    """
-    Executa uma query SQL no banco de dados.
-
-    Args:
-        conexao: Objeto de conexão com o banco.
-        query (str): A query SQL a ser executada.
-        params (tuple, optional): Parâmetros para a query. Defaults to None.
-        commit (bool, optional): True para realizar commit (INSERT, UPDATE, DELETE). Defaults to False.
-        fetch_one (bool, optional): True para buscar um único resultado (SELECT). Defaults to False.
-        fetch_all (bool, optional): True para buscar todos os resultados (SELECT). Defaults to False.
-
-    Returns:
-        int or dict or list or None:
-        - ID da linha inserida (para INSERT com commit=True e lastrowid).
-        - Dicionário (para fetch_one=True).
-        - Lista de dicionários (para fetch_all=True).
-        - rowcount (para UPDATE/DELETE com commit=True).
-        - None se a query não retorna resultado (e não é commit), ou em caso de erro.
-    """
-    if conexao is None or not conexao.is_connected():
-        print("Erro: Conexão com o banco de dados não está ativa.")
-        return None
-
-    cursor = None
-    try:
-        # Usar dictionary=True para que os resultados sejam dicionários (acesso por nome da coluna)
-        cursor = conexao.cursor(dictionary=True)
-        cursor.execute(query, params)
-
-        if commit:
-            conexao.commit()
-            # Para INSERT, retorna o ID da última linha inserida
-            if query.strip().upper().startswith("INSERT"):
-                return cursor.lastrowid
-            # Para UPDATE/DELETE, retorna o número de linhas afetadas
-            return cursor.rowcount
-
-        if fetch_one:
-            return cursor.fetchone()
-        if fetch_all:
-            return cursor.fetchall()
-
-        return None # Caso padrão (ex: SELECT sem fetch, ou DDL)
-
-    except mysql.connector.Error as err:
-        print(f"Erro ao executar query: {err}")
-        # Em caso de erro em uma transação, realizar rollback
-        if conexao and conexao.is_connected() and commit:
-            try:
-                conexao.rollback()
-                print("Rollback realizado devido a erro.")
-            except mysql.connector.Error as rollback_err:
-                print(f"Erro durante o rollback: {rollback_err}")
-        return None
-    finally:
-        if cursor:
-            cursor.close()
\ No newline at end of file
+# db_utils.py
+# Este arquivo contém funções utilitárias para interagir com o banco de dados.
+
+import threading
+import time
+import weakref
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from queue import LifoQueue, Queue, Empty
+
+from backends import (backend_da_conexao, criar_backend, # Backends MySQL e SQLite
+                      ERRO_CONEXAO, ERRO_DUPLICADO, ERRO_OUTRO, ERRO_REFERENCIADO, ERRO_REFERENCIA_INEXISTENTE)
+from db_config import COMMIT_AGRUPADO_CONFIG, POOL_CONFIG, REPLICAS_CONFIG # Configurações do pool, do commit agrupado e das réplicas
+from mensagens import coletar_mensagens, informar # Mensagens de erro (impressas no menu, coletadas no modo em lote)
+from registros import formatar_linha, formatar_linhas, validar_formato # Formatos de linha além do dicionário
+from metricas import metricas # Instrumentação opcional das consultas
+
+# Cursores preparados de cada conexão: {conexao: {ComandoSQL: cursor}}.
+# As entradas somem sozinhas quando a conexão é descartada.
+_cursores_preparados = weakref.WeakKeyDictionary()
+_lock_cursores = threading.Lock()
+
+
+# Categoria do último erro de banco em cada thread (ver ultimo_erro)
+_estado_thread = threading.local()
+
+
+def ultimo_erro():
+    """
+    Categoria do erro que fez a última operação desta thread (executar_query, executar_muitos) retornar None:
+    ERRO_DUPLICADO, ERRO_REFERENCIA_INEXISTENTE, ERRO_REFERENCIADO, ERRO_CONEXAO ou ERRO_OUTRO.
+    Só tem significado logo após uma operação que falhou; permite às funções do CRUD distinguir
+    "CPF já cadastrado" de "cliente não encontrado" sem consultar o banco antes de escrever.
+    """
+    return getattr(_estado_thread, 'erro', None)
+
+
+def limpar_erro():
+    """Esquece a categoria do último erro desta thread (antes de uma operação cujo erro será consultado)."""
+    _estado_thread.erro = None
+
+
+def _registrar_erro(categoria):
+    _estado_thread.erro = categoria
+    if metricas.habilitado:
+        metricas.marcar_erro()
+
+
+# Comandos cujo resultado (rowcount) é devolvido mesmo sem commit, quando o commit fica a cargo de quem chama
+_COMANDOS_ESCRITA = {"UPDATE", "DELETE", "REPLACE"}
+
+
+@lru_cache(maxsize=512)
+def _tipo_comando(sql):
+    """Retorna a primeira palavra do comando em maiúsculas (SELECT, INSERT, UPDATE, ...)."""
+    partes = sql.split(None, 1)
+    return partes[0].upper() if partes else ""
+
+
+class ComandoSQL:
+    """
+    Comando SQL registrado uma única vez no carregamento do módulo que o usa.
+
+    O tipo do comando (SELECT, INSERT, UPDATE, DELETE, ...) é classificado no registro e
+    não a cada execução. Comandos registrados com preparado=True são preparados no servidor
+    na primeira execução em cada conexão; as execuções seguintes reutilizam o mesmo cursor
+    preparado e enviam apenas os parâmetros.
+    """
+    __slots__ = ('sql', 'tipo', 'preparado')
+
+    def __init__(self, sql, preparado=True):
+        self.sql = sql
+        self.tipo = _tipo_comando(sql)
+        self.preparado = preparado
+
+    def __repr__(self):
+        return f"ComandoSQL({self.tipo}, preparado={self.preparado})"
+
+
+def registrar_comando(sql, preparado=True):
+    """
+    Registra um comando SQL de texto fixo para ser reutilizado por executar_query.
+
+    Args:
+        sql (str): O comando SQL com marcadores %s.
+        preparado (bool, optional): True para usar um prepared statement por conexão. Defaults to True.
+
+    Returns:
+        ComandoSQL: O comando registrado, a ser passado no lugar do texto da query.
+    """
+    return ComandoSQL(sql, preparado)
+
+
+def _cursor_preparado(conexao, comando):
+    """Retorna o cursor preparado de 'comando' nesta conexão, criando-o na primeira vez."""
+    cursores = _cursores_preparados.get(conexao)
+    if cursores is None:
+        with _lock_cursores:
+            cursores = _cursores_preparados.setdefault(conexao, {})
+    cursor = cursores.get(comando)
+    if cursor is None:
+        cursor = backend_da_conexao(conexao).cursor_preparado(conexao)
+        cursores[comando] = cursor
+    return cursor
+
+
+def _descartar_cursores_preparados(conexao, comando=None):
+    """
+    Esquece os cursores preparados de uma conexão (todos, ou só o de 'comando').
+    Necessário após uma reconexão, pois os prepared statements ficam no servidor e morrem com a sessão.
+    """
+    cursores = _cursores_preparados.get(conexao)
+    if not cursores:
+        return
+    alvos = [comando] if comando is not None else list(cursores)
+    for alvo in alvos:
+        cursor = cursores.pop(alvo, None)
+        if cursor is not None:
+            try:
+                cursor.close()
+            except backend_da_conexao(conexao).erros:
+                pass
+
+
+def conectar_db(backend=None):
+    """
+    Estabelece uma conexão com o banco de dados configurado (MySQL ou SQLite, conforme DB_BACKEND).
+
+    Args:
+        backend (optional): Backend a usar (ver backends.criar_backend). Defaults to None (DB_BACKEND).
+
+    Returns:
+        Objeto de conexão (mysql.connector ou sqlite3) se sucesso, None caso contrário.
+    """
+    return (backend or criar_backend()).conectar()
+
+
+class PoolConexoes:
+    """
+    Pool limitado de conexões compartilhado pelos terminais e ferramentas do estacionamento.
+
+    As conexões são emprestadas com obter() e devolvidas com devolver() (ou usando o
+    gerenciador de contexto conexao()). Uma conexão só é testada com ping quando ficou
+    ociosa por mais de 'ping_apos_ocioso' segundos; conexões em uso contínuo não pagam
+    esse custo. Conexões que não respondem ao ping são reconectadas de forma transparente.
+    """
+
+    def __init__(self, tamanho=None, timeout_espera=None, ping_apos_ocioso=None, backend=None):
+        self.backend = backend or criar_backend()
+        self.tamanho = tamanho or POOL_CONFIG['tamanho']
+        self.timeout_espera = timeout_espera if timeout_espera is not None else POOL_CONFIG['timeout_espera']
+        self.ping_apos_ocioso = (ping_apos_ocioso if ping_apos_ocioso is not None
+                                 else POOL_CONFIG['ping_apos_ocioso'])
+        # Pilha (LIFO) de tuplas (conexao, instante_da_devolucao): as conexões mais recentes
+        # são reutilizadas primeiro e as antigas envelhecem até precisarem de ping.
+        self._livres = LifoQueue()
+        self._vagas = threading.BoundedSemaphore(self.tamanho)
+        self._fechado = False
+
+    def obter(self):
+        """
+        Empresta uma conexão do pool, abrindo uma nova se nenhuma estiver livre.
+
+        Returns:
+            Objeto de conexão se sucesso, None se o pool estiver esgotado ou o banco inacessível.
+        """
+        if self._fechado:
+            informar("Erro: O pool de conexões já foi encerrado.")
+            return None
+        if not self._vagas.acquire(timeout=self.timeout_espera):
+            informar(f"Erro: Nenhuma conexão livre no pool após {self.timeout_espera}s de espera.")
+            return None
+
+        conexao = None
+        try:
+            conexao, devolvida_em = self._livres.get_nowait()
+        except Empty:
+            pass
+
+        if conexao is not None and time.monotonic() - devolvida_em > self.ping_apos_ocioso:
+            # Verificação de saúde apenas em conexões ociosas; reconecta se o socket caiu.
+            if self.backend.verificar(conexao):
+                # Se o ping reconectou, os prepared statements antigos não existem mais no servidor
+                _descartar_cursores_preparados(conexao)
+            else:
+                self._descartar(conexao)
+                conexao = None
+
+        if conexao is None:
+            conexao = self.backend.conectar()
+            if conexao is None:
+                self._vagas.release()
+        return conexao
+
+    def devolver(self, conexao):
+        """
+        Devolve ao pool uma conexão obtida com obter().
+        Transações deixadas abertas são desfeitas para não vazarem para o próximo usuário.
+
+        Args:
+            conexao: Conexão previamente emprestada pelo pool.
+        """
+        if conexao is None:
+            return
+        try:
+            if conexao.in_transaction:
+                conexao.rollback()
+        except self.backend.erros:
+            self._descartar(conexao)
+            self._vagas.release()
+            return
+
+        if self._fechado:
+            self._descartar(conexao)
+        else:
+            self._livres.put((conexao, time.monotonic()))
+        self._vagas.release()
+
+    @contextmanager
+    def conexao(self):
+        """Gerenciador de contexto que empresta uma conexão e a devolve ao final do bloco."""
+        conexao = self.obter()
+        try:
+            yield conexao
+        finally:
+            self.devolver(conexao)
+
+    def fechar(self):
+        """Encerra todas as conexões ociosas; conexões emprestadas são fechadas ao serem devolvidas."""
+        self._fechado = True
+        while True:
+            try:
+                conexao, _ = self._livres.get_nowait()
+            except Empty:
+                break
+            self._descartar(conexao)
+
+    def _descartar(self, conexao):
+        try:
+            conexao.close()
+        except self.backend.erros:
+            pass
+
+
+def criar_pool(**opcoes):
+    """
+    Cria o pool de conexões e abre a primeira conexão para validar as credenciais.
+
+    Args:
+        **opcoes: Sobrescritas opcionais de POOL_CONFIG (tamanho, timeout_espera, ping_apos_ocioso)
+            e o backend a usar (backend=criar_backend('sqlite'), por exemplo).
+
+    Returns:
+        PoolConexoes or None: O pool pronto para uso, ou None se não foi possível conectar.
+    """
+    pool = PoolConexoes(**opcoes)
+    conexao = pool.obter()
+    if conexao is None:
+        pool.fechar()
+        return None
+    pool.devolver(conexao)
+    return pool
+
+
+class _Replica:
+    """Pool de uma réplica de leitura e o estado usado na escolha (latência média, pausa após falha)."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.latencia = 0.0     # Média móvel exponencial do tempo das leituras, em segundos
+        self.pausada_ate = 0.0  # time.monotonic() até o qual a réplica fica fora do rodízio
+
+
+class RoteadorConexoes(PoolConexoes):
+    """
+    Pool com separação de leituras e escritas: as leituras (SELECT com fetch_one/fetch_all em
+    executar_query, e iterar_query) vão para as réplicas; todo o resto vai para o primário.
+
+    Para o restante do sistema o roteador é o pool do primário: obter(), conexao(), conexao_dedicada(),
+    transacao() e executar_muitos usam o primário, e dentro de transacao() até as leituras ficam nele.
+    Depois de uma escrita, as leituras da mesma thread vão ao primário durante 'janela_leitura_propria'
+    segundos, para que ela enxergue o que acabou de gravar mesmo com réplicas atrasadas.
+    Uma réplica inacessível é pausada e a leitura é refeita no primário.
+    """
+
+    POLITICAS = ('alternado', 'menor_latencia')
+
+    def __init__(self, primario, replicas, politica=None, janela_leitura_propria=None, pausa_replica_falha=None):
+        """
+        Args:
+            primario (PoolConexoes): Pool do banco primário (escritas).
+            replicas (list): PoolConexoes das réplicas de leitura.
+            politica (str, optional): 'alternado' ou 'menor_latencia'. Defaults to REPLICAS_CONFIG.
+            janela_leitura_propria (float, optional): Ver acima; 0 desliga. Defaults to REPLICAS_CONFIG.
+            pausa_replica_falha (float, optional): Segundos fora do rodízio após uma falha. Defaults to REPLICAS_CONFIG.
+        """
+        self.primario = primario
+        self.replicas = [_Replica(replica) for replica in replicas]
+        self.politica = politica or REPLICAS_CONFIG['politica']
+        if self.politica not in self.POLITICAS:
+            raise ValueError(f"Política de réplicas desconhecida: '{self.politica}'. Use {' ou '.join(self.POLITICAS)}.")
+        self.janela_leitura_propria = (REPLICAS_CONFIG['janela_leitura_propria'] if janela_leitura_propria is None
+                                       else janela_leitura_propria)
+        self.pausa_replica_falha = (REPLICAS_CONFIG['pausa_replica_falha'] if pausa_replica_falha is None
+                                    else pausa_replica_falha)
+        self.backend = primario.backend
+        self.tamanho = primario.tamanho
+        self._proxima = 0
+        self._lock = threading.Lock()
+        self._sessao = threading.local() # Instante da última escrita de cada thread
+
+    def obter(self):
+        """Empresta uma conexão do primário (caminho das escritas: marca a thread para leitura própria)."""
+        self._sessao.ultima_escrita = time.monotonic()
+        return self.primario.obter()
+
+    def devolver(self, conexao):
+        self.primario.devolver(conexao)
+
+    def fechar(self):
+        self.primario.fechar()
+        for replica in self.replicas:
+            replica.pool.fechar()
+
+    def escolher_replica(self):
+        """
+        Réplica para a próxima leitura desta thread, ou None se a leitura deve ir ao primário
+        (sem réplicas disponíveis, ou dentro da janela de leitura própria após uma escrita).
+        """
+        agora = time.monotonic()
+        ultima_escrita = getattr(self._sessao, 'ultima_escrita', None)
+        if ultima_escrita is not None and agora - ultima_escrita < self.janela_leitura_propria:
+            return None
+        candidatas = [replica for replica in self.replicas if replica.pausada_ate <= agora]
+        if not candidatas:
+            return None
+        if self.politica == 'menor_latencia':
+            return min(candidatas, key=lambda replica: replica.latencia)
+        with self._lock:
+            self._proxima += 1
+            return candidatas[self._proxima % len(candidatas)]
+
+    def pool_de_leitura(self):
+        """Pool usado por uma leitura longa (iterar_query): uma réplica escolhida, ou o primário."""
+        replica = self.escolher_replica()
+        return replica.pool if replica is not None else self.primario
+
+    def registrar_leitura(self, replica, segundos):
+        replica.latencia = segundos if replica.latencia == 0.0 else 0.8 * replica.latencia + 0.2 * segundos
+
+    def pausar(self, replica):
+        replica.pausada_ate = time.monotonic() + self.pausa_replica_falha
+        replica.latencia = 0.0 # Ao voltar, é medida de novo
+
+
+def criar_roteador(replicas=None, **opcoes):
+    """
+    Cria o pool do primário e os das réplicas de leitura configuradas, e os combina em um RoteadorConexoes.
+
+    Args:
+        replicas (list, optional): Configurações das réplicas (formato de DB_CONFIG, ou de SQLITE_CONFIG com
+            o backend SQLite). Defaults to None (REPLICAS_CONFIG['replicas']).
+        **opcoes: Opções do pool do primário e das réplicas, como em criar_pool().
+
+    Returns:
+        RoteadorConexoes or PoolConexoes or None: O roteador; sem réplicas configuradas, o próprio pool do
+        primário; None se não foi possível conectar ao primário. Réplicas inacessíveis ficam de fora.
+    """
+    primario = criar_pool(**opcoes)
+    configuracoes = REPLICAS_CONFIG['replicas'] if replicas is None else replicas
+    if primario is None or not configuracoes:
+        return primario
+    pools = []
+    for numero, config in enumerate(configuracoes, start=1):
+        pool_replica = criar_pool(**{**opcoes, 'backend': criar_backend(primario.backend.nome, config)})
+        if pool_replica is None:
+            informar(f"Réplica {numero} inacessível; as leituras serão divididas entre as demais (ou feitas no primário).")
+        else:
+            pools.append(pool_replica)
+    return RoteadorConexoes(primario, pools) if pools else primario
+
+
+def _ler_roteado(roteador, query, params, fetch_one, fetch_all, formato):
+    """Leitura de executar_query em um RoteadorConexoes: réplica escolhida, ou primário como alternativa."""
+    executar = _executar_medido if metricas.habilitado else _executar
+    replica = roteador.escolher_replica()
+    if replica is not None:
+        limpar_erro()
+        inicio = time.perf_counter()
+        with coletar_mensagens() as mensagens:
+            resultado = executar(replica.pool, query, params, False, fetch_one, fetch_all, formato)
+        if ultimo_erro() != ERRO_CONEXAO:
+            roteador.registrar_leitura(replica, time.perf_counter() - inicio)
+            for mensagem in mensagens:
+                informar(mensagem)
+            return resultado
+        roteador.pausar(replica)
+        informar(f"Réplica de leitura inacessível; ela fica fora do rodízio por {roteador.pausa_replica_falha}s.")
+    return executar(roteador.primario, query, params, False, fetch_one, fetch_all, formato)
+
+
+@contextmanager
+def conexao_dedicada(conexao):
+    """
+    Garante uma única conexão física durante um bloco de várias queries.
+    Se 'conexao' for um PoolConexoes, uma conexão é emprestada e devolvida ao final;
+    caso contrário a própria conexão recebida é usada.
+    Dentro de transacao() (mesmo pool ou conexão), o bloco usa a conexão da transação em um
+    ponto de salvamento próprio: desfazer() no bloco desfaz apenas os comandos do bloco.
+    """
+    if _transacao_da(conexao) is not None:
+        with transacao(conexao) as ponto:
+            yield ponto.conexao
+    elif isinstance(conexao, PoolConexoes):
+        with conexao.conexao() as conexao_emprestada:
+            yield conexao_emprestada
+    else:
+        yield conexao
+
+
+def desfazer(conexao):
+    """
+    Desfaz (rollback) a transação em andamento em uma conexão obtida com conexao_dedicada.
+    Usado quando um comando executado com commit=False falha no meio de uma sequência.
+    Dentro de transacao(), desfaz até o ponto de salvamento mais interno (ver Transacao.desfazer).
+    """
+    if conexao is None:
+        return
+    atual = getattr(_estado_thread, 'transacao', None)
+    if atual is not None and conexao is atual.conexao:
+        atual.desfazer()
+        return
+    backend = backend_da_conexao(conexao)
+    try:
+        conexao.rollback()
+    except backend.erros as err:
+        informar(f"Erro durante o rollback: {err}")
+
+
+class Transacao:
+    """
+    Unidade de trabalho aberta por transacao(): os comandos executados na thread com o mesmo pool
+    (ou conexão) usam uma única conexão e são confirmados com um único commit ao final do bloco.
+    Um transacao() aninhado é um ponto de salvamento (SAVEPOINT) da transação externa.
+
+    Atributos:
+        conexao: Conexão física da transação (None se não foi possível obter uma).
+        confirmada (bool or None): Depois do bloco, True se o commit foi feito; None durante o bloco.
+    """
+
+    def __init__(self, origem, conexao, externa=None):
+        self.origem = origem      # Pool ou conexão passada a transacao()
+        self.conexao = conexao
+        self.externa = externa    # Transação que contém este ponto de salvamento (None na mais externa)
+        self.ponto = None         # Nome do SAVEPOINT (None na mais externa)
+        self.confirmada = None
+        self.desfazer_ao_final = False
+        self._apos_confirmar = [] # (funcao, args) executados depois do commit
+        self._ao_desfazer = []    # (funcao, args) executados se os comandos deste nível forem desfeitos
+
+    def usa(self, conexao):
+        """Indica se 'conexao' (pool ou conexão) participa desta transação."""
+        raiz = self.raiz
+        return conexao is raiz.origem or (conexao is raiz.conexao and conexao is not None)
+
+    @property
+    def raiz(self):
+        transacao_atual = self
+        while transacao_atual.externa is not None:
+            transacao_atual = transacao_atual.externa
+        return transacao_atual
+
+    def desfazer(self):
+        """
+        Desfaz os comandos deste nível. Em um ponto de salvamento, o ROLLBACK TO é imediato e o bloco
+        pode continuar; na transação mais externa, o rollback é feito ao final do bloco (no lugar do commit).
+        """
+        if self.ponto is None:
+            self.desfazer_ao_final = True
+            return
+        if not _comando_transacao(self.conexao, f"ROLLBACK TO SAVEPOINT {self.ponto}"):
+            self.raiz.desfazer_ao_final = True # Sem o ponto de salvamento, só resta desfazer tudo
+        self._executar_ao_desfazer()
+
+    def _executar_ao_desfazer(self):
+        callbacks, self._ao_desfazer, self._apos_confirmar = self._ao_desfazer, [], []
+        for funcao, args in reversed(callbacks):
+            funcao(*args)
+
+    def _repassar_a_externa(self):
+        """Ao liberar um ponto de salvamento, os callbacks passam a depender da transação externa."""
+        self.externa._apos_confirmar.extend(self._apos_confirmar)
+        self.externa._ao_desfazer.extend(self._ao_desfazer)
+        self._apos_confirmar, self._ao_desfazer = [], []
+
+
+def _transacao_da(conexao):
+    """Transação aberta nesta thread da qual 'conexao' participa, ou None."""
+    atual = getattr(_estado_thread, 'transacao', None)
+    return atual if atual is not None and atual.usa(conexao) else None
+
+
+def _comando_transacao(conexao, sql):
+    """Executa BEGIN/SAVEPOINT/RELEASE/ROLLBACK TO; retorna False (e informa) em caso de erro."""
+    backend = backend_da_conexao(conexao)
+    try:
+        cursor = conexao.cursor()
+        try:
+            cursor.execute(sql)
+        finally:
+            cursor.close()
+        return True
+    except backend.erros as err:
+        informar(f"Erro ao executar '{sql}': {err}")
+        _registrar_erro(ERRO_CONEXAO if backend.conexao_perdida(err) else ERRO_OUTRO)
+        return False
+
+
+@contextmanager
+def transacao(conexao):
+    """
+    Agrupa vários comandos (inclusive chamadas às funções do CRUD) em uma única transação, com um só
+    commit, em vez de um commit por comando. Se o bloco lançar uma exceção, tudo é desfeito.
+
+    Dentro do bloco, executar_query, executar_muitos, iterar_query e conexao_dedicada chamados nesta
+    thread com o mesmo 'conexao' usam a conexão da transação e não fazem commit. Os blocos de
+    conexao_dedicada (ex.: escritas com log) viram pontos de salvamento: a falha de um comando
+    desfaz só aquele comando, e quem chamou decide se desfaz o resto com tx.desfazer().
+
+    Uso:
+        with transacao(pool) as tx:
+            cliente_id = cliente_crud.adicionar_cliente(pool, nome, endereco, cpf, telefone)
+            if cliente_id is None or veiculo_crud.adicionar_veiculo(pool, ...) is None:
+                tx.desfazer()
+
+    Args:
+        conexao: Objeto de conexão com o banco ou PoolConexoes.
+
+    Yields:
+        Transacao: A transação (ou o ponto de salvamento, se já havia uma transação aberta).
+    """
+    atual = _transacao_da(conexao)
+    if atual is not None:
+        yield from _ponto_de_salvamento(atual)
+        return
+
+    with conexao_dedicada(conexao) as conexao_transacao:
+        nova = Transacao(conexao, conexao_transacao)
+        anterior = getattr(_estado_thread, 'transacao', None)
+        if conexao_transacao is not None:
+            try:
+                backend_da_conexao(conexao_transacao).iniciar_transacao(conexao_transacao)
+            except backend_da_conexao(conexao_transacao).erros as err:
+                informar(f"Erro ao iniciar a transação: {err}")
+                nova.desfazer_ao_final = True
+        _estado_thread.transacao = nova
+        try:
+            yield nova
+        except BaseException:
+            _encerrar_transacao(nova, confirmar=False)
+            raise
+        else:
+            _encerrar_transacao(nova, confirmar=not nova.desfazer_ao_final)
+        finally:
+            _estado_thread.transacao = anterior
+
+
+def _ponto_de_salvamento(externa):
+    """Corpo de transacao() aninhado: SAVEPOINT no início; RELEASE (ou ROLLBACK TO, se houver exceção) no final."""
+    interna = Transacao(externa.origem, externa.conexao, externa)
+    profundidade = 1
+    while externa.externa is not None:
+        externa, profundidade = externa.externa, profundidade + 1
+    interna.ponto = f"ponto_{profundidade}"
+    if interna.conexao is None or not _comando_transacao(interna.conexao, f"SAVEPOINT {interna.ponto}"):
+        interna.ponto = None
+        interna.raiz.desfazer_ao_final = True
+    _estado_thread.transacao = interna
+    try:
+        yield interna
+    except BaseException:
+        if interna.ponto is not None:
+            interna.desfazer()
+        raise
+    finally:
+        _estado_thread.transacao = interna.externa
+        if interna.ponto is not None:
+            if not _comando_transacao(interna.conexao, f"RELEASE SAVEPOINT {interna.ponto}"):
+                interna.raiz.desfazer_ao_final = True
+            interna._repassar_a_externa()
+        elif interna.desfazer_ao_final:
+            interna.raiz.desfazer_ao_final = True
+
+
+def _encerrar_transacao(transacao_atual, confirmar):
+    """Commit (ou rollback) da transação mais externa e execução dos callbacks correspondentes."""
+    conexao = transacao_atual.conexao
+    if conexao is None:
+        transacao_atual.confirmada = False
+        return
+    backend = backend_da_conexao(conexao)
+    if confirmar:
+        try:
+            conexao.commit()
+            transacao_atual.confirmada = True
+        except backend.erros as err:
+            informar(f"Erro ao confirmar a transação: {err}")
+            _registrar_erro(ERRO_CONEXAO if backend.conexao_perdida(err) else backend.classificar_erro(err, "COMMIT"))
+    if not transacao_atual.confirmada:
+        transacao_atual.confirmada = False
+        try:
+            conexao.rollback()
+        except backend.erros as err:
+            informar(f"Erro durante o rollback: {err}")
+        transacao_atual._executar_ao_desfazer()
+        return
+    callbacks, transacao_atual._apos_confirmar = transacao_atual._apos_confirmar, []
+    for funcao, args in callbacks:
+        funcao(*args)
+
+
+def apos_confirmar(funcao, *args):
+    """
+    Executa funcao(*args) depois do commit da transação aberta nesta thread (ou agora, se não há
+    transação). Para efeitos fora do banco que não podem valer para comandos desfeitos, como os
+    índices em memória de placas e clientes.
+    """
+    atual = getattr(_estado_thread, 'transacao', None)
+    if atual is None:
+        funcao(*args)
+    else:
+        atual._apos_confirmar.append((funcao, args))
+
+
+def ao_desfazer(funcao, *args):
+    """
+    Registra funcao(*args) para ser executada se a transação (ou o ponto de salvamento) aberta nesta
+    thread for desfeita; sem transação, não faz nada. Para reverter estado em memória já alterado,
+    como a vaga reservada no índice de ocupação.
+    """
+    atual = getattr(_estado_thread, 'transacao', None)
+    if atual is not None:
+        atual._ao_desfazer.append((funcao, args))
+
+
+def executar_query(conexao, query, params=None, commit=False, fetch_one=False, fetch_all=False, formato='dict'):
+    """
+    Executa uma query SQL no banco de dados.
+
+    Args:
+        conexao: Objeto de conexão com o banco ou um PoolConexoes (uma conexão é emprestada por query).
+        query (str or ComandoSQL): A query SQL a ser executada, ou um comando criado com registrar_comando().
+        params (tuple, optional): Parâmetros para a query. Defaults to None.
+        commit (bool, optional): True para realizar commit (INSERT, UPDATE, DELETE). Defaults to False.
+        fetch_one (bool, optional): True para buscar um único resultado (SELECT). Defaults to False.
+        fetch_all (bool, optional): True para buscar todos os resultados (SELECT). Defaults to False.
+        formato (str or type, optional): Formato das linhas: 'dict', 'tupla', 'colunas' ou uma classe de
+            registros.py (ex.: Cliente), cujos campos devem ser as colunas do SELECT. Defaults to 'dict'.
+
+    Returns:
+        int or dict or list or None:
+        - ID da linha inserida (para INSERT e lastrowid).
+        - Uma linha no formato pedido (para fetch_one=True).
+        - Lista de linhas no formato pedido (para fetch_all=True); com 'colunas', dicionário coluna -> valores.
+        - rowcount (para UPDATE/DELETE). Com commit=False o commit fica a cargo de quem chama,
+          usando a mesma conexão (ver conexao_dedicada e desfazer).
+        - None se a query não retorna resultado (ex: DDL), ou em caso de erro.
+    """
+    transacao_atual = _transacao_da(conexao)
+    if transacao_atual is not None: # O commit fica para o final de transacao()
+        conexao, commit = transacao_atual.conexao, False
+    if formato != 'dict':
+        validar_formato(formato)
+    if conexao is None:
+        informar("Erro: Conexão com o banco de dados não está ativa.")
+        _registrar_erro(ERRO_CONEXAO)
+        return None
+    if isinstance(conexao, RoteadorConexoes) and (fetch_one or fetch_all) and not commit:
+        tipo = query.tipo if isinstance(query, ComandoSQL) else _tipo_comando(query)
+        if tipo == "SELECT":
+            return _ler_roteado(conexao, query, params, fetch_one, fetch_all, formato)
+    if metricas.habilitado:
+        return _executar_medido(conexao, query, params, commit, fetch_one, fetch_all, formato)
+    return _executar(conexao, query, params, commit, fetch_one, fetch_all, formato)
+
+
+def _executar(conexao, query, params, commit, fetch_one, fetch_all, formato):
+    if isinstance(conexao, PoolConexoes):
+        with conexao.conexao() as conexao_emprestada:
+            if conexao_emprestada is None:
+                _registrar_erro(ERRO_CONEXAO)
+                return None
+            return _executar_na_conexao(conexao_emprestada, query, params, commit, fetch_one, fetch_all, formato)
+    return _executar_na_conexao(conexao, query, params, commit, fetch_one, fetch_all, formato)
+
+
+def _executar_medido(conexao, query, params, commit, fetch_one, fetch_all, formato):
+    """executar_query com medição: tempo (incluindo a espera por uma conexão do pool), linhas e erro."""
+    origem = metricas.origem_da_chamada()
+    inicio = metricas.iniciar()
+    resultado = _executar(conexao, query, params, commit, fetch_one, fetch_all, formato)
+    if isinstance(query, ComandoSQL):
+        sql, tipo = query.sql, query.tipo
+    else:
+        sql, tipo = query, _tipo_comando(query)
+    metricas.medir(inicio, origem, tipo, sql, _linhas_do_resultado(tipo, resultado, formato))
+    return resultado
+
+
+def _linhas_do_resultado(tipo, resultado, formato='dict'):
+    """Linhas retornadas (SELECT) ou afetadas (escritas) a partir do retorno de executar_query."""
+    if isinstance(resultado, list):
+        return len(resultado)
+    if formato == 'colunas' and isinstance(resultado, dict):
+        return len(next(iter(resultado.values()), ()))
+    if isinstance(resultado, int):
+        return 1 if tipo == "INSERT" else max(resultado, 0)
+    return 0 if resultado is None else 1
+
+
+def _executar_na_conexao(conexao, query, params, commit, fetch_one, fetch_all, formato='dict'):
+    backend = backend_da_conexao(conexao)
+    # Se a conexão caiu fora de uma transação, reconecta e repete a query uma única vez.
+    # Dentro de uma transação a repetição perderia os comandos anteriores, então o erro é mantido.
+    em_transacao = conexao.in_transaction
+    try:
+        return _executar_cursor(backend, conexao, query, params, commit, fetch_one, fetch_all, formato)
+    except backend.erros as err:
+        perdida = backend.conexao_perdida(err)
+        if perdida and not em_transacao:
+            try:
+                backend.reconectar(conexao)
+                _descartar_cursores_preparados(conexao)
+                return _executar_cursor(backend, conexao, query, params, commit, fetch_one, fetch_all, formato)
+            except backend.erros as err_reconexao:
+                err = err_reconexao
+                perdida = backend.conexao_perdida(err)
+        informar(f"Erro ao executar query: {err}")
+        tipo = query.tipo if isinstance(query, ComandoSQL) else _tipo_comando(query)
+        _registrar_erro(ERRO_CONEXAO if perdida else backend.classificar_erro(err, tipo))
+        # Em caso de erro em uma transação, realizar rollback
+        if commit and not perdida:
+            try:
+                conexao.rollback()
+                informar("Rollback realizado devido a erro.")
+            except backend.erros as rollback_err:
+                informar(f"Erro durante o rollback: {rollback_err}")
+        return None
+
+
+def _executar_cursor(backend, conexao, query, params, commit, fetch_one, fetch_all, formato='dict'):
+    if isinstance(query, ComandoSQL):
+        sql, tipo = query.sql, query.tipo
+        if query.preparado and backend.suporta_preparados:
+            return _executar_preparado(backend, conexao, query, params, commit, fetch_one, fetch_all, formato)
+    else:
+        sql, tipo = query, _tipo_comando(query)
+
+    cursor = None
+    try:
+        # No formato 'dict' o próprio cursor monta os dicionários; nos demais ele entrega tuplas
+        cursor = backend.cursor(conexao, dicionario=formato == 'dict')
+        cursor.execute(backend.sql(sql), params or ())
+
+        if commit:
+            conexao.commit()
+        # Para INSERT, retorna o ID da última linha inserida
+        if tipo == "INSERT":
+            return cursor.lastrowid
+        # Para UPDATE/DELETE, retorna o número de linhas afetadas
+        if commit or tipo in _COMANDOS_ESCRITA:
+            return cursor.rowcount
+
+        if formato != 'dict' and (fetch_one or fetch_all):
+            colunas = [coluna[0] for coluna in cursor.description]
+            if fetch_one:
+                return formatar_linha(cursor.fetchone(), formato, colunas)
+            return formatar_linhas(cursor.fetchall(), formato, colunas)
+        if fetch_one:
+            return cursor.fetchone()
+        if fetch_all:
+            return cursor.fetchall()
+
+        return None # Caso padrão (ex: SELECT sem fetch, ou DDL)
+    finally:
+        if cursor:
+            try:
+                cursor.close()
+            except backend.erros:
+                pass # O cursor de uma conexão que caiu não precisa ser fechado
+
+
+def _executar_preparado(backend, conexao, comando, params, commit, fetch_one, fetch_all, formato='dict'):
+    # O cursor preparado não é fechado: ele fica guardado para a próxima execução do mesmo comando.
+    cursor = _cursor_preparado(conexao, comando)
+    try:
+        cursor.execute(comando.sql, params)
+
+        if commit:
+            conexao.commit()
+        if comando.tipo == "INSERT":
+            return cursor.lastrowid
+        if commit or comando.tipo in _COMANDOS_ESCRITA:
+            return cursor.rowcount
+
+        if fetch_one or fetch_all:
+            # Lê todas as linhas para deixar o cursor pronto para a próxima execução
+            colunas = cursor.column_names
+            linhas = cursor.fetchall()
+            if fetch_one:
+                return formatar_linha(linhas[0] if linhas else None, formato, colunas)
+            return formatar_linhas(linhas, formato, colunas)
+        return None
+    except backend.erros:
+        # Um cursor que falhou pode ter ficado em estado inválido; será preparado de novo
+        _descartar_cursores_preparados(conexao, comando)
+        raise
+
+
+def executar_muitos(conexao, query, lista_params, commit=True):
+    """
+    Executa o mesmo comando para várias linhas de parâmetros (executemany).
+    Para INSERT ... VALUES o conector agrupa as linhas em um único comando multi-linha.
+
+    Args:
+        conexao: Objeto de conexão com o banco ou um PoolConexoes.
+        query (str): O comando SQL (normalmente INSERT ... VALUES (%s, ...)).
+        lista_params (list): Lista de tuplas de parâmetros, uma por linha.
+        commit (bool, optional): True para realizar commit ao final do lote. Defaults to True.
+
+    Returns:
+        int or None: Número de linhas afetadas, ou None em caso de erro (o lote é desfeito).
+    """
+    if _transacao_da(conexao) is not None:
+        commit = False # O commit fica para o final de transacao()
+    if conexao is None:
+        informar("Erro: Conexão com o banco de dados não está ativa.")
+        _registrar_erro(ERRO_CONEXAO)
+        return None
+    if not lista_params:
+        return 0
+    if metricas.habilitado:
+        origem = metricas.origem_da_chamada()
+        inicio = metricas.iniciar()
+        resultado = _executar_lote(conexao, query, lista_params, commit)
+        metricas.medir(inicio, origem, _tipo_comando(query), query, resultado or 0)
+        return resultado
+    return _executar_lote(conexao, query, lista_params, commit)
+
+
+def _executar_lote(conexao, query, lista_params, commit):
+    with conexao_dedicada(conexao) as conexao_lote:
+        if conexao_lote is None:
+            _registrar_erro(ERRO_CONEXAO)
+            return None
+        backend = backend_da_conexao(conexao_lote)
+        cursor = None
+        try:
+            cursor = conexao_lote.cursor()
+            cursor.executemany(backend.sql(query), lista_params)
+            if commit:
+                conexao_lote.commit()
+            return cursor.rowcount
+        except backend.erros as err:
+            informar(f"Erro ao executar lote: {err}")
+            _registrar_erro(backend.classificar_erro(err, _tipo_comando(query)))
+            desfazer(conexao_lote)
+            return None
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except backend.erros:
+                    pass
+
+
+def iterar_query(conexao, query, params=None, tamanho_lote=500, formato='dict'):
+    """
+    Executa um SELECT com cursor não-bufferizado e entrega as linhas aos poucos.
+    As linhas são trazidas do servidor em blocos de 'tamanho_lote' (fetchmany), de modo
+    que a memória usada não depende do tamanho da tabela.
+
+    A conexão fica ocupada até o gerador ser consumido por completo ou fechado; com um
+    PoolConexoes, uma conexão é reservada para o gerador durante esse tempo. Dentro de
+    transacao(), a leitura usa a conexão da transação (e enxerga as escritas ainda não confirmadas).
+
+    Args:
+        conexao: Objeto de conexão com o banco ou um PoolConexoes.
+        query (str): A query SELECT a ser executada.
+        params (tuple, optional): Parâmetros para a query. Defaults to None.
+        tamanho_lote (int, optional): Linhas buscadas por ida ao servidor. Defaults to 500.
+        formato (str or type, optional): 'dict', 'tupla' ou uma classe de registros.py (ver executar_query).
+            Defaults to 'dict'.
+
+    Yields:
+        dict, tuple or Registro: Uma linha do resultado por vez. Se a leitura falhar, o gerador termina antes do fim
+        e ultimo_erro() indica o motivo.
+    """
+    if formato != 'dict':
+        validar_formato(formato)
+        if formato == 'colunas':
+            raise ValueError("iterar_query entrega uma linha por vez; o formato 'colunas' só vale em executar_query.")
+    if conexao is None:
+        informar("Erro: Conexão com o banco de dados não está ativa.")
+        _registrar_erro(ERRO_CONEXAO)
+        return
+
+    # Com métricas, mede apenas o tempo gasto no banco (execute e fetchmany), não o de quem consome as linhas
+    medir = metricas.habilitado
+    if medir:
+        origem = metricas.origem_da_chamada()
+        tempo_banco, total_linhas, erro = 0.0, 0, False
+
+    # Na transação, sem ponto de salvamento: o gerador pode ficar suspenso entre outros comandos do bloco
+    transacao_atual = _transacao_da(conexao)
+    if transacao_atual is None and isinstance(conexao, RoteadorConexoes):
+        conexao = conexao.pool_de_leitura()
+    with nullcontext(transacao_atual.conexao) if transacao_atual else conexao_dedicada(conexao) as conexao_leitura:
+        if conexao_leitura is None:
+            _registrar_erro(ERRO_CONEXAO)
+            return
+        backend = backend_da_conexao(conexao_leitura)
+        cursor = None
+        try:
+            inicio = time.perf_counter()
+            cursor = backend.cursor(conexao_leitura, bufferizado=False, dicionario=formato == 'dict')
+            cursor.execute(backend.sql(query), params or ())
+            colunas = [coluna[0] for coluna in cursor.description]
+            while True:
+                linhas = cursor.fetchmany(tamanho_lote)
+                if medir:
+                    tempo_banco += time.perf_counter() - inicio
+                    total_linhas += len(linhas)
+                if not linhas:
+                    break
+                if formato != 'dict' and formato != 'tupla':
+                    linhas = formatar_linhas(linhas, formato, colunas)
+                yield from linhas
+                inicio = time.perf_counter()
+        except backend.erros as err:
+            informar(f"Erro ao ler resultados da query: {err}")
+            _registrar_erro(backend.classificar_erro(err, _tipo_comando(query)))
+            erro = True
+        finally:
+            if cursor:
+                # Descarta linhas não lidas para liberar a conexão (ex.: gerador fechado antes do fim)
+                backend.encerrar_cursor(cursor)
+            if medir:
+                metricas.registrar(origem, _tipo_comando(query), query, tempo_banco, total_linhas, erro)
+
+
+class _PedidoEscrita:
+    """Operação enviada ao CommitAgrupado e o seu resultado, preenchido pela thread escritora."""
+
+    __slots__ = ('funcao', 'args', 'kwargs', 'resultado', 'erro', 'mensagens', 'concluido')
+
+    def __init__(self, funcao, args, kwargs):
+        self.funcao, self.args, self.kwargs = funcao, args, kwargs
+        self.resultado, self.erro, self.mensagens = None, None, []
+        self.concluido = threading.Event()
+
+
+class CommitAgrupado:
+    """
+    Commit agrupado (group commit) para escritores de alta frequência, como os terminais de entrada
+    e saída: as operações enviadas por várias threads são executadas por uma única thread escritora
+    e confirmadas juntas, com um commit (e um fsync) por grupo em vez de um por operação.
+
+    Cada operação roda em um ponto de salvamento próprio: se ela retornar None/False (ou lançar uma
+    exceção), apenas os seus comandos são desfeitos e o restante do grupo é confirmado normalmente.
+    executar() só retorna depois do commit do grupo, então quem chamou nunca recebe um resultado
+    que ainda pode ser perdido.
+
+    Uso:
+        escritor = CommitAgrupado(pool)
+        sessao_id = escritor.executar(sessao_crud.registrar_entrada, pool, placa)  # De qualquer thread
+        ...
+        escritor.fechar()
+    """
+
+    def __init__(self, conexao, operacoes_por_commit=None, espera_maxima=None):
+        """
+        Args:
+            conexao: Objeto de conexão com o banco ou PoolConexoes (o mesmo passado às funções enviadas).
+            operacoes_por_commit (int, optional): Tamanho máximo de um grupo. Defaults to COMMIT_AGRUPADO_CONFIG.
+            espera_maxima (float, optional): Segundos que a primeira operação de um grupo espera por outras
+                antes do commit. Defaults to COMMIT_AGRUPADO_CONFIG.
+        """
+        self.conexao = conexao
+        self.operacoes_por_commit = operacoes_por_commit or COMMIT_AGRUPADO_CONFIG['operacoes_por_commit']
+        self.espera_maxima = COMMIT_AGRUPADO_CONFIG['espera_maxima'] if espera_maxima is None else espera_maxima
+        self.grupos = 0 # Commits feitos (operações / grupos = tamanho médio do grupo)
+        self._fila = Queue()
+        self._fechado = False
+        self._thread = threading.Thread(target=self._escrever, name="commit-agrupado", daemon=True)
+        self._thread.start()
+
+    def executar(self, funcao, *args, **kwargs):
+        """
+        Executa funcao(*args, **kwargs) na thread escritora e espera o commit do seu grupo.
+        As mensagens emitidas pela função e o ultimo_erro() são repassados à thread que chamou.
+
+        Returns:
+            O retorno da função, ou None se ela falhou ou se o commit do grupo falhou.
+        """
+        if self._fechado:
+            informar("Erro: o escritor com commit agrupado já foi encerrado.")
+            return None
+        pedido = _PedidoEscrita(funcao, args, kwargs)
+        self._fila.put(pedido)
+        pedido.concluido.wait()
+        for mensagem in pedido.mensagens:
+            informar(mensagem)
+        if pedido.erro is None:
+            limpar_erro()
+        else:
+            _registrar_erro(pedido.erro)
+        return pedido.resultado
+
+    def fechar(self):
+        """Confirma as operações pendentes e encerra a thread escritora."""
+        if not self._fechado:
+            self._fechado = True
+            self._fila.put(None)
+            self._thread.join()
+
+    def _escrever(self):
+        encerrar = False
+        while not encerrar:
+            pedido = self._fila.get()
+            if pedido is None:
+                return
+            grupo = [pedido]
+            limite = time.monotonic() + self.espera_maxima
+            while len(grupo) < self.operacoes_por_commit:
+                try:
+                    restante = limite - time.monotonic()
+                    pedido = self._fila.get(timeout=restante) if restante > 0 else self._fila.get_nowait()
+                except Empty:
+                    break
+                if pedido is None:
+                    encerrar = True
+                    break
+                grupo.append(pedido)
+            try:
+                self._confirmar_grupo(grupo)
+            finally:
+                for pedido in grupo:
+                    pedido.concluido.set()
+
+    def _confirmar_grupo(self, grupo):
+        with transacao(self.conexao) as transacao_grupo:
+            for pedido in grupo:
+                with coletar_mensagens() as mensagens, transacao(self.conexao) as ponto:
+                    limpar_erro()
+                    try:
+                        pedido.resultado = pedido.funcao(*pedido.args, **pedido.kwargs)
+                    except Exception as e:
+                        informar(f"Erro inesperado na escrita agrupada: {e}")
+                        pedido.resultado = None
+                    if pedido.resultado is None or pedido.resultado is False:
+                        ponto.desfazer()
+                    pedido.erro = ultimo_erro()
+                pedido.mensagens = mensagens
+        self.grupos += 1
+        if not transacao_grupo.confirmada:
+            erro = ultimo_erro() or ERRO_OUTRO
+            for pedido in grupo:
+                if pedido.resultado is not None and pedido.resultado is not False:
+                    pedido.resultado, pedido.erro = None, erro
+                    pedido.mensagens.append("Falha ao confirmar a gravação; a operação foi desfeita.")
@@ -23,5 +23,41 @@ CREATE TABLE IF NOT EXISTS veiculos (
 
 
 CREATE INDEX idx_cpf ON clientes(cpf);              
+CREATE INDEX idx_nome ON clientes(nome);
 CREATE INDEX idx_placa ON veiculos(placa);          
-CREATE INDEX idx_cliente_id ON veiculos(cliente_id);
\ No newline at end of file
+CREATE INDEX idx_cliente_id ON veiculos(cliente_id);
+
+-- Sessões de estacionamento (uma por entrada; 'saida' fica NULL enquanto o veículo está no pátio).
+-- veiculo_id é NULL para veículos avulsos (placa sem cadastro).
+CREATE TABLE IF NOT EXISTS sessoes (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    placa VARCHAR(8) NOT NULL,
+    veiculo_id INT NULL,
+    entrada DATETIME NOT NULL,
+    saida DATETIME NULL,
+    -- Cliente e valor cobrados na saída: o faturamento usa estes, não o proprietário atual do veículo.
+    -- Em bancos anteriores: ALTER TABLE sessoes ADD COLUMN cliente_id INT NULL, ADD COLUMN valor_centavos INT NULL;
+    cliente_id INT NULL,
+    valor_centavos INT NULL,
+    -- Preenchida só nas sessões abertas: impede duas sessões abertas para a mesma placa
+    placa_aberta VARCHAR(8) AS (IF(saida IS NULL, placa, NULL)) STORED UNIQUE,
+    FOREIGN KEY (veiculo_id) REFERENCES veiculos(id)
+        ON DELETE SET NULL
+        ON UPDATE CASCADE
+);
+
+CREATE INDEX idx_sessoes_placa ON sessoes(placa);
+CREATE INDEX idx_sessoes_saida ON sessoes(saida);
+
+
+-- Log de alterações de clientes e veículos, gravado pelas funções de escrita na mesma transação.
+-- As réplicas das cabines (replica_local.py) leem apenas as entradas novas (id > último lido).
+-- registro_id identifica o registro alterado; em cargas em massa apenas a chave natural (cpf/placa) é gravada.
+CREATE TABLE IF NOT EXISTS log_alteracoes (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    tabela VARCHAR(20) NOT NULL,
+    registro_id INT NULL,
+    chave VARCHAR(11) NULL,
+    operacao VARCHAR(10) NOT NULL,
+    momento DATETIME NOT NULL
+);
@@ -0,0 +1,60 @@
+-- Esquema equivalente ao de estacionamento_db.sql para o backend SQLite embutido.
+-- Executado automaticamente por backends.BackendSQLite na primeira conexão a um arquivo vazio.
+CREATE TABLE IF NOT EXISTS clientes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nome VARCHAR(255) NOT NULL COLLATE NOCASE,
+    endereco VARCHAR(255),
+    cpf VARCHAR(11) NOT NULL UNIQUE,
+    telefone VARCHAR(20)
+);
+
+
+CREATE TABLE IF NOT EXISTS veiculos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    marca VARCHAR(100) NOT NULL,
+    modelo VARCHAR(100) NOT NULL,
+    ano INT,
+    placa VARCHAR(8) NOT NULL UNIQUE COLLATE NOCASE,
+    cliente_id INT NOT NULL,
+    FOREIGN KEY (cliente_id) REFERENCES clientes(id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+
+CREATE INDEX IF NOT EXISTS idx_cpf ON clientes(cpf);
+CREATE INDEX IF NOT EXISTS idx_nome ON clientes(nome);
+CREATE INDEX IF NOT EXISTS idx_placa ON veiculos(placa);
+CREATE INDEX IF NOT EXISTS idx_cliente_id ON veiculos(cliente_id);
+
+
+-- Sessões de estacionamento (uma por entrada; 'saida' fica NULL enquanto o veículo está no pátio).
+-- veiculo_id é NULL para veículos avulsos (placa sem cadastro).
+CREATE TABLE IF NOT EXISTS sessoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    placa VARCHAR(8) NOT NULL,
+    veiculo_id INT NULL,
+    entrada DATETIME NOT NULL,
+    saida DATETIME NULL,
+    cliente_id INT NULL,
+    valor_centavos INT NULL,
+    FOREIGN KEY (veiculo_id) REFERENCES veiculos(id)
+        ON DELETE SET NULL
+        ON UPDATE CASCADE
+);
+
+-- Índice parcial: impede duas sessões abertas para a mesma placa
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sessoes_placa_aberta ON sessoes(placa) WHERE saida IS NULL;
+CREATE INDEX IF NOT EXISTS idx_sessoes_placa ON sessoes(placa);
+CREATE INDEX IF NOT EXISTS idx_sessoes_saida ON sessoes(saida);
+
+
+-- Log de alterações de clientes e veículos, gravado pelas funções de escrita na mesma transação.
+CREATE TABLE IF NOT EXISTS log_alteracoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tabela VARCHAR(20) NOT NULL,
+    registro_id INT NULL,
+    chave VARCHAR(11) NULL,
+    operacao VARCHAR(10) NOT NULL,
+    momento DATETIME NOT NULL
+);
@@ -0,0 +1,257 @@
+# exportacao.py
+# Exportação de clientes e veículos para arquivos CSV, JSONL, Parquet ou Arrow (relatórios e cargas noturnas).
+# As linhas vêm de um cursor não-bufferizado (iterar_query) em lotes e são gravadas lote a lote,
+# de modo que a memória usada não depende do tamanho da tabela. As colunas escolhidas e os filtros
+# (ano, marca, cliente_id) viram a própria consulta SQL: o JOIN com clientes só é feito quando
+# alguma coluna do proprietário é pedida, e nenhuma linha descartada sai do banco.
+# O arquivo é gravado com um nome temporário e só substitui o destino quando a exportação termina.
+
+import argparse
+import csv
+import json
+import os
+import sys
+from itertools import islice
+
+from db_utils import iterar_query, limpar_erro, ultimo_erro
+from mensagens import informar
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # O pyarrow só é necessário para os formatos Parquet e Arrow
+    pa = None
+    pq = None
+
+TAMANHO_LOTE_PADRAO = 10000
+LINHAS_POR_GRUPO_PARQUET = 100000 # Row groups maiores comprimem melhor e são lidos mais rápido
+
+# Para cada tabela: colunas exportáveis (nome -> expressão SQL), colunas que exigem o JOIN com clientes
+# e filtros aceitos (nome -> (expressão, operador)).
+TABELAS = {
+    'clientes': {
+        'origem': "FROM clientes c",
+        'juncao': None,
+        'colunas': {'id': "c.id", 'nome': "c.nome", 'endereco': "c.endereco", 'cpf': "c.cpf", 'telefone': "c.telefone"},
+        'colunas_juncao': set(),
+        'filtros': {'cliente_id': ("c.id", "=")},
+        'ordem': "c.id",
+    },
+    'veiculos': {
+        'origem': "FROM veiculos v",
+        'juncao': "JOIN clientes c ON v.cliente_id = c.id",
+        'colunas': {'id': "v.id", 'marca': "v.marca", 'modelo': "v.modelo", 'ano': "v.ano", 'placa': "v.placa",
+                    'cliente_id': "v.cliente_id", 'nome_cliente': "c.nome", 'cpf_cliente': "c.cpf"},
+        'colunas_juncao': {'nome_cliente', 'cpf_cliente'},
+        'filtros': {'ano': ("v.ano", "="), 'ano_min': ("v.ano", ">="), 'ano_max': ("v.ano", "<="),
+                    'marca': ("v.marca", "="), 'cliente_id': ("v.cliente_id", "=")},
+        'ordem': "v.id",
+    },
+}
+
+COLUNAS_INTEIRAS = {'id', 'ano', 'cliente_id'} # As demais são texto (tipos do esquema Parquet/Arrow)
+
+def montar_consulta(tabela, colunas=None, filtros=None):
+    """
+    Monta o SELECT da exportação com apenas as colunas e as linhas pedidas.
+
+    Args:
+        tabela (str): 'clientes' ou 'veiculos'.
+        colunas (list, optional): Colunas a exportar, na ordem desejada. Defaults to None (todas).
+        filtros (dict, optional): Filtros da tabela (ex.: {'ano_min': 2015, 'marca': 'Fiat'}). Uma lista de
+            valores em um filtro de igualdade vira IN (...). Valores None são ignorados. Defaults to None.
+
+    Returns:
+        tuple: (query, parametros, colunas).
+
+    Raises:
+        ValueError: Tabela, coluna ou filtro desconhecidos.
+    """
+    if tabela not in TABELAS:
+        raise ValueError(f"Tabela desconhecida: '{tabela}'. Use 'clientes' ou 'veiculos'.")
+    definicao = TABELAS[tabela]
+    colunas = list(colunas or definicao['colunas'])
+    desconhecidas = [coluna for coluna in colunas if coluna not in definicao['colunas']]
+    if desconhecidas:
+        raise ValueError(f"Coluna(s) desconhecida(s) em {tabela}: {', '.join(desconhecidas)}. "
+                         f"Disponíveis: {', '.join(definicao['colunas'])}.")
+
+    condicoes, parametros = [], []
+    for nome, valor in (filtros or {}).items():
+        if valor is None:
+            continue
+        if nome not in definicao['filtros']:
+            raise ValueError(f"Filtro desconhecido em {tabela}: '{nome}'. Disponíveis: {', '.join(definicao['filtros'])}.")
+        expressao, operador = definicao['filtros'][nome]
+        if operador == "=" and isinstance(valor, (list, tuple, set)):
+            valores = list(valor)
+            if not valores:
+                condicoes.append("1 = 0") # Lista vazia: nenhuma linha
+                continue
+            condicoes.append(f"{expressao} IN ({', '.join(['%s'] * len(valores))})")
+            parametros.extend(valores)
+        else:
+            condicoes.append(f"{expressao} {operador} %s")
+            parametros.append(valor)
+
+    partes = ["SELECT " + ", ".join(f"{definicao['colunas'][coluna]} AS {coluna}" for coluna in colunas),
+              definicao['origem']]
+    if definicao['colunas_juncao'].intersection(colunas):
+        partes.append(definicao['juncao'])
+    if condicoes:
+        partes.append("WHERE " + " AND ".join(condicoes))
+    partes.append(f"ORDER BY {definicao['ordem']}") # Ordem da chave primária: o banco não precisa ordenar
+    return "\n".join(partes), tuple(parametros), colunas
+
+def _em_lotes(linhas, tamanho_lote):
+    """Agrupa as linhas do gerador em listas de até 'tamanho_lote' itens."""
+    while True:
+        lote = list(islice(linhas, tamanho_lote))
+        if not lote:
+            return
+        yield lote
+
+def _gravar_csv(caminho, colunas, lotes):
+    total = 0
+    with open(caminho, "w", encoding="utf-8", newline="") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(colunas)
+        for lote in lotes:
+            escritor.writerows(map(dict.values, lote)) # As chaves já estão na ordem das colunas do SELECT
+            total += len(lote)
+    return total
+
+def _gravar_jsonl(caminho, colunas, lotes):
+    codificar = json.JSONEncoder(ensure_ascii=False, default=str).encode
+    total = 0
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        for lote in lotes:
+            arquivo.write("".join([codificar(linha) + "\n" for linha in lote]))
+            total += len(lote)
+    return total
+
+def _esquema_arrow(colunas):
+    return pa.schema([(coluna, pa.int64() if coluna in COLUNAS_INTEIRAS else pa.string()) for coluna in colunas])
+
+def _gravar_parquet(caminho, colunas, lotes):
+    esquema = _esquema_arrow(colunas)
+    total, pendentes, linhas_pendentes = 0, [], 0
+    with pq.ParquetWriter(caminho, esquema, compression="zstd") as escritor:
+        for lote in lotes:
+            pendentes.append(pa.RecordBatch.from_pylist(lote, schema=esquema))
+            linhas_pendentes += len(lote)
+            if linhas_pendentes >= LINHAS_POR_GRUPO_PARQUET:
+                escritor.write_table(pa.Table.from_batches(pendentes, schema=esquema))
+                total += linhas_pendentes
+                pendentes, linhas_pendentes = [], 0
+        if pendentes:
+            escritor.write_table(pa.Table.from_batches(pendentes, schema=esquema))
+            total += linhas_pendentes
+    return total
+
+def _gravar_arrow(caminho, colunas, lotes):
+    esquema = _esquema_arrow(colunas)
+    total = 0
+    with pa.OSFile(caminho, "wb") as arquivo, pa.ipc.new_file(arquivo, esquema) as escritor:
+        for lote in lotes:
+            escritor.write_batch(pa.RecordBatch.from_pylist(lote, schema=esquema))
+            total += len(lote)
+    return total
+
+def _remover_parcial(temporario):
+    """Apaga o arquivo temporário de uma exportação que não terminou, se ele chegou a ser criado."""
+    try:
+        os.remove(temporario)
+    except FileNotFoundError:
+        pass
+
+FORMATOS = {'csv': _gravar_csv, 'jsonl': _gravar_jsonl, 'parquet': _gravar_parquet, 'arrow': _gravar_arrow}
+_EXTENSOES = {'.csv': 'csv', '.jsonl': 'jsonl', '.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow'}
+
+def exportar(conexao, tabela, caminho, formato=None, colunas=None, filtros=None, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """
+    Exporta clientes ou veículos para um arquivo, em fluxo e com memória constante.
+
+    Args:
+        conexao: Objeto de conexão com o banco ou PoolConexoes.
+        tabela (str): 'clientes' ou 'veiculos'.
+        caminho (str): Arquivo de destino.
+        formato (str, optional): 'csv', 'jsonl', 'parquet' ou 'arrow'. Defaults to None (pela extensão do arquivo).
+        colunas (list, optional): Colunas a exportar (ver TABELAS). Defaults to None (todas).
+        filtros (dict, optional): Filtros aplicados no banco (ver montar_consulta). Defaults to None.
+        tamanho_lote (int, optional): Linhas lidas do banco e gravadas por vez. Defaults to TAMANHO_LOTE_PADRAO.
+
+    Returns:
+        int or None: Quantidade de linhas exportadas, ou None se a leitura ou a gravação falharam
+        (o destino não é alterado).
+
+    Raises:
+        ValueError: Tabela, coluna, filtro ou formato desconhecidos.
+        ImportError: Formato Parquet ou Arrow sem o pacote pyarrow instalado.
+    """
+    formato = formato or _EXTENSOES.get(os.path.splitext(caminho)[1].lower())
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconhecido para '{caminho}'. Use {', '.join(FORMATOS)}.")
+    if formato in ('parquet', 'arrow') and pa is None:
+        raise ImportError(f"O formato {formato} requer o pacote pyarrow (pip install pyarrow).")
+    query, parametros, colunas = montar_consulta(tabela, colunas, filtros)
+
+    temporario = f"{caminho}.parcial"
+    limpar_erro()
+    linhas = iterar_query(conexao, query, parametros, tamanho_lote=tamanho_lote)
+    try:
+        total = FORMATOS[formato](temporario, colunas, _em_lotes(linhas, tamanho_lote))
+    except OSError as e:
+        informar(f"Erro ao gravar o arquivo '{caminho}': {e}")
+        total = None
+    except BaseException:
+        # Qualquer outra falha (ex.: ArrowInvalid, KeyboardInterrupt) sobe, mas sem deixar o arquivo parcial
+        _remover_parcial(temporario)
+        raise
+    finally:
+        linhas.close() # Libera o cursor (e a conexão do pool) mesmo se a gravação parou no meio
+    if total is None or ultimo_erro() is not None:
+        if total is not None:
+            informar(f"Falha ao ler {tabela} do banco. A exportação para '{caminho}' foi cancelada.")
+        _remover_parcial(temporario)
+        return None
+    os.replace(temporario, caminho)
+    return total
+
+# Uso: python exportacao.py clientes|veiculos arquivo.csv|.jsonl|.parquet|.arrow [--colunas id,placa] [--ano-min 2015] ...
+if __name__ == "__main__":
+    from db_utils import criar_roteador
+
+    parser = argparse.ArgumentParser(description="Exporta clientes ou veículos para CSV, JSONL, Parquet ou Arrow.")
+    parser.add_argument("tabela", choices=tuple(TABELAS))
+    parser.add_argument("arquivo", help="Arquivo de destino; a extensão define o formato se --formato não for usado.")
+    parser.add_argument("--formato", choices=tuple(FORMATOS))
+    parser.add_argument("--colunas", help="Colunas separadas por vírgula (padrão: todas).")
+    parser.add_argument("--ano", type=int)
+    parser.add_argument("--ano-min", type=int)
+    parser.add_argument("--ano-max", type=int)
+    parser.add_argument("--marca")
+    parser.add_argument("--cliente-id", type=int, nargs="+", help="Um ou mais IDs de cliente.")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_PADRAO, help="Linhas lidas e gravadas por vez.")
+    args = parser.parse_args()
+
+    filtros = {'cliente_id': args.cliente_id}
+    if args.tabela == 'veiculos':
+        filtros.update({'ano': args.ano, 'ano_min': args.ano_min, 'ano_max': args.ano_max, 'marca': args.marca})
+    elif any(valor is not None for valor in (args.ano, args.ano_min, args.ano_max, args.marca)):
+        parser.error("Os filtros de ano e marca só se aplicam a veículos.")
+
+    pool_db = criar_roteador(tamanho=1) # Com réplicas configuradas, a exportação não carrega o primário
+    if not pool_db:
+        print("Falha ao conectar ao banco de dados.")
+        sys.exit(1)
+    try:
+        exportadas = exportar(pool_db, args.tabela, args.arquivo, args.formato,
+                              args.colunas.split(",") if args.colunas else None, filtros, args.lote)
+    except (ValueError, ImportError) as err:
+        parser.error(str(err))
+    finally:
+        pool_db.fechar()
+    if exportadas is None:
+        sys.exit(1)
+    print(f"{exportadas} linha(s) exportada(s) para '{args.arquivo}'.")
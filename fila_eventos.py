@@ -0,0 +1,312 @@
+# fila_eventos.py
+# Fila de gravação adiada (write-behind) para os eventos das câmeras e cancelas: entradas e saídas
+# lidas em rajadas não esperam pelo banco. enviar() grava o evento no diário local e o coloca na
+# fila; uma thread escritora esvazia a fila em lotes, cada lote em uma transação com um só commit
+# (sessao_crud.registrar_entrada/registrar_saida, com a hora da leitura).
+#
+# - A fila é limitada (FILA_EVENTOS_CONFIG['capacidade']): cheia, enviar() espera uma vaga por até
+#   'espera_maxima' segundos e depois recusa o evento (pressão de volta sobre o produtor).
+# - O diário (um JSON por linha, com número de sequência) é gravado antes de o evento entrar na fila.
+#   A última sequência aplicada fica no banco ('posicao_fila_eventos'), atualizada na mesma transação
+#   do lote; na inicialização, os eventos do diário além dela são reaplicados. Assim, um evento
+#   aceito por enviar() é gravado exatamente uma vez, mesmo com uma queda do processo.
+# - Eventos recusados pelo CRUD (placa já no pátio, estacionamento lotado...) são descartados com
+#   uma mensagem; falhas de conexão ou de commit desfazem o lote, que é repetido após uma pausa.
+#
+# O índice de ocupação de sessao_crud deve estar carregado (carregar_sessoes_abertas) antes de iniciar().
+#
+# Uso:
+#   fila_eventos.iniciar(pool)
+#   fila_eventos.enviar('entrada', 'ABC1D23')           # De qualquer thread; não espera o banco
+#   ...
+#   fila_eventos.fechar()                               # Grava o que restou na fila
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import sessao_crud
+from db_config import FILA_EVENTOS_CONFIG
+from db_utils import executar_query, limpar_erro, transacao, ultimo_erro, ERRO_CONEXAO
+from mensagens import coletar_mensagens, informar
+
+_ESQUEMA_POSICAO = ("CREATE TABLE IF NOT EXISTS posicao_fila_eventos ("
+                    "diario VARCHAR(255) NOT NULL PRIMARY KEY, sequencia BIGINT NOT NULL)")
+# REPLACE INTO existe no MySQL e no SQLite: inclui ou sobrescreve pela chave primária
+GRAVAR_POSICAO = "REPLACE INTO posicao_fila_eventos (diario, sequencia) VALUES (%s, %s)"
+
+# Tipo do evento -> função de sessao_crud que o aplica: funcao(conexao, placa, momento)
+TIPOS_EVENTO = {
+    'entrada': sessao_crud.registrar_entrada,
+    'saida': sessao_crud.registrar_saida,
+}
+
+
+class FilaEventos:
+    """
+    Fila limitada de eventos da portaria, com diário local e uma thread escritora que grava em lotes.
+
+    Atributos:
+        aplicados (int): Eventos gravados no banco.
+        recusados (int): Eventos descartados porque o CRUD os recusou (ex.: placa já no pátio).
+        lotes (int): Lotes confirmados (aplicados + recusados / lotes = tamanho médio do lote).
+    """
+
+    def __init__(self):
+        self.pool = None
+        self.tipos = TIPOS_EVENTO
+        self.diario = None
+        self.nome = None
+        self.aplicados = 0
+        self.recusados = 0
+        self.lotes = 0
+        self._fila = deque()
+        self._condicao = threading.Condition()
+        self._vagas = None
+        self._arquivo = None
+        self._lock_diario = threading.Lock()
+        self._sequencia = 0           # Última sequência gravada no diário
+        self._sequencia_aplicada = 0  # Última sequência confirmada no banco
+        self._thread = None
+        self._encerrar = False
+
+    @property
+    def iniciada(self):
+        return self._thread is not None
+
+    def __len__(self):
+        """Eventos aceitos e ainda não gravados no banco."""
+        return self._sequencia - self._sequencia_aplicada
+
+    def iniciar(self, pool, diario=None, nome=None, tipos=None):
+        """
+        Reaplica os eventos pendentes do diário e inicia a thread escritora.
+
+        Args:
+            pool: PoolConexoes (ou conexão) usado pela thread escritora.
+            diario (str, optional): Arquivo do diário. Defaults to FILA_EVENTOS_CONFIG['diario'].
+            nome (str, optional): Nome da fila na tabela de posições (uma por processo que grava eventos).
+                Defaults to None (nome do arquivo do diário).
+            tipos (dict, optional): {tipo: funcao(pool, placa, momento)} que grava cada evento, com as mesmas chaves
+                de TIPOS_EVENTO. Defaults to None (TIPOS_EVENTO); a réplica local da cabine usa ReplicaLocal.tipos_evento().
+
+        Returns:
+            int or None: Quantidade de eventos reaplicados do diário, ou None em caso de erro.
+        """
+        if self.iniciada:
+            raise ValueError("A fila de eventos já foi iniciada.")
+        self.pool = pool
+        self.tipos = tipos or TIPOS_EVENTO
+        self.diario = diario or FILA_EVENTOS_CONFIG['diario']
+        self.nome = nome or os.path.basename(self.diario)
+        if executar_query(pool, _ESQUEMA_POSICAO, commit=True) is None:
+            informar("Falha ao preparar a tabela de posições da fila de eventos.")
+            return None
+        limpar_erro()
+        linha = executar_query(pool, "SELECT sequencia FROM posicao_fila_eventos WHERE diario = %s",
+                               (self.nome,), fetch_one=True)
+        if linha is None and ultimo_erro() is not None:
+            informar("Falha ao ler a posição da fila de eventos.")
+            return None
+        self._sequencia_aplicada = linha['sequencia'] if linha else 0
+
+        pendentes = self._ler_diario()
+        if pendentes is None:
+            return None
+        self._sequencia = max([self._sequencia_aplicada] + [evento['seq'] for evento in pendentes])
+        pendentes = [evento for evento in pendentes if evento['seq'] > self._sequencia_aplicada]
+        tamanho_lote = FILA_EVENTOS_CONFIG['tamanho_lote']
+        for inicio in range(0, len(pendentes), tamanho_lote):
+            if not self._gravar_lote(pendentes[inicio:inicio + tamanho_lote]):
+                informar(f"Não foi possível reaplicar o diário '{self.diario}'; os eventos continuam nele.")
+                return None
+        try:
+            self._reescrever_diario([])
+        except OSError as err:
+            informar(f"Erro ao abrir o diário da fila de eventos '{self.diario}': {err}")
+            return None
+
+        self._vagas = threading.BoundedSemaphore(FILA_EVENTOS_CONFIG['capacidade'])
+        self._encerrar = False
+        self._thread = threading.Thread(target=self._escrever, name="fila-eventos", daemon=True)
+        self._thread.start()
+        return len(pendentes)
+
+    def enviar(self, tipo, placa, momento=None, espera_maxima=None):
+        """
+        Aceita um evento para gravação posterior. Retorna assim que o evento está no diário.
+
+        Args:
+            tipo (str): 'entrada' ou 'saida' (ver TIPOS_EVENTO).
+            placa (str): Placa lida.
+            momento (datetime, optional): Hora da leitura. Defaults to None (agora).
+            espera_maxima (float, optional): Segundos de espera por uma vaga com a fila cheia.
+                Defaults to FILA_EVENTOS_CONFIG['espera_maxima'].
+
+        Returns:
+            int or None: Número de sequência do evento, ou None se a fila está cheia, encerrada ou o diário falhou.
+        """
+        if tipo not in TIPOS_EVENTO:
+            raise ValueError(f"Tipo de evento desconhecido: {tipo!r}. Use {', '.join(TIPOS_EVENTO)}.")
+        if not self.iniciada or self._encerrar:
+            informar("Erro: a fila de eventos não está em funcionamento.")
+            return None
+        espera = FILA_EVENTOS_CONFIG['espera_maxima'] if espera_maxima is None else espera_maxima
+        if not self._vagas.acquire(timeout=espera):
+            informar(f"Fila de eventos cheia: evento de {tipo} da placa '{placa}' recusado.")
+            return None
+        momento = (momento or datetime.now()).replace(microsecond=0)
+        with self._lock_diario:
+            evento = {'seq': self._sequencia + 1, 'tipo': tipo, 'placa': placa, 'momento': momento.isoformat()}
+            try:
+                self._arquivo.write(json.dumps(evento, ensure_ascii=False) + "\n")
+                self._arquivo.flush()
+                if FILA_EVENTOS_CONFIG['sincronizar_diario']:
+                    os.fsync(self._arquivo.fileno())
+            except (OSError, ValueError) as err:
+                self._vagas.release()
+                informar(f"Erro ao gravar o diário da fila de eventos: {err}")
+                return None
+            self._sequencia = evento['seq']
+            with self._condicao:
+                self._fila.append(evento)
+                self._condicao.notify()
+        return evento['seq']
+
+    def fechar(self):
+        """Grava os eventos que restam na fila e encerra a thread escritora."""
+        if self._thread is None:
+            return
+        with self._condicao:
+            self._encerrar = True
+            self._condicao.notify()
+        self._thread.join()
+        self._thread = None
+        with self._lock_diario:
+            with self._condicao:
+                pendentes = list(self._fila) # Enviados durante o encerramento: ficam para a próxima inicialização
+            try:
+                self._reescrever_diario(pendentes)
+            except OSError as err:
+                informar(f"Erro ao compactar o diário da fila de eventos: {err}")
+            self._arquivo.close()
+            self._arquivo = None
+
+    def _escrever(self):
+        tamanho_lote = FILA_EVENTOS_CONFIG['tamanho_lote']
+        intervalo = FILA_EVENTOS_CONFIG['intervalo']
+        while True:
+            with self._condicao:
+                while not self._fila and not self._encerrar:
+                    self._condicao.wait()
+                if not self._fila:
+                    return
+                # Um lote sai quando enche ou 'intervalo' segundos depois do seu primeiro evento
+                limite = time.monotonic() + intervalo
+                while len(self._fila) < tamanho_lote and not self._encerrar:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._condicao.wait(restante)
+                lote = [self._fila.popleft() for _ in range(min(tamanho_lote, len(self._fila)))]
+            while not self._gravar_lote(lote):
+                time.sleep(FILA_EVENTOS_CONFIG['pausa_apos_falha'])
+            for _ in lote:
+                self._vagas.release()
+            self._compactar_diario()
+
+    def _gravar_lote(self, lote):
+        """
+        Aplica um lote em uma transação, com a nova posição da fila.
+
+        Returns:
+            bool: True se o lote foi confirmado (inclusive com eventos recusados); False para repetir.
+        """
+        recusados = []
+        with transacao(self.pool) as transacao_lote:
+            for evento in lote:
+                funcao = self.tipos.get(evento['tipo'])
+                with coletar_mensagens() as mensagens, transacao(self.pool) as ponto:
+                    limpar_erro()
+                    try:
+                        resultado = funcao(self.pool, evento['placa'], datetime.fromisoformat(evento['momento']))
+                    except Exception as e:
+                        informar(f"Erro inesperado ao aplicar o evento: {e}")
+                        resultado = None
+                    if resultado is None:
+                        ponto.desfazer()
+                if resultado is None:
+                    if ultimo_erro() == ERRO_CONEXAO:
+                        informar("Conexão com o banco perdida; o lote de eventos será repetido.")
+                        transacao_lote.desfazer()
+                        break
+                    recusados.append((evento, mensagens))
+            else:
+                if executar_query(self.pool, GRAVAR_POSICAO, (self.nome, lote[-1]['seq']), commit=True) is None:
+                    transacao_lote.desfazer()
+        if not transacao_lote.confirmada:
+            return False
+        for evento, mensagens in recusados:
+            motivo = mensagens[-1] if mensagens else "recusado"
+            informar(f"Evento {evento['seq']} ({evento['tipo']} de '{evento['placa']}') descartado: {motivo}")
+        self.aplicados += len(lote) - len(recusados)
+        self.recusados += len(recusados)
+        self.lotes += 1
+        self._sequencia_aplicada = lote[-1]['seq']
+        return True
+
+    def _compactar_diario(self):
+        """Ao passar do tamanho limite, o diário é reescrito só com os eventos ainda não aplicados."""
+        with self._lock_diario:
+            if self._arquivo.tell() < FILA_EVENTOS_CONFIG['tamanho_maximo_diario']:
+                return
+            with self._condicao:
+                pendentes = list(self._fila)
+            try:
+                self._reescrever_diario(pendentes)
+            except OSError as err:
+                informar(f"Erro ao compactar o diário da fila de eventos: {err}")
+
+    def _reescrever_diario(self, pendentes):
+        """Substitui o diário por um com apenas os eventos pendentes (troca atômica com os.replace)."""
+        temporario = f"{self.diario}.parcial"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            for evento in pendentes:
+                arquivo.write(json.dumps(evento, ensure_ascii=False) + "\n")
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        if self._arquivo is not None:
+            self._arquivo.close()
+        os.replace(temporario, self.diario)
+        self._arquivo = open(self.diario, "a", encoding="utf-8")
+
+    def _ler_diario(self):
+        """
+        Eventos gravados no diário. Uma última linha incompleta (queda durante a gravação) é ignorada.
+
+        Returns:
+            list or None: Os eventos, na ordem do diário, ou None se o arquivo não pôde ser lido.
+        """
+        eventos = []
+        try:
+            with open(self.diario, encoding="utf-8") as arquivo:
+                for numero, linha in enumerate(arquivo, start=1):
+                    try:
+                        evento = json.loads(linha)
+                    except ValueError:
+                        informar(f"Linha {numero} do diário '{self.diario}' incompleta; ignorada.")
+                        continue
+                    eventos.append(evento)
+        except FileNotFoundError:
+            return []
+        except OSError as err:
+            informar(f"Erro ao ler o diário da fila de eventos '{self.diario}': {err}")
+            return None
+        return eventos
+
+
+# Fila compartilhada pelo processo (câmeras, cancelas, serviço da portaria)
+fila_eventos = FilaEventos()
@@ -0,0 +1,861 @@
+# fragmentos.py
+# Cadastro de clientes e veículos dividido em fragmentos (shards): vários bancos com o mesmo esquema,
+# para que um único estacionamento_db não seja o gargalo de uma rede de estacionamentos.
+#   - Cada cliente mora no fragmento indicado pelo hash do seu CPF em um anel de hash consistente;
+#     os veículos moram no fragmento do proprietário, então a chave estrangeira e os JOINs continuam locais.
+#   - Os IDs são globais: o fragmento N gera IDs a partir de N * bloco_ids + 1, e o fragmento de um ID
+#     é ID // bloco_ids, exceto para os registros movidos, anotados na tabela 'ids_realocados'.
+#   - A placa é localizada pelo diretório placa -> fragmento ('diretorio_placas'), cuja chave primária
+#     também garante a placa única entre os fragmentos. Diretório e IDs realocados ficam no banco do catálogo.
+#   - As listagens percorrem os fragmentos ao mesmo tempo e intercalam os resultados por ID (heapq.merge).
+#   - Um fragmento incluído recebe, em lotes transacionais e com o cadastro em uso, os clientes que o anel
+#     passa a lhe atribuir (adicionar_fragmento e rebalancear).
+# As funções de cadastro têm os mesmos nomes e retornos das de cliente_crud e veiculo_crud, mas recebem
+# um Fragmentos no lugar da conexão. As sessões (sessao_crud) continuam no banco de cada estacionamento.
+
+import argparse
+import hashlib
+import heapq
+import sys
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import islice
+from operator import attrgetter
+
+import cliente_crud
+import veiculo_crud
+from backends import backend_da_conexao, criar_backend
+from db_config import CACHE_CONFIG, FRAGMENTOS_CONFIG
+from db_utils import (conexao_dedicada, criar_pool, desfazer, executar_muitos, executar_query, iterar_query,
+                      limpar_erro, transacao, ultimo_erro, ERRO_DUPLICADO, ERRO_REFERENCIA_INEXISTENTE)
+from log_alteracoes import executar_conjunto_com_log, executar_muitos_com_log
+from mensagens import coletar_mensagens, informar
+from placas import normalizar_placa
+
+# Tabelas do catálogo (criadas por Fragmentos.preparar, com SQL aceito pelo MySQL e pelo SQLite)
+_ESQUEMA_CATALOGO = (
+    "CREATE TABLE IF NOT EXISTS fragmentos_anel ("
+    "numero INT NOT NULL PRIMARY KEY, entrando INT NOT NULL DEFAULT 0)",
+    "CREATE TABLE IF NOT EXISTS diretorio_placas ("
+    "placa VARCHAR(8) NOT NULL PRIMARY KEY, fragmento INT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS ids_realocados ("
+    "tabela VARCHAR(16) NOT NULL, registro_id INT NOT NULL, fragmento INT NOT NULL, PRIMARY KEY (tabela, registro_id))",
+)
+# REPLACE INTO existe no MySQL e no SQLite: inclui ou sobrescreve pela chave primária
+GRAVAR_PLACA = "REPLACE INTO diretorio_placas (placa, fragmento) VALUES (%s, %s)"
+GRAVAR_REALOCADO = "REPLACE INTO ids_realocados (tabela, registro_id, fragmento) VALUES (%s, %s, %s)"
+INSERIR_CLIENTE_COM_ID = "INSERT INTO clientes (id, nome, endereco, cpf, telefone) VALUES (%s, %s, %s, %s, %s)"
+INSERIR_VEICULO_COM_ID = "INSERT INTO veiculos (id, marca, modelo, ano, placa, cliente_id) VALUES (%s, %s, %s, %s, %s, %s)"
+
+_por_id = attrgetter('id')
+
+
+def _hash(chave):
+    """Hash estável de 64 bits (o hash() do Python muda a cada processo)."""
+    return int.from_bytes(hashlib.blake2b(str(chave).encode(), digest_size=8).digest(), 'big')
+
+
+class AnelConsistente:
+    """
+    Anel de hash consistente: cada fragmento ocupa 'nos_virtuais' pontos do anel, e uma chave pertence ao
+    fragmento do primeiro ponto depois do seu hash. Incluir um fragmento muda o dono de ~1/N das chaves,
+    todas para o fragmento incluído; as demais não se movem.
+    """
+
+    def __init__(self, numeros=(), nos_virtuais=None):
+        self.nos_virtuais = nos_virtuais or FRAGMENTOS_CONFIG['nos_virtuais']
+        self.numeros = frozenset(numeros)
+        pontos = sorted((_hash(f"fragmento-{numero}#{indice}"), numero)
+                        for numero in self.numeros for indice in range(self.nos_virtuais))
+        self._pontos = [ponto for ponto, _ in pontos]
+        self._donos = [numero for _, numero in pontos]
+
+    def fragmento(self, chave):
+        """Número do fragmento dono da chave (None se o anel está vazio)."""
+        if not self._pontos:
+            return None
+        return self._donos[bisect_right(self._pontos, _hash(chave)) % len(self._donos)]
+
+
+class Fragmentos:
+    """
+    Os fragmentos do cadastro e as regras que levam cada operação ao fragmento certo.
+
+    Atributos:
+        pools (dict): Número do fragmento -> PoolConexoes, inclusive fragmentos configurados ainda fora do anel.
+        catalogo: PoolConexoes do banco do diretório de placas, dos IDs realocados e dos membros do anel.
+        anel (AnelConsistente): Dono de cada CPF.
+        anel_anterior (AnelConsistente or None): Enquanto um fragmento está entrando, o anel sem ele; um CPF
+            ainda não movido continua sendo encontrado no dono anterior.
+    """
+
+    def __init__(self, pools, catalogo, nos_virtuais=None, bloco_ids=None):
+        self.pools = dict(pools)
+        self.catalogo = catalogo
+        self.nos_virtuais = nos_virtuais or FRAGMENTOS_CONFIG['nos_virtuais']
+        self.bloco_ids = bloco_ids or FRAGMENTOS_CONFIG['bloco_ids']
+        self.anel = AnelConsistente((), self.nos_virtuais)
+        self.anel_anterior = None
+        self._realocados = {}        # (tabela, registro_id) -> fragmento dos registros movidos
+        self._placas = OrderedDict() # Diretório de placas consultado recentemente (LRU): placa -> fragmento
+        self._lock_placas = threading.Lock()
+
+    # ----- Catálogo -----
+
+    def preparar(self):
+        """
+        Cria as tabelas do catálogo, se preciso, e carrega os membros do anel e os IDs realocados.
+        Na primeira execução, os fragmentos configurados formam o anel. Só o fragmento 0 pode já ter
+        cadastro (o banco existente que passa a ser fragmento, com os IDs que já tinha): suas placas são
+        incluídas no diretório e os demais entram no anel como "entrando", até que rebalancear() lhes
+        entregue seus clientes. Um fragmento de outro número com clientes ou veículos é recusado: seus IDs
+        se confundiriam com os do fragmento 0 e seus CPFs não seriam encontrados pelo anel.
+
+        Returns:
+            bool: True se o catálogo está pronto.
+        """
+        for comando in _ESQUEMA_CATALOGO:
+            if executar_query(self.catalogo, comando, commit=True) is None:
+                informar("Falha ao criar as tabelas do catálogo de fragmentos.")
+                return False
+        membros = executar_query(self.catalogo, "SELECT numero FROM fragmentos_anel", fetch_all=True, formato='tupla')
+        if membros is None:
+            return False
+        if not membros and not self._iniciar_anel():
+            return False
+        return self.recarregar()
+
+    def _iniciar_anel(self):
+        ocupados = []
+        for numero in sorted(self.pools):
+            vazio = self.fragmento_vazio(numero)
+            if vazio is None:
+                return False
+            if not vazio and numero != 0:
+                informar(f"O fragmento {numero} já tem clientes ou veículos; só o fragmento 0 pode começar com "
+                         "cadastro. Os demais devem ser bancos vazios.")
+                return False
+            if not self._preparar_fragmento(numero):
+                return False
+            if not vazio:
+                if not self._indexar_placas(numero):
+                    return False
+                ocupados.append(numero)
+        membros = [(numero, 0 if numero in ocupados or not ocupados else 1) for numero in sorted(self.pools)]
+        if executar_muitos(self.catalogo, "INSERT INTO fragmentos_anel (numero, entrando) VALUES (%s, %s)", membros) is None:
+            informar("Falha ao registrar os fragmentos do anel no catálogo.")
+            return False
+        return True
+
+    def fragmento_vazio(self, numero):
+        """
+        Indica se o fragmento não tem clientes nem veículos.
+
+        Returns:
+            bool or None: True se vazio, False se já tem cadastro, None em caso de erro.
+        """
+        linha = executar_query(self.pools[numero], "SELECT (SELECT COUNT(*) FROM (SELECT id FROM clientes LIMIT 1) c), "
+                               "(SELECT COUNT(*) FROM (SELECT id FROM veiculos LIMIT 1) v)", fetch_one=True, formato='tupla')
+        if linha is None:
+            informar(f"Falha ao consultar o cadastro do fragmento {numero}.")
+            return None
+        return not any(linha)
+
+    def _preparar_fragmento(self, numero):
+        """Faz o fragmento gerar IDs do seu bloco (numero * bloco_ids + 1 em diante)."""
+        inicio = numero * self.bloco_ids + 1
+        if inicio == 1:
+            return True # Fragmento 0: o banco original, com os IDs que já tinha
+        with conexao_dedicada(self.pools[numero]) as conexao:
+            if conexao is None:
+                return False
+            backend = backend_da_conexao(conexao)
+            try:
+                for tabela in ('clientes', 'veiculos'):
+                    backend.iniciar_sequencia(conexao, tabela, inicio)
+                conexao.commit()
+                return True
+            except backend.erros as err:
+                informar(f"Erro ao preparar os IDs do fragmento {numero}: {err}")
+                desfazer(conexao)
+                return False
+
+    def _indexar_placas(self, numero):
+        """Inclui no diretório as placas já cadastradas em um fragmento."""
+        linhas = executar_query(self.pools[numero], "SELECT placa FROM veiculos", fetch_all=True, formato='tupla')
+        if linhas is None or executar_muitos(self.catalogo, GRAVAR_PLACA, [(placa, numero) for placa, in linhas]) is None:
+            informar(f"Falha ao incluir as placas do fragmento {numero} no diretório.")
+            return False
+        return True
+
+    def recarregar(self):
+        """
+        Relê do catálogo os membros do anel e os IDs realocados e esquece o diretório de placas em memória.
+        Outros processos devem chamá-la quando um fragmento é incluído.
+
+        Returns:
+            bool: True se o catálogo foi lido.
+        """
+        realocados = executar_query(self.catalogo, "SELECT tabela, registro_id, fragmento FROM ids_realocados",
+                                    fetch_all=True, formato='tupla')
+        if realocados is None or not self.carregar_anel():
+            informar("Falha ao carregar o catálogo de fragmentos.")
+            return False
+        self._realocados = {(tabela, registro_id): numero for tabela, registro_id, numero in realocados}
+        with self._lock_placas:
+            self._placas.clear()
+        return True
+
+    def carregar_anel(self):
+        """Relê os membros do anel. Returns: bool: True se a leitura foi feita."""
+        membros = executar_query(self.catalogo, "SELECT numero, entrando FROM fragmentos_anel",
+                                 fetch_all=True, formato='tupla')
+        if membros is None:
+            return False
+        desconhecidos = sorted(numero for numero, _ in membros if numero not in self.pools)
+        if desconhecidos:
+            informar(f"Fragmento(s) {', '.join(map(str, desconhecidos))} do anel sem configuração em FRAGMENTOS_CONFIG.")
+            return False
+        estaveis = [numero for numero, entrando in membros if not entrando]
+        self.anel = AnelConsistente([numero for numero, _ in membros], self.nos_virtuais)
+        self.anel_anterior = AnelConsistente(estaveis, self.nos_virtuais) if len(estaveis) < len(membros) else None
+        return True
+
+    # ----- Roteamento -----
+
+    def fragmentos_do_cpf(self, cpf):
+        """Fragmentos em que o CPF pode estar: o dono no anel e, durante a entrada de um fragmento, o anterior."""
+        atual = self.anel.fragmento(cpf)
+        anterior = self.anel_anterior.fragmento(cpf) if self.anel_anterior else atual
+        return [atual] if anterior == atual else [atual, anterior]
+
+    def fragmento_do_id(self, tabela, registro_id):
+        """Fragmento de um cliente ou veículo ('clientes' ou 'veiculos') pelo ID."""
+        return self._realocados.get((tabela, registro_id), registro_id // self.bloco_ids)
+
+    def fragmento_da_placa(self, placa, recarregar=False):
+        """
+        Fragmento da placa (canônica) segundo o diretório.
+
+        Args:
+            placa (str): Placa na forma canônica.
+            recarregar (bool, optional): True para ignorar o diretório em memória. Defaults to False.
+
+        Returns:
+            int or None: O número do fragmento, ou None se a placa não está no diretório (ou em caso de erro).
+        """
+        with self._lock_placas:
+            if not recarregar and placa in self._placas:
+                self._placas.move_to_end(placa)
+                return self._placas[placa]
+        linha = executar_query(self.catalogo, "SELECT fragmento FROM diretorio_placas WHERE placa = %s",
+                               (placa,), fetch_one=True, formato='tupla')
+        numero = linha[0] if linha else None
+        self._lembrar_placas([placa], numero)
+        return numero
+
+    def _lembrar_placas(self, placas, numero):
+        with self._lock_placas:
+            for placa in placas:
+                if numero is None:
+                    self._placas.pop(placa, None)
+                    continue
+                self._placas[placa] = numero
+                self._placas.move_to_end(placa)
+            while len(self._placas) > CACHE_CONFIG['tamanho_maximo']:
+                self._placas.popitem(last=False)
+
+    def _rotas_do_cpf(self, cpf):
+        tentados = self.fragmentos_do_cpf(cpf)
+        yield from tentados
+        # Não encontrado: o anel pode ter mudado em outro processo
+        if self.carregar_anel():
+            yield from (numero for numero in self.fragmentos_do_cpf(cpf) if numero not in tentados)
+
+    def _rotas_do_id(self, tabela, registro_id):
+        numero = self.fragmento_do_id(tabela, registro_id)
+        if numero in self.pools:
+            yield numero
+        # Não encontrado: o registro pode ter sido movido por outro processo
+        linha = executar_query(self.catalogo, "SELECT fragmento FROM ids_realocados WHERE tabela = %s AND registro_id = %s",
+                               (tabela, registro_id), fetch_one=True, formato='tupla')
+        if linha and linha[0] != numero and linha[0] in self.pools:
+            self._realocados[(tabela, registro_id)] = linha[0]
+            yield linha[0]
+
+    def _rotas_da_placa(self, placa):
+        numero = self.fragmento_da_placa(placa)
+        if numero is not None:
+            yield numero
+        atualizado = self.fragmento_da_placa(placa, recarregar=True)
+        if atualizado is not None and atualizado != numero:
+            yield atualizado
+
+    def executar_roteado(self, rotas, funcao, *args, ausente=None):
+        """
+        Executa funcao(pool, *args) nos fragmentos indicados por 'rotas' (consumido sob demanda) até um
+        retorno verdadeiro. Só as mensagens da última tentativa são emitidas.
+
+        Args:
+            rotas (iterable): Números de fragmento, na ordem de tentativa.
+            funcao (callable): Função do CRUD que recebe a conexão como primeiro argumento.
+            ausente (str, optional): Mensagem emitida se não houver fragmento a tentar. Defaults to None.
+
+        Returns:
+            O retorno da última tentativa (None se não houve tentativa).
+        """
+        resultado, mensagens, tentou = None, [], False
+        for numero in rotas:
+            tentou = True
+            with coletar_mensagens() as mensagens:
+                resultado = funcao(self.pools[numero], *args)
+            if resultado:
+                break
+        for mensagem in mensagens:
+            informar(mensagem)
+        if not tentou and ausente:
+            informar(ausente)
+        return resultado
+
+    def pools_do_anel(self):
+        return [self.pools[numero] for numero in sorted(self.anel.numeros)]
+
+    # ----- Diretório -----
+
+    def reservar_placa(self, placa, numero):
+        """
+        Inclui a placa no diretório antes do INSERT do veículo; a chave primária recusa uma placa que já
+        existe em qualquer fragmento.
+
+        Returns:
+            bool or None: True se reservada, False se a placa já está cadastrada, None em caso de erro.
+        """
+        limpar_erro()
+        if executar_query(self.catalogo, "INSERT INTO diretorio_placas (placa, fragmento) VALUES (%s, %s)",
+                          (placa, numero), commit=True) is None:
+            return False if ultimo_erro() == ERRO_DUPLICADO else None
+        self._lembrar_placas([placa], numero)
+        return True
+
+    def mover_placa(self, placa, numero):
+        """Aponta a placa para outro fragmento no diretório. Returns: bool: True se o diretório foi atualizado."""
+        if executar_query(self.catalogo, "UPDATE diretorio_placas SET fragmento = %s WHERE placa = %s",
+                          (numero, placa), commit=True) is None:
+            return False
+        self._lembrar_placas([placa], numero)
+        return True
+
+    def remover_placas(self, placas):
+        """Retira placas do diretório (veículos excluídos ou reserva desfeita)."""
+        if not placas:
+            return
+        marcadores = ", ".join(["%s"] * len(placas))
+        if executar_query(self.catalogo, f"DELETE FROM diretorio_placas WHERE placa IN ({marcadores})",
+                          tuple(placas), commit=True) is None:
+            informar(f"Falha ao retirar do diretório a(s) placa(s) {', '.join(placas)}.")
+        self._lembrar_placas(placas, None)
+
+    def _registrar_movimentacao(self, destino, ids_clientes, veiculos):
+        """Aponta para 'destino' as placas e os IDs dos clientes e veículos movidos, com um único commit."""
+        placas = [(placa, destino) for _, _, _, _, placa, _ in veiculos]
+        realocados = ([('clientes', cliente_id, destino) for cliente_id in ids_clientes]
+                      + [('veiculos', veiculo[0], destino) for veiculo in veiculos])
+        with conexao_dedicada(self.catalogo) as conexao:
+            if conexao is None:
+                return False
+            if (executar_muitos(conexao, GRAVAR_PLACA, placas, commit=False) is None
+                    or executar_muitos(conexao, GRAVAR_REALOCADO, realocados) is None):
+                desfazer(conexao)
+                return False
+        for tabela, registro_id, numero in realocados:
+            self._realocados[(tabela, registro_id)] = numero
+        self._lembrar_placas([placa for placa, _ in placas], destino)
+        return True
+
+    def fechar(self):
+        """Encerra os pools de todos os fragmentos e o do catálogo."""
+        for pool in self.pools.values():
+            pool.fechar()
+        if self.catalogo not in self.pools.values():
+            self.catalogo.fechar()
+
+
+def criar_fragmentos(configuracoes=None, catalogo=None, backend=None, **opcoes):
+    """
+    Cria os pools dos fragmentos e do catálogo e prepara o catálogo.
+
+    Args:
+        configuracoes (dict, optional): Número -> configuração de cada fragmento. Defaults to None
+            (FRAGMENTOS_CONFIG['fragmentos']).
+        catalogo (dict, optional): Configuração do banco do catálogo. Defaults to None (FRAGMENTOS_CONFIG['catalogo'];
+            sem ela, o catálogo fica no fragmento de menor número).
+        backend (str, optional): 'mysql' ou 'sqlite'. Defaults to None (DB_BACKEND).
+        **opcoes: Opções dos pools, como em criar_pool().
+
+    Returns:
+        Fragmentos or None: Os fragmentos prontos para uso, ou None se algum banco estiver inacessível.
+    """
+    configuracoes = FRAGMENTOS_CONFIG['fragmentos'] if configuracoes is None else configuracoes
+    catalogo = catalogo or FRAGMENTOS_CONFIG['catalogo']
+    if not configuracoes:
+        informar("Nenhum fragmento configurado (FRAGMENTOS_CONFIG['fragmentos']).")
+        return None
+    pools = {}
+    for numero, config in sorted(configuracoes.items()):
+        pool = criar_pool(**{**opcoes, 'backend': criar_backend(backend, config)})
+        if pool is None:
+            informar(f"Fragmento {numero} inacessível.")
+            for aberto in pools.values():
+                aberto.fechar()
+            return None
+        pools[numero] = pool
+    pool_catalogo = (criar_pool(**{**opcoes, 'backend': criar_backend(backend, catalogo)}) if catalogo
+                     else pools[min(pools)])
+    fragmentos = Fragmentos(pools, pool_catalogo) if pool_catalogo else None
+    if fragmentos is None or not fragmentos.preparar():
+        informar("Falha ao preparar o catálogo de fragmentos.")
+        for pool in pools.values():
+            pool.fechar()
+        if pool_catalogo and catalogo:
+            pool_catalogo.fechar()
+        return None
+    return fragmentos
+
+
+# ----- Clientes -----
+
+def adicionar_cliente(fragmentos, nome, endereco, cpf, telefone):
+    """
+    Adiciona um cliente no fragmento do seu CPF (ver cliente_crud.adicionar_cliente).
+
+    Returns:
+        int or None: O ID do cliente adicionado se sucesso, None caso contrário.
+    """
+    destino, *anteriores = fragmentos.fragmentos_do_cpf(cpf)
+    for numero in anteriores: # Durante a entrada de um fragmento, o CPF pode não ter sido movido ainda
+        existentes = cliente_crud.consultar_ids_por_cpfs(fragmentos.pools[numero], [cpf])
+        if existentes is None:
+            informar(f"Falha ao adicionar cliente '{nome}'.")
+            return None
+        if existentes:
+            informar(f"Falha ao adicionar cliente '{nome}': o CPF {cpf} já está cadastrado.")
+            return None
+    cliente_id = cliente_crud.adicionar_cliente(fragmentos.pools[destino], nome, endereco, cpf, telefone)
+    if cliente_id and cliente_id // fragmentos.bloco_ids != destino:
+        informar(f"Atenção: o fragmento {destino} esgotou seu bloco de IDs (cliente ID {cliente_id}). "
+                 "Aumente FRAGMENTOS_CONFIG['bloco_ids'] ou inclua um fragmento.")
+    return cliente_id
+
+def consultar_cliente_por_cpf(fragmentos, cpf):
+    """Consulta um cliente pelo CPF no seu fragmento (ver cliente_crud.consultar_cliente_por_cpf)."""
+    return fragmentos.executar_roteado(fragmentos._rotas_do_cpf(cpf), cliente_crud.consultar_cliente_por_cpf, cpf)
+
+def consultar_cliente_por_id(fragmentos, cliente_id):
+    """Consulta um cliente pelo ID no seu fragmento (ver cliente_crud.consultar_cliente_por_id)."""
+    return fragmentos.executar_roteado(fragmentos._rotas_do_id('clientes', cliente_id),
+                                       cliente_crud.consultar_cliente_por_id, cliente_id)
+
+def atualizar_cliente(fragmentos, cliente_id, nome=None, endereco=None, telefone=None):
+    """Atualiza um cliente no seu fragmento (ver cliente_crud.atualizar_cliente). Returns: bool."""
+    return bool(fragmentos.executar_roteado(
+        fragmentos._rotas_do_id('clientes', cliente_id), cliente_crud.atualizar_cliente,
+        cliente_id, nome, endereco, telefone,
+        ausente=f"Cliente com ID {cliente_id} não encontrado. Não é possível atualizar."))
+
+def excluir_cliente(fragmentos, cliente_id):
+    """
+    Exclui um cliente e seus veículos (ver cliente_crud.excluir_cliente) e retira as placas do diretório.
+
+    Returns:
+        bool: True se a exclusão foi bem-sucedida, False caso contrário.
+    """
+    placas = []
+
+    def excluir(pool, cliente_id):
+        with transacao(pool) as tx:
+            # Trava o cliente antes de ler as placas: nenhum veículo é incluído para ele até o fim da exclusão
+            travado = executar_query(pool, "UPDATE clientes SET cpf = cpf WHERE id = %s", (cliente_id,))
+            linhas = executar_query(pool, "SELECT placa FROM veiculos WHERE cliente_id = %s", (cliente_id,),
+                                    fetch_all=True, formato='tupla')
+            if travado is None or linhas is None:
+                informar(f"Falha ao excluir cliente ID {cliente_id}.")
+                tx.desfazer()
+                return False
+            if not cliente_crud.excluir_cliente(pool, cliente_id):
+                return False
+        placas[:] = [placa for placa, in linhas]
+        return tx.confirmada
+
+    if not fragmentos.executar_roteado(fragmentos._rotas_do_id('clientes', cliente_id), excluir, cliente_id,
+                                       ausente=f"Cliente com ID {cliente_id} não encontrado. Não é possível excluir."):
+        return False
+    fragmentos.remover_placas(placas)
+    return True
+
+def _intercalar(resultados):
+    """
+    Intercala por ID os resultados já ordenados de cada fragmento, sem carregá-los inteiros. Um registro
+    em movimentação pode aparecer nos dois fragmentos por um instante; a cópia repetida é descartada.
+    """
+    anterior = None
+    for registro in heapq.merge(*resultados, key=_por_id):
+        if registro.id != anterior:
+            anterior = registro.id
+            yield registro
+
+def iterar_clientes(fragmentos, tamanho_lote=500):
+    """
+    Percorre os clientes de todos os fragmentos em ordem de ID, sem carregá-los na memória
+    (uma conexão de cada fragmento fica ocupada até o fim da leitura).
+
+    Yields:
+        Cliente: Um cliente por vez.
+    """
+    return _intercalar([cliente_crud.iterar_clientes(pool, tamanho_lote) for pool in fragmentos.pools_do_anel()])
+
+def listar_clientes(fragmentos):
+    """
+    Lista os clientes de todos os fragmentos, em ordem de ID.
+
+    Returns:
+        list or None: Lista de Cliente, ou None em caso de erro.
+    """
+    limpar_erro()
+    clientes = list(iterar_clientes(fragmentos))
+    if ultimo_erro() is not None:
+        informar("Falha ao listar clientes.")
+        return None
+    if not clientes:
+        informar("Nenhum cliente cadastrado.")
+    return clientes
+
+def listar_clientes_pagina(fragmentos, ultimo_id=0, limite=50):
+    """
+    Página de clientes de todos os fragmentos por paginação por chave: cada fragmento entrega sua
+    página a partir de 'ultimo_id' e as páginas são intercaladas por ID.
+
+    Returns:
+        list or None: Lista de Cliente ordenada por ID, ou None em caso de erro.
+    """
+    paginas = [cliente_crud.listar_clientes_pagina(pool, ultimo_id, limite) for pool in fragmentos.pools_do_anel()]
+    if any(pagina is None for pagina in paginas):
+        return None
+    return list(islice(_intercalar(paginas), limite))
+
+
+# ----- Veículos -----
+
+def adicionar_veiculo(fragmentos, marca, modelo, ano, placa, cliente_id):
+    """
+    Adiciona um veículo no fragmento do proprietário e registra a placa no diretório
+    (ver veiculo_crud.adicionar_veiculo).
+
+    Returns:
+        int or None: O ID do veículo adicionado se sucesso, None caso contrário.
+    """
+    placa_canonica = normalizar_placa(placa)
+    if placa_canonica is None:
+        informar(f"Placa '{placa}' em formato inválido. Não é possível adicionar o veículo.")
+        return None
+    placa = placa_canonica
+    veiculo_id, mensagens, reservada_em = None, [], None
+    for numero in fragmentos._rotas_do_id('clientes', cliente_id):
+        if reservada_em is None:
+            reservada = fragmentos.reservar_placa(placa, numero)
+            if not reservada:
+                informar(f"Falha ao adicionar veículo {marca} {modelo}: a placa {placa} já está cadastrada."
+                         if reservada is False else f"Falha ao adicionar veículo {marca} {modelo}.")
+                return None
+        elif not fragmentos.mover_placa(placa, numero):
+            break
+        reservada_em = numero
+        with coletar_mensagens() as mensagens:
+            veiculo_id = veiculo_crud.adicionar_veiculo(fragmentos.pools[numero], marca, modelo, ano, placa, cliente_id)
+        if veiculo_id or ultimo_erro() != ERRO_REFERENCIA_INEXISTENTE:
+            break # Proprietário não encontrado: tenta o fragmento para onde ele pode ter sido movido
+    for mensagem in mensagens:
+        informar(mensagem)
+    if reservada_em is None:
+        informar(f"Cliente com ID {cliente_id} não encontrado. Não é possível adicionar o veículo.")
+    elif not veiculo_id:
+        fragmentos.remover_placas([placa])
+    return veiculo_id
+
+def consultar_veiculo_por_placa(fragmentos, placa):
+    """Consulta um veículo pela placa no fragmento indicado pelo diretório (ver veiculo_crud.consultar_veiculo_por_placa)."""
+    placa = normalizar_placa(placa) or placa
+    return fragmentos.executar_roteado(fragmentos._rotas_da_placa(placa), veiculo_crud.consultar_veiculo_por_placa,
+                                       placa, ausente=f"Veículo com placa '{placa}' não encontrado.")
+
+def consultar_veiculo_por_id(fragmentos, veiculo_id):
+    """Consulta um veículo pelo ID no seu fragmento (ver veiculo_crud.consultar_veiculo_por_id)."""
+    return fragmentos.executar_roteado(fragmentos._rotas_do_id('veiculos', veiculo_id),
+                                       veiculo_crud.consultar_veiculo_por_id, veiculo_id)
+
+def atualizar_veiculo(fragmentos, veiculo_id, marca=None, modelo=None, ano=None, cliente_id_novo=None):
+    """
+    Atualiza um veículo no seu fragmento (ver veiculo_crud.atualizar_veiculo). O novo proprietário
+    precisa estar no mesmo fragmento do veículo.
+
+    Returns:
+        bool: True se a atualização foi bem-sucedida, False caso contrário.
+    """
+    if (cliente_id_novo is not None and fragmentos.fragmento_do_id('clientes', cliente_id_novo)
+            != fragmentos.fragmento_do_id('veiculos', veiculo_id)):
+        informar(f"O cliente ID {cliente_id_novo} está em outro fragmento: para transferir o veículo ID {veiculo_id}, "
+                 "exclua-o e cadastre-o para o novo proprietário.")
+        return False
+    return bool(fragmentos.executar_roteado(
+        fragmentos._rotas_do_id('veiculos', veiculo_id), veiculo_crud.atualizar_veiculo,
+        veiculo_id, marca, modelo, ano, cliente_id_novo,
+        ausente=f"Veículo com ID {veiculo_id} não encontrado. Não é possível atualizar."))
+
+def excluir_veiculo(fragmentos, veiculo_id):
+    """Exclui um veículo (ver veiculo_crud.excluir_veiculo) e retira sua placa do diretório. Returns: bool."""
+    placas = []
+
+    def excluir(pool, veiculo_id):
+        veiculo = veiculo_crud.consultar_veiculo_por_id(pool, veiculo_id)
+        if veiculo is None:
+            informar(f"Veículo com ID {veiculo_id} não encontrado. Não é possível excluir.")
+            return False
+        placas[:] = [veiculo.placa]
+        return veiculo_crud.excluir_veiculo(pool, veiculo_id)
+
+    if not fragmentos.executar_roteado(fragmentos._rotas_do_id('veiculos', veiculo_id), excluir, veiculo_id,
+                                       ausente=f"Veículo com ID {veiculo_id} não encontrado. Não é possível excluir."):
+        return False
+    fragmentos.remover_placas(placas)
+    return True
+
+def iterar_veiculos(fragmentos, tamanho_lote=500):
+    """
+    Percorre os veículos (com dados do proprietário) de todos os fragmentos em ordem de ID.
+
+    Yields:
+        VeiculoComProprietario: Um veículo por vez.
+    """
+    return _intercalar([veiculo_crud.iterar_veiculos(pool, tamanho_lote) for pool in fragmentos.pools_do_anel()])
+
+def listar_veiculos(fragmentos):
+    """
+    Lista os veículos de todos os fragmentos, em ordem de ID.
+
+    Returns:
+        list or None: Lista de VeiculoComProprietario, ou None em caso de erro.
+    """
+    limpar_erro()
+    veiculos = list(iterar_veiculos(fragmentos))
+    if ultimo_erro() is not None:
+        informar("Falha ao listar veículos.")
+        return None
+    if not veiculos:
+        informar("Nenhum veículo cadastrado.")
+    return veiculos
+
+def listar_veiculos_pagina(fragmentos, ultimo_id=0, limite=50):
+    """Página de veículos de todos os fragmentos, intercalada por ID (ver listar_clientes_pagina)."""
+    paginas = [veiculo_crud.listar_veiculos_pagina(pool, ultimo_id, limite) for pool in fragmentos.pools_do_anel()]
+    if any(pagina is None for pagina in paginas):
+        return None
+    return list(islice(_intercalar(paginas), limite))
+
+
+# ----- Rebalanceamento -----
+
+def adicionar_fragmento(fragmentos, numero, tamanho_lote=None):
+    """
+    Inclui no anel um fragmento já configurado e move para ele os clientes (com seus veículos) cujo CPF
+    passa a lhe pertencer. O cadastro continua em uso durante a movimentação: um CPF ainda não movido
+    é procurado também no dono anterior.
+
+    Args:
+        fragmentos (Fragmentos): Os fragmentos, com o pool do novo fragmento em 'pools'.
+        numero (int): Número do fragmento incluído.
+        tamanho_lote (int, optional): Clientes movidos por transação. Defaults to None (FRAGMENTOS_CONFIG).
+
+    Returns:
+        dict or None: O resultado de rebalancear(), ou None em caso de erro.
+
+    Raises:
+        ValueError: Fragmento sem pool, já no anel ou com número menor que os do anel (os IDs
+            movidos para um fragmento precisam ser menores que o seu bloco).
+    """
+    if numero not in fragmentos.pools:
+        raise ValueError(f"O fragmento {numero} não está configurado.")
+    if numero in fragmentos.anel.numeros:
+        raise ValueError(f"O fragmento {numero} já faz parte do anel.")
+    if fragmentos.anel.numeros and numero < max(fragmentos.anel.numeros):
+        raise ValueError(f"O fragmento incluído deve ter número maior que os do anel (maior atual: "
+                         f"{max(fragmentos.anel.numeros)}).")
+    vazio = fragmentos.fragmento_vazio(numero)
+    if not vazio:
+        if vazio is False:
+            informar(f"O fragmento {numero} já tem clientes ou veículos; o fragmento incluído deve ser um banco vazio.")
+        return None
+    if not fragmentos._preparar_fragmento(numero):
+        return None
+    if executar_query(fragmentos.catalogo, "INSERT INTO fragmentos_anel (numero, entrando) VALUES (%s, 1)",
+                      (numero,), commit=True) is None or not fragmentos.carregar_anel():
+        informar(f"Falha ao incluir o fragmento {numero} no anel.")
+        return None
+    return rebalancear(fragmentos, tamanho_lote)
+
+def rebalancear(fragmentos, tamanho_lote=None):
+    """
+    Move cada cliente que está fora do fragmento indicado pelo anel (com seus veículos) para o fragmento
+    certo, em lotes de 'tamanho_lote' clientes. Sem pendências, os fragmentos que estavam entrando passam
+    a membros estáveis do anel. Pode ser executada de novo a qualquer momento (ex.: após uma interrupção).
+
+    Returns:
+        dict or None: 'clientes' e 'veiculos' movidos e 'pendentes' (clientes que não podem ser movidos
+        porque o ID não cabe abaixo do bloco do destino), ou None em caso de erro.
+    """
+    tamanho_lote = tamanho_lote or FRAGMENTOS_CONFIG['tamanho_lote_rebalanceamento']
+    resultado = {'clientes': 0, 'veiculos': 0, 'pendentes': 0}
+    for origem in sorted(fragmentos.anel.numeros):
+        fora_do_lugar = _clientes_fora_do_lugar(fragmentos, origem)
+        if fora_do_lugar is None:
+            return None
+        for destino, ids in sorted(fora_do_lugar.items()):
+            # Um ID acima do bloco do destino faria o contador de IDs do destino invadir outro bloco
+            movidos = [cliente_id for cliente_id in ids if cliente_id < destino * fragmentos.bloco_ids]
+            if len(movidos) < len(ids):
+                resultado['pendentes'] += len(ids) - len(movidos)
+                informar(f"{len(ids) - len(movidos)} cliente(s) do fragmento {origem} pertencem ao fragmento "
+                         f"{destino}, de bloco de IDs menor, e não foram movidos.")
+            for inicio in range(0, len(movidos), tamanho_lote):
+                lote = _mover_lote(fragmentos, origem, destino, movidos[inicio:inicio + tamanho_lote])
+                if lote is None:
+                    return None
+                resultado['clientes'] += lote[0]
+                resultado['veiculos'] += lote[1]
+    if not resultado['pendentes'] and fragmentos.anel_anterior is not None:
+        if (executar_query(fragmentos.catalogo, "UPDATE fragmentos_anel SET entrando = 0", commit=True) is None
+                or not fragmentos.carregar_anel()):
+            informar("Falha ao concluir a entrada dos fragmentos no anel.")
+            return None
+    informar(f"Rebalanceamento concluído: {resultado['clientes']} cliente(s) e {resultado['veiculos']} veículo(s) movidos.")
+    return resultado
+
+def _clientes_fora_do_lugar(fragmentos, origem):
+    """IDs dos clientes de 'origem' que pertencem a outro fragmento: {destino: [ids]}, ou None em caso de erro."""
+    por_destino = {}
+    limpar_erro()
+    for cliente_id, cpf in iterar_query(fragmentos.pools[origem], "SELECT id, cpf FROM clientes ORDER BY id",
+                                        tamanho_lote=5000, formato='tupla'):
+        destino = fragmentos.anel.fragmento(cpf)
+        if destino != origem:
+            por_destino.setdefault(destino, []).append(cliente_id)
+    if ultimo_erro() is not None:
+        informar(f"Falha ao ler os clientes do fragmento {origem}.")
+        return None
+    return por_destino
+
+def _mover_lote(fragmentos, origem, destino, ids):
+    """
+    Move um lote de clientes e seus veículos de 'origem' para 'destino', mantendo os IDs:
+    cópia no destino, diretório e IDs realocados no catálogo e exclusão na origem. Os clientes ficam
+    travados na origem até o fim; escritas concorrentes esperam e depois encontram o registro no destino.
+
+    Returns:
+        tuple or None: (clientes, veiculos) movidos, ou None em caso de erro (nada muda na origem).
+    """
+    pool_origem, pool_destino = fragmentos.pools[origem], fragmentos.pools[destino]
+    marcadores = ", ".join(["%s"] * len(ids))
+    with transacao(pool_origem) as tx:
+        travados = executar_query(pool_origem, f"UPDATE clientes SET cpf = cpf WHERE id IN ({marcadores})", tuple(ids))
+        clientes = executar_query(pool_origem, f"SELECT id, nome, endereco, cpf, telefone FROM clientes WHERE id IN ({marcadores})",
+                                  tuple(ids), fetch_all=True, formato='tupla')
+        veiculos = executar_query(pool_origem, "SELECT id, marca, modelo, ano, placa, cliente_id FROM veiculos "
+                                  f"WHERE cliente_id IN ({marcadores})", tuple(ids), fetch_all=True, formato='tupla')
+        if travados is None or clientes is None or veiculos is None:
+            informar(f"Falha ao ler o lote de clientes do fragmento {origem}.")
+            tx.desfazer()
+            return None
+        ids_movidos = [cliente[0] for cliente in clientes] # Sem os excluídos desde a leitura dos IDs
+        copiados = _copiar_lote(pool_destino, clientes, veiculos)
+        if copiados is None or not fragmentos._registrar_movimentacao(destino, ids_movidos, veiculos):
+            informar(f"Falha ao copiar o lote de clientes do fragmento {origem} para o {destino}.")
+            if copiados:
+                _excluir_clientes(pool_destino, copiados)
+            tx.desfazer()
+            return None
+        if ids_movidos and _excluir_clientes(pool_origem, ids_movidos) is None:
+            tx.desfazer()
+    if not tx.confirmada:
+        # A cópia e o catálogo já apontam para o destino; a próxima execução só exclui o que ficou na origem
+        informar(f"Falha ao excluir do fragmento {origem} o lote movido para o {destino}.")
+        return None
+    return len(clientes), len(veiculos)
+
+def _copiar_lote(pool, clientes, veiculos):
+    """Insere no fragmento os clientes e veículos com os IDs originais. Returns: list or None: IDs de cliente inseridos."""
+    with transacao(pool) as tx:
+        # Clientes já presentes vieram de uma movimentação interrompida e não são copiados de novo
+        existentes = cliente_crud.consultar_clientes_existentes(pool, [cliente[0] for cliente in clientes])
+        if existentes is None:
+            tx.desfazer()
+            return None
+        novos = [cliente for cliente in clientes if cliente[0] not in existentes]
+        ids_novos = [cliente[0] for cliente in novos]
+        veiculos = [veiculo for veiculo in veiculos if veiculo[5] not in existentes]
+        if (executar_muitos_com_log(pool, INSERIR_CLIENTE_COM_ID, novos, 'clientes',
+                                    [cliente[3] for cliente in novos], registro_ids=ids_novos) is None
+                or executar_muitos_com_log(pool, INSERIR_VEICULO_COM_ID, veiculos, 'veiculos',
+                                           [veiculo[4] for veiculo in veiculos],
+                                           registro_ids=[veiculo[0] for veiculo in veiculos]) is None):
+            tx.desfazer()
+    return ids_novos if tx.confirmada else None
+
+def _excluir_clientes(pool, ids):
+    marcadores = ", ".join(["%s"] * len(ids))
+    return executar_conjunto_com_log(pool, f"DELETE FROM clientes WHERE id IN ({marcadores})", tuple(ids),
+                                     'clientes', 'DELETE', ids)
+
+
+def situacao(fragmentos):
+    """
+    Quantidade de clientes e veículos em cada fragmento do anel.
+
+    Returns:
+        list: Tuplas (numero, clientes, veiculos, entrando); contagens None se o fragmento não respondeu.
+    """
+    entrando = fragmentos.anel.numeros - (fragmentos.anel_anterior.numeros if fragmentos.anel_anterior else fragmentos.anel.numeros)
+    linhas = []
+    for numero in sorted(fragmentos.anel.numeros):
+        contagem = executar_query(fragmentos.pools[numero], "SELECT (SELECT COUNT(*) FROM clientes), "
+                                  "(SELECT COUNT(*) FROM veiculos)", fetch_one=True, formato='tupla')
+        linhas.append((numero, *(contagem or (None, None)), numero in entrando))
+    return linhas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Administra os fragmentos do cadastro (FRAGMENTOS_CONFIG).")
+    parser.add_argument("--adicionar", type=int, metavar="NUMERO",
+                        help="Inclui no anel o fragmento configurado com este número e move seus clientes para ele.")
+    parser.add_argument("--rebalancear", action="store_true", help="Move os clientes que estão fora do fragmento certo.")
+    parser.add_argument("--lote", type=int, default=FRAGMENTOS_CONFIG['tamanho_lote_rebalanceamento'],
+                        help="Clientes movidos por transação.")
+    args = parser.parse_args()
+
+    fragmentos_db = criar_fragmentos(tamanho=2)
+    if fragmentos_db is None:
+        sys.exit(1)
+    try:
+        if args.adicionar is not None:
+            try:
+                resultado = adicionar_fragmento(fragmentos_db, args.adicionar, args.lote)
+            except ValueError as err:
+                parser.error(str(err))
+        elif args.rebalancear:
+            resultado = rebalancear(fragmentos_db, args.lote)
+        else:
+            resultado = True
+        for numero, clientes, veiculos, entrando in situacao(fragmentos_db):
+            print(f"Fragmento {numero}: {clientes} cliente(s), {veiculos} veículo(s)" + (" (entrando)" if entrando else ""))
+    finally:
+        fragmentos_db.fechar()
+    if resultado is None:
+        sys.exit(1)
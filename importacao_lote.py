@@ -0,0 +1,237 @@
+# importacao_lote.py
+# Importação em massa de clientes e veículos a partir de arquivos CSV ou JSONL.
+# Os arquivos são lidos como geradores (sem carregar tudo na memória), validados em lotes
+# e inseridos com comandos multi-linha, um commit por lote. Uma linha inválida ou duplicada
+# é registrada no relatório de erros e não interrompe o restante da carga.
+
+import csv
+import json
+import sys
+
+from db_utils import conexao_dedicada
+from log_alteracoes import executar_com_log, inserir_muitos_com_log
+from cliente_crud import consultar_clientes_existentes, consultar_ids_por_cpfs
+from veiculo_crud import consultar_placas_existentes
+from cpf import validar_cpf
+from placas import normalizar_placa
+
+TAMANHO_LOTE_PADRAO = 1000
+
+def ler_registros(caminho):
+    """
+    Lê um arquivo CSV (com cabeçalho) ou JSONL, um registro por vez.
+
+    Args:
+        caminho (str): Caminho do arquivo; a extensão (.csv ou .jsonl) define o formato.
+
+    Yields:
+        tuple: (numero_da_linha, dict) para cada registro do arquivo.
+    """
+    if caminho.lower().endswith(".jsonl"):
+        with open(caminho, encoding="utf-8") as arquivo:
+            for numero, linha in enumerate(arquivo, start=1):
+                if not linha.strip():
+                    continue
+                try:
+                    yield numero, json.loads(linha)
+                except json.JSONDecodeError as e:
+                    yield numero, {"_erro": f"JSON inválido: {e}"}
+    else:
+        with open(caminho, encoding="utf-8", newline="") as arquivo:
+            # A linha 1 é o cabeçalho, então os registros começam na linha 2
+            for numero, registro in enumerate(csv.DictReader(arquivo), start=2):
+                yield numero, registro
+
+def _em_lotes(registros, tamanho_lote):
+    """Agrupa um iterável de registros em listas de até 'tamanho_lote' itens."""
+    lote = []
+    for item in registros:
+        lote.append(item)
+        if len(lote) >= tamanho_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+def _texto(registro, campo):
+    valor = registro.get(campo)
+    return str(valor).strip() if valor is not None else ""
+
+def _normalizar_cpf(cpf):
+    return cpf.replace(".", "").replace("-", "").replace(" ", "")
+
+def _inserir_lote(conexao, query, linhas_validas, relatorio, tabela, posicao_chave, coluna_chave):
+    """
+    Insere um lote já validado em uma única transação, registrando cada linha no log de alterações.
+    Se o lote inteiro falhar (ex.: duplicata inserida por outro terminal durante a carga),
+    as linhas são reenviadas uma a uma para isolar a(s) linha(s) problemática(s).
+    """
+    parametros = [params for _, params in linhas_validas]
+    chaves = [params[posicao_chave] for params in parametros]
+    if inserir_muitos_com_log(conexao, query, parametros, tabela, chaves, coluna_chave) is not None:
+        relatorio['inseridos'] += len(linhas_validas)
+        return
+    for numero, params in linhas_validas:
+        if executar_com_log(conexao, query, params, tabela, 'INSERT', chave=params[posicao_chave]):
+            relatorio['inseridos'] += 1
+        else:
+            relatorio['erros'].append({'linha': numero, 'erro': "Falha ao inserir no banco (registro duplicado ou inválido)."})
+
+def importar_clientes(conexao, registros, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """
+    Importa clientes em massa. Cada registro deve ter 'nome' e 'cpf' ('endereco' e 'telefone' são opcionais).
+
+    Args:
+        conexao: Objeto de conexão com o banco ou PoolConexoes.
+        registros (iterable): Tuplas (numero_da_linha, dict), como as geradas por ler_registros().
+        tamanho_lote (int, optional): Quantidade de linhas por transação. Defaults to TAMANHO_LOTE_PADRAO.
+
+    Returns:
+        dict: Relatório com 'total', 'inseridos' e 'erros' (lista de {'linha', 'erro'}).
+    """
+    relatorio = {'total': 0, 'inseridos': 0, 'erros': []}
+    query = "INSERT INTO clientes (nome, endereco, cpf, telefone) VALUES (%s, %s, %s, %s)"
+    cpfs_vistos = set() # CPFs já aceitos nesta carga, para detectar duplicatas dentro do próprio arquivo
+
+    with conexao_dedicada(conexao) as conexao_carga:
+        for lote in _em_lotes(registros, tamanho_lote):
+            relatorio['total'] += len(lote)
+            candidatos = []
+            for numero, registro in lote:
+                if '_erro' in registro:
+                    relatorio['erros'].append({'linha': numero, 'erro': registro['_erro']})
+                    continue
+                nome = _texto(registro, 'nome')
+                cpf = _normalizar_cpf(_texto(registro, 'cpf'))
+                if not nome:
+                    relatorio['erros'].append({'linha': numero, 'erro': "Nome é obrigatório."})
+                elif not validar_cpf(cpf):
+                    relatorio['erros'].append({'linha': numero, 'erro': f"CPF inválido: '{cpf}'."})
+                elif cpf in cpfs_vistos:
+                    relatorio['erros'].append({'linha': numero, 'erro': f"CPF {cpf} repetido no arquivo."})
+                else:
+                    cpfs_vistos.add(cpf)
+                    candidatos.append((numero, (nome, _texto(registro, 'endereco'), cpf, _texto(registro, 'telefone'))))
+
+            # Uma única consulta por lote para descobrir quais CPFs já estão cadastrados
+            ja_cadastrados = consultar_ids_por_cpfs(conexao_carga, [params[2] for _, params in candidatos])
+            if ja_cadastrados is None:
+                for numero, _ in candidatos:
+                    relatorio['erros'].append({'linha': numero, 'erro': "Falha ao verificar CPFs no banco."})
+                continue
+
+            linhas_validas = []
+            for numero, params in candidatos:
+                if params[2] in ja_cadastrados:
+                    relatorio['erros'].append({'linha': numero, 'erro': f"CPF {params[2]} já cadastrado."})
+                else:
+                    linhas_validas.append((numero, params))
+            _inserir_lote(conexao_carga, query, linhas_validas, relatorio, 'clientes', 2, 'cpf')
+    relatorio['erros'].sort(key=lambda erro: erro['linha'])
+    return relatorio
+
+def importar_veiculos(conexao, registros, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """
+    Importa veículos em massa. Cada registro deve ter 'marca', 'modelo', 'ano', 'placa' e o
+    proprietário, informado por 'cliente_id' ou por 'cpf_cliente'.
+
+    Args:
+        conexao: Objeto de conexão com o banco ou PoolConexoes.
+        registros (iterable): Tuplas (numero_da_linha, dict), como as geradas por ler_registros().
+        tamanho_lote (int, optional): Quantidade de linhas por transação. Defaults to TAMANHO_LOTE_PADRAO.
+
+    Returns:
+        dict: Relatório com 'total', 'inseridos' e 'erros' (lista de {'linha', 'erro'}).
+    """
+    relatorio = {'total': 0, 'inseridos': 0, 'erros': []}
+    query = "INSERT INTO veiculos (marca, modelo, ano, placa, cliente_id) VALUES (%s, %s, %s, %s, %s)"
+    placas_vistas = set()
+
+    with conexao_dedicada(conexao) as conexao_carga:
+        for lote in _em_lotes(registros, tamanho_lote):
+            relatorio['total'] += len(lote)
+            candidatos = [] # (numero, marca, modelo, ano, placa, cliente_id ou None, cpf_cliente ou None)
+            for numero, registro in lote:
+                if '_erro' in registro:
+                    relatorio['erros'].append({'linha': numero, 'erro': registro['_erro']})
+                    continue
+                marca = _texto(registro, 'marca')
+                modelo = _texto(registro, 'modelo')
+                ano_str = _texto(registro, 'ano')
+                placa_lida = _texto(registro, 'placa')
+                placa = normalizar_placa(placa_lida) # Forma canônica: ABC-1234 e ABC1C34 são a mesma placa
+                cliente_id_str = _texto(registro, 'cliente_id')
+                cpf_cliente = _normalizar_cpf(_texto(registro, 'cpf_cliente'))
+
+                if not (marca and modelo):
+                    relatorio['erros'].append({'linha': numero, 'erro': "Marca e modelo são obrigatórios."})
+                elif not (ano_str.isdigit() and len(ano_str) == 4):
+                    relatorio['erros'].append({'linha': numero, 'erro': f"Ano inválido: '{ano_str}'."})
+                elif placa is None:
+                    relatorio['erros'].append({'linha': numero, 'erro': f"Placa inválida: '{placa_lida}'."})
+                elif placa in placas_vistas:
+                    relatorio['erros'].append({'linha': numero, 'erro': f"Placa {placa} repetida no arquivo."})
+                elif cliente_id_str.isdigit():
+                    placas_vistas.add(placa)
+                    candidatos.append((numero, marca, modelo, int(ano_str), placa, int(cliente_id_str), None))
+                elif validar_cpf(cpf_cliente):
+                    placas_vistas.add(placa)
+                    candidatos.append((numero, marca, modelo, int(ano_str), placa, None, cpf_cliente))
+                else:
+                    relatorio['erros'].append({'linha': numero, 'erro': "Informe 'cliente_id' numérico ou 'cpf_cliente' válido."})
+
+            # Verificações em conjunto: proprietários por ID, proprietários por CPF e placas já cadastradas
+            ids_existentes = consultar_clientes_existentes(conexao_carga, [c[5] for c in candidatos if c[5] is not None])
+            ids_por_cpf = consultar_ids_por_cpfs(conexao_carga, [c[6] for c in candidatos if c[6] is not None])
+            placas_cadastradas = consultar_placas_existentes(conexao_carga, [c[4] for c in candidatos])
+            if ids_existentes is None or ids_por_cpf is None or placas_cadastradas is None:
+                for candidato in candidatos:
+                    relatorio['erros'].append({'linha': candidato[0], 'erro': "Falha ao verificar proprietários/placas no banco."})
+                continue
+
+            linhas_validas = []
+            for numero, marca, modelo, ano, placa, cliente_id, cpf_cliente in candidatos:
+                if cpf_cliente is not None:
+                    cliente_id = ids_por_cpf.get(cpf_cliente)
+                    if cliente_id is None:
+                        relatorio['erros'].append({'linha': numero, 'erro': f"Cliente com CPF {cpf_cliente} não encontrado."})
+                        continue
+                elif cliente_id not in ids_existentes:
+                    relatorio['erros'].append({'linha': numero, 'erro': f"Cliente com ID {cliente_id} não encontrado."})
+                    continue
+                if placa in placas_cadastradas:
+                    relatorio['erros'].append({'linha': numero, 'erro': f"Placa {placa} já cadastrada."})
+                    continue
+                linhas_validas.append((numero, (marca, modelo, ano, placa, cliente_id)))
+            _inserir_lote(conexao_carga, query, linhas_validas, relatorio, 'veiculos', 3, 'placa')
+    relatorio['erros'].sort(key=lambda erro: erro['linha'])
+    return relatorio
+
+def exibir_relatorio(relatorio, limite_erros=20):
+    """Mostra o resumo de uma importação e as primeiras linhas com erro."""
+    print("\n--- Resultado da Importação ---")
+    print(f"Registros lidos: {relatorio['total']}, inseridos: {relatorio['inseridos']}, "
+          f"com erro: {len(relatorio['erros'])}")
+    for erro in relatorio['erros'][:limite_erros]:
+        print(f"Linha {erro['linha']}: {erro['erro']}")
+    if len(relatorio['erros']) > limite_erros:
+        print(f"... e mais {len(relatorio['erros']) - limite_erros} erro(s).")
+    print("------------------------")
+
+# Uso: python importacao_lote.py clientes|veiculos arquivo.csv|arquivo.jsonl
+if __name__ == "__main__":
+    from db_utils import criar_pool
+
+    if len(sys.argv) != 3 or sys.argv[1] not in ("clientes", "veiculos"):
+        print("Uso: python importacao_lote.py clientes|veiculos <arquivo.csv|arquivo.jsonl>")
+        sys.exit(2)
+
+    pool_db = criar_pool()
+    if not pool_db:
+        print("Falha ao conectar ao banco de dados.")
+        sys.exit(1)
+    try:
+        importar = importar_clientes if sys.argv[1] == "clientes" else importar_veiculos
+        exibir_relatorio(importar(pool_db, ler_registros(sys.argv[2])))
+    finally:
+        pool_db.fechar()
@@ -0,0 +1,420 @@
+# indice_clientes.py
+# Índice em memória para a busca de clientes por parte do nome, do telefone ou do CPF, sem
+# diferenciar maiúsculas, minúsculas e acentos ("joao" encontra "João", "9876" encontra o telefone).
+# O banco só oferece a busca pelo início do nome (LIKE 'texto%' em idx_nome); uma busca por
+# qualquer trecho varreria a tabela inteira.
+#
+# Como funciona:
+#   - Cada cliente vira um texto normalizado " nome|cpf|telefone|" (sem acentos, minúsculo, só letras,
+#     dígitos e espaços no nome; só dígitos no CPF e no telefone). As linhas ficam ordenadas por
+#     esse texto, ou seja, em ordem alfabética de nome.
+#   - Índice de trigramas: para cada sequência de 3 caracteres (letras/dígitos), a lista ordenada das
+#     linhas que a contêm. Os candidatos de uma busca são a interseção das listas dos trigramas dos
+#     termos; a conferência final (e a relevância) é feita de uma vez com NumPy nos candidatos.
+#   - Termos com menos de 3 caracteres não têm trigramas: sozinhos, buscam apenas o início do nome
+#     (faixa contígua das linhas ordenadas, por busca binária).
+#   - Relevância: 0 = CPF ou telefone exatos, ou nome igual à busca; 1 = nome começa com a busca;
+#     2 = todos os termos começam alguma palavra (ou o CPF/telefone); 3 = termos em qualquer trecho.
+#     Empates ficam em ordem alfabética de nome.
+#   - Como em indice_placas.py, a base carregada do banco é imutável: inclusões e alterações posteriores
+#     ficam em um pequeno dicionário complementar, e exclusões apenas marcam a linha como removida.
+#
+# cliente_crud mantém o índice atualizado a cada escrita feita no processo e, antes de cada busca,
+# aplica as alterações feitas por outros processos (pelo log de alterações).
+
+import re
+import threading
+import unicodedata
+
+try:
+    import numpy as np
+except ImportError: # NumPy só é necessário para usar o índice
+    np = None
+
+from db_config import INDICE_CLIENTES_CONFIG
+from db_utils import executar_query, iterar_query
+
+TAMANHO_TRIGRAMA = 3
+TRIGRAMAS_POR_TERMO = 2          # Listas de trigramas intersectadas por termo (as mais curtas)
+TAMANHO_BLOCO_RELEVANCIA = 4096  # Candidatos conferidos por vez ao procurar inícios de palavra
+TAMANHO_LOTE_CONSTRUCAO = 100000 # Linhas processadas por vez na geração dos trigramas (limita a memória temporária)
+TAMANHO_LOTE_SINCRONIZACAO = 1000
+_NAO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+_NAO_DIGITO = re.compile(r"[^0-9]+")
+
+# Relevâncias (quanto menor, mais relevante)
+EXATO, INICIO_NOME, INICIO_PALAVRA, TRECHO = 0, 1, 2, 3
+
+
+def normalizar_texto(texto):
+    """
+    Normaliza um texto para comparação: sem acentos, minúsculo, só letras, dígitos e espaços simples.
+
+    Args:
+        texto (str): Texto qualquer (ex.: 'João  da Silva-Júnior').
+
+    Returns:
+        str: O texto normalizado (ex.: 'joao da silva junior').
+    """
+    sem_acentos = unicodedata.normalize("NFKD", texto or "").encode("ascii", "ignore").decode("ascii")
+    return _NAO_ALFANUMERICO.sub(" ", sem_acentos.lower()).strip()
+
+def _texto_cliente(nome, cpf, telefone):
+    """Texto indexado de um cliente: ' nome|cpf|telefone|' (bytes ASCII)."""
+    digitos_cpf = _NAO_DIGITO.sub("", cpf or "")
+    digitos_telefone = _NAO_DIGITO.sub("", telefone or "")
+    return f" {normalizar_texto(nome)}|{digitos_cpf}|{digitos_telefone}|".encode("ascii")
+
+def _campos_texto(texto):
+    """Separa um texto indexado em (nome, cpf, telefone) normalizados."""
+    nome, cpf, telefone, _ = texto.decode("ascii").split("|")
+    return nome[1:], cpf, telefone
+
+def _termos(busca):
+    """
+    Termos de uma busca, já normalizados. Uma busca sem letras (ex.: '123.456', '(11) 9876')
+    é um único termo de dígitos, para que a pontuação do CPF ou do telefone não separe o número.
+    """
+    normalizada = normalizar_texto(busca)
+    if normalizada and not any(caractere.isalpha() for caractere in normalizada):
+        return [normalizada.replace(" ", "")]
+    return normalizada.split()
+
+def _trigramas(termo):
+    """Códigos (int) dos trigramas de um termo."""
+    dados = termo.encode("ascii")
+    return [(dados[i] << 16) | (dados[i + 1] << 8) | dados[i + 2] for i in range(len(dados) - TAMANHO_TRIGRAMA + 1)]
+
+def _relevancia(texto, termos, busca):
+    """Relevância de um texto indexado (bytes) que contém todos os termos (mesmas regras de _Base.primeiros)."""
+    if (f"|{busca}|".encode("ascii") in texto) or texto.startswith(f" {busca}|".encode("ascii")):
+        return EXATO
+    if texto.startswith(f" {busca}".encode("ascii")):
+        return INICIO_NOME
+    if all(f" {termo}".encode("ascii") in texto or f"|{termo}".encode("ascii") in texto for termo in termos):
+        return INICIO_PALAVRA
+    return TRECHO
+
+
+class _Base:
+    """Parte imutável do índice: textos ordenados, IDs e listas de linhas por trigrama."""
+
+    def __init__(self, ids, textos):
+        textos = np.array(textos, dtype=bytes) if len(textos) else np.array([], dtype="S1")
+        ordem = np.argsort(textos, kind="stable")
+        self.textos = textos[ordem]          # Textos indexados, em ordem alfabética (de nome)
+        self.ids = ids[ordem]                # ID do cliente de cada linha
+        self.vivas = np.ones(len(self.ids), dtype=bool) # False para clientes alterados ou excluídos depois da carga
+        self.ordem_ids = np.argsort(self.ids, kind="stable")
+        self.ids_ordenados = self.ids[self.ordem_ids]
+
+        validos = np.zeros(256, dtype=bool)
+        validos[np.frombuffer(b"abcdefghijklmnopqrstuvwxyz0123456789", dtype=np.uint8)] = True
+        largura = self.textos.dtype.itemsize
+        pares = [] # Blocos de (trigrama << 32 | linha)
+        for inicio in range(0, len(self.textos), TAMANHO_LOTE_CONSTRUCAO):
+            bloco = self.textos[inicio:inicio + TAMANHO_LOTE_CONSTRUCAO]
+            matriz = bloco.view(np.uint8).reshape(len(bloco), largura)
+            a, b, c = matriz[:, :-2], matriz[:, 1:-1], matriz[:, 2:]
+            codigos = (a.astype(np.int64) << 16) | (b.astype(np.int64) << 8) | c
+            linhas = np.arange(inicio, inicio + len(bloco), dtype=np.int64)[:, None]
+            pares.append((codigos << 32 | linhas)[validos[a] & validos[b] & validos[c]])
+        pares = np.sort(np.concatenate(pares)) if pares else np.empty(0, dtype=np.int64)
+        # Ordenados, os pares repetidos (trigrama repetido na mesma linha) ficam vizinhos
+        pares = pares[np.concatenate(([True], pares[1:] != pares[:-1]))] if len(pares) else pares
+        codigos = (pares >> 32).astype(np.int32)
+        self.linhas = (pares & 0xFFFFFFFF).astype(np.int32) # Linhas agrupadas por trigrama, crescentes em cada grupo
+        novos = np.flatnonzero(np.concatenate(([True], codigos[1:] != codigos[:-1])))[:len(codigos)]
+        self.trigramas = codigos[novos]
+        self.inicios = novos
+        self.fins = np.append(novos[1:], len(self.linhas))
+
+    def linha_do_id(self, cliente_id):
+        """Linha viva do cliente, ou None."""
+        posicao = int(np.searchsorted(self.ids_ordenados, cliente_id))
+        if posicao < len(self.ids_ordenados) and self.ids_ordenados[posicao] == cliente_id:
+            linha = int(self.ordem_ids[posicao])
+            if self.vivas[linha]:
+                return linha
+        return None
+
+    def faixa(self, prefixo):
+        """Intervalo [inicio, fim) das linhas cujo texto começa com 'prefixo' (bytes): busca binária nos textos ordenados."""
+        if len(prefixo) > self.textos.dtype.itemsize:
+            return 0, 0 # Mais longo que qualquer texto indexado
+        seguinte = prefixo[:-1] + bytes([prefixo[-1] + 1]) # Menor texto maior que todos os que começam com o prefixo
+        limites = np.array([prefixo, seguinte], dtype=self.textos.dtype) # Mesmo tipo: evita converter o vetor inteiro
+        inicio, fim = self.textos.searchsorted(limites)
+        return int(inicio), int(fim)
+
+    def candidatos(self, termos):
+        """
+        Linhas vivas que contêm todos os termos, em ordem alfabética.
+        Sem termo de 3 ou mais caracteres, retorna as linhas cujo nome começa com a busca.
+        """
+        listas = []
+        for termo in termos:
+            do_termo = []
+            for codigo in _trigramas(termo):
+                posicao = int(self.trigramas.searchsorted(np.int32(codigo)))
+                if posicao == len(self.trigramas) or self.trigramas[posicao] != codigo:
+                    return np.empty(0, dtype=np.int32) # Trigrama inexistente: nenhum cliente contém o termo
+                do_termo.append(self.linhas[self.inicios[posicao]:self.fins[posicao]])
+            # As listas mais curtas do termo já filtram quase tudo; a conferência do termo inteiro faz o resto
+            listas.extend(sorted(do_termo, key=len)[:TRIGRAMAS_POR_TERMO])
+        if not listas:
+            inicio, fim = self.faixa(f" {' '.join(termos)}".encode("ascii"))
+            linhas = np.arange(inicio, fim, dtype=np.int32)
+            return linhas[self.vivas[linhas]]
+
+        listas.sort(key=len)
+        linhas = listas[0]
+        for lista in listas[1:]:
+            if not len(linhas):
+                break
+            # Listas ordenadas: busca binária das poucas linhas restantes na lista maior
+            posicoes = np.minimum(lista.searchsorted(linhas), len(lista) - 1)
+            linhas = linhas[lista[posicoes] == linhas]
+        linhas = linhas[self.vivas[linhas]]
+        # Termos longos podem ter os trigramas em posições diferentes, e os curtos não têm trigrama:
+        # só o termo de exatamente 3 caracteres está garantido pelas listas; os demais são conferidos inteiros
+        conferir = [termo for termo in termos if len(termo) != TAMANHO_TRIGRAMA]
+        if conferir and len(linhas):
+            textos = self.textos[linhas]
+            contem = np.ones(len(linhas), dtype=bool)
+            for termo in conferir:
+                contem &= np.char.find(textos, termo.encode("ascii")) >= 0
+            linhas = linhas[contem]
+        return linhas
+
+    def primeiros(self, linhas, termos, busca, quantidade):
+        """
+        Os 'quantidade' primeiros candidatos em ordem de relevância (ver _relevancia) e, nos empates, alfabética.
+        Nome igual e início do nome são faixas das linhas ordenadas; os inícios de palavra só são
+        procurados (em blocos) enquanto faltarem resultados para completar a página.
+
+        Returns:
+            list: Tuplas (relevancia, linha).
+        """
+        inicio, fim = self.faixa(f" {busca}|".encode("ascii"))
+        exatos = (linhas >= inicio) & (linhas < fim)
+        if busca.isdigit() and len(linhas): # CPF ou telefone completos
+            exatos |= np.char.find(self.textos[linhas], f"|{busca}|".encode("ascii")) >= 0
+        inicio, fim = self.faixa(f" {busca}".encode("ascii"))
+        inicio_nome = (linhas >= inicio) & (linhas < fim) & ~exatos
+        resultado = [(EXATO, linha) for linha in linhas[exatos][:quantidade].tolist()]
+        resultado += [(INICIO_NOME, linha) for linha in linhas[inicio_nome][:quantidade - len(resultado)].tolist()]
+
+        restantes = linhas[~(exatos | inicio_nome)]
+        trechos = []
+        for bloco in range(0, len(restantes), TAMANHO_BLOCO_RELEVANCIA):
+            if len(resultado) >= quantidade:
+                break
+            parte = restantes[bloco:bloco + TAMANHO_BLOCO_RELEVANCIA]
+            textos = self.textos[parte]
+            palavras = np.ones(len(parte), dtype=bool)
+            for termo in termos:
+                inicio_palavra = np.char.find(textos, f" {termo}".encode("ascii")) >= 0
+                if termo.isdigit(): # Só dígitos vêm depois de '|' (CPF e telefone)
+                    inicio_palavra |= np.char.find(textos, f"|{termo}".encode("ascii")) >= 0
+                palavras &= inicio_palavra
+            resultado += [(INICIO_PALAVRA, linha) for linha in parte[palavras][:quantidade - len(resultado)].tolist()]
+            if len(trechos) < quantidade:
+                trechos += parte[~palavras][:quantidade - len(trechos)].tolist()
+        else:
+            # Todos os candidatos conferidos: os trechos completam a página
+            resultado += [(TRECHO, linha) for linha in trechos[:quantidade - len(resultado)]]
+        return resultado
+
+
+class IndiceClientes:
+    """
+    Índice de busca de clientes por trechos de nome, telefone e CPF.
+
+    Args:
+        limite_alteracoes (int, optional): Inclusões e alterações guardadas no dicionário complementar
+            antes de o índice ser recompactado. Defaults to INDICE_CLIENTES_CONFIG['limite_alteracoes'].
+    """
+
+    def __init__(self, limite_alteracoes=None):
+        self.limite_alteracoes = limite_alteracoes or INDICE_CLIENTES_CONFIG['limite_alteracoes']
+        self._lock = threading.Lock()
+        self._base = None
+        self._alterados = {} # cliente_id -> texto indexado, para clientes incluídos ou alterados depois da carga
+        self.ultimo_log_id = 0
+
+    @property
+    def carregado(self):
+        return self._base is not None
+
+    def __len__(self):
+        base = self._base
+        return 0 if base is None else int(base.vivas.sum()) + len(self._alterados)
+
+    def construir(self, clientes):
+        """
+        Monta o índice a partir de tuplas (id, nome, cpf, telefone).
+
+        Returns:
+            int: Quantidade de clientes indexados.
+        """
+        if np is None:
+            raise ImportError("A busca de clientes requer NumPy (pip install numpy).")
+        ids, textos = [], []
+        for cliente_id, nome, cpf, telefone in clientes:
+            ids.append(cliente_id)
+            textos.append(_texto_cliente(nome, cpf, telefone))
+        base = _Base(np.array(ids, dtype=np.int64), textos)
+        with self._lock:
+            self._base = base
+            self._alterados.clear()
+        return len(ids)
+
+    def carregar(self, conexao):
+        """
+        Carrega (ou recarrega) todos os clientes e marca a posição atual do log de alterações.
+
+        Args:
+            conexao: Objeto de conexão com o banco ou PoolConexoes.
+
+        Returns:
+            int or None: Quantidade de clientes indexados, ou None em caso de erro.
+        """
+        # A posição do log é lida antes da carga: alterações feitas durante a carga serão reaplicadas depois
+        ultimo = executar_query(conexao, "SELECT COALESCE(MAX(id), 0) AS ultimo FROM log_alteracoes", fetch_one=True)
+        if ultimo is None:
+            return None
+        clientes = iterar_query(conexao, "SELECT id, nome, cpf, telefone FROM clientes", tamanho_lote=5000, formato='tupla')
+        total = self.construir(clientes)
+        self.ultimo_log_id = ultimo['ultimo']
+        return total
+
+    def adicionar(self, cliente_id, nome, cpf, telefone):
+        """Inclui (ou substitui) um cliente (chamado por cliente_crud após cada inclusão)."""
+        if self._base is None:
+            return
+        texto = _texto_cliente(nome, cpf, telefone)
+        with self._lock:
+            linha = self._base.linha_do_id(cliente_id)
+            if linha is not None:
+                if self._base.textos[linha] == texto:
+                    return
+                self._base.vivas[linha] = False
+            self._alterados[cliente_id] = texto
+            if len(self._alterados) > self.limite_alteracoes:
+                self._compactar()
+
+    def atualizar(self, cliente_id, nome=None, telefone=None):
+        """Aplica a alteração de nome e/ou telefone de um cliente (chamado por cliente_crud após cada atualização)."""
+        if self._base is None:
+            return
+        with self._lock:
+            texto = self._alterados.get(cliente_id)
+            if texto is None:
+                linha = self._base.linha_do_id(cliente_id)
+                if linha is None:
+                    return
+                texto = bytes(self._base.textos[linha])
+        nome_atual, cpf, telefone_atual = _campos_texto(texto)
+        # Campos em branco não são alterados (como em cliente_crud.atualizar_cliente)
+        self.adicionar(cliente_id, nome if nome and nome.strip() else nome_atual, cpf,
+                       telefone if telefone and telefone.strip() else telefone_atual)
+
+    def remover(self, cliente_id):
+        """Retira um cliente excluído (chamado por cliente_crud após cada exclusão)."""
+        if self._base is None:
+            return
+        with self._lock:
+            self._alterados.pop(cliente_id, None)
+            linha = self._base.linha_do_id(cliente_id)
+            if linha is not None:
+                self._base.vivas[linha] = False
+
+    def _compactar(self):
+        """Gera uma nova base com as linhas vivas e as alteradas (chamado com o lock adquirido)."""
+        base = self._base
+        ids = np.concatenate([base.ids[base.vivas], np.array(list(self._alterados), dtype=np.int64)])
+        textos = [bytes(texto) for texto in base.textos[base.vivas]] + list(self._alterados.values())
+        self._base = _Base(ids, textos)
+        self._alterados.clear()
+
+    def buscar(self, busca, pagina=1, limite=20):
+        """
+        Busca clientes por trechos do nome, do telefone ou do CPF.
+
+        Args:
+            busca (str): Texto buscado (ex.: 'joao silv', '9876', '123.456').
+            pagina (int, optional): Página do resultado, a partir de 1. Defaults to 1.
+            limite (int, optional): Clientes por página. Defaults to 20.
+
+        Returns:
+            tuple: (lista de (cliente_id, relevancia) da página, total de clientes encontrados).
+            Lista vazia se o índice não está carregado ou a busca não tem letras nem dígitos.
+        """
+        base = self._base
+        termos = _termos(busca)
+        if base is None or not termos:
+            return [], 0
+        texto_busca = " ".join(termos)
+        fim = max(pagina, 1) * limite
+        linhas = base.candidatos(termos)
+
+        termos_bytes = [termo.encode("ascii") for termo in termos]
+        with self._lock:
+            extras = [(_relevancia(texto, termos, texto_busca), texto, cliente_id)
+                      for cliente_id, texto in self._alterados.items()
+                      if all(termo in texto for termo in termos_bytes)
+                      and (any(len(termo) >= TAMANHO_TRIGRAMA for termo in termos)
+                           or texto.startswith(f" {texto_busca}".encode("ascii")))]
+        principais = [(relevancia, bytes(base.textos[linha]), int(base.ids[linha]))
+                      for relevancia, linha in base.primeiros(linhas, termos, texto_busca, fim)]
+        resultado = sorted(principais + extras)[fim - limite:fim]
+        return [(cliente_id, relevancia) for relevancia, _, cliente_id in resultado], len(linhas) + len(extras)
+
+    def sincronizar(self, conexao):
+        """
+        Aplica as alterações de clientes feitas por outros processos, lendo o log de alterações
+        a partir da última entrada aplicada; os clientes alterados são relidos do banco.
+
+        Returns:
+            int or None: Entradas de 'clientes' aplicadas, ou None em caso de erro.
+        """
+        if self._base is None:
+            return 0
+        aplicadas = 0
+        while True:
+            entradas = executar_query(
+                conexao,
+                "SELECT id, tabela, registro_id, chave, operacao FROM log_alteracoes WHERE id > %s ORDER BY id LIMIT %s",
+                (self.ultimo_log_id, TAMANHO_LOTE_SINCRONIZACAO), fetch_all=True)
+            if entradas is None:
+                return None
+            if not entradas:
+                return aplicadas
+            ultimo_id = entradas[-1]['id']
+            entradas = [entrada for entrada in entradas if entrada['tabela'] == 'clientes']
+            ids = {entrada['registro_id'] for entrada in entradas if entrada['registro_id'] is not None}
+            cpfs = {entrada['chave'] for entrada in entradas if entrada['registro_id'] is None and entrada['chave']}
+            if ids or cpfs:
+                # Estado atual de cada cliente citado: os que não voltam foram excluídos
+                condicoes, params = [], []
+                if ids:
+                    condicoes.append(f"id IN ({', '.join(['%s'] * len(ids))})")
+                    params.extend(ids)
+                if cpfs:
+                    condicoes.append(f"cpf IN ({', '.join(['%s'] * len(cpfs))})")
+                    params.extend(cpfs)
+                atuais = executar_query(conexao, f"SELECT id, nome, cpf, telefone FROM clientes WHERE {' OR '.join(condicoes)}",
+                                        tuple(params), fetch_all=True)
+                if atuais is None:
+                    return None
+                for cliente in atuais:
+                    self.adicionar(cliente['id'], cliente['nome'], cliente['cpf'], cliente['telefone'])
+                for cliente_id in ids - {cliente['id'] for cliente in atuais}:
+                    self.remover(cliente_id)
+                aplicadas += len(entradas)
+            self.ultimo_log_id = ultimo_id
+
+
+# Índice usado por cliente_crud.buscar_clientes
+indice_clientes = IndiceClientes()
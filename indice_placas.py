@@ -0,0 +1,373 @@
+# indice_placas.py
+# Índice em memória para busca aproximada de placas lidas por câmera (LPR).
+# O OCR confunde caracteres parecidos (O/0/D/Q, I/1/L, B/8, S/5, Z/2, G/6), e a consulta exata
+# por placa não encontra o veículo. O índice devolve as placas cadastradas que diferem da leitura
+# em até 2 posições, sem contar as trocas entre caracteres confundíveis, ordenadas da mais provável
+# para a menos provável.
+#
+# Como funciona:
+#   - Cada placa (forma canônica, 7 caracteres) vira um "esqueleto": cada caractere é trocado pelo
+#     representante de sua classe de confusão. Trocas dentro da mesma classe não contam como erro.
+#   - Princípio da casa dos pombos: o esqueleto é dividido em 3 partes; com no máximo 2 posições
+#     erradas, ao menos uma parte está intacta. Cada parte tem um vetor de chaves ordenado, e os
+#     candidatos são as placas com alguma parte igual à da leitura (três buscas binárias).
+#   - Para cada parte, os esqueletos (7 bytes empacotados em um inteiro de 64 bits) ficam ordenados
+#     pela chave; os candidatos de uma busca são uma fatia contígua, conferida de uma vez com NumPy
+#     (XOR com a leitura e contagem dos bytes diferentes).
+#   - A base carregada do banco é imutável; inclusões feitas depois ficam em um pequeno índice
+#     complementar (dicionários com as mesmas chaves) e exclusões apenas marcam a linha como removida.
+#     Quando as inclusões passam de 'limite_alteracoes', tudo é recompactado em uma nova base.
+#
+# veiculo_crud mantém o índice atualizado a cada inclusão e exclusão feita no processo, e
+# sincronizar() aplica as alterações feitas por outros processos (pelo log de alterações).
+# Veículos apagados em cascata com o cliente só saem do índice na próxima carga; por isso os
+# candidatos são sempre confirmados no banco (ver veiculo_crud.consultar_veiculos_por_placa_aproximada).
+
+import itertools
+import threading
+
+try:
+    import numpy as np
+except ImportError: # NumPy só é necessário para usar o índice
+    np = None
+
+from db_config import INDICE_PLACAS_CONFIG
+from db_utils import executar_query, iterar_query
+from placas import DIGITOS, LETRAS, normalizar_placa
+
+# Caracteres que o OCR costuma confundir; o primeiro de cada grupo é o representante da classe
+CLASSES_CONFUSAO = ("O0DQ", "I1L", "B8", "S5", "Z2", "G6")
+_ESQUELETO = bytes.maketrans(
+    "".join(classe[1:] for classe in CLASSES_CONFUSAO).encode("ascii"),
+    "".join(classe[0] * (len(classe) - 1) for classe in CLASSES_CONFUSAO).encode("ascii"))
+_LIMPEZA = bytes.maketrans(LETRAS.lower().encode("ascii"), LETRAS.encode("ascii"))
+_DIGITO_PARA_LETRA = bytes.maketrans(DIGITOS.encode("ascii"), LETRAS[:10].encode("ascii"))
+# Partes do esqueleto usadas como chave (posições); com até 2 erros, ao menos uma fica intacta
+PARTES = ((0, 1), (2, 4), (3, 5, 6))
+DISTANCIA_MAXIMA = len(PARTES) - 1
+TAMANHO_PLACA = 7
+TAMANHO_LOTE_SINCRONIZACAO = 1000
+
+
+def _chave(esqueleto, parte):
+    """Chave (bytes) de uma parte do esqueleto, usada no índice complementar."""
+    return bytes(esqueleto[posicao] for posicao in parte)
+
+def _leitura_para_bytes(placa_lida):
+    """
+    Prepara a leitura da câmera para a comparação: maiúsculas, sem separadores e com o quinto caractere
+    convertido para letra quando vier no padrão antigo (como na forma canônica). Não exige que a
+    leitura seja uma placa válida, porque justamente pode ter caracteres trocados.
+
+    Returns:
+        bytes or None: Os 7 caracteres, ou None se a leitura não tem o tamanho de uma placa.
+    """
+    try:
+        leitura = placa_lida.encode("ascii").translate(_LIMPEZA, b"- .")
+    except (AttributeError, UnicodeEncodeError):
+        return None
+    if len(leitura) != TAMANHO_PLACA:
+        return None
+    return leitura[:4] + leitura[4:5].translate(_DIGITO_PARA_LETRA) + leitura[5:]
+
+
+# Máscaras para contar, em um inteiro de 8 bytes, quantos bytes são diferentes de zero (SWAR)
+_SETE_BITS = np.uint64(0x7F7F7F7F7F7F7F7F) if np is not None else None
+_BIT_ALTO = np.uint64(0x8080808080808080) if np is not None else None
+
+
+def _empacotar(esqueletos):
+    """Converte esqueletos (bytes de 7, concatenados) em um inteiro de 64 bits por placa."""
+    quantidade = len(esqueletos) // TAMANHO_PLACA
+    matriz = np.zeros((quantidade, 8), dtype=np.uint8)
+    matriz[:, :TAMANHO_PLACA] = np.frombuffer(esqueletos, dtype=np.uint8).reshape(-1, TAMANHO_PLACA)
+    return matriz.view(np.uint64).ravel()
+
+def _bytes_diferentes(a, b):
+    """Quantidade de posições diferentes entre cada esqueleto empacotado de 'a' e o esqueleto 'b'."""
+    x = a ^ b
+    marcados = (((x & _SETE_BITS) + _SETE_BITS) | x) & _BIT_ALTO # Bit alto de cada byte não nulo
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(marcados)
+    return (marcados.view(np.uint8).reshape(-1, 8) != 0).sum(axis=1)
+
+
+class _Base:
+    """Parte imutável do índice: placas ordenadas, esqueletos e, por parte, os esqueletos ordenados pela chave."""
+
+    def __init__(self, placas, ids):
+        ordem = np.argsort(placas, kind="stable")
+        self.placas = placas[ordem]            # Placas canônicas (bytes de 7), em ordem alfabética
+        self.ids = ids[ordem]                  # ID do veículo de cada placa (-1 se desconhecido)
+        self.vivas = np.ones(len(self.placas), dtype=bool) # False para placas excluídas depois da carga
+        self.ordem_ids = np.argsort(self.ids, kind="stable")
+        self.ids_ordenados = self.ids[self.ordem_ids]
+        esqueletos = self.placas.tobytes().translate(_ESQUELETO)
+        matriz = np.frombuffer(esqueletos, dtype=np.uint8).reshape(-1, TAMANHO_PLACA)
+        empacotados = _empacotar(esqueletos)
+        # Por parte: (chaves ordenadas, esqueletos na mesma ordem, linha de cada um). Os candidatos de
+        # uma chave ficam contíguos, e a conferência lê uma fatia, sem copiar linhas espalhadas.
+        self.particoes = []
+        for parte in PARTES:
+            chaves = np.zeros(len(self.placas), dtype=np.int32)
+            for posicao in parte:
+                chaves = chaves * 256 + matriz[:, posicao]
+            ordem_chaves = np.argsort(chaves, kind="stable").astype(np.int32)
+            self.particoes.append((chaves[ordem_chaves], empacotados[ordem_chaves], ordem_chaves))
+
+    def contem(self, placa):
+        """Retorna a linha da placa (bytes) se ela está na base e não foi excluída, ou None."""
+        linha = int(np.searchsorted(self.placas, placa))
+        if linha < len(self.placas) and self.placas[linha] == placa and self.vivas[linha]:
+            return linha
+        return None
+
+    def candidatos(self, esqueleto, distancia_maxima):
+        """Linhas vivas cujo esqueleto difere do informado em até 'distancia_maxima' posições."""
+        if not len(self.placas):
+            return np.empty(0, dtype=np.int32)
+        alvo = _empacotar(esqueleto)[0]
+        pedacos = []
+        for parte, (chaves_ordenadas, esqueletos, linhas) in zip(PARTES, self.particoes):
+            chave = 0
+            for posicao in parte:
+                chave = chave * 256 + esqueleto[posicao]
+            chave = np.int32(chave) # Mesmo tipo do vetor: evita que a busca converta o vetor inteiro
+            inicio = chaves_ordenadas.searchsorted(chave, "left")
+            fim = chaves_ordenadas.searchsorted(chave, "right")
+            erros = _bytes_diferentes(esqueletos[inicio:fim], alvo)
+            pedacos.append(linhas[inicio:fim][erros <= distancia_maxima])
+        encontradas = np.unique(np.concatenate(pedacos))
+        return encontradas[self.vivas[encontradas]]
+
+
+class IndicePlacasAproximado:
+    """
+    Índice de busca aproximada sobre todas as placas de 'veiculos'. Fica inativo (e as chamadas de
+    atualização não fazem nada) até carregar() ser chamado.
+    """
+
+    def __init__(self, limite_alteracoes=None):
+        self.limite_alteracoes = limite_alteracoes or INDICE_PLACAS_CONFIG['limite_alteracoes']
+        self._lock = threading.Lock()
+        self._base = None
+        self._incluidas = {}        # placa (bytes) -> veiculo_id (ou None), incluídas depois da carga
+        self._incluidas_por_id = {} # veiculo_id -> placa (bytes)
+        self._baldes = {}           # (parte, chave) -> {placa, ...} das placas incluídas
+        self.ultimo_log_id = 0
+
+    @property
+    def carregado(self):
+        return self._base is not None
+
+    def __len__(self):
+        base = self._base
+        return 0 if base is None else int(base.vivas.sum()) + len(self._incluidas)
+
+    def construir(self, placas, ids=None):
+        """
+        Monta o índice a partir de uma lista de placas (em qualquer formato; as inválidas são ignoradas).
+
+        Args:
+            placas (iterable): Placas cadastradas.
+            ids (iterable, optional): ID do veículo de cada placa, na mesma ordem. Defaults to None.
+
+        Returns:
+            int: Quantidade de placas indexadas.
+        """
+        if np is None:
+            raise ImportError("A busca aproximada de placas requer NumPy (pip install numpy).")
+        canonicas, lista_ids = [], []
+        for placa, veiculo_id in zip(placas, ids if ids is not None else itertools.repeat(None)):
+            canonica = normalizar_placa(placa)
+            if canonica is not None:
+                canonicas.append(canonica.encode("ascii"))
+                lista_ids.append(-1 if veiculo_id is None else veiculo_id)
+        base = _Base(np.array(canonicas, dtype=f"S{TAMANHO_PLACA}"), np.array(lista_ids, dtype=np.int64))
+        with self._lock:
+            self._base = base
+            self._incluidas.clear()
+            self._incluidas_por_id.clear()
+            self._baldes.clear()
+        return len(canonicas)
+
+    def carregar(self, conexao):
+        """
+        Carrega (ou recarrega) todas as placas de 'veiculos' e marca a posição atual do log de alterações.
+
+        Args:
+            conexao: Objeto de conexão com o banco ou PoolConexoes.
+
+        Returns:
+            int or None: Quantidade de placas indexadas, ou None em caso de erro.
+        """
+        # A posição do log é lida antes da carga: alterações feitas durante a carga serão reaplicadas depois
+        ultimo = executar_query(conexao, "SELECT COALESCE(MAX(id), 0) AS ultimo FROM log_alteracoes", fetch_one=True)
+        if ultimo is None:
+            return None
+        placas, ids = [], []
+        for veiculo_id, placa in iterar_query(conexao, "SELECT id, placa FROM veiculos ORDER BY id",
+                                              tamanho_lote=5000, formato='tupla'):
+            ids.append(veiculo_id)
+            placas.append(placa)
+        total = self.construir(placas, ids)
+        self.ultimo_log_id = ultimo['ultimo']
+        return total
+
+    def adicionar(self, placa, veiculo_id=None):
+        """Inclui uma placa cadastrada (chamado por veiculo_crud após cada inclusão)."""
+        if self._base is None:
+            return
+        canonica = normalizar_placa(placa)
+        if canonica is None:
+            return
+        canonica = canonica.encode("ascii")
+        with self._lock:
+            linha = self._base.contem(canonica)
+            if linha is not None:
+                if veiculo_id is None or self._base.ids[linha] == veiculo_id:
+                    return
+                # Linha de um veículo excluído sem passar por remover() (ex.: em cascata): o novo cadastro a substitui
+                self._base.vivas[linha] = False
+            if veiculo_id is not None:
+                self._incluidas_por_id[veiculo_id] = canonica
+            if canonica not in self._incluidas:
+                esqueleto = canonica.translate(_ESQUELETO)
+                for indice, parte in enumerate(PARTES):
+                    self._baldes.setdefault((indice, _chave(esqueleto, parte)), set()).add(canonica)
+            self._incluidas[canonica] = veiculo_id
+            if len(self._incluidas) > self.limite_alteracoes:
+                self._compactar()
+
+    def remover(self, veiculo_id):
+        """Retira a placa de um veículo excluído (chamado por veiculo_crud após cada exclusão)."""
+        base = self._base
+        if base is None:
+            return
+        with self._lock:
+            canonica = self._incluidas_por_id.pop(veiculo_id, None)
+            if canonica is not None:
+                del self._incluidas[canonica]
+                esqueleto = canonica.translate(_ESQUELETO)
+                for indice, parte in enumerate(PARTES):
+                    self._baldes[(indice, _chave(esqueleto, parte))].discard(canonica)
+                return
+            posicao = int(np.searchsorted(base.ids_ordenados, veiculo_id))
+            if posicao < len(base.ids_ordenados) and base.ids_ordenados[posicao] == veiculo_id:
+                base.vivas[base.ordem_ids[posicao]] = False
+
+    def _compactar(self):
+        """Gera uma nova base com as placas vivas e as incluídas (chamado com o lock adquirido)."""
+        base = self._base
+        placas = np.concatenate([base.placas[base.vivas],
+                                 np.array(list(self._incluidas), dtype=f"S{TAMANHO_PLACA}")])
+        ids = np.concatenate([base.ids[base.vivas],
+                              np.array([-1 if i is None else i for i in self._incluidas.values()], dtype=np.int64)])
+        self._base = _Base(placas, ids)
+        self._incluidas.clear()
+        self._incluidas_por_id.clear()
+        self._baldes.clear()
+
+    def buscar(self, placa_lida, distancia_maxima=None, limite=None):
+        """
+        Busca as placas cadastradas parecidas com a leitura da câmera.
+
+        Args:
+            placa_lida (str): Placa como lida pelo OCR (ex.: 'AB81O23').
+            distancia_maxima (int, optional): Posições erradas aceitas, fora as trocas entre caracteres
+                confundíveis (no máximo 2). Defaults to INDICE_PLACAS_CONFIG['distancia_maxima'].
+            limite (int, optional): Quantidade máxima de candidatos. Defaults to INDICE_PLACAS_CONFIG['limite_candidatos'].
+
+        Returns:
+            list: Dicionários {'placa', 'veiculo_id', 'distancia', 'diferencas'}, do mais provável ao menos
+            provável; 'distancia' conta as posições erradas e 'diferencas' todos os caracteres diferentes
+            (inclusive as trocas confundíveis). Lista vazia se o índice não está carregado.
+        """
+        base = self._base
+        leitura = _leitura_para_bytes(placa_lida)
+        if base is None or leitura is None:
+            return []
+        if distancia_maxima is None:
+            distancia_maxima = INDICE_PLACAS_CONFIG['distancia_maxima']
+        distancia_maxima = min(distancia_maxima, DISTANCIA_MAXIMA)
+        esqueleto = leitura.translate(_ESQUELETO)
+
+        encontradas = {}
+        for linha in base.candidatos(esqueleto, distancia_maxima):
+            encontradas[bytes(base.placas[linha])] = int(base.ids[linha])
+        with self._lock:
+            for indice, parte in enumerate(PARTES):
+                for placa in self._baldes.get((indice, _chave(esqueleto, parte)), ()):
+                    encontradas[placa] = self._incluidas[placa]
+
+        resultado = []
+        for placa, veiculo_id in encontradas.items():
+            distancia = sum(a != b for a, b in zip(placa.translate(_ESQUELETO), esqueleto))
+            if distancia <= distancia_maxima:
+                resultado.append({
+                    'placa': placa.decode("ascii"),
+                    'veiculo_id': None if veiculo_id in (None, -1) else veiculo_id,
+                    'distancia': distancia,
+                    'diferencas': sum(a != b for a, b in zip(placa, leitura)),
+                })
+        resultado.sort(key=lambda candidato: (candidato['distancia'], candidato['diferencas'], candidato['placa']))
+        return resultado[:limite or INDICE_PLACAS_CONFIG['limite_candidatos']]
+
+    def sincronizar(self, conexao):
+        """
+        Aplica as inclusões e exclusões de veículos feitas por outros processos, lendo o log de alterações
+        a partir da última entrada aplicada.
+
+        Returns:
+            int or None: Entradas de 'veiculos' aplicadas, ou None em caso de erro.
+        """
+        if self._base is None:
+            return 0
+        aplicadas = 0
+        while True:
+            entradas = executar_query(
+                conexao,
+                "SELECT id, tabela, registro_id, chave, operacao FROM log_alteracoes WHERE id > %s ORDER BY id LIMIT %s",
+                (self.ultimo_log_id, TAMANHO_LOTE_SINCRONIZACAO), fetch_all=True)
+            if entradas is None:
+                return None
+            if not entradas:
+                return aplicadas
+            for entrada in entradas:
+                if entrada['tabela'] != 'veiculos':
+                    continue
+                if entrada['operacao'] in ('DELETE', 'UPDATE') and entrada['registro_id'] is not None:
+                    # UPDATE só muda a placa quando traz a chave (ex.: migração para a forma canônica)
+                    if entrada['operacao'] == 'DELETE' or entrada['chave']:
+                        self.remover(entrada['registro_id'])
+                if entrada['operacao'] in ('INSERT', 'UPDATE') and entrada['chave']:
+                    self.adicionar(entrada['chave'], entrada['registro_id'])
+                aplicadas += 1
+            self.ultimo_log_id = entradas[-1]['id']
+
+
+# Índice usado por veiculo_crud e pelo serviço da portaria
+indice_placas = IndicePlacasAproximado()
+
+def iniciar_sincronizacao(conexao, intervalo=None, indice=None):
+    """
+    Inicia uma thread (daemon) que aplica ao índice, periodicamente, as alterações feitas por outros processos.
+
+    Args:
+        conexao: PoolConexoes (a thread usa o pool junto com as demais).
+        intervalo (float, optional): Segundos entre sincronizações. Defaults to INDICE_PLACAS_CONFIG['intervalo_sincronizacao'].
+        indice (IndicePlacasAproximado, optional): Índice a sincronizar. Defaults to indice_placas.
+
+    Returns:
+        threading.Event: Sinalize (set()) para encerrar a thread.
+    """
+    indice = indice or indice_placas
+    intervalo = intervalo or INDICE_PLACAS_CONFIG['intervalo_sincronizacao']
+    parar = threading.Event()
+
+    def sincronizar_periodicamente():
+        while not parar.wait(intervalo):
+            indice.sincronizar(conexao)
+
+    threading.Thread(target=sincronizar_periodicamente, name="sincronizacao_indice_placas", daemon=True).start()
+    return parar
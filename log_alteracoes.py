@@ -0,0 +1,147 @@
+# log_alteracoes.py
+# Registro das alterações feitas em 'clientes' e 'veiculos' na tabela 'log_alteracoes'.
+# Cada escrita do CRUD grava sua entrada no log na mesma transação da alteração,
+# para que as réplicas das cabines (replica_local.py) possam buscar só o que mudou.
+
+from datetime import datetime
+
+from db_utils import conexao_dedicada, desfazer, executar_muitos, executar_query, registrar_comando
+
+REGISTRAR_ALTERACAO = registrar_comando(
+    "INSERT INTO log_alteracoes (tabela, registro_id, chave, operacao, momento) VALUES (%s, %s, %s, %s, %s)")
+TAMANHO_BLOCO_IDS = 500 # Chaves por consulta (WHERE ... IN) ao ler os IDs de um lote inserido
+
+def executar_com_log(conexao, query, params, tabela, operacao, registro_id=None, chave=None):
+    """
+    Executa uma escrita (INSERT, UPDATE ou DELETE) e registra a alteração no log, com um único commit.
+    Se qualquer um dos dois comandos falhar, nada é gravado.
+
+    Args:
+        conexao: Objeto de conexão com o banco ou PoolConexoes.
+        query (str or ComandoSQL): O comando de escrita.
+        params (tuple): Parâmetros do comando.
+        tabela (str): 'clientes' ou 'veiculos'.
+        operacao (str): 'INSERT', 'UPDATE' ou 'DELETE'.
+        registro_id (int, optional): ID do registro alterado; para INSERT é obtido do lastrowid. Defaults to None.
+        chave (str, optional): Chave natural do registro (CPF ou placa), quando conhecida. Defaults to None.
+
+    Returns:
+        int or None: O mesmo retorno de executar_query (ID inserido ou linhas afetadas), ou None em caso de erro.
+    """
+    with conexao_dedicada(conexao) as conexao_escrita:
+        if conexao_escrita is None:
+            return None
+        resultado = executar_query(conexao_escrita, query, params)
+        if resultado is None:
+            desfazer(conexao_escrita)
+            return None
+        if operacao == 'INSERT':
+            registro_id = resultado
+        elif resultado == 0:
+            # Nenhuma linha alterada: não há o que registrar
+            desfazer(conexao_escrita)
+            return 0
+        params_log = (tabela, registro_id, chave, operacao, datetime.now().replace(microsecond=0))
+        if executar_query(conexao_escrita, REGISTRAR_ALTERACAO, params_log, commit=True) is None:
+            return None
+        return resultado
+
+def executar_muitos_com_log(conexao, query, lista_params, tabela, chaves, operacao='INSERT', registro_ids=None):
+    """
+    Executa um comando para um lote de linhas (executemany) e registra uma entrada no log para cada uma,
+    com um único commit.
+
+    Args:
+        conexao: Objeto de conexão com o banco ou PoolConexoes.
+        query (str): O comando, ex.: INSERT ... VALUES (%s, ...) ou UPDATE ... WHERE id = %s.
+        lista_params (list): Tuplas de parâmetros, uma por linha.
+        tabela (str): 'clientes' ou 'veiculos'.
+        chaves (list): Chave natural (CPF ou placa) de cada linha, na mesma ordem de lista_params.
+        operacao (str, optional): Operação registrada no log. Defaults to 'INSERT'.
+        registro_ids (list, optional): ID de cada linha, quando conhecido (UPDATE/DELETE). Defaults to None.
+
+    Returns:
+        int or None: Número de linhas afetadas, ou None em caso de erro (o lote inteiro é desfeito).
+    """
+    momento = datetime.now().replace(microsecond=0)
+    with conexao_dedicada(conexao) as conexao_escrita:
+        if conexao_escrita is None:
+            return None
+        inseridas = executar_muitos(conexao_escrita, query, lista_params, commit=False)
+        if inseridas is None:
+            return None
+        registro_ids = registro_ids or [None] * len(chaves)
+        params_log = [(tabela, registro_id, chave, operacao, momento) for registro_id, chave in zip(registro_ids, chaves)]
+        if executar_muitos(conexao_escrita, REGISTRAR_ALTERACAO.sql, params_log, commit=True) is None:
+            return None
+        return inseridas
+
+def inserir_muitos_com_log(conexao, query, lista_params, tabela, chaves, coluna_chave):
+    """
+    Insere um lote de linhas (executemany) e registra cada uma no log com o ID gerado, com um único commit.
+    O executemany não devolve os IDs: eles são lidos pela chave natural, na mesma transação, antes do log.
+
+    Args:
+        conexao: Objeto de conexão com o banco ou PoolConexoes.
+        query (str): O INSERT ... VALUES (%s, ...).
+        lista_params (list): Tuplas de parâmetros, uma por linha.
+        tabela (str): 'clientes' ou 'veiculos'.
+        chaves (list): Chave natural (CPF ou placa) de cada linha, na mesma ordem de lista_params.
+        coluna_chave (str): Coluna única que guarda a chave natural ('cpf' ou 'placa').
+
+    Returns:
+        list or None: O ID de cada linha, na ordem de lista_params, ou None em caso de erro (o lote inteiro é desfeito).
+    """
+    momento = datetime.now().replace(microsecond=0)
+    with conexao_dedicada(conexao) as conexao_escrita:
+        if conexao_escrita is None:
+            return None
+        if executar_muitos(conexao_escrita, query, lista_params, commit=False) is None:
+            return None
+        ids_por_chave = {}
+        for inicio in range(0, len(chaves), TAMANHO_BLOCO_IDS):
+            bloco = chaves[inicio:inicio + TAMANHO_BLOCO_IDS]
+            marcadores = ", ".join(["%s"] * len(bloco))
+            linhas = executar_query(conexao_escrita, f"SELECT {coluna_chave}, id FROM {tabela} WHERE {coluna_chave} IN ({marcadores})",
+                                    tuple(bloco), fetch_all=True, formato='tupla')
+            if linhas is None:
+                desfazer(conexao_escrita)
+                return None
+            ids_por_chave.update(linhas)
+        registro_ids = [ids_por_chave.get(chave) for chave in chaves]
+        params_log = [(tabela, registro_id, chave, 'INSERT', momento) for registro_id, chave in zip(registro_ids, chaves)]
+        if executar_muitos(conexao_escrita, REGISTRAR_ALTERACAO.sql, params_log, commit=True) is None:
+            return None
+        return registro_ids
+
+def executar_conjunto_com_log(conexao, query, params, tabela, operacao, registro_ids):
+    """
+    Executa um único comando que altera vários registros (ex.: DELETE ... WHERE id IN (...)) e
+    registra uma entrada no log para cada ID, com um único commit.
+
+    Args:
+        conexao: Objeto de conexão com o banco ou PoolConexoes.
+        query (str): O comando de escrita.
+        params (tuple): Parâmetros do comando.
+        tabela (str): 'clientes' ou 'veiculos'.
+        operacao (str): 'UPDATE' ou 'DELETE'.
+        registro_ids (list): IDs dos registros alvo do comando.
+
+    Returns:
+        int or None: Linhas afetadas, ou None em caso de erro (nada é gravado).
+    """
+    momento = datetime.now().replace(microsecond=0)
+    with conexao_dedicada(conexao) as conexao_escrita:
+        if conexao_escrita is None:
+            return None
+        resultado = executar_query(conexao_escrita, query, params)
+        if resultado is None:
+            desfazer(conexao_escrita)
+            return None
+        if resultado == 0:
+            desfazer(conexao_escrita)
+            return 0
+        params_log = [(tabela, registro_id, None, operacao, momento) for registro_id in registro_ids]
+        if executar_muitos(conexao_escrita, REGISTRAR_ALTERACAO.sql, params_log, commit=True) is None:
+            return None
+        return resultado
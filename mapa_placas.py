@@ -0,0 +1,337 @@
+# mapa_placas.py
+# Mapa de placas somente leitura, compartilhado por vários processos de portaria por mapeamento de
+# memória (mmap): placa -> (veiculo_id, cliente_id, status), sem consultar o banco nem montar um cache
+# por processo. O arquivo é gerado a partir de 'veiculos' por gerar_mapa() (ou por este módulo
+# executado como programa, periodicamente) e cada processo o abre com mapa_placas.abrir().
+#
+# Formato (inteiros little-endian):
+#   - Cabeçalho de 64 bytes: identificação, versão, geração, quantidade de placas, posições da tabela
+#     e blocos do filtro de Bloom.
+#   - Filtro de Bloom em blocos de 64 bits: todos os bits de uma placa ficam no mesmo bloco, então
+#     "placa desconhecida" custa uma única leitura de 8 bytes (falso positivo em ~0,5% das placas).
+#   - Tabela de hash com sondagem linear e posições de 16 bytes (placa canônica de 7 bytes, status,
+#     veiculo_id e cliente_id); uma posição com a placa zerada está vazia.
+# Nada é copiado para a memória do processo: as páginas do arquivo ficam no cache do sistema
+# operacional, uma única vez para todos os leitores.
+#
+# Cada geração é um arquivo novo ('<caminho>.<geração>'), e o arquivo 'caminho' contém apenas o nome da
+# geração atual, trocado com os.replace. Os leitores percebem a troca em até 'intervalo_verificacao'
+# segundos e passam a mapear a geração nova; quem ainda consulta a antiga termina a consulta nela.
+# Não se substitui o próprio arquivo mapeado porque o Windows não permite trocar um arquivo aberto.
+#
+# O mapa é uma fotografia de 'veiculos' no momento da geração. Executado sem --intervalo, este módulo
+# gera o mapa uma única vez, e ele fica desatualizado a cada cadastro, troca de proprietário ou
+# exclusão: em produção, deixe-o rodando com --intervalo (ex.: python mapa_placas.py --intervalo 60).
+# Por isso o cliente_id do mapa não é usado para cobrança: sessao_crud lê o proprietário no banco na
+# saída, e veículos cadastrados depois da geração são confirmados no banco se
+# MAPA_PLACAS_CONFIG['consultar_banco_se_ausente'].
+
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+
+from db_config import MAPA_PLACAS_CONFIG
+from db_utils import executar_query
+from mensagens import informar
+from placas import normalizar_placa
+
+IDENTIFICACAO = b"MAPAPLC1"
+VERSAO = 1
+STATUS_CADASTRADO = 1  # Bit 0: veículo cadastrado, de um cliente (os demais bits ficam para situações futuras)
+
+_CABECALHO = struct.Struct("<8sIIQQQQ")  # identificação, versão, reservado, geração, quantidade, posições, blocos
+TAMANHO_CABECALHO = 64
+_POSICAO = struct.Struct("<7sBII")        # placa, status, veiculo_id, cliente_id
+_BLOCO = struct.Struct("<Q")
+_HASH = struct.Struct("<QQ")
+_VAZIA = bytes(7)
+BITS_POR_BLOCO_BLOOM = 5                  # Bits marcados por placa no seu bloco de 64
+
+
+def _hashes(placa):
+    """Dois hashes de 64 bits da placa (bytes): o primeiro escolhe a posição na tabela, o segundo o bloco do Bloom."""
+    return _HASH.unpack(hashlib.blake2b(placa, digest_size=16).digest())
+
+def _bloco_e_mascara(hash_bloom, total_blocos):
+    """Bloco do filtro de Bloom (32 bits baixos do hash) e os bits da placa nele (6 bits do hash para cada um)."""
+    mascara, restante = 0, hash_bloom >> 32
+    for _ in range(BITS_POR_BLOCO_BLOOM):
+        mascara |= 1 << (restante & 63)
+        restante >>= 6
+    return hash_bloom & (total_blocos - 1), mascara
+
+def _potencia_de_dois(minimo):
+    return 1 << max(int(minimo) - 1, 1).bit_length()
+
+
+def montar_mapa(veiculos, geracao=None, bits_bloom_por_placa=None, carga_maxima=None):
+    """
+    Monta o conteúdo do arquivo do mapa.
+
+    Args:
+        veiculos (iterable): Tuplas (placa, veiculo_id, cliente_id[, status]) com a placa na forma canônica.
+        geracao (int, optional): Número da geração. Defaults to None (time.time_ns()).
+        bits_bloom_por_placa (int, optional): Tamanho do filtro. Defaults to None (MAPA_PLACAS_CONFIG).
+        carga_maxima (float, optional): Ocupação máxima da tabela. Defaults to None (MAPA_PLACAS_CONFIG).
+
+    Returns:
+        bytearray: O conteúdo completo do arquivo.
+    """
+    bits_bloom_por_placa = bits_bloom_por_placa or MAPA_PLACAS_CONFIG['bits_bloom_por_placa']
+    carga_maxima = carga_maxima or MAPA_PLACAS_CONFIG['carga_maxima']
+    veiculos = list(veiculos)
+    total_posicoes = _potencia_de_dois(len(veiculos) / carga_maxima + 1)
+    total_blocos = _potencia_de_dois(len(veiculos) * bits_bloom_por_placa / 64 + 1)
+    inicio_tabela = TAMANHO_CABECALHO + total_blocos * _BLOCO.size
+    conteudo = bytearray(inicio_tabela + total_posicoes * _POSICAO.size)
+    _CABECALHO.pack_into(conteudo, 0, IDENTIFICACAO, VERSAO, 0, geracao or time.time_ns(), len(veiculos),
+                         total_posicoes, total_blocos)
+
+    blocos = [0] * total_blocos
+    ultima_posicao = total_posicoes - 1
+    for veiculo in veiculos:
+        placa = veiculo[0].encode("ascii")
+        hash_tabela, hash_bloom = _hashes(placa)
+        bloco, mascara = _bloco_e_mascara(hash_bloom, total_blocos)
+        blocos[bloco] |= mascara
+        posicao = hash_tabela & ultima_posicao
+        while True:
+            deslocamento = inicio_tabela + posicao * _POSICAO.size
+            atual = conteudo[deslocamento:deslocamento + 7]
+            if atual == _VAZIA or atual == placa: # Placa repetida: vale a última
+                break
+            posicao = (posicao + 1) & ultima_posicao
+        status = veiculo[3] if len(veiculo) > 3 else STATUS_CADASTRADO
+        _POSICAO.pack_into(conteudo, deslocamento, placa, status, veiculo[1], veiculo[2] or 0)
+    struct.pack_into(f"<{total_blocos}Q", conteudo, TAMANHO_CABECALHO, *blocos)
+    return conteudo
+
+def gerar_mapa(conexao, caminho=None):
+    """
+    Gera uma nova geração do mapa a partir de 'veiculos' e a torna a atual, sem interromper os leitores.
+    Gerações anteriores à penúltima são apagadas (no Windows, só quando nenhum processo as mapeia mais).
+
+    Args:
+        conexao: Objeto de conexão com o banco ou PoolConexoes.
+        caminho (str, optional): Arquivo de indicação da geração atual. Defaults to None (MAPA_PLACAS_CONFIG).
+
+    Returns:
+        int or None: Quantidade de placas no mapa, ou None em caso de erro.
+    """
+    caminho = caminho or MAPA_PLACAS_CONFIG['caminho']
+    veiculos = executar_query(conexao, "SELECT placa, id, cliente_id FROM veiculos", fetch_all=True, formato='tupla')
+    if veiculos is None:
+        informar("Falha ao ler os veículos para o mapa de placas.")
+        return None
+    # Linhas anteriores a migrar_placas.py podem estar no formato antigo; placas inválidas ficam de fora
+    veiculos = [(placa, veiculo_id, cliente_id) for placa, veiculo_id, cliente_id in
+                ((normalizar_placa(placa), veiculo_id, cliente_id) for placa, veiculo_id, cliente_id in veiculos)
+                if placa is not None]
+    geracao = time.time_ns()
+    arquivo_geracao = f"{caminho}.{geracao}"
+    try:
+        _gravar_substituindo(arquivo_geracao, montar_mapa(veiculos, geracao))
+        _gravar_substituindo(caminho, os.path.basename(arquivo_geracao).encode("utf-8"))
+    except (OSError, UnicodeEncodeError) as err:
+        informar(f"Erro ao gravar o mapa de placas '{caminho}': {err}")
+        return None
+    _apagar_geracoes_antigas(caminho, manter=2)
+    return len(veiculos)
+
+def _gravar_substituindo(caminho, conteudo):
+    """Grava em um arquivo temporário e o coloca no lugar de 'caminho' com os.replace (troca atômica)."""
+    temporario = f"{caminho}.parcial"
+    try:
+        with open(temporario, "wb") as arquivo:
+            arquivo.write(conteudo)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, caminho)
+    except OSError:
+        try:
+            os.remove(temporario)
+        except OSError:
+            pass
+        raise
+
+def _apagar_geracoes_antigas(caminho, manter):
+    pasta, nome = os.path.split(os.path.abspath(caminho))
+    geracoes = sorted(int(arquivo[len(nome) + 1:]) for arquivo in os.listdir(pasta)
+                      if arquivo.startswith(nome + ".") and arquivo[len(nome) + 1:].isdigit())
+    for geracao in geracoes[:-manter]:
+        try:
+            os.remove(os.path.join(pasta, f"{nome}.{geracao}"))
+        except OSError:
+            pass # Ainda mapeada por algum leitor (Windows); sai na próxima geração
+
+
+class _Geracao:
+    """Uma geração do mapa aberta: o mmap e os números do cabeçalho."""
+
+    __slots__ = ('nome', 'mapa', 'numero', 'quantidade', 'ultima_posicao', 'total_blocos', 'inicio_tabela')
+
+    def __init__(self, nome, mapa):
+        identificacao, versao, _, numero, quantidade, total_posicoes, total_blocos = _CABECALHO.unpack_from(mapa, 0)
+        if identificacao != IDENTIFICACAO or versao != VERSAO:
+            raise ValueError("não é um mapa de placas desta versão")
+        self.inicio_tabela = TAMANHO_CABECALHO + total_blocos * _BLOCO.size
+        if len(mapa) != self.inicio_tabela + total_posicoes * _POSICAO.size:
+            raise ValueError("tamanho do arquivo não confere com o cabeçalho")
+        self.nome = nome
+        self.mapa = mapa
+        self.numero = numero
+        self.quantidade = quantidade
+        self.ultima_posicao = total_posicoes - 1
+        self.total_blocos = total_blocos
+
+
+class MapaPlacas:
+    """
+    Leitor do mapa de placas. Fica inativo até abrir(); depois, consultar() responde pela geração atual
+    e passa sozinho para uma geração nova quando o arquivo de indicação muda.
+    """
+
+    def __init__(self, intervalo_verificacao=None):
+        self.intervalo_verificacao = (intervalo_verificacao if intervalo_verificacao is not None
+                                      else MAPA_PLACAS_CONFIG['intervalo_verificacao'])
+        self.caminho = None
+        self._geracao = None
+        self._proxima_verificacao = 0.0
+        self._lock = threading.Lock() # Só para a troca de geração; as consultas não esperam
+        self.consultas = 0
+        self.descartadas_bloom = 0    # Consultas respondidas só pelo filtro de Bloom
+
+    @property
+    def aberto(self):
+        return self._geracao is not None
+
+    @property
+    def geracao(self):
+        """Número da geração em uso (momento da geração, em nanossegundos), ou None."""
+        return self._geracao.numero if self._geracao else None
+
+    def __len__(self):
+        return self._geracao.quantidade if self._geracao else 0
+
+    def abrir(self, caminho=None):
+        """
+        Mapeia a geração atual do arquivo.
+
+        Returns:
+            int or None: Quantidade de placas no mapa, ou None se o arquivo não existe ou é inválido.
+        """
+        self.caminho = caminho or MAPA_PLACAS_CONFIG['caminho']
+        if not self.atualizar():
+            return None
+        return len(self)
+
+    def atualizar(self):
+        """
+        Passa a usar a geração indicada no arquivo 'caminho', se for outra.
+
+        Returns:
+            bool: True se há uma geração em uso (a nova ou a mesma de antes).
+        """
+        self._proxima_verificacao = time.monotonic() + self.intervalo_verificacao
+        try:
+            with open(self.caminho, "rb") as arquivo:
+                nome = arquivo.read().decode("utf-8").strip()
+        except (OSError, UnicodeDecodeError) as err:
+            informar(f"Erro ao ler o mapa de placas '{self.caminho}': {err}")
+            return self._geracao is not None
+        if self._geracao is not None and self._geracao.nome == nome:
+            return True
+        with self._lock:
+            if self._geracao is not None and self._geracao.nome == nome:
+                return True
+            try:
+                with open(os.path.join(os.path.dirname(os.path.abspath(self.caminho)), nome), "rb") as arquivo:
+                    mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+                nova = _Geracao(nome, mapa)
+            except (OSError, ValueError, struct.error) as err:
+                informar(f"Erro ao abrir o mapa de placas '{nome}': {err}")
+                return self._geracao is not None
+            # A geração anterior é fechada quando a última consulta que a usa termina (sai de escopo)
+            self._geracao = nova
+        return True
+
+    def consultar(self, placa):
+        """
+        Consulta uma placa no mapa, sem acessar o banco.
+
+        Args:
+            placa (str): Placa em qualquer formato (ABC-1234, abc1234, ABC1D23).
+
+        Returns:
+            tuple or None: (veiculo_id, cliente_id, status) se a placa está no mapa, None caso contrário
+            (inclusive mapa não aberto).
+        """
+        if time.monotonic() >= self._proxima_verificacao and self.caminho is not None:
+            self.atualizar()
+        geracao = self._geracao
+        if geracao is None:
+            return None
+        placa = normalizar_placa(placa)
+        if placa is None:
+            return None
+        chave = placa.encode("ascii")
+        self.consultas += 1
+        hash_tabela, hash_bloom = _hashes(chave)
+        bloco, mascara = _bloco_e_mascara(hash_bloom, geracao.total_blocos)
+        mapa = geracao.mapa
+        if _BLOCO.unpack_from(mapa, TAMANHO_CABECALHO + bloco * _BLOCO.size)[0] & mascara != mascara:
+            self.descartadas_bloom += 1
+            return None
+        posicao = hash_tabela & geracao.ultima_posicao
+        while True:
+            placa_posicao, status, veiculo_id, cliente_id = _POSICAO.unpack_from(
+                mapa, geracao.inicio_tabela + posicao * _POSICAO.size)
+            if placa_posicao == chave:
+                return veiculo_id, cliente_id or None, status
+            if placa_posicao == _VAZIA:
+                return None
+            posicao = (posicao + 1) & geracao.ultima_posicao
+
+    def fechar(self):
+        """Deixa de usar o mapa (consultas passam a responder None)."""
+        self._geracao = None
+        self.caminho = None
+
+
+# Mapa compartilhado pelo processo (terminais de entrada da portaria)
+mapa_placas = MapaPlacas()
+
+
+if __name__ == "__main__":
+    from db_utils import criar_roteador
+
+    parser = argparse.ArgumentParser(description="Gera o mapa de placas compartilhado pelos processos da portaria.")
+    parser.add_argument("--caminho", default=MAPA_PLACAS_CONFIG['caminho'], help="Arquivo de indicação da geração atual.")
+    parser.add_argument("--intervalo", type=float, help="Gera uma nova geração a cada tantos segundos. Sem esta opção o mapa é gerado uma "
+                             "única vez e não acompanha as alterações do cadastro.")
+    args = parser.parse_args()
+
+    pool_db = criar_roteador(tamanho=1)
+    if not pool_db:
+        print("Falha ao conectar ao banco de dados.")
+        sys.exit(1)
+    try:
+        while True:
+            inicio = time.perf_counter()
+            total = gerar_mapa(pool_db, args.caminho)
+            if total is None and not args.intervalo:
+                sys.exit(1)
+            if total is not None:
+                print(f"Mapa de placas gerado: {total} placa(s) em {time.perf_counter() - inicio:.1f}s ('{args.caminho}').")
+            if not args.intervalo:
+                break
+            time.sleep(args.intervalo)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool_db.fechar()
@@ -0,0 +1,40 @@
+# mensagens.py
+# Destino das mensagens de status da camada de dados (cliente_crud, veiculo_crud, sessao_crud, db_utils).
+# As funções de dados não imprimem diretamente: chamam informar(). No menu interativo (main.py)
+# a mensagem é impressa na tela, como sempre; no modo em lote (cli.py) e em servidores ela é
+# coletada e devolvida junto com o resultado do comando, sem se misturar à saída.
+
+import threading
+from contextlib import contextmanager
+
+# Cada thread tem seu próprio coletor, para que comandos simultâneos não misturem suas mensagens
+_estado_thread = threading.local()
+
+def informar(texto):
+    """
+    Emite uma mensagem de status (sucesso, registro não encontrado, motivo de uma falha...).
+
+    Args:
+        texto (str): A mensagem, pronta para exibição.
+    """
+    coletor = getattr(_estado_thread, 'coletor', None)
+    if coletor is None:
+        print(texto)
+    else:
+        coletor.append(texto)
+
+@contextmanager
+def coletar_mensagens():
+    """
+    Gerenciador de contexto que captura as mensagens emitidas por esta thread durante o bloco.
+
+    Yields:
+        list: Lista que recebe as mensagens, na ordem em que foram emitidas.
+    """
+    anterior = getattr(_estado_thread, 'coletor', None)
+    coletor = []
+    _estado_thread.coletor = coletor
+    try:
+        yield coletor
+    finally:
+        _estado_thread.coletor = anterior
@@ -0,0 +1,331 @@
+# metricas.py
+# Instrumentação das consultas ao banco feitas por db_utils (executar_query, executar_muitos, iterar_query).
+# Para cada função do CRUD que consulta o banco (ex.: consultar_veiculo_por_placa) e tipo de comando
+# (SELECT, INSERT, ...) são contados execuções, linhas e erros, e o tempo de resposta vai para um
+# histograma no estilo HDR (p50/p90/p99 com erro relativo abaixo de 2%).
+# Consultas acima do limite configurado entram no registro de consultas lentas.
+# Os dados podem ser exportados em JSON ou no formato texto do Prometheus (servidor HTTP opcional).
+# Desligada (padrão), a instrumentação custa apenas um teste de atributo por consulta.
+
+import json
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from db_config import METRICAS_CONFIG
+
+# Módulos de infraestrutura ignorados ao procurar a função do CRUD que originou a consulta
+_MODULOS_INFRA = {'db_utils', 'metricas', 'log_alteracoes', 'contextlib', 'functools'}
+
+QUANTIS_EXPORTADOS = (0.5, 0.9, 0.99)
+
+
+class HistogramaLatencia:
+    """
+    Histograma de latências em microssegundos com precisão relativa fixa (estilo HDR Histogram).
+
+    Valores até 127 µs têm um balde cada; acima disso, cada potência de 2 é dividida em 64 baldes
+    iguais. Assim o erro de qualquer quantil fica abaixo de 1/64 (~1,6%) do valor, com memória
+    proporcional ao número de baldes usados e não ao número de medições.
+    """
+    __slots__ = ('_baldes', 'contagem', 'soma', 'minimo', 'maximo')
+
+    _SUB_BALDES = 64
+
+    def __init__(self):
+        self._baldes = {}
+        self.contagem = 0
+        self.soma = 0
+        self.minimo = None
+        self.maximo = 0
+
+    @classmethod
+    def _indice(cls, valor):
+        if valor < 2 * cls._SUB_BALDES:
+            return valor
+        deslocamento = valor.bit_length() - 7
+        return deslocamento * cls._SUB_BALDES + (valor >> deslocamento)
+
+    @classmethod
+    def _limite_superior(cls, indice):
+        """Maior valor representado pelo balde (o quantil é reportado pelo limite superior)."""
+        if indice < 2 * cls._SUB_BALDES:
+            return indice
+        deslocamento = (indice - cls._SUB_BALDES) // cls._SUB_BALDES
+        sub_balde = indice - deslocamento * cls._SUB_BALDES
+        return ((sub_balde + 1) << deslocamento) - 1
+
+    def registrar(self, microssegundos):
+        valor = max(int(microssegundos), 0)
+        indice = self._indice(valor)
+        self._baldes[indice] = self._baldes.get(indice, 0) + 1
+        self.contagem += 1
+        self.soma += valor
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def mesclar(self, outro):
+        """Soma ao histograma as medições de outro (ex.: histogramas de várias threads)."""
+        for indice, quantidade in outro._baldes.items():
+            self._baldes[indice] = self._baldes.get(indice, 0) + quantidade
+        self.contagem += outro.contagem
+        self.soma += outro.soma
+        if outro.minimo is not None and (self.minimo is None or outro.minimo < self.minimo):
+            self.minimo = outro.minimo
+        self.maximo = max(self.maximo, outro.maximo)
+
+    def quantil(self, fracao):
+        """
+        Valor (µs) abaixo do qual está a fração 'fracao' das medições (ex.: 0.99 para o p99).
+
+        Returns:
+            int: O quantil, ou 0 se não houver medições.
+        """
+        if not self.contagem:
+            return 0
+        alvo = max(1, int(fracao * self.contagem + 0.5))
+        acumulado = 0
+        for indice in sorted(self._baldes):
+            acumulado += self._baldes[indice]
+            if acumulado >= alvo:
+                return min(self._limite_superior(indice), self.maximo)
+        return self.maximo
+
+
+class _Estatistica:
+    """Contadores e histograma de uma combinação (função de origem, tipo de comando)."""
+    __slots__ = ('execucoes', 'linhas', 'erros', 'lentas', 'histograma')
+
+    def __init__(self):
+        self.execucoes = 0
+        self.linhas = 0
+        self.erros = 0
+        self.lentas = 0
+        self.histograma = HistogramaLatencia()
+
+
+class ColetorMetricas:
+    """
+    Acumula as medições das consultas. Uma instância única (metricas) é usada por db_utils.
+
+    O atributo 'habilitado' é lido a cada consulta; quando é False, db_utils segue o caminho
+    sem medição. As demais operações são seguras para uso entre threads.
+    """
+
+    def __init__(self, config=None):
+        config = config or METRICAS_CONFIG
+        self.habilitado = config['habilitado']
+        self.limite_lenta_ms = config['limite_consulta_lenta_ms']
+        self.arquivo_lentas = config['arquivo_consultas_lentas']
+        self._estatisticas = {}
+        self._lentas = deque(maxlen=config['consultas_lentas_em_memoria'])
+        self._lock = threading.Lock()
+        self._erro_thread = threading.local()
+
+    def habilitar(self, habilitado=True):
+        self.habilitado = habilitado
+
+    def resetar(self):
+        """Descarta todas as medições acumuladas."""
+        with self._lock:
+            self._estatisticas = {}
+            self._lentas.clear()
+
+    # --- Coleta (chamada por db_utils) ---
+
+    def origem_da_chamada(self):
+        """Nome da primeira função fora da infraestrutura de banco na pilha de chamadas."""
+        quadro = sys._getframe(1)
+        while quadro is not None and quadro.f_globals.get('__name__') in _MODULOS_INFRA:
+            quadro = quadro.f_back
+        return quadro.f_code.co_name if quadro is not None else "desconhecida"
+
+    def iniciar(self):
+        """Marca o início de uma consulta; retorna o instante para medir() e limpa o erro da thread."""
+        self._erro_thread.ocorreu = False
+        return time.perf_counter()
+
+    def marcar_erro(self):
+        """Sinaliza que a consulta em andamento nesta thread terminou em erro."""
+        self._erro_thread.ocorreu = True
+
+    def medir(self, inicio, origem, tipo, sql, linhas):
+        """
+        Registra uma consulta iniciada com iniciar() que acabou de terminar.
+
+        Args:
+            inicio (float): Valor devolvido por iniciar().
+            origem (str): Função do CRUD que fez a consulta.
+            tipo (str): Tipo do comando (SELECT, INSERT, UPDATE, ...).
+            sql (str): Texto do comando (usado apenas no registro de consultas lentas).
+            linhas (int): Linhas retornadas ou afetadas.
+        """
+        erro = getattr(self._erro_thread, 'ocorreu', False)
+        self.registrar(origem, tipo, sql, time.perf_counter() - inicio, linhas, erro)
+
+    def registrar(self, origem, tipo, sql, segundos, linhas, erro=False):
+        """Registra uma consulta já medida (duração em segundos); usado quando a medição é fracionada."""
+        lenta = segundos * 1000 >= self.limite_lenta_ms
+        chave = (origem, tipo)
+        with self._lock:
+            estatistica = self._estatisticas.get(chave)
+            if estatistica is None:
+                estatistica = self._estatisticas[chave] = _Estatistica()
+            estatistica.execucoes += 1
+            estatistica.linhas += linhas
+            estatistica.erros += erro
+            estatistica.histograma.registrar(segundos * 1_000_000)
+            if lenta:
+                estatistica.lentas += 1
+        if lenta:
+            self._registrar_lenta(origem, tipo, sql, segundos, linhas, erro)
+
+    def _registrar_lenta(self, origem, tipo, sql, segundos, linhas, erro):
+        registro = {
+            'momento': datetime.now().isoformat(" ", "seconds"),
+            'funcao': origem,
+            'comando': tipo,
+            'duracao_ms': round(segundos * 1000, 3),
+            'linhas': linhas,
+            'erro': erro,
+            # Apenas o texto do comando: os parâmetros (CPF, placa) não vão para o registro
+            'sql': " ".join(sql.split()),
+        }
+        self._lentas.append(registro)
+        if self.arquivo_lentas:
+            try:
+                with open(self.arquivo_lentas, "a", encoding="utf-8") as arquivo:
+                    arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            except OSError as err:
+                print(f"Erro ao gravar o registro de consultas lentas: {err}")
+
+    # --- Consulta e exportação ---
+
+    def consultas_lentas(self):
+        """Retorna as consultas lentas mais recentes (lista de dicionários, da mais antiga para a mais nova)."""
+        return list(self._lentas)
+
+    def resumo(self):
+        """
+        Retorna as medições por função e comando.
+
+        Returns:
+            list: Dicionários com 'funcao', 'comando', 'execucoes', 'linhas', 'erros', 'lentas',
+            'total_ms', 'media_ms', 'p50_ms', 'p90_ms', 'p99_ms' e 'max_ms', do maior tempo total para o menor.
+        """
+        with self._lock:
+            itens = list(self._estatisticas.items())
+            linhas = []
+            for (origem, tipo), estatistica in itens:
+                histograma = estatistica.histograma
+                linha = {
+                    'funcao': origem,
+                    'comando': tipo,
+                    'execucoes': estatistica.execucoes,
+                    'linhas': estatistica.linhas,
+                    'erros': estatistica.erros,
+                    'lentas': estatistica.lentas,
+                    'total_ms': histograma.soma / 1000,
+                    'media_ms': histograma.soma / histograma.contagem / 1000 if histograma.contagem else 0,
+                    'max_ms': histograma.maximo / 1000,
+                }
+                for quantil in QUANTIS_EXPORTADOS:
+                    linha[f"p{round(quantil * 100)}_ms"] = histograma.quantil(quantil) / 1000
+                linhas.append(linha)
+        linhas.sort(key=lambda item: item['total_ms'], reverse=True)
+        return linhas
+
+    def exportar_json(self, caminho=None):
+        """
+        Exporta o resumo e as consultas lentas em JSON.
+
+        Args:
+            caminho (str, optional): Arquivo de destino; sem ele, o JSON é apenas retornado. Defaults to None.
+
+        Returns:
+            str: O documento JSON.
+        """
+        documento = json.dumps({'consultas': self.resumo(), 'consultas_lentas': self.consultas_lentas()},
+                               ensure_ascii=False, indent=2)
+        if caminho:
+            with open(caminho, "w", encoding="utf-8") as arquivo:
+                arquivo.write(documento)
+        return documento
+
+    def exportar_prometheus(self):
+        """Retorna as medições no formato texto de exposição do Prometheus."""
+        resumo = self.resumo()
+        saida = [
+            "# HELP estacionamento_consulta_segundos Tempo de resposta das consultas ao banco.",
+            "# TYPE estacionamento_consulta_segundos summary",
+        ]
+        for item in resumo:
+            rotulos = f'funcao="{item["funcao"]}",comando="{item["comando"]}"'
+            for quantil in QUANTIS_EXPORTADOS:
+                valor = item[f"p{round(quantil * 100)}_ms"] / 1000
+                saida.append(f'estacionamento_consulta_segundos{{{rotulos},quantile="{quantil}"}} {valor:.6f}')
+            saida.append(f"estacionamento_consulta_segundos_sum{{{rotulos}}} {item['total_ms'] / 1000:.6f}")
+            saida.append(f"estacionamento_consulta_segundos_count{{{rotulos}}} {item['execucoes']}")
+        contadores = (
+            ('linhas', "Linhas retornadas ou afetadas pelas consultas."),
+            ('erros', "Consultas que terminaram em erro."),
+            ('lentas', "Consultas acima do limite de consulta lenta."),
+        )
+        for campo, descricao in contadores:
+            saida.append(f"# HELP estacionamento_consulta_{campo}_total {descricao}")
+            saida.append(f"# TYPE estacionamento_consulta_{campo}_total counter")
+            for item in resumo:
+                rotulos = f'funcao="{item["funcao"]}",comando="{item["comando"]}"'
+                saida.append(f"estacionamento_consulta_{campo}_total{{{rotulos}}} {item[campo]}")
+        return "\n".join(saida) + "\n"
+
+
+# Coletor usado por db_utils
+metricas = ColetorMetricas()
+
+
+class _TratadorMetricas(BaseHTTPRequestHandler):
+    """Responde /metrics (Prometheus) e /metricas.json."""
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            corpo, tipo = metricas.exportar_prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path == "/metricas.json":
+            corpo, tipo = metricas.exportar_json(), "application/json; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+        dados = corpo.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, formato, *args):
+        pass # Não polui o terminal do operador a cada coleta
+
+
+def iniciar_servidor_metricas(porta=None, endereco="0.0.0.0"):
+    """
+    Inicia, em uma thread de fundo, o servidor HTTP com /metrics e /metricas.json.
+
+    Args:
+        porta (int, optional): Porta TCP. Defaults to METRICAS_CONFIG['porta_http'].
+        endereco (str, optional): Endereço de escuta. Defaults to "0.0.0.0".
+
+    Returns:
+        ThreadingHTTPServer or None: O servidor (use shutdown() para parar), ou None se a porta não pôde ser aberta.
+    """
+    try:
+        servidor = ThreadingHTTPServer((endereco, porta or METRICAS_CONFIG['porta_http']), _TratadorMetricas)
+    except OSError as err:
+        print(f"Erro ao iniciar o servidor de métricas: {err}")
+        return None
+    threading.Thread(target=servidor.serve_forever, name="servidor_metricas", daemon=True).start()
+    return servidor
@@ -0,0 +1,159 @@
+# migrar_placas.py
+# Migração única: reescreve as placas já gravadas (veiculos e sessoes) na forma canônica de placas.py.
+# Antes dela, 'veiculos.placa' guardava a placa como foi digitada (ABC-1234, abc1234, ABC1234...),
+# e a consulta pela forma canônica não encontrava essas linhas no índice idx_placa.
+#
+# As linhas são lidas em páginas pela chave (sem cursor aberto durante as escritas) e atualizadas
+# em lotes. Se duas placas gravadas têm a mesma forma canônica (ex.: ABC1234 e ABC1C34, a mesma
+# placa antes e depois da conversão para o Mercosul), a restrição UNIQUE recusa o lote; ele é então
+# refeito linha a linha e as placas em conflito ficam como estão, listadas no relatório para revisão.
+# As alterações de 'veiculos' entram no log de alterações, para que as réplicas das cabines as recebam.
+#
+# Execute com o sistema parado (o índice de sessões abertas é carregado na inicialização):
+#   python migrar_placas.py [--simular]
+
+import argparse
+
+from cache_consultas import cache_cadastro
+from db_utils import conexao_dedicada, criar_pool, executar_muitos, executar_query
+from log_alteracoes import executar_com_log, executar_muitos_com_log
+from mensagens import coletar_mensagens
+from placas import normalizar_placa
+
+ATUALIZAR_PLACA_VEICULO = "UPDATE veiculos SET placa = %s WHERE id = %s"
+ATUALIZAR_PLACA_SESSOES = "UPDATE sessoes SET placa = %s WHERE placa = %s"
+
+
+def _paginas(conexao, query, chave, inicio, tamanho_lote):
+    """Lê uma tabela em páginas ordenadas pela 'chave' (WHERE chave > ultima ORDER BY chave LIMIT n)."""
+    ultimo = inicio
+    while True:
+        pagina = executar_query(conexao, query, (ultimo, tamanho_lote), fetch_all=True)
+        if pagina is None:
+            raise RuntimeError("Falha ao ler as placas gravadas.")
+        if not pagina:
+            return
+        yield pagina
+        ultimo = pagina[-1][chave]
+
+def _aplicar(alteracoes, em_lote, uma_a_uma):
+    """
+    Aplica as alterações de uma página com um comando em lote; se o banco recusar o lote
+    (placa canônica já usada por outra linha), aplica uma a uma para isolar os conflitos.
+
+    Returns:
+        tuple: (quantidade aplicada, lista das alterações recusadas).
+    """
+    with coletar_mensagens(): # O erro esperado do lote não precisa aparecer na tela
+        aplicadas = em_lote(alteracoes)
+    if aplicadas is not None:
+        return len(alteracoes), []
+    total, recusadas = 0, []
+    for alteracao in alteracoes:
+        with coletar_mensagens():
+            resultado = uma_a_uma(alteracao)
+        if resultado is None:
+            recusadas.append(alteracao)
+        else:
+            total += 1
+    return total, recusadas
+
+def migrar_placas(conexao, tamanho_lote=1000, simular=False):
+    """
+    Converte para a forma canônica as placas de 'veiculos' e de 'sessoes'.
+
+    Args:
+        conexao: Objeto de conexão com o banco ou PoolConexoes.
+        tamanho_lote (int, optional): Linhas lidas e atualizadas por vez. Defaults to 1000.
+        simular (bool, optional): Apenas conta o que seria alterado, sem gravar. Defaults to False.
+
+    Returns:
+        dict: 'veiculos' e 'sessoes' (placas convertidas), 'conflitos' (lista de (veiculo_id, placa,
+        placa_canonica) não convertidos por duplicidade) e 'invalidas' (lista de (veiculo_id, placa)
+        que não seguem nenhum padrão e foram mantidas).
+    """
+    relatorio = {'veiculos': 0, 'sessoes': 0, 'conflitos': [], 'invalidas': []}
+
+    def em_lote_veiculos(alteracoes):
+        return executar_muitos_com_log(conexao_migracao, ATUALIZAR_PLACA_VEICULO,
+                                       [(canonica, veiculo_id) for veiculo_id, _, canonica in alteracoes],
+                                       'veiculos', [canonica for _, _, canonica in alteracoes],
+                                       operacao='UPDATE', registro_ids=[veiculo_id for veiculo_id, _, _ in alteracoes])
+
+    def um_veiculo(alteracao):
+        veiculo_id, _, canonica = alteracao
+        return executar_com_log(conexao_migracao, ATUALIZAR_PLACA_VEICULO, (canonica, veiculo_id),
+                                'veiculos', 'UPDATE', registro_id=veiculo_id, chave=canonica)
+
+    def em_lote_sessoes(alteracoes):
+        return executar_muitos(conexao_migracao, ATUALIZAR_PLACA_SESSOES, [(canonica, placa) for placa, canonica in alteracoes])
+
+    def uma_placa_de_sessoes(alteracao):
+        placa, canonica = alteracao
+        return executar_query(conexao_migracao, ATUALIZAR_PLACA_SESSOES, (canonica, placa), commit=True)
+
+    with conexao_dedicada(conexao) as conexao_migracao:
+        if conexao_migracao is None:
+            raise RuntimeError("Sem conexão com o banco.")
+
+        consulta = "SELECT id, placa FROM veiculos WHERE id > %s ORDER BY id LIMIT %s"
+        for pagina in _paginas(conexao_migracao, consulta, 'id', 0, tamanho_lote):
+            alteracoes = []
+            for veiculo in pagina:
+                canonica = normalizar_placa(veiculo['placa'])
+                if canonica is None:
+                    relatorio['invalidas'].append((veiculo['id'], veiculo['placa']))
+                elif canonica != veiculo['placa']:
+                    alteracoes.append((veiculo['id'], veiculo['placa'], canonica))
+            if not alteracoes:
+                continue
+            if simular:
+                relatorio['veiculos'] += len(alteracoes)
+                continue
+            aplicadas, recusadas = _aplicar(alteracoes, em_lote_veiculos, um_veiculo)
+            relatorio['veiculos'] += aplicadas
+            relatorio['conflitos'].extend(recusadas)
+
+        # Sessões (inclusive de avulsos) são agrupadas pela placa: um UPDATE por placa distinta
+        consulta = "SELECT DISTINCT placa FROM sessoes WHERE placa > %s ORDER BY placa LIMIT %s"
+        for pagina in _paginas(conexao_migracao, consulta, 'placa', "", tamanho_lote):
+            alteracoes = [(linha['placa'], normalizar_placa(linha['placa'])) for linha in pagina]
+            alteracoes = [(placa, canonica) for placa, canonica in alteracoes if canonica and canonica != placa]
+            if not alteracoes:
+                continue
+            if simular:
+                relatorio['sessoes'] += len(alteracoes)
+                continue
+            # Uma placa recusada aqui tem duas sessões abertas que viraram a mesma placa; fica como está
+            aplicadas, _ = _aplicar(alteracoes, em_lote_sessoes, uma_placa_de_sessoes)
+            relatorio['sessoes'] += aplicadas
+
+    if not simular:
+        cache_cadastro.limpar() # Entradas em cache ainda têm as placas antigas
+    return relatorio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reescreve as placas gravadas na forma canônica (placas.py).")
+    parser.add_argument("--simular", action="store_true", help="Só mostra quantas placas seriam convertidas.")
+    parser.add_argument("--tamanho-lote", type=int, default=1000)
+    args = parser.parse_args()
+
+    pool_db = criar_pool()
+    if pool_db is None:
+        raise SystemExit(1)
+    try:
+        relatorio = migrar_placas(pool_db, args.tamanho_lote, args.simular)
+    except RuntimeError as err:
+        print(f"Migração interrompida: {err}")
+        raise SystemExit(1)
+    finally:
+        pool_db.fechar()
+
+    acao = "a converter" if args.simular else "convertidas"
+    print(f"Placas de veículos {acao}: {relatorio['veiculos']}")
+    print(f"Placas de sessões {acao}: {relatorio['sessoes']}")
+    for veiculo_id, placa, canonica in relatorio['conflitos']:
+        print(f"Conflito: veículo ID {veiculo_id} ({placa}) não convertido; {canonica} já pertence a outro veículo.")
+    for veiculo_id, placa in relatorio['invalidas']:
+        print(f"Placa fora do padrão mantida: veículo ID {veiculo_id} ({placa}).")
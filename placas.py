@@ -0,0 +1,84 @@
+# placas.py
+# Validação e normalização de placas de veículos.
+# Toda placa é guardada e consultada em uma única forma canônica: sete caracteres maiúsculos, sem
+# hífen ou espaços, no padrão Mercosul. Placas do padrão antigo (ABC1234 / ABC-1234) são convertidas
+# pela regra oficial: o segundo dígito vira letra (0=A, 1=B, ..., 9=J), então ABC-1234 é guardada
+# como ABC1C34. Assim a mesma placa, digitada em qualquer formato, sempre cai na mesma linha do índice.
+#
+# A validação é feita por tabelas de tradução (str.translate, em C) em vez de expressões regulares:
+# a placa limpa é traduzida para sua "assinatura" de classes (L = letra, D = dígito) e a assinatura
+# é procurada na tabela de formatos.
+
+from functools import lru_cache
+
+LETRAS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+DIGITOS = "0123456789"
+
+# Limpeza: minúsculas viram maiúsculas; hífen, espaço e ponto são descartados
+_LIMPEZA = str.maketrans(LETRAS.lower(), LETRAS, "- .")
+# Assinatura: cada letra vira 'L' e cada dígito vira 'D'; qualquer outro caractere sobra e invalida a placa
+_CLASSES = str.maketrans(LETRAS + DIGITOS, "L" * len(LETRAS) + "D" * len(DIGITOS))
+# Assinatura -> padrão da placa
+FORMATOS = {
+    "LLLDDDD": "antiga",
+    "LLLDLDD": "mercosul",
+}
+# Quinto caractere: dígito do padrão antigo -> letra correspondente no Mercosul
+_DIGITO_PARA_LETRA = dict(zip(DIGITOS, LETRAS))
+
+
+def formato_placa(placa):
+    """
+    Identifica o padrão de uma placa, aceitando maiúsculas/minúsculas, hífen e espaços.
+
+    Args:
+        placa (str): Placa em qualquer formato de digitação.
+
+    Returns:
+        str or None: 'antiga', 'mercosul' ou None se a placa é inválida.
+    """
+    if not isinstance(placa, str):
+        return None
+    return FORMATOS.get(placa.translate(_LIMPEZA).translate(_CLASSES))
+
+@lru_cache(maxsize=8192) # Câmeras leem a mesma placa em vários quadros seguidos
+def normalizar_placa(placa):
+    """
+    Converte uma placa para a forma canônica (Mercosul, maiúscula, sem separadores).
+
+    Args:
+        placa (str): Placa em qualquer formato (ex.: 'abc-1234', 'ABC1234', 'ABC1D23').
+
+    Returns:
+        str or None: A placa canônica (ex.: 'ABC1C34'), ou None se a placa é inválida.
+    """
+    if not isinstance(placa, str):
+        return None
+    limpa = placa.translate(_LIMPEZA)
+    formato = FORMATOS.get(limpa.translate(_CLASSES))
+    if formato == "mercosul":
+        return limpa
+    if formato == "antiga":
+        return limpa[:4] + _DIGITO_PARA_LETRA[limpa[4]] + limpa[5:]
+    return None
+
+def normalizar_placas(placas):
+    """
+    Normaliza um lote de placas (ex.: leituras de uma câmera), na mesma ordem.
+
+    Args:
+        placas (iterable): Placas em qualquer formato.
+
+    Returns:
+        list: A forma canônica de cada placa, com None nas posições das placas inválidas.
+    """
+    return list(map(normalizar_placa, placas))
+
+def validar_placa(placa):
+    """
+    Valida o formato da placa.
+    Aceita formatos como AAA-1234 (antigo), ABC1234 (antigo sem hífen)
+    e ABC1D23 (Mercosul Brasil), em maiúsculas ou minúsculas.
+    Retorna True se válida, False caso contrário.
+    """
+    return normalizar_placa(placa) is not None
@@ -0,0 +1,190 @@
+# registros.py
+# Formatos das linhas devolvidas por executar_query e iterar_query (parâmetro 'formato').
+# O padrão continua sendo um dicionário por linha, mas um dicionário repete as chaves em cada
+# linha e ocupa várias vezes o espaço dos valores. Para leituras grandes há três alternativas:
+#   'tupla'   - tuplas simples, na ordem das colunas do SELECT;
+#   Registro  - objetos com __slots__ (Cliente, Veiculo, VeiculoComProprietario), acessados por
+#               atributo (cliente.nome) ou por chave (cliente['nome']), como os dicionários;
+#   'colunas' - um dicionário coluna -> valores, com colunas numéricas em array.array (8 bytes por valor).
+# Os registros são usados pelas funções do CRUD; quem precisa de um dicionário de verdade
+# (JSON, dict(**)) usa como_dict() ou dict(registro).
+
+import gc
+from array import array
+from contextlib import contextmanager
+
+
+class Registro:
+    """
+    Base dos registros com __slots__. Cada subclasse declara os campos na ordem das colunas
+    do SELECT que a produz; a linha é convertida pela posição, sem criar um dicionário.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def da_linha(cls, linha):
+        """Cria o registro a partir de uma tupla com os valores na ordem de __slots__."""
+        return cls(*linha)
+
+    def __getitem__(self, campo):
+        try:
+            return getattr(self, campo)
+        except (AttributeError, TypeError):
+            raise KeyError(campo) from None
+
+    def get(self, campo, padrao=None):
+        return getattr(self, campo, padrao) if campo in self.__slots__ else padrao
+
+    def __contains__(self, campo):
+        return campo in self.__slots__
+
+    def keys(self):
+        return self.__slots__
+
+    def values(self):
+        return [getattr(self, campo) for campo in self.__slots__]
+
+    def items(self):
+        return [(campo, getattr(self, campo)) for campo in self.__slots__]
+
+    def como_dict(self):
+        """Dicionário com os mesmos campos (para JSON e para a camada de apresentação)."""
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    def __eq__(self, outro):
+        if isinstance(outro, Registro):
+            return type(self) is type(outro) and self.values() == outro.values()
+        if isinstance(outro, dict):
+            return self.como_dict() == outro
+        return NotImplemented
+
+    __hash__ = None # Mutável, como o dicionário que substitui
+
+    def __repr__(self):
+        valores = ", ".join(f"{campo}={getattr(self, campo)!r}" for campo in self.__slots__)
+        return f"{type(self).__name__}({valores})"
+
+
+class Cliente(Registro):
+    """Cliente como devolvido pelas consultas de cliente_crud (SELECT id, nome, cpf, telefone, endereco)."""
+
+    __slots__ = ('id', 'nome', 'cpf', 'telefone', 'endereco')
+
+    def __init__(self, id, nome, cpf, telefone, endereco):
+        self.id = id
+        self.nome = nome
+        self.cpf = cpf
+        self.telefone = telefone
+        self.endereco = endereco
+
+
+class Veiculo(Registro):
+    """Veículo sem os dados do proprietário (consulta por ID)."""
+
+    __slots__ = ('id', 'marca', 'modelo', 'ano', 'placa', 'cliente_id')
+
+    def __init__(self, id, marca, modelo, ano, placa, cliente_id):
+        self.id = id
+        self.marca = marca
+        self.modelo = modelo
+        self.ano = ano
+        self.placa = placa
+        self.cliente_id = cliente_id
+
+
+class VeiculoComProprietario(Registro):
+    """Veículo com nome e CPF do proprietário (consulta por placa e listagens, com JOIN em clientes)."""
+
+    __slots__ = ('id', 'marca', 'modelo', 'ano', 'placa', 'cliente_id', 'nome_cliente', 'cpf_cliente')
+
+    def __init__(self, id, marca, modelo, ano, placa, cliente_id, nome_cliente, cpf_cliente):
+        self.id = id
+        self.marca = marca
+        self.modelo = modelo
+        self.ano = ano
+        self.placa = placa
+        self.cliente_id = cliente_id
+        self.nome_cliente = nome_cliente
+        self.cpf_cliente = cpf_cliente
+
+
+FORMATOS = ('dict', 'tupla', 'colunas') # Além de uma subclasse de Registro
+
+def validar_formato(formato):
+    """
+    Confere o 'formato' pedido a executar_query/iterar_query.
+
+    Raises:
+        ValueError: Formato desconhecido.
+    """
+    if formato in FORMATOS or (isinstance(formato, type) and issubclass(formato, Registro)):
+        return
+    raise ValueError(f"Formato de linha desconhecido: {formato!r}. Use {', '.join(FORMATOS)} ou uma classe de registros.py.")
+
+def _conferir_colunas(classe, colunas):
+    if tuple(colunas) != classe.__slots__:
+        raise ValueError(f"As colunas do SELECT ({', '.join(colunas)}) não correspondem aos campos de "
+                         f"{classe.__name__} ({', '.join(classe.__slots__)}).")
+
+def formatar_linha(linha, formato, colunas):
+    """
+    Converte uma linha em tupla (na ordem de 'colunas') para o formato pedido.
+
+    Returns:
+        dict, tuple, Registro ou None (linha None).
+    """
+    if linha is None or formato == 'tupla':
+        return linha
+    if formato == 'dict':
+        return dict(zip(colunas, linha))
+    if formato == 'colunas':
+        return formatar_linhas([linha], formato, colunas)
+    _conferir_colunas(formato, colunas)
+    return formato(*linha)
+
+# A partir deste tamanho a conversão pausa o coletor de ciclos: cada registro criado é um objeto
+# rastreado, e as coletas disparadas a cada ~700 alocações chegam a dominar o tempo da conversão.
+LINHAS_SEM_COLETA = 1000
+
+@contextmanager
+def _coleta_pausada(quantidade):
+    pausar = quantidade >= LINHAS_SEM_COLETA and gc.isenabled()
+    if pausar:
+        gc.disable()
+    try:
+        yield
+    finally:
+        if pausar:
+            gc.enable()
+
+def formatar_linhas(linhas, formato, colunas):
+    """
+    Converte uma lista de linhas em tupla para o formato pedido.
+
+    Returns:
+        list or dict: Lista de dicionários, tuplas ou registros; para 'colunas', dicionário coluna -> valores.
+    """
+    if formato == 'tupla':
+        return linhas if isinstance(linhas, list) else list(linhas)
+    if formato == 'dict':
+        with _coleta_pausada(len(linhas)):
+            return [dict(zip(colunas, linha)) for linha in linhas]
+    if formato == 'colunas':
+        return {coluna: _compactar_coluna(valores)
+                for coluna, valores in zip(colunas, zip(*linhas) if linhas else [()] * len(colunas))}
+    _conferir_colunas(formato, colunas)
+    with _coleta_pausada(len(linhas)):
+        return [formato(*linha) for linha in linhas]
+
+def _compactar_coluna(valores):
+    """Coluna só de inteiros (sem NULL) vira array('q'); só de floats, array('d'); as demais, lista."""
+    tipos = set(map(type, valores))
+    if tipos == {int}:
+        try:
+            return array('q', valores)
+        except OverflowError:
+            pass
+    elif tipos == {float}:
+        return array('d', valores)
+    return list(valores)
@@ -0,0 +1,700 @@
+# replica_local.py
+# Réplica local (SQLite) de clientes e veículos para as cabines de portaria.
+# As consultas são sempre respondidas pela réplica, mesmo sem conexão com o banco central.
+# A réplica se atualiza buscando apenas as entradas novas do log de alterações do banco central;
+# escritas feitas sem conexão ficam numa fila local e são reenviadas quando a conexão volta.
+# Entradas e saídas da portaria seguem o mesmo caminho: a placa é identificada pela réplica e a
+# sessão vai ao banco central ou, sem conexão, à réplica e à fila (servidor_portaria.py --replica).
+
+import json
+import threading
+import time
+from datetime import datetime
+
+import cliente_crud
+import sessao_crud
+import veiculo_crud
+from backends import backend_da_conexao, criar_backend, ERRO_CONEXAO, ERRO_REFERENCIA_INEXISTENTE
+from cache_consultas import cache_cadastro
+from db_config import REPLICA_CONFIG
+from db_utils import (PoolConexoes, conexao_dedicada, criar_pool, desfazer, executar_muitos, executar_query,
+                      iterar_query, limpar_erro, transacao, ultimo_erro)
+from log_alteracoes import executar_com_log
+from mensagens import informar
+from placas import normalizar_placa
+
+TAMANHO_LOTE_SINCRONIZACAO = 1000
+
+_ESQUEMA_REPLICA = (
+    "CREATE TABLE IF NOT EXISTS replica_estado (chave TEXT PRIMARY KEY, valor TEXT NOT NULL)",
+    """CREATE TABLE IF NOT EXISTS fila_offline (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        operacao TEXT NOT NULL,
+        dados TEXT NOT NULL,
+        criado_em DATETIME NOT NULL)""",
+    """CREATE TABLE IF NOT EXISTS ids_provisorios (
+        tabela TEXT NOT NULL,
+        id_provisorio INTEGER NOT NULL,
+        id_definitivo INTEGER NOT NULL,
+        PRIMARY KEY (tabela, id_provisorio))""",
+    """CREATE TABLE IF NOT EXISTS conflitos_replica (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        operacao TEXT NOT NULL,
+        dados TEXT NOT NULL,
+        motivo TEXT NOT NULL,
+        momento DATETIME NOT NULL)""",
+)
+
+# Grava a versão do banco central de um registro mantendo o mesmo ID
+UPSERT_CLIENTE = ("INSERT INTO clientes (id, nome, endereco, cpf, telefone) VALUES (%s, %s, %s, %s, %s) "
+                  "ON CONFLICT(id) DO UPDATE SET nome = excluded.nome, endereco = excluded.endereco, "
+                  "cpf = excluded.cpf, telefone = excluded.telefone")
+UPSERT_VEICULO = ("INSERT INTO veiculos (id, marca, modelo, ano, placa, cliente_id) VALUES (%s, %s, %s, %s, %s, %s) "
+                  "ON CONFLICT(id) DO UPDATE SET marca = excluded.marca, modelo = excluded.modelo, "
+                  "ano = excluded.ano, placa = excluded.placa, cliente_id = excluded.cliente_id")
+
+def _params_cliente(cliente):
+    return (cliente['id'], cliente['nome'], cliente['endereco'], cliente['cpf'], cliente['telefone'])
+
+def _params_veiculo(veiculo):
+    return (veiculo['id'], veiculo['marca'], veiculo['modelo'], veiculo['ano'], veiculo['placa'], veiculo['cliente_id'])
+
+def _em_blocos(linhas, tamanho):
+    bloco = []
+    for linha in linhas:
+        bloco.append(linha)
+        if len(bloco) >= tamanho:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+def _marcadores(valores):
+    return ", ".join(["%s"] * len(valores))
+
+
+class ReplicaLocal:
+    """
+    Réplica de 'clientes' e 'veiculos' mantida em um arquivo SQLite na cabine.
+
+    - Leituras (consultar_*) usam sempre a réplica local.
+    - Escritas vão direto ao banco central quando ele responde; sem conexão, são aplicadas
+      na réplica com IDs provisórios (negativos) e guardadas em 'fila_offline'.
+    - Entradas e saídas (registrar_entrada/registrar_saida) identificam a placa pela réplica e gravam a
+      sessão da mesma forma; sessões abertas offline ficam na tabela 'sessoes' da réplica.
+    - sincronizar() reenvia a fila e depois aplica as entradas novas do log de alterações.
+      Conflitos de CPF/placa no reenvio seguem a 'politica_conflito' e ficam em 'conflitos_replica'.
+    """
+
+    def __init__(self, central, pool_local, politica_conflito):
+        self.central = central
+        self.local = pool_local
+        self.politica_conflito = politica_conflito
+        self._conflitos_resolvidos = 0
+        self.sessoes_sem_central = False # Índice de ocupação carregado sem o banco central (ver carregar_sessoes_abertas)
+
+    # --- Estado e disponibilidade ---
+
+    def central_disponivel(self):
+        """Testa se o banco central responde (ping na conexão emprestada)."""
+        with conexao_dedicada(self.central) as conexao:
+            return conexao is not None and backend_da_conexao(conexao).verificar(conexao)
+
+    def _estado(self, chave, padrao=None):
+        linha = executar_query(self.local, "SELECT valor FROM replica_estado WHERE chave = %s", (chave,), fetch_one=True)
+        return linha['valor'] if linha else padrao
+
+    def _gravar_estado(self, conexao_local, chave, valor, commit):
+        query = ("INSERT INTO replica_estado (chave, valor) VALUES (%s, %s) "
+                 "ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor")
+        return executar_query(conexao_local, query, (chave, str(valor)), commit=commit)
+
+    def pendencias(self):
+        """Quantidade de escritas offline aguardando envio ao banco central."""
+        linha = executar_query(self.local, "SELECT COUNT(*) AS total FROM fila_offline", fetch_one=True)
+        return linha['total'] if linha else 0
+
+    # --- Sincronização ---
+
+    def sincronizar(self):
+        """
+        Reenvia as escritas offline e aplica as alterações novas do banco central.
+
+        Returns:
+            dict or None: 'enviadas', 'conflitos' e 'recebidas', ou None se o banco central não está acessível.
+        """
+        if not self.central_disponivel():
+            return None
+        enviadas, conflitos, completa = self._reenviar_fila()
+        if not completa:
+            return None
+        if self._estado('ultimo_log_id') is None:
+            recebidas = self._copia_inicial()
+        else:
+            recebidas = self._puxar_alteracoes()
+        if recebidas is None:
+            return None
+        return {'enviadas': enviadas, 'conflitos': conflitos, 'recebidas': recebidas}
+
+    def _copia_inicial(self):
+        """Copia todas as tabelas do banco central e marca a posição atual do log."""
+        # A posição do log é lida antes da cópia: alterações feitas durante a cópia serão reaplicadas depois
+        ultimo = executar_query(self.central, "SELECT COALESCE(MAX(id), 0) AS ultimo FROM log_alteracoes", fetch_one=True)
+        if ultimo is None:
+            return None
+
+        with conexao_dedicada(self.local) as conexao_local:
+            if executar_query(conexao_local, "DELETE FROM clientes") is None:
+                desfazer(conexao_local)
+                return None
+            copiados = 0
+            # Colunas na ordem dos parâmetros do UPSERT: as tuplas lidas vão direto para o executemany
+            consultas = (
+                ("SELECT id, nome, endereco, cpf, telefone FROM clientes ORDER BY id", UPSERT_CLIENTE),
+                ("SELECT id, marca, modelo, ano, placa, cliente_id FROM veiculos ORDER BY id", UPSERT_VEICULO),
+            )
+            for query, upsert in consultas:
+                for bloco in _em_blocos(iterar_query(self.central, query, formato='tupla'), TAMANHO_LOTE_SINCRONIZACAO):
+                    if executar_muitos(conexao_local, upsert, bloco, commit=False) is None:
+                        return None
+                    copiados += len(bloco)
+            if self._gravar_estado(conexao_local, 'ultimo_log_id', ultimo['ultimo'], commit=True) is None:
+                return None
+        cache_cadastro.limpar()
+        return copiados
+
+    def _puxar_alteracoes(self):
+        """Aplica na réplica, em lotes, as entradas do log posteriores à última aplicada."""
+        ultimo_id = int(self._estado('ultimo_log_id', 0))
+        recebidas = 0
+        while True:
+            entradas = executar_query(
+                self.central,
+                "SELECT id, tabela, registro_id, chave FROM log_alteracoes WHERE id > %s ORDER BY id LIMIT %s",
+                (ultimo_id, TAMANHO_LOTE_SINCRONIZACAO), fetch_all=True)
+            if entradas is None:
+                return None
+            if not entradas:
+                return recebidas
+            if not self._aplicar_alteracoes(entradas):
+                return None
+            ultimo_id = entradas[-1]['id']
+            recebidas += len(entradas)
+
+    def _buscar_centrais(self, colunas, tabela, coluna_chave, ids, chaves):
+        """Busca no banco central, em conjunto, os registros atuais pelos IDs e chaves naturais."""
+        linhas = {}
+        for coluna, valores in (('id', ids), (coluna_chave, chaves)):
+            if not valores:
+                continue
+            valores = list(valores)
+            query = f"SELECT {colunas} FROM {tabela} WHERE {coluna} IN ({_marcadores(valores)})"
+            resultado = executar_query(self.central, query, tuple(valores), fetch_all=True)
+            if resultado is None:
+                return None
+            for linha in resultado:
+                linhas[linha['id']] = linha
+        return linhas
+
+    def _aplicar_alteracoes(self, entradas):
+        """
+        Aplica um lote do log. Cada registro citado é relido no banco central: se existe, a versão
+        central é gravada na réplica; se não existe mais, é excluído da réplica.
+        """
+        ids = {'clientes': set(), 'veiculos': set()}
+        chaves = {'clientes': set(), 'veiculos': set()}
+        for entrada in entradas:
+            if entrada['registro_id'] is not None:
+                ids[entrada['tabela']].add(entrada['registro_id'])
+            if entrada['chave'] is not None:
+                chaves[entrada['tabela']].add(entrada['chave'])
+
+        clientes = self._buscar_centrais("id, nome, endereco, cpf, telefone", "clientes", "cpf",
+                                         ids['clientes'], chaves['clientes'])
+        veiculos = self._buscar_centrais("id, marca, modelo, ano, placa, cliente_id", "veiculos", "placa",
+                                         ids['veiculos'], chaves['veiculos'])
+        if clientes is None or veiculos is None:
+            return False
+
+        clientes_removidos = ids['clientes'] - set(clientes)
+        cpfs_removidos = chaves['clientes'] - {cliente['cpf'] for cliente in clientes.values()}
+        veiculos_removidos = ids['veiculos'] - set(veiculos)
+        placas_removidas = chaves['veiculos'] - {veiculo['placa'] for veiculo in veiculos.values()}
+
+        comandos = [
+            # Um registro local com o mesmo CPF/placa e outro ID (ex.: provisório) dá lugar à versão central
+            ("DELETE FROM clientes WHERE cpf = %s AND id <> %s", [(c['cpf'], c['id']) for c in clientes.values()]),
+            (UPSERT_CLIENTE, [_params_cliente(c) for c in clientes.values()]),
+            ("DELETE FROM veiculos WHERE placa = %s AND id <> %s", [(v['placa'], v['id']) for v in veiculos.values()]),
+            (UPSERT_VEICULO, [_params_veiculo(v) for v in veiculos.values()]),
+            ("DELETE FROM veiculos WHERE id = %s", [(veiculo_id,) for veiculo_id in veiculos_removidos]),
+            ("DELETE FROM veiculos WHERE placa = %s", [(placa,) for placa in placas_removidas]),
+            # A exclusão de um cliente remove seus veículos na réplica também (ON DELETE CASCADE)
+            ("DELETE FROM clientes WHERE id = %s", [(cliente_id,) for cliente_id in clientes_removidos]),
+            ("DELETE FROM clientes WHERE cpf = %s", [(cpf,) for cpf in cpfs_removidos]),
+        ]
+        with conexao_dedicada(self.local) as conexao_local:
+            for query, lista_params in comandos:
+                if executar_muitos(conexao_local, query, lista_params, commit=False) is None:
+                    return False
+            if self._gravar_estado(conexao_local, 'ultimo_log_id', entradas[-1]['id'], commit=True) is None:
+                return False
+
+        for cliente_id in ids['clientes'] | set(clientes):
+            cache_cadastro.invalidar_cliente(self.local, cliente_id)
+        for veiculo_id in ids['veiculos'] | set(veiculos):
+            cache_cadastro.invalidar_veiculo(self.local, veiculo_id)
+        return True
+
+    # --- Fila de escritas offline ---
+
+    def _enfileirar(self, conexao_local, operacao, dados):
+        query = "INSERT INTO fila_offline (operacao, dados, criado_em) VALUES (%s, %s, %s)"
+        return executar_query(conexao_local, query, (operacao, json.dumps(dados), datetime.now()), commit=True)
+
+    def _proximo_id_provisorio(self, conexao_local, tabela):
+        linha = executar_query(conexao_local, f"SELECT MIN(id) AS menor FROM {tabela}", fetch_one=True)
+        menor = linha['menor'] if linha and linha['menor'] is not None else 0
+        return min(menor, 0) - 1
+
+    def _id_definitivo(self, tabela, registro_id):
+        """Traduz um ID provisório (negativo) para o ID recebido do banco central, se já houver."""
+        if registro_id is None or registro_id > 0:
+            return registro_id
+        linha = executar_query(self.local,
+                               "SELECT id_definitivo FROM ids_provisorios WHERE tabela = %s AND id_provisorio = %s",
+                               (tabela, registro_id), fetch_one=True)
+        return linha['id_definitivo'] if linha else None
+
+    def _reenviar_fila(self):
+        """
+        Reenvia, em ordem, as escritas guardadas enquanto o banco central estava inacessível.
+
+        Returns:
+            tuple: (enviadas, conflitos, completa); completa é False se a conexão caiu no meio do reenvio.
+        """
+        pendentes = executar_query(self.local, "SELECT id, operacao, dados FROM fila_offline ORDER BY id", fetch_all=True)
+        if pendentes is None:
+            return 0, 0, False
+        enviadas = 0
+        self._conflitos_resolvidos = conflitos = 0
+        for item in pendentes:
+            resultado = self._reenviar(item['operacao'], json.loads(item['dados']))
+            if resultado == 'offline':
+                return enviadas, conflitos + self._conflitos_resolvidos, False
+            # O registro do resultado e a retirada da fila são uma só transação local: se um deles falha, o item
+            # continua na fila e o reenvio para aqui, porque os itens seguintes podem depender do ID traduzido
+            with transacao(self.local) as tx:
+                if isinstance(resultado, tuple):
+                    tabela, id_provisorio, id_definitivo = resultado
+                    registrado = executar_query(self.local, "INSERT OR REPLACE INTO ids_provisorios VALUES (%s, %s, %s)",
+                                                (tabela, id_provisorio, id_definitivo))
+                elif resultado is not True:
+                    registrado = executar_query(
+                        self.local, "INSERT INTO conflitos_replica (operacao, dados, motivo, momento) VALUES (%s, %s, %s, %s)",
+                        (item['operacao'], item['dados'], resultado, datetime.now()))
+                else:
+                    registrado = True
+                if registrado is None or executar_query(self.local, "DELETE FROM fila_offline WHERE id = %s",
+                                                        (item['id'],)) is None:
+                    tx.desfazer()
+            if not tx.confirmada:
+                informar(f"Falha ao registrar na réplica local o reenvio do item {item['id']}; ele continua na fila.")
+                return enviadas, conflitos + self._conflitos_resolvidos, False
+            if isinstance(resultado, tuple) and resultado[0] == 'sessoes':
+                sessao_crud.indice_ocupacao.renumerar(resultado[1], resultado[2])
+            elif not isinstance(resultado, tuple) and resultado is not True:
+                conflitos += 1
+            enviadas += 1
+        conflitos += self._conflitos_resolvidos
+
+        if pendentes:
+            # Os registros provisórios dão lugar às versões definitivas, trazidas pelo log na sequência
+            with conexao_dedicada(self.local) as conexao_local:
+                veiculos = executar_query(conexao_local, "SELECT id FROM veiculos WHERE id < 0", fetch_all=True, formato='tupla')
+                clientes = executar_query(conexao_local, "SELECT id FROM clientes WHERE id < 0", fetch_all=True, formato='tupla')
+                executar_query(conexao_local, "DELETE FROM veiculos WHERE id < 0")
+                executar_query(conexao_local, "DELETE FROM clientes WHERE id < 0")
+                executar_query(conexao_local, "DELETE FROM sessoes WHERE id < 0")
+                executar_query(conexao_local, "DELETE FROM ids_provisorios", commit=True)
+            # As consultas por CPF e placa não podem continuar devolvendo o registro de ID provisório
+            for veiculo_id, in veiculos or ():
+                cache_cadastro.invalidar_veiculo(self.local, veiculo_id)
+            for cliente_id, in clientes or ():
+                cache_cadastro.invalidar_cliente(self.local, cliente_id)
+        return enviadas, conflitos, True
+
+    def _falha(self, motivo):
+        """Diferencia uma queda de conexão (tentar de novo depois) de uma recusa do banco (conflito)."""
+        return 'offline' if not self.central_disponivel() else motivo
+
+    def _reenviar(self, operacao, dados):
+        """
+        Reenvia uma escrita ao banco central.
+
+        Returns:
+            True se aplicada; uma tupla (tabela, id_provisorio, id_definitivo) para inclusões;
+            'offline' se a conexão caiu; ou o texto do conflito encontrado.
+        """
+        vence_local = self.politica_conflito == 'local'
+
+        if operacao == 'adicionar_cliente':
+            existentes = cliente_crud.consultar_ids_por_cpfs(self.central, [dados['cpf']])
+            if existentes is None:
+                return self._falha("Falha ao verificar o CPF no servidor.")
+            if dados['cpf'] in existentes:
+                id_central = existentes[dados['cpf']]
+                if vence_local:
+                    cliente_crud.atualizar_cliente(self.central, id_central, dados['nome'], dados['endereco'], dados['telefone'])
+                self._registrar_conflito_resolvido(operacao, dados, f"CPF {dados['cpf']} já cadastrado no servidor "
+                                                   f"(ID {id_central}); prevaleceu a versão {'local' if vence_local else 'do servidor'}.")
+                return ('clientes', dados['id'], id_central)
+            novo_id = cliente_crud.adicionar_cliente(self.central, dados['nome'], dados['endereco'], dados['cpf'], dados['telefone'])
+            return ('clientes', dados['id'], novo_id) if novo_id else self._falha("Servidor recusou a inclusão do cliente.")
+
+        if operacao == 'adicionar_veiculo':
+            cliente_id = self._id_definitivo('clientes', dados['cliente_id'])
+            if cliente_id is None:
+                return "Cliente provisório do veículo não foi enviado ao servidor."
+            existentes = veiculo_crud.consultar_placas_existentes(self.central, [dados['placa']])
+            if existentes is None:
+                return self._falha("Falha ao verificar a placa no servidor.")
+            if dados['placa'] in existentes:
+                veiculo = executar_query(self.central, "SELECT id FROM veiculos WHERE placa = %s", (dados['placa'],), fetch_one=True)
+                if veiculo is None:
+                    return self._falha("Falha ao buscar o veículo no servidor.")
+                if vence_local:
+                    veiculo_crud.atualizar_veiculo(self.central, veiculo['id'], dados['marca'], dados['modelo'], dados['ano'], cliente_id)
+                self._registrar_conflito_resolvido(operacao, dados, f"Placa {dados['placa']} já cadastrada no servidor "
+                                                   f"(ID {veiculo['id']}); prevaleceu a versão {'local' if vence_local else 'do servidor'}.")
+                return ('veiculos', dados['id'], veiculo['id'])
+            novo_id = veiculo_crud.adicionar_veiculo(self.central, dados['marca'], dados['modelo'], dados['ano'],
+                                                     dados['placa'], cliente_id)
+            return ('veiculos', dados['id'], novo_id) if novo_id else self._falha("Servidor recusou a inclusão do veículo.")
+
+        if operacao == 'atualizar_cliente':
+            cliente_id = self._id_definitivo('clientes', dados['cliente_id'])
+            if cliente_id is None or not cliente_crud.atualizar_cliente(self.central, cliente_id, dados['nome'],
+                                                                        dados['endereco'], dados['telefone']):
+                return self._falha("Cliente não existe mais no servidor; a alteração foi descartada.")
+            return True
+
+        if operacao == 'atualizar_veiculo':
+            veiculo_id = self._id_definitivo('veiculos', dados['veiculo_id'])
+            cliente_id = self._id_definitivo('clientes', dados['cliente_id_novo'])
+            if veiculo_id is None or not veiculo_crud.atualizar_veiculo(self.central, veiculo_id, dados['marca'],
+                                                                        dados['modelo'], dados['ano'], cliente_id):
+                return self._falha("Veículo não existe mais no servidor; a alteração foi descartada.")
+            return True
+
+        if operacao in ('excluir_cliente', 'excluir_veiculo'):
+            tabela = 'clientes' if operacao == 'excluir_cliente' else 'veiculos'
+            registro_id = self._id_definitivo(tabela, dados['id'])
+            if registro_id is None:
+                return True # Registro provisório que nunca chegou ao servidor
+            # Direto pelo log: aqui uma exclusão de registro que já não existe (0 linhas) não é falha
+            comando = cliente_crud.EXCLUIR_CLIENTE if tabela == 'clientes' else veiculo_crud.EXCLUIR_VEICULO
+            if executar_com_log(self.central, comando, (registro_id,), tabela, 'DELETE', registro_id=registro_id) is None:
+                return self._falha("Servidor recusou a exclusão.")
+            if tabela == 'clientes':
+                cache_cadastro.invalidar_cliente(self.central, registro_id)
+            else:
+                cache_cadastro.invalidar_veiculo(self.central, registro_id)
+            return True
+
+        if operacao == 'registrar_entrada':
+            # Veículo provisório que não chegou ao servidor: a sessão fica como avulsa
+            veiculo_id = self._id_definitivo('veiculos', dados['veiculo_id'])
+            sessao_id = executar_query(self.central, sessao_crud.INSERIR_SESSAO,
+                                       (dados['placa'], veiculo_id, datetime.fromisoformat(dados['entrada'])), commit=True)
+            if not sessao_id:
+                return self._falha(f"Servidor recusou a entrada da placa '{dados['placa']}' (já estava no pátio?).")
+            return ('sessoes', dados['id'], sessao_id)
+
+        if operacao == 'registrar_saida':
+            sessao_id = self._id_definitivo('sessoes', dados['sessao_id'])
+            if sessao_id is None:
+                # Entrada reenviada em uma sincronização anterior: a sessão aberta da placa no servidor
+                sessao = executar_query(self.central, "SELECT id FROM sessoes WHERE placa = %s AND saida IS NULL",
+                                        (dados['placa'],), fetch_one=True)
+                if sessao is None:
+                    return self._falha(f"Nenhuma sessão aberta da placa '{dados['placa']}' no servidor.")
+                sessao_id = sessao['id']
+            params = (datetime.fromisoformat(dados['saida']), self._id_definitivo('clientes', dados['cliente_id']),
+                      dados['valor_centavos'], sessao_id)
+            encerradas = executar_query(self.central, sessao_crud.ENCERRAR_SESSAO, params, commit=True)
+            if encerradas is None:
+                return self._falha(f"Servidor recusou a saída da placa '{dados['placa']}'.")
+            return True if encerradas else f"A sessão da placa '{dados['placa']}' já estava encerrada no servidor."
+
+        return f"Operação desconhecida na fila: '{operacao}'."
+
+    def _registrar_conflito_resolvido(self, operacao, dados, motivo):
+        self._conflitos_resolvidos += 1
+        executar_query(self.local,
+                       "INSERT INTO conflitos_replica (operacao, dados, motivo, momento) VALUES (%s, %s, %s, %s)",
+                       (operacao, json.dumps(dados), motivo, datetime.now()), commit=True)
+        informar(f"Conflito ao sincronizar: {motivo}")
+
+    # --- Consultas (sempre na réplica local) ---
+
+    def consultar_veiculo_por_placa(self, placa):
+        """Consulta um veículo pela placa na réplica local (funciona sem conexão com o banco central)."""
+        return veiculo_crud.consultar_veiculo_por_placa(self.local, placa)
+
+    def consultar_cliente_por_cpf(self, cpf):
+        """Consulta um cliente pelo CPF na réplica local (funciona sem conexão com o banco central)."""
+        return cliente_crud.consultar_cliente_por_cpf(self.local, cpf)
+
+    # --- Escritas (no banco central, ou na fila offline) ---
+
+    def _escrever_offline(self, operacao, dados, *comandos_locais):
+        """Aplica a escrita na réplica e a enfileira, na mesma transação local."""
+        with conexao_dedicada(self.local) as conexao_local:
+            for query, params in comandos_locais:
+                if executar_query(conexao_local, query, params) is None:
+                    desfazer(conexao_local)
+                    return False
+            if self._enfileirar(conexao_local, operacao, dados) is None:
+                return False
+        informar("Sem conexão com o servidor central: alteração gravada na réplica local e enfileirada para envio.")
+        return True
+
+    def adicionar_cliente(self, nome, endereco, cpf, telefone):
+        """Como cliente_crud.adicionar_cliente; offline, retorna um ID provisório (negativo)."""
+        if self.central_disponivel():
+            cliente_id = cliente_crud.adicionar_cliente(self.central, nome, endereco, cpf, telefone)
+            self._puxar_alteracoes()
+            return cliente_id
+        with conexao_dedicada(self.local) as conexao_local:
+            cliente_id = self._proximo_id_provisorio(conexao_local, 'clientes')
+        dados = {'id': cliente_id, 'nome': nome, 'endereco': endereco, 'cpf': cpf, 'telefone': telefone}
+        if not self._escrever_offline('adicionar_cliente', dados,
+                                      ("INSERT INTO clientes (id, nome, endereco, cpf, telefone) VALUES (%s, %s, %s, %s, %s)",
+                                       (cliente_id, nome, endereco, cpf, telefone))):
+            informar(f"Falha ao adicionar cliente '{nome}' na réplica. Verifique se o CPF já está cadastrado.")
+            return None
+        return cliente_id
+
+    def adicionar_veiculo(self, marca, modelo, ano, placa, cliente_id):
+        """Como veiculo_crud.adicionar_veiculo; offline, retorna um ID provisório (negativo)."""
+        if self.central_disponivel():
+            veiculo_id = veiculo_crud.adicionar_veiculo(self.central, marca, modelo, ano, placa, cliente_id)
+            self._puxar_alteracoes()
+            return veiculo_id
+        placa_canonica = normalizar_placa(placa) # Gravada como no banco central, para o reenvio cair na mesma placa
+        if placa_canonica is None:
+            informar(f"Placa '{placa}' em formato inválido. Não é possível adicionar o veículo.")
+            return None
+        placa = placa_canonica
+        with conexao_dedicada(self.local) as conexao_local:
+            veiculo_id = self._proximo_id_provisorio(conexao_local, 'veiculos')
+        dados = {'id': veiculo_id, 'marca': marca, 'modelo': modelo, 'ano': ano, 'placa': placa, 'cliente_id': cliente_id}
+        if not self._escrever_offline('adicionar_veiculo', dados,
+                                      ("INSERT INTO veiculos (id, marca, modelo, ano, placa, cliente_id) VALUES (%s, %s, %s, %s, %s, %s)",
+                                       (veiculo_id, marca, modelo, ano, placa, cliente_id))):
+            informar(f"Falha ao adicionar veículo {marca} {modelo} na réplica. Verifique a placa e o cliente.")
+            return None
+        return veiculo_id
+
+    def atualizar_cliente(self, cliente_id, nome=None, endereco=None, telefone=None):
+        """Como cliente_crud.atualizar_cliente."""
+        if self.central_disponivel():
+            resultado = cliente_crud.atualizar_cliente(self.central, cliente_id, nome, endereco, telefone)
+            self._puxar_alteracoes()
+            return resultado
+        dados = {'cliente_id': cliente_id, 'nome': nome, 'endereco': endereco, 'telefone': telefone}
+        campos = {campo: valor for campo, valor in dados.items() if campo != 'cliente_id' and valor}
+        if not campos:
+            informar("Nenhum dado fornecido para atualização ou os dados fornecidos estão vazios.")
+            return False
+        query = f"UPDATE clientes SET {', '.join(f'{campo} = %s' for campo in campos)} WHERE id = %s"
+        resultado = self._escrever_offline('atualizar_cliente', dados, (query, (*campos.values(), cliente_id)))
+        cache_cadastro.invalidar_cliente(self.local, cliente_id)
+        return resultado
+
+    def atualizar_veiculo(self, veiculo_id, marca=None, modelo=None, ano=None, cliente_id_novo=None):
+        """Como veiculo_crud.atualizar_veiculo."""
+        if self.central_disponivel():
+            resultado = veiculo_crud.atualizar_veiculo(self.central, veiculo_id, marca, modelo, ano, cliente_id_novo)
+            self._puxar_alteracoes()
+            return resultado
+        dados = {'veiculo_id': veiculo_id, 'marca': marca, 'modelo': modelo, 'ano': ano, 'cliente_id_novo': cliente_id_novo}
+        campos = {'marca': marca, 'modelo': modelo, 'ano': ano, 'cliente_id': cliente_id_novo}
+        campos = {campo: valor for campo, valor in campos.items() if valor not in (None, "")}
+        if not campos:
+            informar("Nenhum dado válido fornecido para atualização do veículo.")
+            return False
+        query = f"UPDATE veiculos SET {', '.join(f'{campo} = %s' for campo in campos)} WHERE id = %s"
+        resultado = self._escrever_offline('atualizar_veiculo', dados, (query, (*campos.values(), veiculo_id)))
+        cache_cadastro.invalidar_veiculo(self.local, veiculo_id)
+        return resultado
+
+    def excluir_cliente(self, cliente_id):
+        """Como cliente_crud.excluir_cliente (a confirmação cabe à interface)."""
+        if self.central_disponivel():
+            resultado = cliente_crud.excluir_cliente(self.central, cliente_id)
+            self._puxar_alteracoes()
+            return resultado
+        resultado = self._escrever_offline('excluir_cliente', {'id': cliente_id},
+                                           ("DELETE FROM clientes WHERE id = %s", (cliente_id,)))
+        cache_cadastro.invalidar_cliente(self.local, cliente_id)
+        return resultado
+
+    def excluir_veiculo(self, veiculo_id):
+        """Como veiculo_crud.excluir_veiculo (a confirmação cabe à interface)."""
+        if self.central_disponivel():
+            resultado = veiculo_crud.excluir_veiculo(self.central, veiculo_id)
+            self._puxar_alteracoes()
+            return resultado
+        resultado = self._escrever_offline('excluir_veiculo', {'id': veiculo_id},
+                                           ("DELETE FROM veiculos WHERE id = %s", (veiculo_id,)))
+        cache_cadastro.invalidar_veiculo(self.local, veiculo_id)
+        return resultado
+
+    # --- Entradas e saídas da portaria ---
+
+    def _central_para_escrita(self):
+        """As sessões vão direto ao banco central se ele responde e não há escritas anteriores na fila."""
+        return not self.pendencias() and self.central_disponivel()
+
+    def registrar_entrada(self, placa, momento=None):
+        """Como sessao_crud.registrar_entrada; offline, a sessão recebe um ID provisório (negativo)."""
+        return sessao_crud.registrar_entrada(self.local, placa, momento, abrir_sessao=self._abrir_sessao)
+
+    def registrar_saida(self, placa, momento=None):
+        """Como sessao_crud.registrar_saida; offline, a saída é gravada na fila e o valor é cobrado na hora."""
+        return sessao_crud.registrar_saida(self.local, placa, momento, encerrar_sessao=self._encerrar_sessao)
+
+    def tipos_evento(self):
+        """TIPOS_EVENTO de fila_eventos.py gravados pela réplica (iniciar a fila com o pool self.local)."""
+        return {'entrada': lambda _local, placa, momento=None: self.registrar_entrada(placa, momento),
+                'saida': lambda _local, placa, momento=None: self.registrar_saida(placa, momento)}
+
+    def _abrir_sessao(self, placa, veiculo_id, entrada):
+        if self._central_para_escrita():
+            sessao_id = executar_query(self.central, sessao_crud.INSERIR_SESSAO, (placa, veiculo_id, entrada), commit=True)
+            if sessao_id is None and ultimo_erro() == ERRO_REFERENCIA_INEXISTENTE:
+                self._puxar_alteracoes() # Veículo excluído no servidor: a nova tentativa lê a réplica atualizada
+            if sessao_id is not None or ultimo_erro() != ERRO_CONEXAO:
+                return sessao_id
+            limpar_erro() # A conexão caiu durante o INSERT: a sessão vai para a fila
+        with conexao_dedicada(self.local) as conexao_local:
+            sessao_id = self._proximo_id_provisorio(conexao_local, 'sessoes')
+        dados = {'id': sessao_id, 'placa': placa, 'veiculo_id': veiculo_id, 'entrada': entrada.isoformat()}
+        if not self._escrever_offline('registrar_entrada', dados,
+                                      ("INSERT INTO sessoes (id, placa, veiculo_id, entrada) VALUES (%s, %s, %s, %s)",
+                                       (sessao_id, placa, veiculo_id, entrada))):
+            return None
+        return sessao_id
+
+    def _encerrar_sessao(self, placa, sessao_id, saida, cliente_id, valor_centavos):
+        if sessao_id > 0 and self._central_para_escrita():
+            encerradas = executar_query(self.central, sessao_crud.ENCERRAR_SESSAO,
+                                        (saida, cliente_id, valor_centavos, sessao_id), commit=True)
+            if encerradas is not None or ultimo_erro() != ERRO_CONEXAO:
+                return encerradas
+            limpar_erro()
+        dados = {'sessao_id': sessao_id, 'placa': placa, 'saida': saida.isoformat(),
+                 'cliente_id': cliente_id, 'valor_centavos': valor_centavos}
+        # Só as sessões abertas offline existem na réplica
+        comandos = [("UPDATE sessoes SET saida = %s WHERE id = %s", (saida, sessao_id))] if sessao_id < 0 else []
+        return 1 if self._escrever_offline('registrar_saida', dados, *comandos) else None
+
+    def carregar_sessoes_abertas(self):
+        """
+        Carrega o índice de ocupação com as sessões abertas do banco central e as abertas offline ainda na fila.
+        Sem o banco central, apenas as da réplica são carregadas (sessoes_sem_central fica True) e
+        iniciar_sincronizacao recarrega o índice depois da primeira sincronização completa.
+
+        Returns:
+            int or None: Quantidade de veículos no pátio, ou None em caso de erro.
+        """
+        sessoes = []
+        self.sessoes_sem_central = not self.central_disponivel()
+        if not self.sessoes_sem_central:
+            sessoes = executar_query(self.central, sessao_crud.CONSULTA_SESSOES_ABERTAS, fetch_all=True)
+            if sessoes is None:
+                informar("Falha ao carregar as sessões abertas do banco central.")
+                return None
+        locais = executar_query(self.local, sessao_crud.CONSULTA_SESSOES_ABERTAS, fetch_all=True)
+        if locais is None:
+            informar("Falha ao carregar as sessões abertas da réplica.")
+            return None
+        sessoes = sessoes + locais
+        sessao_crud.indice_ocupacao.carregar(sessoes)
+        return len(sessoes)
+
+
+def criar_replica(central, caminho=None, politica_conflito=None):
+    """
+    Abre (ou cria) a réplica local de uma cabine.
+
+    Args:
+        central: Conexão ou PoolConexoes do banco central.
+        caminho (str, optional): Arquivo SQLite da réplica. Defaults to REPLICA_CONFIG['caminho'].
+        politica_conflito (str, optional): 'servidor' ou 'local'. Defaults to REPLICA_CONFIG['politica_conflito'].
+
+    Returns:
+        ReplicaLocal or None: A réplica pronta para uso, ou None se o arquivo local não pôde ser aberto.
+    """
+    politica_conflito = politica_conflito or REPLICA_CONFIG['politica_conflito']
+    if politica_conflito not in ('servidor', 'local'):
+        raise ValueError("politica_conflito deve ser 'servidor' ou 'local'.")
+    backend = criar_backend('sqlite', {'caminho': caminho or REPLICA_CONFIG['caminho'], 'esquema': None})
+    pool_local = criar_pool(backend=backend)
+    if pool_local is None:
+        return None
+    for comando in _ESQUEMA_REPLICA:
+        executar_query(pool_local, comando, commit=True)
+    return ReplicaLocal(central, pool_local, politica_conflito)
+
+
+def iniciar_sincronizacao(replica, intervalo=None):
+    """
+    Inicia uma thread (daemon) que sincroniza a réplica periodicamente. Se o índice de ocupação foi
+    carregado sem o banco central, ele é recarregado na primeira sincronização sem escritas pendentes.
+
+    Args:
+        replica (ReplicaLocal): Réplica da cabine.
+        intervalo (float, optional): Segundos entre sincronizações. Defaults to REPLICA_CONFIG['intervalo_sincronizacao'].
+
+    Returns:
+        threading.Event: Sinalize (set()) para encerrar a thread.
+    """
+    intervalo = intervalo or REPLICA_CONFIG['intervalo_sincronizacao']
+    parar = threading.Event()
+
+    def sincronizar_periodicamente():
+        while not parar.wait(intervalo):
+            if replica.sincronizar() is not None and replica.sessoes_sem_central and not replica.pendencias():
+                replica.carregar_sessoes_abertas()
+
+    threading.Thread(target=sincronizar_periodicamente, name="sincronizacao_replica", daemon=True).start()
+    return parar
+
+
+# Laço de sincronização de uma cabine: python replica_local.py
+if __name__ == "__main__":
+    # Sem o banco central na inicialização, a cabine trabalha com a réplica e o pool conecta quando ele voltar
+    pool_central = criar_pool() or PoolConexoes()
+    replica = criar_replica(pool_central)
+    if replica is None:
+        print(f"Não foi possível abrir a réplica local '{REPLICA_CONFIG['caminho']}'.")
+        pool_central.fechar()
+        raise SystemExit(1)
+    intervalo = REPLICA_CONFIG['intervalo_sincronizacao']
+    try:
+        while True:
+            resumo = replica.sincronizar()
+            if resumo is None:
+                print(f"Banco central inacessível; {replica.pendencias()} escrita(s) aguardando envio.")
+            elif any(resumo.values()):
+                print(f"Sincronização: {resumo['enviadas']} enviada(s), {resumo['conflitos']} conflito(s), "
+                      f"{resumo['recebidas']} alteração(ões) recebida(s).")
+            time.sleep(intervalo)
+    except KeyboardInterrupt:
+        print("Sincronização encerrada.")
+    finally:
+        replica.local.fechar()
+        pool_central.fechar()
@@ -0,0 +1,449 @@
+# servidor_portaria.py
+# Serviço HTTP para o hardware da portaria e outros sistemas: consulta de placa ("é assinante?"),
+# consulta de cliente por CPF e cadastro/atualização/exclusão de clientes e veículos, em JSON.
+#
+# As conexões são HTTP/1.1 com keep-alive (a cancela mantém uma conexão aberta e faz várias consultas
+# por ela) e são atendidas por um grupo fixo de threads, que compartilham um único pool de conexões
+# com o banco. As consultas por placa e CPF passam pelo cache de cadastro de veiculo_crud/cliente_crud.
+# Com réplicas em REPLICAS_CONFIG, as consultas vão às réplicas de leitura e os cadastros ao primário
+# (ver db_utils.RoteadorConexoes).
+#
+# Rotas:
+#   GET    /portao/<placa>          {"placa", "cadastrado", "veiculo_id", "cliente_id", "nome_cliente"} (sempre 200);
+#                                   sem a placa exata, traz "candidatos" da busca aproximada (ver abaixo)
+#   GET    /veiculos/placa/<placa>  Veículo e proprietário (404 se não cadastrado)
+#   GET    /veiculos/aproximada/<leitura>  Veículos com placa parecida com a leitura da câmera
+#   GET    /clientes/cpf/<cpf>      Cliente (404 se não cadastrado)
+#   POST   /clientes                {"nome", "cpf", "endereco", "telefone"} -> 201 {"id"}
+#   PUT    /clientes/<id>           {"nome", "endereco", "telefone"} (campos opcionais)
+#   DELETE /clientes/<id>
+#   POST   /veiculos                {"marca", "modelo", "ano", "placa", "cliente_id"} -> 201 {"id"}
+#   PUT    /veiculos/<id>           {"marca", "modelo", "ano", "cliente_id"} (campos opcionais)
+#   DELETE /veiculos/<id>
+#   POST   /eventos/<entrada|saida> {"placa", "momento"} -> 202 {"sequencia"}: leitura de câmera gravada
+#                                   depois, em lote (ver fila_eventos.py); 503 com a fila cheia ou desligada
+#   GET    /saude                   {"ok": true}
+#
+# Respostas de erro: {"erro": categoria, "mensagens": [...]}, com 400 (requisição inválida),
+# 404 (não encontrado), 409 (CPF/placa duplicados ou cliente com vínculos), 422 (proprietário
+# inexistente), 503 (banco indisponível) ou 500. Para medir a vazão, ver carga_portaria.py.
+#
+# Com PORTARIA_CONFIG['busca_aproximada'], o índice de placas (indice_placas.py) é carregado na
+# inicialização e sincronizado periodicamente. Quando a leitura da câmera não é uma placa cadastrada,
+# o portão consulta o índice: se um único veículo difere da leitura apenas por caracteres confundíveis
+# (O/0, I/1, B/8...), ele é reconhecido ("placa_reconhecida"); senão, os candidatos vão na resposta
+# para conferência do operador, e o veículo não é liberado automaticamente.
+#
+# Com --replica (cabine de portaria), consultas, entradas e saídas usam a réplica local de clientes e
+# veículos (replica_local.py): a portaria continua funcionando sem o banco central, e as escritas feitas
+# nesse período ficam na fila offline da réplica até a conexão voltar.
+
+import argparse
+import functools
+import json
+import re
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from backends import (criar_backend, ERRO_CONEXAO, ERRO_DUPLICADO, ERRO_OUTRO,
+                      ERRO_REFERENCIA_INEXISTENTE, ERRO_REFERENCIADO)
+from db_config import MAPA_PLACAS_CONFIG, PORTARIA_CONFIG, REPLICA_CONFIG, SQLITE_CONFIG
+from db_utils import PoolConexoes, criar_roteador, limpar_erro, ultimo_erro
+from fila_eventos import fila_eventos, TIPOS_EVENTO
+from indice_placas import indice_placas, iniciar_sincronizacao
+from mapa_placas import mapa_placas
+from cpf import validar_cpf
+from placas import normalizar_placa, validar_placa
+from mensagens import coletar_mensagens
+from registros import Registro
+from metricas import metricas, iniciar_servidor_metricas
+import cliente_crud
+import replica_local
+import sessao_crud
+import veiculo_crud
+
+# Status HTTP de cada categoria de erro do banco (ver db_utils.ultimo_erro)
+_STATUS_ERRO = {
+    ERRO_DUPLICADO: 409,
+    ERRO_REFERENCIADO: 409,
+    ERRO_REFERENCIA_INEXISTENTE: 422,
+    ERRO_CONEXAO: 503,
+    ERRO_OUTRO: 500,
+}
+
+
+class RequisicaoInvalida(Exception):
+    """Corpo ou parâmetros da requisição fora do formato esperado (resposta 400)."""
+
+
+def _para_json(valor):
+    """Registros (Cliente, Veiculo...) viram objetos JSON; o resto (datas), texto."""
+    return valor.como_dict() if isinstance(valor, Registro) else str(valor)
+
+def _campos(corpo, obrigatorios=(), opcionais=()):
+    """Extrai do corpo JSON os campos esperados; faltando algum obrigatório, a requisição é inválida."""
+    faltando = [campo for campo in obrigatorios if corpo.get(campo) in (None, "")]
+    if faltando:
+        raise RequisicaoInvalida(f"Campos obrigatórios ausentes: {', '.join(faltando)}.")
+    return {campo: corpo.get(campo) for campo in (*obrigatorios, *opcionais)}
+
+def _inteiro(valor, nome):
+    """Converte um ID ou ano recebido em texto ou JSON para int."""
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise RequisicaoInvalida(f"'{nome}' deve ser um número inteiro.") from None
+
+def _falha(status_sem_erro):
+    """Resposta para uma função do CRUD que retornou None/False: o status vem da categoria do erro do banco."""
+    erro = ultimo_erro()
+    if erro is None:
+        return status_sem_erro, {'erro': 'nao_encontrado' if status_sem_erro == 404 else 'falha'}
+    return _STATUS_ERRO.get(erro, 500), {'erro': erro}
+
+
+def _leitura(pool):
+    """Onde as consultas são feitas: na réplica local da cabine (--replica) ou no pool do banco."""
+    return pool.local if isinstance(pool, replica_local.ReplicaLocal) else pool
+
+def _escrita(pool, modulo, nome):
+    """Função de escrita do CRUD: a da réplica (banco central ou fila offline) ou a do módulo, sobre o pool."""
+    if isinstance(pool, replica_local.ReplicaLocal):
+        return getattr(pool, nome)
+    return functools.partial(getattr(modulo, nome), pool)
+
+
+# --- Rotas: cada uma recebe (pool, parametro_da_url, corpo) e retorna (status, dicionário) ---
+# O pool é um PoolConexoes ou, com --replica, a ReplicaLocal da cabine.
+
+def _portao(pool, placa, corpo):
+    pool = _leitura(pool)
+    placa = normalizar_placa(placa) or placa.upper() # Placa ilegível: responde "não cadastrado"
+    if mapa_placas.aberto:
+        encontrado = mapa_placas.consultar(placa)
+        if encontrado is not None:
+            # O proprietário não vem do mapa, que pode ser anterior a uma troca de proprietário
+            return 200, {'placa': placa, 'cadastrado': True, 'veiculo_id': encontrado[0],
+                         'cliente_id': None, 'nome_cliente': None}
+    if mapa_placas.aberto and not MAPA_PLACAS_CONFIG['consultar_banco_se_ausente']:
+        veiculo = None
+    else:
+        veiculo = veiculo_crud.consultar_veiculo_por_placa(pool, placa)
+        if veiculo is None and ultimo_erro() is not None:
+            return _falha(500) # Sem banco não há resposta confiável; a cancela decide o que fazer
+    resposta = {'placa': placa}
+    if veiculo is None and indice_placas.carregado:
+        candidatos = veiculo_crud.consultar_veiculos_por_placa_aproximada(pool, placa)
+        if candidatos is None and ultimo_erro() is not None:
+            return _falha(500)
+        candidatos = candidatos or []
+        resposta['candidatos'] = [{'placa': candidato['placa'], 'distancia': candidato['distancia']}
+                                  for candidato in candidatos]
+        # Só trocas entre caracteres confundíveis e nenhum outro candidato igualmente próximo
+        if candidatos and candidatos[0]['distancia'] == 0 and (len(candidatos) == 1 or candidatos[1]['distancia'] > 0):
+            veiculo = candidatos[0]
+            resposta['placa_reconhecida'] = veiculo['placa']
+    resposta.update({
+        'cadastrado': veiculo is not None,
+        'veiculo_id': veiculo['id'] if veiculo else None,
+        'cliente_id': veiculo['cliente_id'] if veiculo else None,
+        'nome_cliente': veiculo['nome_cliente'] if veiculo else None,
+    })
+    return 200, resposta
+
+def _consultar_veiculo(pool, placa, corpo):
+    if not validar_placa(placa):
+        raise RequisicaoInvalida(f"Placa '{placa}' em formato inválido.")
+    veiculo = veiculo_crud.consultar_veiculo_por_placa(_leitura(pool), placa)
+    return (200, veiculo) if veiculo else _falha(404)
+
+def _consultar_veiculo_aproximado(pool, placa_lida, corpo):
+    veiculos = veiculo_crud.consultar_veiculos_por_placa_aproximada(_leitura(pool), placa_lida)
+    if veiculos is None:
+        return 503, {'erro': 'indice_indisponivel'}
+    return (200, veiculos) if veiculos else _falha(404)
+
+def _consultar_cliente(pool, cpf, corpo):
+    if not validar_cpf(cpf):
+        raise RequisicaoInvalida("O CPF deve ter 11 dígitos numéricos.")
+    cliente = cliente_crud.consultar_cliente_por_cpf(_leitura(pool), cpf)
+    return (200, cliente) if cliente else _falha(404)
+
+def _adicionar_cliente(pool, _, corpo):
+    dados = _campos(corpo, ('nome', 'cpf'), ('endereco', 'telefone'))
+    if not validar_cpf(str(dados['cpf'])):
+        raise RequisicaoInvalida("O CPF deve ter 11 dígitos numéricos.")
+    cliente_id = _escrita(pool, cliente_crud, 'adicionar_cliente')(dados['nome'], dados['endereco'] or "",
+                                                                  str(dados['cpf']), dados['telefone'] or "")
+    return (201, {'id': cliente_id}) if cliente_id else _falha(500)
+
+def _atualizar_cliente(pool, cliente_id, corpo):
+    dados = _campos(corpo, opcionais=('nome', 'endereco', 'telefone'))
+    if not any(dados.values()):
+        raise RequisicaoInvalida("Nenhum campo para atualizar.")
+    atualizado = _escrita(pool, cliente_crud, 'atualizar_cliente')(_inteiro(cliente_id, 'id'), **dados)
+    return (200, {'id': int(cliente_id)}) if atualizado else _falha(404)
+
+def _excluir_cliente(pool, cliente_id, corpo):
+    excluido = _escrita(pool, cliente_crud, 'excluir_cliente')(_inteiro(cliente_id, 'id'))
+    return (200, {'id': int(cliente_id)}) if excluido else _falha(404)
+
+def _adicionar_veiculo(pool, _, corpo):
+    dados = _campos(corpo, ('marca', 'modelo', 'ano', 'placa', 'cliente_id'))
+    placa = str(dados['placa'])
+    if not validar_placa(placa):
+        raise RequisicaoInvalida(f"Placa '{placa}' em formato inválido.")
+    veiculo_id = _escrita(pool, veiculo_crud, 'adicionar_veiculo')(dados['marca'], dados['modelo'],
+                                                                  _inteiro(dados['ano'], 'ano'), placa,
+                                                                  _inteiro(dados['cliente_id'], 'cliente_id'))
+    return (201, {'id': veiculo_id}) if veiculo_id else _falha(500)
+
+def _atualizar_veiculo(pool, veiculo_id, corpo):
+    dados = _campos(corpo, opcionais=('marca', 'modelo', 'ano', 'cliente_id'))
+    if all(valor is None for valor in dados.values()):
+        raise RequisicaoInvalida("Nenhum campo para atualizar.")
+    ano = _inteiro(dados['ano'], 'ano') if dados['ano'] is not None else None
+    cliente_id = _inteiro(dados['cliente_id'], 'cliente_id') if dados['cliente_id'] is not None else None
+    atualizado = _escrita(pool, veiculo_crud, 'atualizar_veiculo')(_inteiro(veiculo_id, 'id'), dados['marca'],
+                                                                  dados['modelo'], ano, cliente_id)
+    return (200, {'id': int(veiculo_id)}) if atualizado else _falha(404)
+
+def _excluir_veiculo(pool, veiculo_id, corpo):
+    excluido = _escrita(pool, veiculo_crud, 'excluir_veiculo')(_inteiro(veiculo_id, 'id'))
+    return (200, {'id': int(veiculo_id)}) if excluido else _falha(404)
+
+def _registrar_evento(pool, tipo, corpo):
+    if tipo not in TIPOS_EVENTO:
+        raise RequisicaoInvalida(f"Tipo de evento '{tipo}' inválido. Use {', '.join(TIPOS_EVENTO)}.")
+    dados = _campos(corpo, ('placa',), ('momento',))
+    momento = None
+    if dados['momento'] is not None:
+        try:
+            momento = datetime.fromisoformat(str(dados['momento']))
+        except ValueError:
+            raise RequisicaoInvalida("'momento' deve estar no formato ISO 8601 (ex.: 2024-05-01T08:30:00).") from None
+    sequencia = fila_eventos.enviar(tipo, str(dados['placa']), momento)
+    if sequencia is None:
+        return 503, {'erro': 'fila_indisponivel'}
+    return 202, {'sequencia': sequencia}
+
+def _saude(pool, _, corpo):
+    return 200, {'ok': True}
+
+# (método, padrão da URL, função); o grupo do padrão, se houver, é o parâmetro passado à função
+ROTAS = [
+    ('GET', re.compile(r"/portao/([^/]+)"), _portao),
+    ('GET', re.compile(r"/veiculos/placa/([^/]+)"), _consultar_veiculo),
+    ('GET', re.compile(r"/veiculos/aproximada/([^/]+)"), _consultar_veiculo_aproximado),
+    ('GET', re.compile(r"/clientes/cpf/([^/]+)"), _consultar_cliente),
+    ('POST', re.compile(r"/clientes()"), _adicionar_cliente),
+    ('PUT', re.compile(r"/clientes/([^/]+)"), _atualizar_cliente),
+    ('DELETE', re.compile(r"/clientes/([^/]+)"), _excluir_cliente),
+    ('POST', re.compile(r"/veiculos()"), _adicionar_veiculo),
+    ('PUT', re.compile(r"/veiculos/([^/]+)"), _atualizar_veiculo),
+    ('DELETE', re.compile(r"/veiculos/([^/]+)"), _excluir_veiculo),
+    ('POST', re.compile(r"/eventos/([^/]+)"), _registrar_evento),
+    ('GET', re.compile(r"/saude()"), _saude),
+]
+
+
+class _TratadorPortaria(BaseHTTPRequestHandler):
+    """Atende as requisições de uma conexão (várias, em sequência, com keep-alive)."""
+
+    protocol_version = "HTTP/1.1"       # Mantém a conexão aberta entre requisições
+    disable_nagle_algorithm = True      # Cabeçalho e corpo saem sem esperar o ACK do pacote anterior
+    timeout = PORTARIA_CONFIG['tempo_ocioso']
+
+    def do_GET(self):
+        self._despachar('GET')
+
+    def do_POST(self):
+        self._despachar('POST')
+
+    def do_PUT(self):
+        self._despachar('PUT')
+
+    def do_DELETE(self):
+        self._despachar('DELETE')
+
+    def _despachar(self, metodo):
+        caminho = self.path.split("?", 1)[0].rstrip("/")
+        corpo_bruto = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        for metodo_rota, padrao, funcao in ROTAS:
+            correspondencia = padrao.fullmatch(caminho)
+            if correspondencia and metodo_rota == metodo:
+                break
+        else:
+            self._responder(404, {'erro': 'rota_inexistente', 'mensagens': [f"{metodo} {caminho} não existe."]})
+            return
+
+        limpar_erro() # A categoria consultada em _falha deve ser a desta requisição
+        with coletar_mensagens() as mensagens:
+            try:
+                corpo = json.loads(corpo_bruto) if corpo_bruto else {}
+                if not isinstance(corpo, dict):
+                    raise RequisicaoInvalida("O corpo deve ser um objeto JSON.")
+                status, dados = funcao(self.server.pool, correspondencia.group(1), corpo)
+            except ValueError as err: # JSON malformado
+                status, dados = 400, {'erro': 'requisicao_invalida', 'mensagens': [f"JSON inválido: {err}"]}
+            except RequisicaoInvalida as err:
+                status, dados = 400, {'erro': 'requisicao_invalida', 'mensagens': [str(err)]}
+        if status >= 400:
+            dados.setdefault('mensagens', []).extend(mensagens)
+        self._responder(status, dados)
+
+    def _responder(self, status, dados):
+        corpo = json.dumps(dados, ensure_ascii=False, default=_para_json).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        pass # Milhares de consultas por segundo não devem ir para o terminal
+
+
+class ServidorPortaria(HTTPServer):
+    """
+    HTTPServer que atende cada conexão em um grupo fixo de threads (em vez de criar uma thread por
+    conexão), com o pool de conexões do banco compartilhado entre elas.
+    """
+
+    request_queue_size = 128 # Fila de conexões aceitas pelo sistema operacional antes do accept()
+
+    def __init__(self, endereco, pool, trabalhadores=None):
+        super().__init__(endereco, _TratadorPortaria)
+        self.pool = pool
+        self._executor = ThreadPoolExecutor(max_workers=trabalhadores or PORTARIA_CONFIG['trabalhadores'],
+                                            thread_name_prefix="portaria")
+
+    def process_request(self, request, client_address):
+        self._executor.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address):
+        # Mesmo tratamento de ThreadingMixIn.process_request_thread
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iniciar_servidor_portaria(pool, porta=None, endereco=None, trabalhadores=None):
+    """
+    Cria o serviço HTTP da portaria (sem iniciá-lo: chame serve_forever(), na thread atual ou em outra).
+
+    Args:
+        pool (PoolConexoes or ReplicaLocal): Pool de conexões compartilhado pelas threads do serviço, ou a
+            réplica local da cabine (replica_local.py), que atende mesmo sem o banco central.
+        porta (int, optional): Porta TCP. Defaults to PORTARIA_CONFIG['porta'].
+        endereco (str, optional): Endereço de escuta. Defaults to PORTARIA_CONFIG['endereco'].
+        trabalhadores (int, optional): Threads de atendimento. Defaults to PORTARIA_CONFIG['trabalhadores'].
+
+    Returns:
+        ServidorPortaria or None: O servidor, ou None se a porta não pôde ser aberta.
+    """
+    try:
+        return ServidorPortaria((endereco or PORTARIA_CONFIG['endereco'], porta or PORTARIA_CONFIG['porta']),
+                                pool, trabalhadores)
+    except OSError as err:
+        print(f"Erro ao iniciar o serviço da portaria: {err}")
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço HTTP da portaria (consulta de placas e cadastro).")
+    parser.add_argument("--porta", type=int, default=PORTARIA_CONFIG['porta'])
+    parser.add_argument("--endereco", default=PORTARIA_CONFIG['endereco'])
+    parser.add_argument("--trabalhadores", type=int, default=PORTARIA_CONFIG['trabalhadores'])
+    parser.add_argument("--conexoes-banco", type=int, default=PORTARIA_CONFIG['conexoes_banco'])
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), help="Padrão: DB_BACKEND de db_config.")
+    parser.add_argument("--caminho", help="Arquivo da base SQLite (padrão: SQLITE_CONFIG).")
+    parser.add_argument("--mapa-placas", metavar="ARQUIVO",
+                        help="Responde /portao e as entradas da fila de eventos pelo mapa compartilhado de placas "
+                             "(ver mapa_placas.py), sem consultar o banco.")
+    parser.add_argument("--fila-eventos", action="store_true",
+                        help="Aceita leituras de câmera em POST /eventos, gravadas em lote (ver fila_eventos.py).")
+    parser.add_argument("--replica", metavar="ARQUIVO", nargs="?", const=REPLICA_CONFIG['caminho'],
+                        help="Cabine com réplica local (ver replica_local.py): consultas, entradas e saídas continuam "
+                             "sem o banco central. Padrão do arquivo: REPLICA_CONFIG['caminho'].")
+    args = parser.parse_args()
+
+    config = {**SQLITE_CONFIG, 'caminho': args.caminho} if args.caminho else None
+    backend = criar_backend(args.backend or 'sqlite', config) if args.backend or config else None
+    pool_db = criar_roteador(tamanho=args.conexoes_banco, backend=backend)
+    if pool_db is None and args.replica:
+        print("Banco central inacessível; a cabine começa com a réplica local.")
+        pool_db = PoolConexoes(tamanho=args.conexoes_banco, backend=backend) # Conecta quando o banco voltar
+    if pool_db is None:
+        raise SystemExit(1)
+    replica = None
+    if args.replica:
+        replica = replica_local.criar_replica(pool_db, args.replica)
+        if replica is None:
+            pool_db.fechar()
+            raise SystemExit(1)
+        if replica.sincronizar() is None:
+            print(f"Réplica não sincronizada; {replica.pendencias()} escrita(s) aguardando envio.")
+        replica_local.iniciar_sincronizacao(replica)
+    servidor = iniciar_servidor_portaria(replica or pool_db, args.porta, args.endereco, args.trabalhadores)
+    if servidor is None:
+        pool_db.fechar()
+        raise SystemExit(1)
+    if metricas.habilitado:
+        iniciar_servidor_metricas()
+    if PORTARIA_CONFIG['busca_aproximada']:
+        try:
+            total = indice_placas.carregar(pool_db)
+        except ImportError as err:
+            print(f"Busca aproximada de placas desativada: {err}")
+        else:
+            if total is None:
+                print("Falha ao carregar o índice de placas; a busca aproximada fica desativada.")
+            else:
+                print(f"Índice de placas carregado ({total} placas).")
+                iniciar_sincronizacao(pool_db)
+    if args.mapa_placas:
+        total = mapa_placas.abrir(args.mapa_placas)
+        if total is None:
+            servidor.server_close()
+            pool_db.fechar()
+            raise SystemExit(1)
+        print(f"Mapa de placas aberto ({total} placas).")
+    if args.fila_eventos:
+        if replica is not None:
+            ocupadas = replica.carregar_sessoes_abertas()
+        else:
+            ocupadas = sessao_crud.carregar_sessoes_abertas(pool_db)
+        if ocupadas is None:
+            servidor.server_close()
+            pool_db.fechar()
+            raise SystemExit(1)
+        if replica is not None:
+            reaplicados = fila_eventos.iniciar(replica.local, tipos=replica.tipos_evento())
+        else:
+            reaplicados = fila_eventos.iniciar(pool_db)
+        if reaplicados is None:
+            servidor.server_close()
+            pool_db.fechar()
+            raise SystemExit(1)
+        print(f"Fila de eventos iniciada ({reaplicados} eventos reaplicados do diário).")
+    print(f"Serviço da portaria em http://{args.endereco}:{args.porta} "
+          f"({args.trabalhadores} threads, {args.conexoes_banco} conexões com o banco). Ctrl+C para encerrar.")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        fila_eventos.fechar()
+        if replica is not None:
+            replica.local.fechar()
+        pool_db.fechar()
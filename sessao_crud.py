@@ -0,0 +1,260 @@
+# sessao_crud.py
+# Este arquivo contém as funções de entrada e saída de veículos (sessões de estacionamento).
+# As sessões abertas ficam em um índice em memória sincronizado com a tabela 'sessoes',
+# de modo que "o carro está no pátio?" e "quantas vagas livres?" nunca consultam o banco.
+
+import functools
+import threading
+from datetime import datetime
+
+from db_config import ESTACIONAMENTO_CONFIG, MAPA_PLACAS_CONFIG
+from db_utils import ao_desfazer, executar_query, limpar_erro, registrar_comando, ultimo_erro, ERRO_REFERENCIA_INEXISTENTE
+from mapa_placas import mapa_placas
+from mensagens import informar
+from placas import normalizar_placa
+from tarifacao import formatar_valor, tabela_tarifas
+from veiculo_crud import consultar_veiculo_por_placa
+
+# cliente_id de uma sessão aberta com o veículo identificado pelo mapa de placas: o proprietário
+# é lido do banco na saída, porque o mapa pode ser anterior a uma troca de proprietário
+PROPRIETARIO_A_LER = object()
+
+INSERIR_SESSAO = registrar_comando("INSERT INTO sessoes (placa, veiculo_id, entrada) VALUES (%s, %s, %s)")
+# O cliente e o valor cobrados ficam gravados na sessão: o faturamento não depende do proprietário atual
+ENCERRAR_SESSAO = registrar_comando("UPDATE sessoes SET saida = %s, cliente_id = %s, valor_centavos = %s "
+                                    "WHERE id = %s AND saida IS NULL")
+CONSULTAR_PROPRIETARIO = registrar_comando("SELECT cliente_id FROM veiculos WHERE id = %s")
+CONSULTA_SESSOES_ABERTAS = """
+    SELECT s.id, s.placa, s.entrada, s.veiculo_id, v.cliente_id
+    FROM sessoes s
+    LEFT JOIN veiculos v ON s.veiculo_id = v.id
+    WHERE s.saida IS NULL
+"""
+
+class IndiceOcupacao:
+    """
+    Índice em memória das sessões abertas: placa -> (sessao_id, entrada, veiculo_id, cliente_id).
+
+    Todas as operações são O(1). Uma entrada é reservada no índice antes do INSERT, para que
+    duas leituras simultâneas da mesma placa (ou a última vaga disputada por dois carros)
+    não gerem duas sessões.
+    """
+
+    def __init__(self, total_vagas=None):
+        self.total_vagas = total_vagas or ESTACIONAMENTO_CONFIG['total_vagas']
+        self._abertas = {}
+        self._lock = threading.Lock()
+
+    def carregar(self, sessoes):
+        """Substitui o conteúdo do índice pelas sessões abertas informadas (linhas da tabela 'sessoes')."""
+        with self._lock:
+            self._abertas = {
+                sessao['placa']: (sessao['id'], sessao['entrada'], sessao['veiculo_id'], sessao['cliente_id'])
+                for sessao in sessoes
+            }
+
+    def reservar(self, placa):
+        """
+        Reserva a vaga de uma placa que está entrando.
+
+        Returns:
+            str or None: None se a reserva foi feita; 'dentro' se a placa já está no pátio; 'lotado' se não há vagas.
+        """
+        with self._lock:
+            if placa in self._abertas:
+                return 'dentro'
+            if len(self._abertas) >= self.total_vagas:
+                return 'lotado'
+            self._abertas[placa] = None # Reservada, aguardando o INSERT
+            return None
+
+    def confirmar(self, placa, sessao_id, entrada, veiculo_id, cliente_id):
+        """Completa a reserva com os dados da sessão gravada no banco."""
+        with self._lock:
+            self._abertas[placa] = (sessao_id, entrada, veiculo_id, cliente_id)
+
+    def liberar(self, placa):
+        """Remove a placa do índice (saída concluída ou reserva cancelada)."""
+        with self._lock:
+            self._abertas.pop(placa, None)
+
+    def renumerar(self, sessao_id, novo_id):
+        """Troca o ID de uma sessão aberta (sessão gravada offline que recebeu o ID definitivo do banco central)."""
+        with self._lock:
+            for placa, sessao in self._abertas.items():
+                if sessao is not None and sessao[0] == sessao_id:
+                    self._abertas[placa] = (novo_id, *sessao[1:])
+                    return
+
+    def obter(self, placa):
+        """Retorna (sessao_id, entrada, veiculo_id, cliente_id) da sessão aberta da placa, ou None."""
+        return self._abertas.get(placa)
+
+    def esta_dentro(self, placa):
+        return placa in self._abertas
+
+    def ocupadas(self):
+        return len(self._abertas)
+
+    def vagas_livres(self):
+        return max(self.total_vagas - len(self._abertas), 0)
+
+
+# Índice compartilhado pelo processo (terminais de entrada e saída)
+indice_ocupacao = IndiceOcupacao()
+
+def carregar_sessoes_abertas(conexao):
+    """
+    Carrega do banco as sessões ainda abertas para o índice em memória.
+    Deve ser chamada uma vez na inicialização, antes de registrar entradas e saídas.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+
+    Returns:
+        int or None: Quantidade de veículos no pátio, ou None em caso de erro.
+    """
+    sessoes = executar_query(conexao, CONSULTA_SESSOES_ABERTAS, fetch_all=True)
+    if sessoes is None:
+        informar("Falha ao carregar as sessões abertas.")
+        return None
+    indice_ocupacao.carregar(sessoes)
+    return len(sessoes)
+
+def _veiculo_da_placa(conexao, placa, usar_mapa=True):
+    """
+    (veiculo_id, cliente_id) da placa, ou (None, None) para avulsos. Com o mapa de placas aberto
+    (mapa_placas.py), o veículo vem do mapa e o cliente_id é PROPRIETARIO_A_LER; o banco só é consultado
+    para placas fora do mapa, e apenas se MAPA_PLACAS_CONFIG['consultar_banco_se_ausente'].
+    """
+    if usar_mapa and mapa_placas.aberto:
+        encontrado = mapa_placas.consultar(placa)
+        if encontrado is not None:
+            return encontrado[0], PROPRIETARIO_A_LER
+        if not MAPA_PLACAS_CONFIG['consultar_banco_se_ausente']:
+            return None, None
+    veiculo = consultar_veiculo_por_placa(conexao, placa)
+    return (veiculo['id'], veiculo['cliente_id']) if veiculo else (None, None)
+
+def _inserir_sessao(conexao, placa, veiculo_id, entrada):
+    return executar_query(conexao, INSERIR_SESSAO, (placa, veiculo_id, entrada), commit=True)
+
+def _encerrar_sessao(conexao, placa, sessao_id, saida, cliente_id, valor_centavos):
+    return executar_query(conexao, ENCERRAR_SESSAO, (saida, cliente_id, valor_centavos, sessao_id), commit=True)
+
+def registrar_entrada(conexao, placa, momento=None, abrir_sessao=None):
+    """
+    Registra a entrada de um veículo no estacionamento.
+    O veículo é identificado pela placa; placas sem cadastro entram como avulsas.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        placa (str): Placa lida na entrada.
+        momento (datetime, optional): Hora da leitura. Defaults to None (agora).
+        abrir_sessao (callable, optional): abrir_sessao(placa, veiculo_id, entrada) grava a sessão e retorna
+            seu ID, ou None em caso de erro. Defaults to None (INSERT em 'sessoes' na própria conexão); a
+            réplica local da cabine (replica_local.py) grava no banco central ou na fila offline.
+
+    Returns:
+        int or None: O ID da sessão aberta se sucesso, None caso contrário.
+    """
+    abrir_sessao = abrir_sessao or functools.partial(_inserir_sessao, conexao)
+    placa = normalizar_placa(placa) or placa.upper() # Placa fora do padrão ainda entra, como avulsa
+    entrada = (momento or datetime.now()).replace(microsecond=0)
+    motivo = indice_ocupacao.reservar(placa)
+    if motivo == 'dentro':
+        informar(f"Veículo com placa '{placa}' já está no estacionamento.")
+        return None
+    if motivo == 'lotado':
+        informar("Estacionamento lotado. Nenhuma vaga livre.")
+        return None
+
+    veiculo_id, cliente_id = _veiculo_da_placa(conexao, placa)
+
+    sessao_id = abrir_sessao(placa, veiculo_id, entrada)
+    if not sessao_id and veiculo_id is not None and ultimo_erro() == ERRO_REFERENCIA_INEXISTENTE:
+        # Veículo excluído depois da geração do mapa de placas: vale o cadastro atual do banco
+        veiculo_id, cliente_id = _veiculo_da_placa(conexao, placa, usar_mapa=False)
+        sessao_id = abrir_sessao(placa, veiculo_id, entrada)
+    if not sessao_id:
+        indice_ocupacao.liberar(placa)
+        informar(f"Falha ao registrar a entrada da placa '{placa}'.")
+        return None
+
+    indice_ocupacao.confirmar(placa, sessao_id, entrada, veiculo_id, cliente_id)
+    ao_desfazer(indice_ocupacao.liberar, placa) # Dentro de transacao(), a vaga volta se o INSERT for desfeito
+    tipo = "cliente cadastrado" if veiculo_id is not None else "avulso"
+    informar(f"Entrada registrada: placa {placa} ({tipo}) às {entrada:%H:%M:%S} (sessão {sessao_id}). "
+          f"Vagas livres: {indice_ocupacao.vagas_livres()}.")
+    return sessao_id
+
+def registrar_saida(conexao, placa, momento=None, encerrar_sessao=None):
+    """
+    Registra a saída de um veículo, encerrando sua sessão aberta.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        placa (str): Placa lida na saída.
+        momento (datetime, optional): Hora da leitura. Defaults to None (agora).
+        encerrar_sessao (callable, optional): encerrar_sessao(placa, sessao_id, saida, cliente_id, valor_centavos)
+            grava a saída e retorna a quantidade de sessões encerradas (0 se já estava encerrada), ou None em caso de
+            erro. Defaults to None (UPDATE em 'sessoes' na própria conexão).
+
+    Returns:
+        dict or None: Dados da sessão encerrada ('id', 'placa', 'entrada', 'saida', 'veiculo_id', 'cliente_id',
+        'valor_centavos'), ou None se a placa não estava no pátio ou houve erro.
+    """
+    encerrar_sessao = encerrar_sessao or functools.partial(_encerrar_sessao, conexao)
+    placa = normalizar_placa(placa) or placa.upper()
+    sessao = indice_ocupacao.obter(placa)
+    if sessao is None:
+        informar(f"Veículo com placa '{placa}' não está no estacionamento.")
+        return None
+    sessao_id, entrada, veiculo_id, cliente_id = sessao
+    saida = (momento or datetime.now()).replace(microsecond=0)
+    if cliente_id is PROPRIETARIO_A_LER:
+        limpar_erro()
+        proprietario = executar_query(conexao, CONSULTAR_PROPRIETARIO, (veiculo_id,), fetch_one=True, formato='tupla')
+        if proprietario is None and ultimo_erro() is not None:
+            informar(f"Falha ao registrar a saída da placa '{placa}'.")
+            return None
+        cliente_id = proprietario[0] if proprietario else None # Veículo excluído: cobrado como avulso
+
+    valor = tabela_tarifas.calcular(entrada, saida, cliente_id)
+    resultado = encerrar_sessao(placa, sessao_id, saida, cliente_id, valor)
+    if resultado is None:
+        informar(f"Falha ao registrar a saída da placa '{placa}'.")
+        return None
+    indice_ocupacao.liberar(placa)
+    ao_desfazer(indice_ocupacao.confirmar, placa, *sessao)
+    if resultado == 0:
+        # Outro terminal já encerrou esta sessão; o índice local apenas se atualiza
+        informar(f"A sessão {sessao_id} da placa '{placa}' já havia sido encerrada.")
+        return None
+
+    informar(f"Saída registrada: placa {placa} às {saida:%H:%M:%S} (permanência: {saida - entrada}). "
+          f"Valor a pagar: {formatar_valor(valor)}. Vagas livres: {indice_ocupacao.vagas_livres()}.")
+    return {'id': sessao_id, 'placa': placa, 'entrada': entrada, 'saida': saida,
+            'veiculo_id': veiculo_id, 'cliente_id': cliente_id, 'valor_centavos': valor}
+
+def veiculo_esta_dentro(placa):
+    """
+    Informa se a placa tem uma sessão aberta (consulta apenas o índice em memória).
+
+    Returns:
+        bool: True se o veículo está no pátio.
+    """
+    return indice_ocupacao.esta_dentro(normalizar_placa(placa) or placa.upper())
+
+def consultar_ocupacao():
+    """
+    Retorna a ocupação atual a partir do índice em memória, sem consultar o banco.
+
+    Returns:
+        dict: 'ocupadas', 'vagas_livres' e 'total_vagas'.
+    """
+    return {
+        'ocupadas': indice_ocupacao.ocupadas(),
+        'vagas_livres': indice_ocupacao.vagas_livres(),
+        'total_vagas': indice_ocupacao.total_vagas,
+    }
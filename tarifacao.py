@@ -0,0 +1,202 @@
+# tarifacao.py
+# Cálculo do valor das permanências: preço por hora iniciada conforme a faixa horária,
+# teto a cada 24 horas e descontos para clientes cadastrados.
+# Há dois modos com resultados idênticos: escalar (cancela de saída, uma sessão por vez)
+# e em lote com NumPy (faturamento mensal, colunas inteiras de entradas e saídas).
+# Todos os valores são inteiros em centavos, para que os dois modos nunca divirjam por arredondamento.
+
+from datetime import datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError: # NumPy só é necessário para o modo em lote
+    np = None
+
+from db_config import TARIFA_CONFIG
+from db_utils import iterar_query
+
+MINUTOS_DIA = 24 * 60
+_EPOCA = datetime(1970, 1, 1)
+
+def _minutos_desde_epoca(momento):
+    """Minutos inteiros desde 1970-01-01 (segundos descartados, como em datetime64[m])."""
+    return (momento - _EPOCA) // timedelta(minutes=1)
+
+class TabelaTarifas:
+    """
+    Tabela de preços do estacionamento.
+
+    Regras (aplicadas igualmente nos dois modos):
+    - Permanências de até 'tolerancia_minutos' custam zero.
+    - Cada bloco completo de 24 horas custa o menor valor entre a soma das 24 horas e o teto diário.
+    - O restante é cobrado por hora iniciada; cada hora custa o preço da faixa em que começa,
+      limitado também ao teto diário.
+    - Clientes cadastrados recebem o desconto padrão, ou o desconto específico do seu cliente_id.
+    """
+
+    def __init__(self, config=None):
+        config = config or TARIFA_CONFIG
+        self.tolerancia_minutos = config['tolerancia_minutos']
+        self.teto_diario = config['teto_diario']
+        self.desconto_assinante = config['desconto_assinante']
+        self.descontos_por_cliente = dict(config.get('descontos_por_cliente', {}))
+
+        preco_hora = [None] * 24
+        for hora_inicio, hora_fim, centavos in config['faixas']:
+            for hora in range(hora_inicio, hora_fim):
+                preco_hora[hora] = centavos
+        if None in preco_hora:
+            raise ValueError("As faixas de TARIFA_CONFIG precisam cobrir as 24 horas do dia.")
+        self.preco_hora = preco_hora
+
+        # Somas acumuladas sobre 48 horas: o custo de N horas a partir da hora h é acumulado[h+N] - acumulado[h]
+        self._acumulado = [0]
+        for hora in range(48):
+            self._acumulado.append(self._acumulado[-1] + preco_hora[hora % 24])
+        self.custo_dia = min(self._acumulado[24], self.teto_diario)
+
+    def desconto_de(self, cliente_id):
+        """Percentual de desconto aplicado a um cliente (0 para veículos avulsos: cliente_id None ou 0)."""
+        if not cliente_id:
+            return 0
+        return self.descontos_por_cliente.get(cliente_id, self.desconto_assinante)
+
+    def calcular(self, entrada, saida, cliente_id=None):
+        """
+        Calcula o valor de uma permanência (modo escalar, usado na cancela de saída).
+
+        Args:
+            entrada (datetime): Momento da entrada.
+            saida (datetime): Momento da saída.
+            cliente_id (int, optional): Cliente dono do veículo; None (ou 0) para avulsos. Defaults to None.
+
+        Returns:
+            int: Valor em centavos.
+        """
+        minuto_entrada = _minutos_desde_epoca(entrada)
+        duracao = _minutos_desde_epoca(saida) - minuto_entrada
+        if duracao < 0:
+            raise ValueError("A saída não pode ser anterior à entrada.")
+        if duracao <= self.tolerancia_minutos:
+            return 0
+
+        dias, resto = divmod(duracao, MINUTOS_DIA)
+        horas = (resto + 59) // 60
+        hora_inicial = (minuto_entrada // 60) % 24
+        custo_resto = min(self._acumulado[hora_inicial + horas] - self._acumulado[hora_inicial], self.teto_diario)
+        total = dias * self.custo_dia + custo_resto
+        return total * (100 - self.desconto_de(cliente_id)) // 100
+
+    def calcular_lote(self, entradas, saidas, cliente_ids=None):
+        """
+        Calcula o valor de muitas permanências de uma vez (modo vetorizado com NumPy).
+        O resultado de cada posição é idêntico ao de calcular() para a mesma sessão.
+
+        Args:
+            entradas: Sequência de datetime ou array datetime64 com os momentos de entrada.
+            saidas: Sequência de datetime ou array datetime64 com os momentos de saída.
+            cliente_ids: Sequência de IDs de cliente (None ou 0 para avulsos). Defaults to None (todos avulsos).
+
+        Returns:
+            numpy.ndarray: Valores em centavos (int64), na mesma ordem das entradas.
+        """
+        if np is None:
+            raise ImportError("O cálculo em lote requer NumPy (pip install numpy).")
+
+        minuto_entrada = np.asarray(entradas, dtype='datetime64[m]').astype(np.int64)
+        duracao = np.asarray(saidas, dtype='datetime64[m]').astype(np.int64) - minuto_entrada
+        if (duracao < 0).any():
+            raise ValueError("A saída não pode ser anterior à entrada.")
+
+        acumulado = np.asarray(self._acumulado, dtype=np.int64)
+        dias, resto = np.divmod(duracao, MINUTOS_DIA)
+        horas = (resto + 59) // 60
+        hora_inicial = (minuto_entrada // 60) % 24
+        custo_resto = np.minimum(acumulado[hora_inicial + horas] - acumulado[hora_inicial], self.teto_diario)
+        total = dias * self.custo_dia + custo_resto
+        total[duracao <= self.tolerancia_minutos] = 0
+        return total * (100 - self._descontos_lote(cliente_ids, len(total))) // 100
+
+    def _descontos_lote(self, cliente_ids, quantidade):
+        if cliente_ids is None:
+            return np.zeros(quantidade, dtype=np.int64)
+        ids = np.asarray([0 if cliente_id is None else cliente_id for cliente_id in cliente_ids], dtype=np.int64)
+        descontos = np.where(ids > 0, self.desconto_assinante, 0).astype(np.int64)
+        if self.descontos_por_cliente:
+            # Busca binária nas chaves ordenadas dos descontos específicos
+            chaves = np.asarray(sorted(self.descontos_por_cliente), dtype=np.int64)
+            valores = np.asarray([self.descontos_por_cliente[chave] for chave in chaves], dtype=np.int64)
+            posicoes = np.minimum(np.searchsorted(chaves, ids), len(chaves) - 1)
+            encontrados = chaves[posicoes] == ids
+            descontos = np.where(encontrados, valores[posicoes], descontos)
+        return descontos
+
+
+# Tabela usada pela cancela de saída e pelo faturamento
+tabela_tarifas = TabelaTarifas()
+
+def formatar_valor(centavos):
+    """Formata um valor em centavos como moeda, ex.: 1250 -> 'R$ 12,50'."""
+    return f"R$ {centavos // 100},{centavos % 100:02d}"
+
+def faturar_periodo(conexao, inicio, fim, tamanho_bloco=100000):
+    """
+    Calcula o faturamento das sessões encerradas no período [inicio, fim), agrupado por cliente.
+    Cada sessão entra com o cliente e o valor gravados na saída, isto é, o que foi cobrado na cancela,
+    mesmo que o veículo tenha trocado de proprietário depois. Sessões encerradas antes dessas colunas
+    existirem são precificadas em blocos vetorizados com o proprietário atual. A leitura é em
+    streaming, com memória constante.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        inicio (datetime): Início do período (inclusive).
+        fim (datetime): Fim do período (exclusive).
+        tamanho_bloco (int, optional): Sessões agrupadas (ou precificadas) por vez. Defaults to 100000.
+
+    Returns:
+        dict: {cliente_id: {'sessoes': n, 'total_centavos': valor}}; a chave None agrupa os avulsos.
+    """
+    query = """
+        SELECT s.entrada, s.saida, s.valor_centavos,
+               CASE WHEN s.valor_centavos IS NULL THEN v.cliente_id ELSE s.cliente_id END AS cliente_id
+        FROM sessoes s
+        LEFT JOIN veiculos v ON s.veiculo_id = v.id
+        WHERE s.saida >= %s AND s.saida < %s
+    """
+    faturamento = {}
+
+    def acumular(cliente_ids, valores):
+        # Soma por cliente sem laço por sessão: agrupa os IDs e usa bincount ponderado pelos valores
+        ids = np.asarray([0 if cliente_id is None else cliente_id for cliente_id in cliente_ids], dtype=np.int64)
+        ids_unicos, grupos = np.unique(ids, return_inverse=True)
+        quantidades = np.bincount(grupos)
+        totais = np.bincount(grupos, weights=np.asarray(valores, dtype=np.int64)).astype(np.int64)
+        for cliente_id, quantidade, total in zip(ids_unicos.tolist(), quantidades.tolist(), totais.tolist()):
+            item = faturamento.setdefault(cliente_id or None, {'sessoes': 0, 'total_centavos': 0})
+            item['sessoes'] += quantidade
+            item['total_centavos'] += total
+
+    def precificar(entradas, saidas, cliente_ids):
+        acumular(cliente_ids, tabela_tarifas.calcular_lote(entradas, saidas, cliente_ids))
+
+    cobradas_ids, cobradas_valores = [], []
+    entradas, saidas, cliente_ids = [], [], [] # Sessões sem valor gravado
+    for sessao in iterar_query(conexao, query, (inicio, fim)):
+        if sessao['valor_centavos'] is not None:
+            cobradas_ids.append(sessao['cliente_id'])
+            cobradas_valores.append(sessao['valor_centavos'])
+            if len(cobradas_ids) >= tamanho_bloco:
+                acumular(cobradas_ids, cobradas_valores)
+                cobradas_ids, cobradas_valores = [], []
+            continue
+        entradas.append(sessao['entrada'])
+        saidas.append(sessao['saida'])
+        cliente_ids.append(sessao['cliente_id'])
+        if len(entradas) >= tamanho_bloco:
+            precificar(entradas, saidas, cliente_ids)
+            entradas, saidas, cliente_ids = [], [], []
+    if cobradas_ids:
+        acumular(cobradas_ids, cobradas_valores)
+    if entradas:
+        precificar(entradas, saidas, cliente_ids)
+    return faturamento
@@ -0,0 +1,48 @@
+# conftest.py
+# Fixtures compartilhadas pelos testes: bancos SQLite em memória com o esquema do projeto
+# (estacionamento_db_sqlite.sql) e os índices e caches globais zerados entre um teste e outro.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sessao_crud
+from backends import criar_backend
+from cache_consultas import cache_cadastro
+from db_utils import criar_pool, limpar_erro
+from mensagens import coletar_mensagens
+
+
+def criar_pool_memoria(tamanho=2):
+    """Pool de um banco SQLite novo em memória (as conexões do pool compartilham o mesmo banco)."""
+    return criar_pool(tamanho=tamanho, backend=criar_backend('sqlite', {'caminho': ':memory:', 'esquema': None}))
+
+
+@pytest.fixture(autouse=True)
+def estado_limpo():
+    """Índice de ocupação, cache do cadastro e erro da thread vazios; mensagens coletadas em vez de impressas."""
+    sessao_crud.indice_ocupacao.carregar([])
+    cache_cadastro.limpar()
+    limpar_erro()
+    with coletar_mensagens() as mensagens:
+        yield mensagens
+    sessao_crud.indice_ocupacao.carregar([])
+    cache_cadastro.limpar()
+
+
+@pytest.fixture
+def pool():
+    pool = criar_pool_memoria()
+    assert pool is not None
+    yield pool
+    pool.fechar()
+
+
+@pytest.fixture
+def cliente(pool):
+    """ID de um cliente cadastrado."""
+    import cliente_crud
+    return cliente_crud.adicionar_cliente(pool, "Ana Souza", "Rua A, 10", "12345678901", "11999990000")
@@ -0,0 +1,24 @@
+import cliente_crud
+import veiculo_crud
+from cache_consultas import cache_cadastro
+from conftest import criar_pool_memoria
+
+
+def test_cache_separado_por_banco(pool, cliente):
+    outro = criar_pool_memoria()
+    try:
+        assert veiculo_crud.adicionar_veiculo(pool, "Fiat", "Uno", 2010, "ABC1D23", cliente)
+        assert veiculo_crud.consultar_veiculo_por_placa(pool, "ABC1D23")['modelo'] == "Uno"
+        # A consulta em cache no primeiro banco não responde pelo segundo, que está vazio
+        assert veiculo_crud.consultar_veiculo_por_placa(outro, "ABC1D23") is None
+        assert cliente_crud.consultar_cliente_por_cpf(outro, "12345678901") is None
+        assert cache_cadastro.do_banco(pool) is not cache_cadastro.do_banco(outro)
+    finally:
+        outro.fechar()
+
+
+def test_conexao_avulsa_nao_usa_cache(pool, cliente):
+    with pool.conexao() as conexao:
+        assert cache_cadastro.do_banco(conexao) is None
+        assert cliente_crud.consultar_cliente_por_id(conexao, cliente)['nome'] == "Ana Souza"
+    assert cache_cadastro.estatisticas()['itens'] == 0
@@ -0,0 +1,63 @@
+import cliente_crud
+import veiculo_crud
+from db_utils import executar_query, limpar_erro, ultimo_erro, ERRO_DUPLICADO, ERRO_REFERENCIA_INEXISTENTE
+
+
+def test_adicionar_e_consultar_cliente(pool, cliente):
+    assert cliente
+    encontrado = cliente_crud.consultar_cliente_por_cpf(pool, "12345678901")
+    assert encontrado['id'] == cliente
+    assert encontrado['nome'] == "Ana Souza"
+    assert cliente_crud.consultar_cliente_por_id(pool, cliente)['cpf'] == "12345678901"
+
+
+def test_cpf_duplicado_e_classificado(pool, cliente, estado_limpo):
+    assert cliente_crud.adicionar_cliente(pool, "Outra Ana", "Rua B", "12345678901", "") is None
+    assert ultimo_erro() == ERRO_DUPLICADO
+    assert "já está cadastrado" in estado_limpo[-1]
+
+
+def test_veiculo_de_cliente_inexistente(pool, estado_limpo):
+    assert veiculo_crud.adicionar_veiculo(pool, "Fiat", "Uno", 2010, "ABC1D23", 999) is None
+    assert ultimo_erro() == ERRO_REFERENCIA_INEXISTENTE
+    assert "não encontrado" in estado_limpo[-1]
+
+
+def test_placa_duplicada_em_outro_formato(pool, cliente):
+    assert veiculo_crud.adicionar_veiculo(pool, "Fiat", "Uno", 2010, "abc-1234", cliente)
+    # ABC-1234 e ABC1C34 são a mesma placa na forma canônica
+    assert veiculo_crud.adicionar_veiculo(pool, "VW", "Gol", 2012, "ABC1C34", cliente) is None
+    assert ultimo_erro() == ERRO_DUPLICADO
+    assert veiculo_crud.consultar_veiculo_por_placa(pool, "ABC1234")['modelo'] == "Uno"
+
+
+def test_atualizar_e_excluir_cliente(pool, cliente):
+    assert cliente_crud.atualizar_cliente(pool, cliente, telefone="1133334444")
+    assert cliente_crud.consultar_cliente_por_id(pool, cliente)['telefone'] == "1133334444"
+    assert not cliente_crud.atualizar_cliente(pool, 999, nome="Ninguém")
+
+    veiculo_id = veiculo_crud.adicionar_veiculo(pool, "Fiat", "Uno", 2010, "ABC1D23", cliente)
+    assert cliente_crud.excluir_cliente(pool, cliente)
+    assert cliente_crud.consultar_cliente_por_id(pool, cliente) is None
+    # ON DELETE CASCADE: o veículo sai junto, e o cache não devolve o registro excluído
+    assert veiculo_crud.consultar_veiculo_por_id(pool, veiculo_id) is None
+    assert not cliente_crud.excluir_cliente(pool, cliente)
+
+
+def test_escritas_registradas_no_log(pool, cliente):
+    veiculo_crud.adicionar_veiculos(pool, [("Fiat", "Uno", 2010, "ABC1D23", cliente),
+                                           ("VW", "Gol", 2012, "XYZ9A87", cliente)])
+    linhas = executar_query(pool, "SELECT tabela, registro_id, chave, operacao FROM log_alteracoes ORDER BY id",
+                            fetch_all=True, formato='tupla')
+    assert linhas[0] == ('clientes', cliente, "12345678901", 'INSERT')
+    veiculos = {placa: veiculo_id for _, veiculo_id, placa, _ in linhas[1:]}
+    assert set(veiculos) == {"ABC1D23", "XYZ9A87"}
+    assert all(veiculos.values()) # Inserções em lote também registram os IDs gerados
+    assert veiculo_crud.consultar_veiculo_por_placa(pool, "XYZ9A87")['id'] == veiculos["XYZ9A87"]
+
+
+def test_erro_de_sintaxe_e_limpo_por_limpar_erro(pool):
+    assert executar_query(pool, "SELECT * FROM tabela_inexistente", fetch_all=True) is None
+    assert ultimo_erro() is not None
+    limpar_erro()
+    assert ultimo_erro() is None
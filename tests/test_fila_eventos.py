@@ -0,0 +1,82 @@
+import json
+from datetime import datetime
+
+import pytest
+
+import sessao_crud
+from db_utils import executar_query
+from fila_eventos import FilaEventos, GRAVAR_POSICAO
+
+
+def _gravar_diario(caminho, eventos):
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        for seq, (tipo, placa, momento) in enumerate(eventos, start=1):
+            arquivo.write(json.dumps({'seq': seq, 'tipo': tipo, 'placa': placa, 'momento': momento}) + "\n")
+
+
+def _sessoes(pool):
+    return executar_query(pool, "SELECT placa, entrada, saida FROM sessoes ORDER BY id", fetch_all=True, formato='tupla')
+
+
+@pytest.fixture
+def diario(tmp_path):
+    return str(tmp_path / "fila_eventos.jsonl")
+
+
+def test_reaplica_o_diario_na_inicializacao(pool, diario):
+    _gravar_diario(diario, [('entrada', "ABC1D23", "2024-03-04T09:00:00"),
+                            ('entrada', "XYZ9A87", "2024-03-04T09:05:00"),
+                            ('saida', "ABC1D23", "2024-03-04T11:00:00")])
+    fila = FilaEventos()
+    assert fila.iniciar(pool, diario=diario) == 3
+    fila.fechar()
+    assert _sessoes(pool) == [("ABC1D23", datetime(2024, 3, 4, 9, 0), datetime(2024, 3, 4, 11, 0)),
+                              ("XYZ9A87", datetime(2024, 3, 4, 9, 5), None)]
+    assert sessao_crud.veiculo_esta_dentro("XYZ9A87")
+
+    # Diário já aplicado: uma nova inicialização não grava nada de novo
+    fila = FilaEventos()
+    assert fila.iniciar(pool, diario=diario) == 0
+    fila.fechar()
+    assert len(_sessoes(pool)) == 2
+
+
+def test_eventos_ja_aplicados_nao_se_repetem(pool, diario):
+    # Queda depois do commit do lote e antes da compactação do diário: a posição no banco já inclui o evento 1
+    sessao_crud.registrar_entrada(pool, "ABC1D23", datetime(2024, 3, 4, 9, 0))
+    executar_query(pool, "CREATE TABLE posicao_fila_eventos (diario VARCHAR(255) NOT NULL PRIMARY KEY, "
+                   "sequencia BIGINT NOT NULL)", commit=True)
+    executar_query(pool, GRAVAR_POSICAO, ("fila_eventos.jsonl", 1), commit=True)
+    _gravar_diario(diario, [('entrada', "ABC1D23", "2024-03-04T09:00:00"),
+                            ('saida', "ABC1D23", "2024-03-04T10:00:00")])
+    fila = FilaEventos()
+    assert fila.iniciar(pool, diario=diario) == 1
+    fila.fechar()
+    assert _sessoes(pool) == [("ABC1D23", datetime(2024, 3, 4, 9, 0), datetime(2024, 3, 4, 10, 0))]
+
+
+def test_linha_incompleta_no_fim_do_diario(pool, diario):
+    _gravar_diario(diario, [('entrada', "ABC1D23", "2024-03-04T09:00:00")])
+    with open(diario, "a", encoding="utf-8") as arquivo:
+        arquivo.write('{"seq": 2, "tipo": "entr') # Queda no meio da gravação
+    fila = FilaEventos()
+    assert fila.iniciar(pool, diario=diario) == 1
+    fila.fechar()
+    assert [placa for placa, _, _ in _sessoes(pool)] == ["ABC1D23"]
+
+
+def test_enviar_grava_no_banco_e_recusa_eventos_invalidos(pool, diario):
+    fila = FilaEventos()
+    assert fila.iniciar(pool, diario=diario) == 0
+    assert fila.enviar('entrada', "ABC1D23", datetime(2024, 3, 4, 9, 0)) == 1
+    assert fila.enviar('entrada', "ABC1D23", datetime(2024, 3, 4, 9, 1)) == 2 # Recusado pelo CRUD: já está no pátio
+    assert fila.enviar('saida', "ABC1D23", datetime(2024, 3, 4, 10, 0)) == 3
+    fila.fechar()
+    assert (fila.aplicados, fila.recusados) == (2, 1)
+    assert len(fila) == 0
+    assert _sessoes(pool) == [("ABC1D23", datetime(2024, 3, 4, 9, 0), datetime(2024, 3, 4, 10, 0))]
+    with open(diario, encoding="utf-8") as arquivo:
+        assert arquivo.read() == "" # Compactado no encerramento
+    with pytest.raises(ValueError):
+        fila.enviar('pagamento', "ABC1D23")
+
@@ -0,0 +1,105 @@
+import pytest
+
+import cliente_crud
+import fragmentos
+from conftest import criar_pool_memoria
+from fragmentos import AnelConsistente, Fragmentos
+
+BLOCO_IDS = 1000
+
+
+def _cpf(numero):
+    return f"{numero:011d}"
+
+
+@pytest.fixture
+def pools():
+    abertos = {}
+    yield lambda numero: abertos.setdefault(numero, criar_pool_memoria())
+    for pool in abertos.values():
+        pool.fechar()
+
+
+def _preparar(pools, numeros):
+    conjunto = Fragmentos({numero: pools(numero) for numero in numeros}, pools(min(numeros)), nos_virtuais=32,
+                          bloco_ids=BLOCO_IDS)
+    assert conjunto.preparar()
+    return conjunto
+
+
+def _cadastrar(conjunto, quantidade):
+    """Clientes com um veículo cada: {cpf: (cliente_id, placa)}."""
+    cadastro = {}
+    for numero in range(1, quantidade + 1):
+        cliente_id = fragmentos.adicionar_cliente(conjunto, f"Cliente {numero}", "", _cpf(numero), "")
+        placa = f"AAA{numero // 100 % 10}{'ABCDEFGHIJ'[numero // 10 % 10]}{numero % 100 // 10}{numero % 10}"
+        assert fragmentos.adicionar_veiculo(conjunto, "Fiat", "Uno", 2010, placa, cliente_id)
+        cadastro[_cpf(numero)] = (cliente_id, placa)
+    return cadastro
+
+
+def _conferir(conjunto, cadastro):
+    for cpf, (cliente_id, placa) in cadastro.items():
+        dono = conjunto.anel.fragmento(cpf)
+        assert fragmentos.consultar_cliente_por_cpf(conjunto, cpf)['id'] == cliente_id
+        assert fragmentos.consultar_cliente_por_id(conjunto, cliente_id)['cpf'] == cpf
+        assert fragmentos.consultar_veiculo_por_placa(conjunto, placa)['cliente_id'] == cliente_id
+        assert conjunto.fragmento_da_placa(placa, recarregar=True) == dono
+        assert cliente_crud.consultar_cliente_por_cpf(conjunto.pools[dono], cpf) is not None
+
+
+def test_anel_move_poucas_chaves_ao_crescer():
+    chaves = [_cpf(numero) for numero in range(2000)]
+    antes = AnelConsistente([0, 1, 2], nos_virtuais=64)
+    depois = AnelConsistente([0, 1, 2, 3], nos_virtuais=64)
+    movidas = [chave for chave in chaves if antes.fragmento(chave) != depois.fragmento(chave)]
+    assert all(depois.fragmento(chave) == 3 for chave in movidas) # Só para o fragmento incluído
+    assert 0.1 < len(movidas) / len(chaves) < 0.4
+    assert AnelConsistente([]).fragmento("x") is None
+
+
+def test_roteamento_por_cpf_id_e_placa(pools):
+    conjunto = _preparar(pools, [0, 1, 2])
+    cadastro = _cadastrar(conjunto, 40)
+    _conferir(conjunto, cadastro)
+    for cpf, (cliente_id, _) in cadastro.items():
+        assert cliente_id // BLOCO_IDS == conjunto.anel.fragmento(cpf) # IDs do bloco do fragmento
+    assert len(fragmentos.listar_clientes(conjunto)) == 40
+    assert [cliente.id for cliente in fragmentos.listar_clientes(conjunto)] == sorted(c for c, _ in cadastro.values())
+    # Placa e CPF continuam únicos entre os fragmentos
+    assert fragmentos.adicionar_cliente(conjunto, "Repetido", "", _cpf(1), "") is None
+    outro = next(iter(cadastro.values()))[0]
+    assert fragmentos.adicionar_veiculo(conjunto, "VW", "Gol", 2012, cadastro[_cpf(2)][1], outro) is None
+
+
+def test_rebalanceamento_ao_incluir_fragmento(pools):
+    conjunto = _preparar(pools, [0, 1])
+    cadastro = _cadastrar(conjunto, 60)
+    conjunto.pools[2] = pools(2)
+    resultado = fragmentos.adicionar_fragmento(conjunto, 2, tamanho_lote=7)
+    assert resultado['pendentes'] == 0
+    assert resultado['clientes'] == resultado['veiculos'] > 0
+    assert conjunto.anel.numeros == {0, 1, 2} and conjunto.anel_anterior is None
+    _conferir(conjunto, cadastro)
+    contagens = {numero: (clientes, veiculos) for numero, clientes, veiculos, _ in fragmentos.situacao(conjunto)}
+    assert contagens[2][0] == resultado['clientes']
+    assert sum(clientes for clientes, _ in contagens.values()) == 60
+    # Outro processo com o mesmo catálogo encontra os IDs movidos
+    assert conjunto.recarregar()
+    _conferir(conjunto, cadastro)
+    assert fragmentos.rebalancear(conjunto)['clientes'] == 0
+
+
+def test_recusa_fragmento_com_cadastro(pools):
+    conjunto = _preparar(pools, [0])
+    novo = pools(1)
+    cliente_crud.adicionar_cliente(novo, "Intruso", "", _cpf(9), "")
+    conjunto.pools[1] = novo
+    assert fragmentos.adicionar_fragmento(conjunto, 1) is None
+    assert conjunto.anel.numeros == {0}
+    with pytest.raises(ValueError):
+        fragmentos.adicionar_fragmento(conjunto, 0)
+
+    preenchido = pools(2)
+    cliente_crud.adicionar_cliente(preenchido, "Intruso", "", _cpf(9), "")
+    assert not Fragmentos({0: pools(3), 2: preenchido}, pools(3)).preparar()
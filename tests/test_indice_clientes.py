@@ -0,0 +1,45 @@
+import pytest
+
+from indice_clientes import IndiceClientes
+
+pytest.importorskip("numpy")
+
+CLIENTES = [
+    (1, "Ana Silva", "11111111111", "11999990001"),
+    (2, "José Silva", "22222222222", "11999990002"),
+    (3, "Zé Silveira", "33333333333", "11999990003"),
+    (4, "Maria Souza", "44444444444", "11988880004"),
+]
+
+
+@pytest.fixture
+def indice():
+    indice = IndiceClientes()
+    assert indice.construir(CLIENTES) == len(CLIENTES)
+    return indice
+
+
+def test_busca_por_trecho_sem_acentos(indice):
+    resultado, total = indice.buscar("jose silv")
+    assert total == 1 and resultado[0][0] == 2
+    assert {cliente_id for cliente_id, _ in indice.buscar("silv")[0]} == {1, 2, 3}
+    assert indice.buscar("0004")[0][0][0] == 4 # Trecho do telefone
+
+
+def test_termo_curto_junto_de_termo_longo(indice):
+    # 'ze' não tem trigramas, mas também precisa estar no texto do cliente
+    resultado, total = indice.buscar("ze silv")
+    assert total == 1 and [cliente_id for cliente_id, _ in resultado] == [3]
+    assert indice.buscar("zz silva") == ([], 0)
+    assert indice.buscar("silva an")[1] == 1
+
+
+def test_termo_curto_sozinho_busca_o_inicio_do_nome(indice):
+    assert [cliente_id for cliente_id, _ in indice.buscar("ma")[0]] == [4]
+
+
+def test_alteracoes_depois_da_carga(indice):
+    indice.adicionar(5, "Zeca Silva", "55555555555", "")
+    indice.remover(1)
+    assert {cliente_id for cliente_id, _ in indice.buscar("silv")[0]} == {2, 3, 5}
+    assert {cliente_id for cliente_id, _ in indice.buscar("ze silv")[0]} == {3, 5}
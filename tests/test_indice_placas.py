@@ -0,0 +1,56 @@
+import pytest
+
+import cliente_crud
+import veiculo_crud
+from indice_placas import IndicePlacasAproximado, indice_placas
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def indice_carregado(pool, monkeypatch):
+    """O índice compartilhado (o que veiculo_crud atualiza), carregado do banco de teste e descarregado no final."""
+    monkeypatch.setattr(indice_placas, '_base', None)
+    assert indice_placas.carregar(pool) is not None
+    return indice_placas
+
+
+def _ids(indice, placa):
+    return [candidato['veiculo_id'] for candidato in indice.buscar(placa) if candidato['placa'] == placa]
+
+
+def test_leitura_com_caracteres_confundiveis():
+    indice = IndicePlacasAproximado()
+    indice.construir(["ABC1D23", "XYZ9A87"], [1, 2])
+    [candidato] = indice.buscar("A8C1O23")
+    assert (candidato['placa'], candidato['veiculo_id'], candidato['distancia']) == ("ABC1D23", 1, 0)
+    assert indice.buscar("QQQ0Q00") == []
+
+
+def test_linha_antiga_da_base_substituida_por_outro_id():
+    indice = IndicePlacasAproximado()
+    indice.construir(["ABC1D23"], [1])
+    indice.adicionar("ABC1D23", 1) # Mesmo veículo: nada muda
+    assert len(indice) == 1
+    indice.adicionar("ABC1D23", 7) # Veículo 1 excluído sem passar por remover(); a placa foi recadastrada
+    assert _ids(indice, "ABC1D23") == [7]
+    indice.remover(7)
+    assert indice.buscar("ABC1D23") == []
+
+
+def test_exclusao_do_cliente_remove_as_placas(pool, cliente, indice_carregado):
+    veiculo_crud.adicionar_veiculo(pool, "Fiat", "Uno", 2010, "ABC1D23", cliente)
+    outro = cliente_crud.adicionar_cliente(pool, "Bruno Lima", "Rua C", "98765432100", "")
+    veiculo_crud.adicionar_veiculo(pool, "VW", "Gol", 2012, "XYZ9A87", outro)
+    indice_carregado.carregar(pool)
+    veiculo_crud.adicionar_veiculo(pool, "Ford", "Ka", 2015, "KKK1K11", cliente) # Depois da carga
+
+    assert cliente_crud.excluir_cliente(pool, cliente)
+    assert indice_carregado.buscar("ABC1D23") == [] and indice_carregado.buscar("KKK1K11") == []
+    assert cliente_crud.excluir_clientes(pool, [outro]) == 1
+    assert indice_carregado.buscar("XYZ9A87") == []
+
+    # A placa volta em outro veículo: o índice aponta para o novo ID
+    novo_dono = cliente_crud.adicionar_cliente(pool, "Carla Dias", "Rua D", "11122233344", "")
+    veiculo_id = veiculo_crud.adicionar_veiculo(pool, "Fiat", "Uno", 2010, "ABC1D23", novo_dono)
+    assert _ids(indice_carregado, "ABC1D23") == [veiculo_id]
@@ -0,0 +1,81 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+import cliente_crud
+import sessao_crud
+import veiculo_crud
+from mapa_placas import STATUS_CADASTRADO, MapaPlacas, gerar_mapa, mapa_placas, montar_mapa
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    return str(tmp_path / "mapa_placas.bin")
+
+
+def _geracoes(caminho):
+    pasta, nome = os.path.split(caminho)
+    return sorted(arquivo for arquivo in os.listdir(pasta)
+                  if arquivo.startswith(nome + ".") and arquivo[len(nome) + 1:].isdigit())
+
+
+def test_gerar_e_consultar(pool, cliente, caminho):
+    veiculo_id = veiculo_crud.adicionar_veiculo(pool, "Fiat", "Uno", 2010, "ABC1D23", cliente)
+    assert gerar_mapa(pool, caminho) == 1
+    leitor = MapaPlacas(intervalo_verificacao=60)
+    assert leitor.abrir(caminho) == 1
+    assert leitor.consultar("abc-1d23") == (veiculo_id, cliente, STATUS_CADASTRADO)
+    assert leitor.consultar("XYZ9A87") is None
+    assert leitor.consultar("placa ruim") is None
+
+
+def test_troca_de_geracao_sem_interromper_leitores(pool, cliente, caminho):
+    veiculo_crud.adicionar_veiculo(pool, "Fiat", "Uno", 2010, "ABC1D23", cliente)
+    gerar_mapa(pool, caminho)
+    leitor = MapaPlacas(intervalo_verificacao=0) # Verifica a indicação a cada consulta
+    leitor.abrir(caminho)
+    antiga = leitor._geracao
+    numero_antigo = leitor.geracao
+
+    novo_id = veiculo_crud.adicionar_veiculo(pool, "VW", "Gol", 2012, "XYZ9A87", cliente)
+    assert gerar_mapa(pool, caminho) == 2
+    assert leitor.consultar("XYZ9A87")[0] == novo_id
+    assert leitor.geracao != numero_antigo and len(leitor) == 2
+    # Quem ainda tinha a geração anterior continua lendo dela
+    assert len(antiga.mapa) > 0 and antiga.quantidade == 1
+
+    gerar_mapa(pool, caminho)
+    assert len(_geracoes(caminho)) == 2 # Só a atual e a anterior ficam no disco
+
+
+def test_geracao_invalida_mantem_a_atual(caminho):
+    with open(f"{caminho}.1", "wb") as arquivo:
+        arquivo.write(montar_mapa([("ABC1D23", 7, 3)], geracao=1))
+    with open(caminho, "w") as arquivo:
+        arquivo.write(os.path.basename(f"{caminho}.1"))
+    leitor = MapaPlacas(intervalo_verificacao=0)
+    assert leitor.abrir(caminho) == 1
+
+    with open(f"{caminho}.2", "wb") as arquivo:
+        arquivo.write(b"lixo")
+    with open(caminho, "w") as arquivo:
+        arquivo.write(os.path.basename(f"{caminho}.2"))
+    assert leitor.consultar("ABC1D23") == (7, 3, STATUS_CADASTRADO)
+    assert leitor.geracao == 1
+    assert MapaPlacas().abrir(os.path.join(os.path.dirname(caminho), "inexistente")) is None
+
+
+def test_saida_cobra_o_proprietario_atual_e_nao_o_do_mapa(pool, cliente, caminho):
+    veiculo_id = veiculo_crud.adicionar_veiculo(pool, "Fiat", "Uno", 2010, "ABC1D23", cliente)
+    gerar_mapa(pool, caminho)
+    novo_dono = cliente_crud.adicionar_cliente(pool, "Bruno Lima", "Rua C", "98765432100", "")
+    veiculo_crud.atualizar_veiculo(pool, veiculo_id, cliente_id_novo=novo_dono) # Depois da geração do mapa
+    assert mapa_placas.abrir(caminho) == 1
+    try:
+        entrada = datetime(2024, 3, 4, 9, 0)
+        assert sessao_crud.registrar_entrada(pool, "ABC1D23", entrada)
+        sessao = sessao_crud.registrar_saida(pool, "ABC1D23", entrada + timedelta(hours=1))
+    finally:
+        mapa_placas.fechar()
+    assert (sessao['veiculo_id'], sessao['cliente_id']) == (veiculo_id, novo_dono)
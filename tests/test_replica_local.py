@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta
+
+import cliente_crud
+import servidor_portaria
+import sessao_crud
+import veiculo_crud
+from db_utils import executar_query
+from fila_eventos import FilaEventos
+from replica_local import _ESQUEMA_REPLICA, criar_replica
+from tarifacao import tabela_tarifas
+
+ENTRADA = datetime(2024, 3, 4, 9, 0)
+
+
+def _replica(pool, monkeypatch=None, online=True):
+    replica = criar_replica(pool, ':memory:')
+    assert replica is not None
+    if monkeypatch is not None:
+        monkeypatch.setattr(replica, 'central_disponivel', lambda: online)
+    return replica
+
+
+def _total(conexao, tabela):
+    return executar_query(conexao, f"SELECT COUNT(*) AS n FROM {tabela}", fetch_one=True)['n']
+
+
+def test_copia_inicial_e_alteracoes_do_log(pool, cliente):
+    veiculo_id = veiculo_crud.adicionar_veiculo(pool, "Fiat", "Uno", 2010, "ABC1D23", cliente)
+    replica = _replica(pool)
+    assert replica.sincronizar() == {'enviadas': 0, 'conflitos': 0, 'recebidas': 2}
+    assert replica.consultar_veiculo_por_placa("ABC1D23")['id'] == veiculo_id
+
+    outro = veiculo_crud.adicionar_veiculo(pool, "VW", "Gol", 2012, "XYZ9A87", cliente)
+    assert veiculo_crud.excluir_veiculo(pool, veiculo_id)
+    assert replica.sincronizar()['recebidas'] == 2
+    assert replica.consultar_veiculo_por_placa("XYZ9A87")['id'] == outro
+    assert replica.consultar_veiculo_por_placa("ABC1D23") is None
+
+
+def test_escritas_offline_reenviadas_com_ids_definitivos(pool, monkeypatch):
+    replica = _replica(pool, monkeypatch, online=False)
+    cliente_id = replica.adicionar_cliente("Bruno Lima", "Rua C", "98765432100", "")
+    veiculo_id = replica.adicionar_veiculo("VW", "Gol", 2012, "xyz-9a87", cliente_id)
+    assert cliente_id < 0 and veiculo_id < 0
+    assert replica.pendencias() == 2
+    assert replica.consultar_veiculo_por_placa("XYZ9A87")['cliente_id'] == cliente_id
+
+    monkeypatch.setattr(replica, 'central_disponivel', lambda: True)
+    resumo = replica.sincronizar()
+    assert resumo['enviadas'] == 2 and resumo['conflitos'] == 0
+    assert replica.pendencias() == 0
+    central = veiculo_crud.consultar_veiculo_por_placa(pool, "XYZ9A87")
+    assert central['cliente_id'] == cliente_crud.consultar_cliente_por_cpf(pool, "98765432100")['id']
+    # Os registros provisórios dão lugar às versões do banco central
+    assert replica.consultar_veiculo_por_placa("XYZ9A87")['id'] == central['id']
+    assert _total(replica.local, "veiculos WHERE id < 0") == 0
+
+
+def test_conflito_de_cpf_prevalece_o_servidor(pool, cliente, monkeypatch):
+    replica = _replica(pool, monkeypatch, online=False)
+    assert replica.adicionar_cliente("Ana S.", "Rua Z", "12345678901", "")
+    monkeypatch.setattr(replica, 'central_disponivel', lambda: True)
+    assert replica.sincronizar()['conflitos'] == 1
+    assert cliente_crud.consultar_cliente_por_id(pool, cliente)['nome'] == "Ana Souza"
+    assert replica.consultar_cliente_por_cpf("12345678901")['id'] == cliente
+    assert _total(replica.local, "conflitos_replica") == 1
+
+
+def test_item_continua_na_fila_se_o_registro_local_falha(pool, monkeypatch):
+    replica = _replica(pool, monkeypatch, online=False)
+    cliente_id = replica.adicionar_cliente("Bruno Lima", "Rua C", "98765432100", "")
+    assert replica.adicionar_veiculo("VW", "Gol", 2012, "XYZ9A87", cliente_id)
+    monkeypatch.setattr(replica, 'central_disponivel', lambda: True)
+
+    executar_query(replica.local, "DROP TABLE ids_provisorios", commit=True)
+    assert replica.sincronizar() is None
+    assert replica.pendencias() == 2 # Nada foi retirado sem o ID traduzido ficar registrado
+
+    executar_query(replica.local, _ESQUEMA_REPLICA[2], commit=True)
+    resumo = replica.sincronizar()
+    # O cliente já havia chegado ao servidor: o reenvio o reconhece pelo CPF e o veículo segue com o ID certo
+    assert resumo['enviadas'] == 2
+    assert veiculo_crud.consultar_veiculo_por_placa(pool, "XYZ9A87")['cliente_id'] == \
+        cliente_crud.consultar_cliente_por_cpf(pool, "98765432100")['id']
+
+
+def _sessoes_centrais(pool):
+    return executar_query(pool, "SELECT id, placa, entrada, saida, cliente_id, valor_centavos FROM sessoes ORDER BY id",
+                          fetch_all=True)
+
+
+def test_portaria_funciona_sem_o_banco_central(pool, cliente, monkeypatch):
+    veiculo_crud.adicionar_veiculo(pool, "Fiat", "Uno", 2010, "ABC1D23", cliente)
+    replica = _replica(pool, monkeypatch, online=True)
+    replica.sincronizar()
+    monkeypatch.setattr(replica, 'central_disponivel', lambda: False)
+
+    sessao_id = replica.registrar_entrada("ABC1D23", ENTRADA)
+    assert sessao_id < 0
+    saida = replica.registrar_saida("ABC1D23", ENTRADA + timedelta(hours=2))
+    # A placa foi reconhecida pela réplica: cobrado como cliente, com desconto
+    assert saida['cliente_id'] == cliente
+    assert saida['valor_centavos'] == tabela_tarifas.calcular(ENTRADA, ENTRADA + timedelta(hours=2), cliente)
+    assert replica.pendencias() == 2
+    assert _sessoes_centrais(pool) == []
+
+    monkeypatch.setattr(replica, 'central_disponivel', lambda: True)
+    assert replica.sincronizar()['enviadas'] == 2
+    [sessao] = _sessoes_centrais(pool)
+    assert sessao['saida'] == ENTRADA + timedelta(hours=2)
+    assert (sessao['cliente_id'], sessao['valor_centavos']) == (cliente, saida['valor_centavos'])
+    assert _total(replica.local, "sessoes") == 0
+
+
+def test_sessao_aberta_offline_recebe_o_id_do_servidor(pool, monkeypatch):
+    replica = _replica(pool, monkeypatch, online=False)
+    assert replica.registrar_entrada("XYZ9A87", ENTRADA) < 0
+    monkeypatch.setattr(replica, 'central_disponivel', lambda: True)
+    replica.sincronizar()
+    [sessao] = _sessoes_centrais(pool)
+    assert sessao_crud.indice_ocupacao.obter("XYZ9A87")[0] == sessao['id']
+
+    # Com o banco central de volta, a saída vai direto a ele
+    assert replica.registrar_saida("XYZ9A87", ENTRADA + timedelta(hours=1))
+    assert replica.pendencias() == 0
+    assert _sessoes_centrais(pool)[0]['saida'] == ENTRADA + timedelta(hours=1)
+
+
+def test_indice_carregado_com_as_sessoes_offline(pool, monkeypatch):
+    assert sessao_crud.registrar_entrada(pool, "AAA1A11", ENTRADA)
+    replica = _replica(pool, monkeypatch, online=False)
+    assert replica.registrar_entrada("XYZ9A87", ENTRADA)
+    sessao_crud.indice_ocupacao.carregar([]) # Reinício da cabine
+
+    assert replica.carregar_sessoes_abertas() == 1 and replica.sessoes_sem_central
+    monkeypatch.setattr(replica, 'central_disponivel', lambda: True)
+    assert replica.carregar_sessoes_abertas() == 2
+    assert sessao_crud.veiculo_esta_dentro("AAA1A11") and sessao_crud.veiculo_esta_dentro("XYZ9A87")
+
+
+def test_rotas_da_portaria_usam_a_replica(pool, cliente, monkeypatch):
+    veiculo_crud.adicionar_veiculo(pool, "Fiat", "Uno", 2010, "ABC1D23", cliente)
+    replica = _replica(pool, monkeypatch, online=True)
+    replica.sincronizar()
+    monkeypatch.setattr(replica, 'central_disponivel', lambda: False)
+
+    status, resposta = servidor_portaria._portao(replica, "abc1d23", {})
+    assert status == 200 and resposta['cadastrado'] and resposta['cliente_id'] == cliente
+    status, resposta = servidor_portaria._adicionar_cliente(replica, None, {'nome': "Bruno", 'cpf': "98765432100"})
+    assert status == 201 and resposta['id'] < 0
+    assert replica.pendencias() == 1
+
+
+def test_fila_de_eventos_grava_pela_replica(pool, monkeypatch, tmp_path):
+    replica = _replica(pool, monkeypatch, online=False)
+    fila = FilaEventos()
+    assert fila.iniciar(replica.local, diario=str(tmp_path / "eventos.jsonl"), tipos=replica.tipos_evento()) == 0
+    assert fila.enviar('entrada', "XYZ9A87", ENTRADA)
+    fila.fechar()
+    assert fila.aplicados == 1
+    assert sessao_crud.veiculo_esta_dentro("XYZ9A87")
+    assert replica.pendencias() == 1 and _sessoes_centrais(pool) == []
@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+
+import cliente_crud
+from conftest import criar_pool_memoria
+from db_utils import RoteadorConexoes, executar_query, iterar_query, transacao
+
+CONSULTA = "SELECT nome FROM clientes WHERE cpf = %s"
+
+
+@pytest.fixture
+def replica():
+    """Réplica atrasada: banco separado que ainda não recebeu nada do primário."""
+    pool = criar_pool_memoria()
+    yield pool
+    pool.fechar()
+
+
+def _nome(conexao, cpf="12345678901"):
+    linha = executar_query(conexao, CONSULTA, (cpf,), fetch_one=True)
+    return linha['nome'] if linha else None
+
+
+def _em_outra_thread(funcao):
+    resultado = []
+    thread = threading.Thread(target=lambda: resultado.append(funcao()))
+    thread.start()
+    thread.join()
+    return resultado[0]
+
+
+def test_thread_que_escreveu_le_o_primario(pool, replica):
+    roteador = RoteadorConexoes(pool, [replica], janela_leitura_propria=5)
+    assert cliente_crud.adicionar_cliente(roteador, "Ana Souza", "", "12345678901", "")
+    assert _nome(roteador) == "Ana Souza"
+    # Outra thread, sem escrita recente, lê da réplica (que ainda não tem o cliente)
+    assert _em_outra_thread(lambda: _nome(roteador)) is None
+    assert _em_outra_thread(lambda: list(iterar_query(roteador, "SELECT id FROM clientes"))) == []
+
+
+def test_janela_de_leitura_propria_expira(pool, replica):
+    roteador = RoteadorConexoes(pool, [replica], janela_leitura_propria=0.05)
+    assert cliente_crud.adicionar_cliente(roteador, "Ana Souza", "", "12345678901", "")
+    assert _nome(roteador) == "Ana Souza"
+    time.sleep(0.1)
+    assert _nome(roteador) is None
+    sem_janela = RoteadorConexoes(pool, [replica], janela_leitura_propria=0)
+    assert cliente_crud.adicionar_cliente(sem_janela, "Bia Lima", "", "98765432100", "")
+    assert _nome(sem_janela, "98765432100") is None
+
+
+def test_leituras_dentro_da_transacao_ficam_no_primario(pool, replica):
+    roteador = RoteadorConexoes(pool, [replica], janela_leitura_propria=0)
+    with transacao(roteador):
+        assert cliente_crud.adicionar_cliente(roteador, "Ana Souza", "", "12345678901", "")
+        assert _nome(roteador) == "Ana Souza"
+
+
+def test_replica_inacessivel_fica_fora_do_rodizio(pool, replica, cliente):
+    roteador = RoteadorConexoes(pool, [replica], janela_leitura_propria=0, pausa_replica_falha=60)
+    replica.fechar()
+    assert _nome(roteador) == "Ana Souza" # Refeita no primário
+    assert roteador.escolher_replica() is None
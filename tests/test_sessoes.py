@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import cliente_crud
+import sessao_crud
+import veiculo_crud
+from db_utils import executar_query, transacao
+from tarifacao import faturar_periodo, tabela_tarifas
+
+ENTRADA = datetime(2024, 3, 4, 9, 0)
+
+
+def test_entrada_e_saida_de_cliente_cadastrado(pool, cliente):
+    veiculo_id = veiculo_crud.adicionar_veiculo(pool, "Fiat", "Uno", 2010, "ABC1D23", cliente)
+    sessao_id = sessao_crud.registrar_entrada(pool, "abc-1d23", ENTRADA)
+    assert sessao_id
+    assert sessao_crud.veiculo_esta_dentro("ABC1D23")
+    assert sessao_crud.consultar_ocupacao()['ocupadas'] == 1
+
+    saida = ENTRADA + timedelta(hours=2, minutes=10)
+    sessao = sessao_crud.registrar_saida(pool, "ABC1D23", saida)
+    assert sessao['id'] == sessao_id
+    assert sessao['veiculo_id'] == veiculo_id
+    assert sessao['cliente_id'] == cliente
+    assert sessao['valor_centavos'] == tabela_tarifas.calcular(ENTRADA, saida, cliente)
+    assert not sessao_crud.veiculo_esta_dentro("ABC1D23")
+    gravada = executar_query(pool, "SELECT saida, cliente_id, valor_centavos FROM sessoes WHERE id = %s",
+                             (sessao_id,), fetch_one=True)
+    assert gravada == {'saida': saida, 'cliente_id': cliente, 'valor_centavos': sessao['valor_centavos']}
+
+
+def test_faturamento_usa_o_cliente_cobrado_na_saida(pool, cliente):
+    pytest.importorskip("numpy")
+    veiculo_id = veiculo_crud.adicionar_veiculo(pool, "Fiat", "Uno", 2010, "ABC1D23", cliente)
+    sessao_crud.registrar_entrada(pool, "ABC1D23", ENTRADA)
+    cobrado = sessao_crud.registrar_saida(pool, "ABC1D23", ENTRADA + timedelta(hours=3))['valor_centavos']
+    # O veículo é vendido depois da saída: a fatura continua com quem pagou na cancela
+    novo_dono = cliente_crud.adicionar_cliente(pool, "Bruno Lima", "Rua C", "98765432100", "")
+    assert veiculo_crud.atualizar_veiculo(pool, veiculo_id, cliente_id_novo=novo_dono)
+    faturamento = faturar_periodo(pool, ENTRADA, ENTRADA + timedelta(days=1))
+    assert faturamento == {cliente: {'sessoes': 1, 'total_centavos': cobrado}}
+
+
+def test_avulso_e_entrada_repetida(pool):
+    assert sessao_crud.registrar_entrada(pool, "XYZ9A87", ENTRADA)
+    assert sessao_crud.registrar_entrada(pool, "XYZ9A87", ENTRADA) is None # Já está no pátio
+    sessao = sessao_crud.registrar_saida(pool, "XYZ9A87", ENTRADA + timedelta(hours=1))
+    assert sessao['veiculo_id'] is None and sessao['cliente_id'] is None
+    assert sessao_crud.registrar_saida(pool, "XYZ9A87") is None # Já saiu
+
+
+def test_estacionamento_lotado(pool, monkeypatch):
+    monkeypatch.setattr(sessao_crud.indice_ocupacao, 'total_vagas', 1)
+    assert sessao_crud.registrar_entrada(pool, "AAA1A11", ENTRADA)
+    assert sessao_crud.registrar_entrada(pool, "BBB2B22", ENTRADA) is None
+    assert sessao_crud.consultar_ocupacao()['vagas_livres'] == 0
+    assert not sessao_crud.veiculo_esta_dentro("BBB2B22") # A reserva recusada não fica no índice
+
+
+def test_indice_recarregado_do_banco(pool, cliente):
+    veiculo_crud.adicionar_veiculo(pool, "Fiat", "Uno", 2010, "ABC1D23", cliente)
+    sessao_id = sessao_crud.registrar_entrada(pool, "ABC1D23", ENTRADA)
+    sessao_crud.registrar_entrada(pool, "XYZ9A87", ENTRADA)
+    sessao_crud.indice_ocupacao.carregar([]) # Reinício do processo
+    assert sessao_crud.carregar_sessoes_abertas(pool) == 2
+    assert sessao_crud.indice_ocupacao.obter("ABC1D23")[0] == sessao_id
+    assert sessao_crud.indice_ocupacao.obter("ABC1D23")[3] == cliente
+
+
+def test_entrada_desfeita_libera_a_vaga(pool):
+    with transacao(pool) as tx:
+        assert sessao_crud.registrar_entrada(pool, "ABC1D23", ENTRADA)
+        tx.desfazer()
+    assert not sessao_crud.veiculo_esta_dentro("ABC1D23")
+    assert executar_query(pool, "SELECT COUNT(*) AS n FROM sessoes", fetch_one=True)['n'] == 0
+
+
+def test_reserva_concorrente_da_mesma_placa():
+    indice = sessao_crud.IndiceOcupacao(total_vagas=2)
+    assert indice.reservar("ABC1D23") is None
+    assert indice.reservar("ABC1D23") == 'dentro'
+    assert indice.reservar("XYZ9A87") is None
+    assert indice.reservar("AAA1A11") == 'lotado'
+    indice.liberar("ABC1D23")
+    assert indice.vagas_livres() == 1
+
@@ -0,0 +1,60 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from tarifacao import TabelaTarifas, formatar_valor
+
+np = pytest.importorskip("numpy")
+
+CONFIG = {
+    'tolerancia_minutos': 15,
+    'faixas': [(0, 6, 400), (6, 20, 800), (20, 24, 500)],
+    'teto_diario': 5000,
+    'desconto_assinante': 20,
+    'descontos_por_cliente': {7: 50, 42: 100},
+}
+
+
+def test_regras_do_modo_escalar():
+    tabela = TabelaTarifas(CONFIG)
+    entrada = datetime(2024, 3, 4, 9, 0)
+    assert tabela.calcular(entrada, entrada + timedelta(minutes=15)) == 0
+    assert tabela.calcular(entrada, entrada + timedelta(minutes=16)) == 800
+    assert tabela.calcular(entrada, entrada + timedelta(hours=2, minutes=1)) == 3 * 800
+    assert tabela.calcular(entrada, entrada + timedelta(hours=10)) == 5000 # Teto diário
+    assert tabela.calcular(entrada, entrada + timedelta(hours=1), cliente_id=3) == 640
+    assert tabela.calcular(entrada, entrada + timedelta(hours=1), cliente_id=42) == 0
+    assert tabela.calcular(entrada, entrada + timedelta(hours=1), cliente_id=0) == 800 # 0 também é avulso
+    with pytest.raises(ValueError):
+        tabela.calcular(entrada, entrada - timedelta(minutes=1))
+
+
+def test_faixas_precisam_cobrir_o_dia():
+    with pytest.raises(ValueError):
+        TabelaTarifas({**CONFIG, 'faixas': [(0, 20, 800)]})
+
+
+def test_modo_vetorizado_igual_ao_escalar():
+    tabela = TabelaTarifas(CONFIG)
+    sorteio = random.Random(20240304)
+    inicio = datetime(2024, 1, 1)
+    entradas, saidas, cliente_ids = [], [], []
+    for _ in range(5000):
+        entrada = inicio + timedelta(minutes=sorteio.randrange(60 * 24 * 60), seconds=sorteio.randrange(60))
+        entradas.append(entrada)
+        saidas.append(entrada + timedelta(minutes=sorteio.choice([0, 15, 16, 59, 60, 61, 1439, 1440, 1441])
+                                          + sorteio.randrange(3 * 24 * 60)))
+        cliente_ids.append(sorteio.choice([None, 0, 3, 7, 42]))
+
+    lote = tabela.calcular_lote(entradas, saidas, cliente_ids)
+    escalar = [tabela.calcular(e, s, c) for e, s, c in zip(entradas, saidas, cliente_ids)]
+    assert lote.tolist() == escalar
+    assert tabela.calcular_lote(np.array(entradas, dtype='datetime64[s]'),
+                                np.array(saidas, dtype='datetime64[s]')).tolist() == \
+        [tabela.calcular(e, s) for e, s in zip(entradas, saidas)]
+
+
+def test_formatar_valor():
+    assert formatar_valor(1250) == "R$ 12,50"
+    assert formatar_valor(5) == "R$ 0,05"
@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import cliente_crud
+from db_utils import (CommitAgrupado, ERRO_DUPLICADO, ao_desfazer, apos_confirmar, executar_query, transacao,
+                      ultimo_erro)
+
+
+def _cpfs(pool):
+    linhas = executar_query(pool, "SELECT cpf FROM clientes ORDER BY cpf", fetch_all=True, formato='tupla')
+    return [cpf for cpf, in linhas]
+
+
+def test_um_commit_para_o_bloco_e_callbacks(pool):
+    eventos = []
+    with transacao(pool) as tx:
+        assert cliente_crud.adicionar_cliente(pool, "Ana", "", "11111111111", "")
+        assert cliente_crud.adicionar_cliente(pool, "Bia", "", "22222222222", "")
+        apos_confirmar(eventos.append, 'confirmada')
+        ao_desfazer(eventos.append, 'desfeita')
+        assert eventos == [] # Só depois do commit
+    assert tx.confirmada
+    assert eventos == ['confirmada']
+    assert _cpfs(pool) == ["11111111111", "22222222222"]
+
+
+def test_desfazer_e_excecao_desfazem_tudo(pool):
+    eventos = []
+    with transacao(pool) as tx:
+        cliente_crud.adicionar_cliente(pool, "Ana", "", "11111111111", "")
+        apos_confirmar(eventos.append, 'confirmada')
+        ao_desfazer(eventos.append, 'desfeita')
+        tx.desfazer()
+    assert tx.confirmada is False
+    assert eventos == ['desfeita']
+
+    with pytest.raises(RuntimeError):
+        with transacao(pool):
+            cliente_crud.adicionar_cliente(pool, "Bia", "", "22222222222", "")
+            raise RuntimeError("falha no meio do bloco")
+    assert _cpfs(pool) == []
+
+
+def test_ponto_de_salvamento_desfaz_so_o_bloco_interno(pool):
+    eventos = []
+    with transacao(pool) as tx:
+        cliente_crud.adicionar_cliente(pool, "Ana", "", "11111111111", "")
+        with transacao(pool) as ponto:
+            cliente_crud.adicionar_cliente(pool, "Bia", "", "22222222222", "")
+            ao_desfazer(eventos.append, 'interno desfeito')
+            apos_confirmar(eventos.append, 'interno confirmado')
+            ponto.desfazer()
+        with transacao(pool):
+            apos_confirmar(eventos.append, 'segundo confirmado')
+        # Comando recusado (CPF duplicado): só o seu ponto de salvamento é desfeito
+        assert cliente_crud.adicionar_cliente(pool, "Ana de novo", "", "11111111111", "") is None
+        assert ultimo_erro() == ERRO_DUPLICADO
+        cliente_crud.adicionar_cliente(pool, "Carla", "", "33333333333", "")
+    assert tx.confirmada
+    assert eventos == ['interno desfeito', 'segundo confirmado']
+    assert _cpfs(pool) == ["11111111111", "33333333333"]
+
+
+def test_commit_agrupado_confirma_varias_threads_juntas(pool):
+    escritor = CommitAgrupado(pool, operacoes_por_commit=50, espera_maxima=0.2)
+    cpfs = [f"{numero:011d}" for numero in range(1, 21)] + ["00000000001"] # O último repete um CPF
+
+    def adicionar(cpf):
+        return escritor.executar(cliente_crud.adicionar_cliente, pool, f"Cliente {cpf}", "", cpf, ""), ultimo_erro()
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(cpfs)) as executor:
+            resultados = list(executor.map(adicionar, cpfs))
+    finally:
+        escritor.fechar()
+    recusados = [erro for cliente_id, erro in resultados if cliente_id is None]
+    assert recusados == [ERRO_DUPLICADO] # O erro chega à thread que enviou a operação
+    assert len(_cpfs(pool)) == 20
+    assert escritor.grupos < len(cpfs) # Menos commits que operações
+    assert escritor.executar(cliente_crud.adicionar_cliente, pool, "Depois", "", "99999999999", "") is None
@@ -1,220 +1,389 @@
-# veiculo_crud.py
-# Este arquivo contém as funções CRUD (Create, Read, Update, Delete) para a entidade 'veiculos'.
-
-from db_utils import executar_query
-from cliente_crud import consultar_cliente_por_id # Usado para verificar se o cliente proprietário existe
-
-def adicionar_veiculo(conexao, marca, modelo, ano, placa, cliente_id):
-    """
-    Adiciona um novo veículo ao banco de dados, associado a um cliente existente.
-
-    Args:
-        conexao: Objeto de conexão com o banco.
-        marca (str): Marca do veículo.
-        modelo (str): Modelo do veículo.
-        ano (int): Ano do veículo.
-        placa (str): Placa do veículo (deve ser única).
-        cliente_id (int): ID do cliente proprietário do veículo.
-
-    Returns:
-        int or None: O ID do veículo adicionado se sucesso, None caso contrário.
-    """
-    # Verifica se o cliente proprietário existe
-    cliente_proprietario = consultar_cliente_por_id(conexao, cliente_id)
-    if not cliente_proprietario:
-        print(f"Cliente com ID {cliente_id} não encontrado. Não é possível adicionar o veículo.")
-        return None
-
-    query = "INSERT INTO veiculos (marca, modelo, ano, placa, cliente_id) VALUES (%s, %s, %s, %s, %s)"
-    params = (marca, modelo, ano, placa, cliente_id)
-    try:
-        veiculo_id = executar_query(conexao, query, params, commit=True)
-        if veiculo_id:
-            print(f"Veículo {marca} {modelo} (Placa: {placa}) adicionado com sucesso (ID: {veiculo_id}) "
-                  f"para o cliente '{cliente_proprietario['nome']}'.")
-            return veiculo_id
-        else:
-            # Isso pode acontecer se a placa já existir (devido à restrição UNIQUE)
-            # ou outro erro na execução da query.
-            print(f"Falha ao adicionar veículo {marca} {modelo}. Verifique se a placa já está cadastrada.")
-            return None
-    except Exception as e:
-        print(f"Erro inesperado ao adicionar veículo: {e}")
-        return None
-
-
-def listar_veiculos(conexao):
-    """
-    Lista todos os veículos cadastrados, incluindo informações do proprietário.
-
-    Args:
-        conexao: Objeto de conexão com o banco.
-
-    Returns:
-        list or None: Uma lista de dicionários representando os veículos, ou None se não houver veículos ou erro.
-    """
-    # Query SQL com JOIN para buscar dados das tabelas 'veiculos' e 'clientes'
-    query = """
-        SELECT
-            v.id, v.marca, v.modelo, v.ano, v.placa,
-            c.nome AS nome_cliente, c.cpf AS cpf_cliente
-        FROM veiculos v
-        JOIN clientes c ON v.cliente_id = c.id
-    """
-    veiculos = executar_query(conexao, query, fetch_all=True)
-    if veiculos:
-        print("\n--- Lista de Veículos ---")
-        for veiculo in veiculos:
-            print(f"ID: {veiculo['id']}, Marca: {veiculo['marca']}, Modelo: {veiculo['modelo']}, "
-                  f"Ano: {veiculo['ano']}, Placa: {veiculo['placa']}, "
-                  f"Proprietário: {veiculo['nome_cliente']} (CPF: {veiculo['cpf_cliente']})")
-        print("------------------------")
-    elif veiculos == []: # Lista vazia
-        print("Nenhum veículo cadastrado.")
-    else: # None, erro na consulta
-        print("Falha ao listar veículos.")
-    return veiculos
-
-def consultar_veiculo_por_placa(conexao, placa):
-    """
-    Consulta um veículo específico pela sua placa.
-
-    Args:
-        conexao: Objeto de conexão com o banco.
-        placa (str): Placa do veículo a ser consultado.
-
-    Returns:
-        dict or None: Um dicionário com os dados do veículo se encontrado, None caso contrário.
-    """
-    query = """
-        SELECT
-            v.id, v.marca, v.modelo, v.ano, v.placa, v.cliente_id,
-            c.nome AS nome_cliente, c.cpf AS cpf_cliente
-        FROM veiculos v
-        JOIN clientes c ON v.cliente_id = c.id
-        WHERE v.placa = %s
-    """
-    params = (placa,)
-    veiculo = executar_query(conexao, query, params, fetch_one=True)
-    if veiculo:
-        print("\n--- Veículo Encontrado ---")
-        print(f"ID: {veiculo['id']}, Marca: {veiculo['marca']}, Modelo: {veiculo['modelo']}, "
-              f"Ano: {veiculo['ano']}, Placa: {veiculo['placa']}, "
-              f"Proprietário: {veiculo['nome_cliente']} (CPF: {veiculo['cpf_cliente']}), ID Cliente: {veiculo['cliente_id']}")
-        print("------------------------")
-    else:
-        print(f"Veículo com placa '{placa}' não encontrado.")
-    return veiculo
-
-def consultar_veiculo_por_id(conexao, veiculo_id):
-    """
-    Consulta um veículo específico pelo seu ID.
-    Útil internamente para verificações.
-
-    Args:
-        conexao: Objeto de conexão com o banco.
-        veiculo_id (int): ID do veículo a ser consultado.
-
-    Returns:
-        dict or None: Um dicionário com os dados do veículo se encontrado, None caso contrário.
-    """
-    query = "SELECT id, marca, modelo, ano, placa, cliente_id FROM veiculos WHERE id = %s"
-    params = (veiculo_id,)
-    return executar_query(conexao, query, params, fetch_one=True)
-
-def atualizar_veiculo(conexao, veiculo_id, marca=None, modelo=None, ano=None, cliente_id_novo=None):
-    """
-    Atualiza os dados de um veículo existente.
-    A placa não é atualizável por ser um identificador único.
-
-    Args:
-        conexao: Objeto de conexão com o banco.
-        veiculo_id (int): ID do veículo a ser atualizado.
-        marca (str, optional): Nova marca do veículo.
-        modelo (str, optional): Novo modelo do veículo.
-        ano (int, optional): Novo ano do veículo.
-        cliente_id_novo (int, optional): Novo ID do cliente proprietário.
-
-    Returns:
-        bool: True se a atualização foi bem-sucedida, False caso contrário.
-    """
-    veiculo_existente = consultar_veiculo_por_id(conexao, veiculo_id)
-    if not veiculo_existente:
-        print(f"Veículo com ID {veiculo_id} não encontrado. Não é possível atualizar.")
-        return False
-
-    campos_para_atualizar = []
-    params_valores = []
-
-    if marca is not None and marca.strip() != "":
-        campos_para_atualizar.append("marca = %s")
-        params_valores.append(marca)
-    if modelo is not None and modelo.strip() != "":
-        campos_para_atualizar.append("modelo = %s")
-        params_valores.append(modelo)
-    if ano is not None: # ano pode ser 0, mas aqui assumimos que None significa não alterar
-        try:
-            # Validar se o ano é um inteiro antes de adicionar
-            ano_int = int(ano)
-            campos_para_atualizar.append("ano = %s")
-            params_valores.append(ano_int)
-        except ValueError:
-            print("Ano inválido fornecido para atualização. O ano não será alterado.")
-
-    if cliente_id_novo is not None:
-        # Verifica se o novo cliente proprietário existe
-        novo_proprietario = consultar_cliente_por_id(conexao, cliente_id_novo)
-        if not novo_proprietario:
-            print(f"Novo cliente proprietário com ID {cliente_id_novo} não encontrado. "
-                  "O proprietário do veículo não será alterado.")
-        else:
-            campos_para_atualizar.append("cliente_id = %s")
-            params_valores.append(cliente_id_novo)
-
-    if not campos_para_atualizar:
-        print("Nenhum dado válido fornecido para atualização do veículo.")
-        return False
-
-    query = f"UPDATE veiculos SET {', '.join(campos_para_atualizar)} WHERE id = %s"
-    params_valores.append(veiculo_id) # Adiciona o ID do veículo ao final
-
-    resultado_update = executar_query(conexao, query, tuple(params_valores), commit=True)
-    if resultado_update is not None:
-        print(f"Dados do veículo ID {veiculo_id} atualizados com sucesso.")
-        return True
-    else:
-        print(f"Falha ao atualizar dados do veículo ID {veiculo_id}.")
-        return False
-
-def excluir_veiculo(conexao, veiculo_id):
-    """
-    Exclui um veículo do banco de dados.
-
-    Args:
-        conexao: Objeto de conexão com o banco.
-        veiculo_id (int): ID do veículo a ser excluído.
-
-    Returns:
-        bool: True se a exclusão foi bem-sucedida, False caso contrário.
-    """
-    veiculo_existente = consultar_veiculo_por_id(conexao, veiculo_id)
-    if not veiculo_existente:
-        print(f"Veículo com ID {veiculo_id} não encontrado. Não é possível excluir.")
-        return False
-
-    # Confirmação do usuário
-    confirmacao = input(f"Tem certeza que deseja excluir o veículo {veiculo_existente['marca']} "
-                        f"{veiculo_existente['modelo']} (Placa: {veiculo_existente['placa']})? (s/N): ").strip().lower()
-    if confirmacao != 's':
-        print("Exclusão cancelada pelo usuário.")
-        return False
-
-    query = "DELETE FROM veiculos WHERE id = %s"
-    params = (veiculo_id,)
-    resultado_delete = executar_query(conexao, query, params, commit=True)
-    if resultado_delete is not None:
-        print(f"Veículo ID {veiculo_id} ('{veiculo_existente['marca']} {veiculo_existente['modelo']}') excluído com sucesso.")
-        return True
-    else:
-        print(f"Falha ao excluir veículo ID {veiculo_id}.")
-        return False
\ No newline at end of file
+# veiculo_crud.py
+# Este arquivo contém as funções CRUD (Create, Read, Update, Delete) para a entidade 'veiculos'.
+
+from db_utils import executar_query, iterar_query, registrar_comando
+from db_utils import ultimo_erro, ERRO_DUPLICADO, ERRO_REFERENCIA_INEXISTENTE # Motivo de uma escrita recusada pelo banco
+from db_utils import ao_desfazer, apos_confirmar # Índice e cache acompanham o commit (ou o rollback) de transacao()
+from cache_consultas import cache_cadastro # Cache das consultas por placa e ID
+from log_alteracoes import executar_com_log, executar_conjunto_com_log, inserir_muitos_com_log # Escritas gravadas também no log de alterações
+from mensagens import coletar_mensagens, informar # Mensagens de status (impressas no menu, coletadas no modo em lote)
+from placas import normalizar_placa # Placas gravadas e consultadas sempre na forma canônica
+from indice_placas import indice_placas # Busca aproximada de placas lidas por câmera
+from cliente_crud import consultar_clientes_existentes # Validação em conjunto dos proprietários de um lote
+from registros import Veiculo, VeiculoComProprietario # Linhas de veículo com __slots__ (acesso por atributo ou por chave)
+
+# Comandos de texto fixo, registrados uma vez e preparados no servidor em cada conexão.
+# A consulta por placa é executada a cada leitura na cancela.
+INSERIR_VEICULO = registrar_comando("INSERT INTO veiculos (marca, modelo, ano, placa, cliente_id) VALUES (%s, %s, %s, %s, %s)")
+CONSULTA_VEICULO_POR_PLACA = registrar_comando("""
+    SELECT
+        v.id, v.marca, v.modelo, v.ano, v.placa, v.cliente_id,
+        c.nome AS nome_cliente, c.cpf AS cpf_cliente
+    FROM veiculos v
+    JOIN clientes c ON v.cliente_id = c.id
+    WHERE v.placa = %s
+""")
+CONSULTA_VEICULO_POR_ID = registrar_comando("SELECT id, marca, modelo, ano, placa, cliente_id FROM veiculos WHERE id = %s")
+EXCLUIR_VEICULO = registrar_comando("DELETE FROM veiculos WHERE id = %s")
+
+def adicionar_veiculo(conexao, marca, modelo, ano, placa, cliente_id):
+    """
+    Adiciona um novo veículo ao banco de dados, associado a um cliente existente.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        marca (str): Marca do veículo.
+        modelo (str): Modelo do veículo.
+        ano (int): Ano do veículo.
+        placa (str): Placa do veículo (deve ser única); é gravada na forma canônica (ver placas.py).
+        cliente_id (int): ID do cliente proprietário do veículo.
+
+    Returns:
+        int or None: O ID do veículo adicionado se sucesso, None caso contrário.
+    """
+    placa_canonica = normalizar_placa(placa)
+    if placa_canonica is None:
+        informar(f"Placa '{placa}' em formato inválido. Não é possível adicionar o veículo.")
+        return None
+    placa = placa_canonica
+    # Um único comando: a chave estrangeira garante que o proprietário existe e a restrição UNIQUE
+    # garante a placa inédita; o motivo de uma recusa vem do código de erro do banco.
+    query = INSERIR_VEICULO
+    params = (marca, modelo, ano, placa, cliente_id)
+    try:
+        veiculo_id = executar_com_log(conexao, query, params, 'veiculos', 'INSERT', chave=placa)
+        if veiculo_id:
+            apos_confirmar(indice_placas.adicionar, placa, veiculo_id)
+            informar(f"Veículo {marca} {modelo} (Placa: {placa}) adicionado com sucesso (ID: {veiculo_id}) "
+                  f"para o cliente ID {cliente_id}.")
+            return veiculo_id
+        erro = ultimo_erro()
+        if erro == ERRO_REFERENCIA_INEXISTENTE:
+            informar(f"Cliente com ID {cliente_id} não encontrado. Não é possível adicionar o veículo.")
+        elif erro == ERRO_DUPLICADO:
+            informar(f"Falha ao adicionar veículo {marca} {modelo}: a placa {placa} já está cadastrada.")
+        else:
+            informar(f"Falha ao adicionar veículo {marca} {modelo}.")
+        return None
+    except Exception as e:
+        informar(f"Erro inesperado ao adicionar veículo: {e}")
+        return None
+
+def adicionar_veiculos(conexao, veiculos):
+    """
+    Adiciona vários veículos de uma vez. Os proprietários e as placas de todo o lote são
+    validados com uma consulta cada (WHERE ... IN), e as linhas válidas são inseridas com um único executemany.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        veiculos (list): Tuplas (marca, modelo, ano, placa, cliente_id); as placas são gravadas na forma canônica.
+
+    Returns:
+        dict or None: 'inseridos' (quantidade) e 'rejeitados' (lista de (posição no lote, motivo)),
+        ou None se a validação ou a inserção falharam.
+    """
+    placas = [normalizar_placa(veiculo[3]) for veiculo in veiculos]
+    existentes = consultar_clientes_existentes(conexao, [veiculo[4] for veiculo in veiculos])
+    placas_cadastradas = consultar_placas_existentes(conexao, [placa for placa in placas if placa])
+    if existentes is None or placas_cadastradas is None:
+        informar("Falha ao validar o lote de veículos.")
+        return None
+
+    validos, rejeitados, placas_do_lote = [], [], set()
+    for posicao, ((marca, modelo, ano, placa_lida, cliente_id), placa) in enumerate(zip(veiculos, placas)):
+        if placa is None:
+            rejeitados.append((posicao, f"Placa '{placa_lida}' em formato inválido."))
+        elif cliente_id not in existentes:
+            rejeitados.append((posicao, f"Cliente com ID {cliente_id} não encontrado."))
+        elif placa in placas_cadastradas or placa in placas_do_lote:
+            rejeitados.append((posicao, f"Placa {placa} já cadastrada."))
+        else:
+            placas_do_lote.add(placa)
+            validos.append((marca, modelo, ano, placa, cliente_id))
+
+    ids = inserir_muitos_com_log(conexao, INSERIR_VEICULO.sql, validos, 'veiculos',
+                                 [veiculo[3] for veiculo in validos], 'placa') if validos else []
+    if ids is None:
+        informar("Falha ao inserir o lote de veículos.")
+        return None
+    for veiculo, veiculo_id in zip(validos, ids):
+        apos_confirmar(indice_placas.adicionar, veiculo[3], veiculo_id)
+    return {'inseridos': len(ids), 'rejeitados': rejeitados}
+
+def listar_veiculos(conexao):
+    """
+    Lista todos os veículos cadastrados, incluindo informações do proprietário.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+
+    Returns:
+        list or None: Uma lista de VeiculoComProprietario (registros.py), ou None se não houver veículos ou erro.
+    """
+    # Query SQL com JOIN para buscar dados das tabelas 'veiculos' e 'clientes'
+    query = """
+        SELECT
+            v.id, v.marca, v.modelo, v.ano, v.placa, v.cliente_id,
+            c.nome AS nome_cliente, c.cpf AS cpf_cliente
+        FROM veiculos v
+        JOIN clientes c ON v.cliente_id = c.id
+    """
+    veiculos = executar_query(conexao, query, fetch_all=True, formato=VeiculoComProprietario)
+    if veiculos == []: # Lista vazia
+        informar("Nenhum veículo cadastrado.")
+    elif veiculos is None: # None, erro na consulta
+        informar("Falha ao listar veículos.")
+    return veiculos
+
+def listar_veiculos_pagina(conexao, ultimo_id=0, limite=50):
+    """
+    Busca uma página de veículos (com dados do proprietário) usando paginação por chave.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        ultimo_id (int, optional): Maior ID de veículo da página anterior (0 para a primeira). Defaults to 0.
+        limite (int, optional): Quantidade máxima de veículos na página. Defaults to 50.
+
+    Returns:
+        list or None: Lista de VeiculoComProprietario ordenada por ID (vazia ao fim da tabela), ou None em caso de erro.
+    """
+    query = """
+        SELECT
+            v.id, v.marca, v.modelo, v.ano, v.placa, v.cliente_id,
+            c.nome AS nome_cliente, c.cpf AS cpf_cliente
+        FROM veiculos v
+        JOIN clientes c ON v.cliente_id = c.id
+        WHERE v.id > %s
+        ORDER BY v.id
+        LIMIT %s
+    """
+    return executar_query(conexao, query, (ultimo_id, limite), fetch_all=True, formato=VeiculoComProprietario)
+
+def iterar_veiculos(conexao, tamanho_lote=500):
+    """
+    Percorre todos os veículos (com dados do proprietário) sem carregar o resultado inteiro na memória.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        tamanho_lote (int, optional): Linhas trazidas do servidor por vez. Defaults to 500.
+
+    Yields:
+        VeiculoComProprietario: Um veículo por vez.
+    """
+    query = """
+        SELECT
+            v.id, v.marca, v.modelo, v.ano, v.placa, v.cliente_id,
+            c.nome AS nome_cliente, c.cpf AS cpf_cliente
+        FROM veiculos v
+        JOIN clientes c ON v.cliente_id = c.id
+        ORDER BY v.id
+    """
+    return iterar_query(conexao, query, tamanho_lote=tamanho_lote, formato=VeiculoComProprietario)
+
+def consultar_veiculo_por_placa(conexao, placa):
+    """
+    Consulta um veículo específico pela sua placa.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        placa (str): Placa do veículo a ser consultado, em qualquer formato (ABC-1234, abc1234, ABC1D23).
+
+    Returns:
+        VeiculoComProprietario or None: Os dados do veículo e do proprietário se encontrado, None caso contrário.
+    """
+    placa = normalizar_placa(placa) or placa # Placa inválida não está cadastrada; a consulta apenas não encontra
+    query = CONSULTA_VEICULO_POR_PLACA
+    params = (placa,)
+    veiculo = cache_cadastro.obter(conexao, ('placa', placa))
+    if veiculo is None:
+        veiculo = executar_query(conexao, query, params, fetch_one=True, formato=VeiculoComProprietario)
+        if veiculo:
+            cache_cadastro.guardar_veiculo(conexao, ('placa', placa), veiculo)
+    if not veiculo:
+        informar(f"Veículo com placa '{placa}' não encontrado.")
+    return veiculo
+
+def consultar_veiculos_por_placa_aproximada(conexao, placa_lida, distancia_maxima=None, limite=None):
+    """
+    Busca os veículos cujas placas se parecem com uma leitura de câmera (OCR), para quando a
+    consulta exata não encontra a placa. Os candidatos do índice são confirmados no banco.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        placa_lida (str): Placa como lida pela câmera (ex.: 'AB81O23').
+        distancia_maxima (int, optional): Posições erradas aceitas (até 2). Defaults to INDICE_PLACAS_CONFIG.
+        limite (int, optional): Quantidade máxima de veículos. Defaults to INDICE_PLACAS_CONFIG.
+
+    Returns:
+        list or None: Dicionários com os dados do veículo (como em consultar_veiculo_por_placa) mais 'distancia' e
+        'diferencas', do mais provável ao menos provável; None se o índice não está carregado.
+    """
+    if not indice_placas.carregado:
+        informar("Índice de placas não carregado. A busca aproximada não está disponível.")
+        return None
+    veiculos = []
+    for candidato in indice_placas.buscar(placa_lida, distancia_maxima, limite):
+        with coletar_mensagens(): # Candidato já excluído por outro processo apenas não entra no resultado
+            veiculo = consultar_veiculo_por_placa(conexao, candidato['placa'])
+        if veiculo:
+            veiculos.append(dict(veiculo, distancia=candidato['distancia'], diferencas=candidato['diferencas']))
+    if not veiculos:
+        informar(f"Nenhum veículo com placa parecida com '{placa_lida}'.")
+    return veiculos
+
+def consultar_veiculo_por_id(conexao, veiculo_id):
+    """
+    Consulta um veículo específico pelo seu ID.
+    Útil internamente para verificações.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        veiculo_id (int): ID do veículo a ser consultado.
+
+    Returns:
+        Veiculo or None: Os dados do veículo se encontrado, None caso contrário.
+    """
+    query = CONSULTA_VEICULO_POR_ID
+    params = (veiculo_id,)
+    veiculo = cache_cadastro.obter(conexao, ('veiculo_id', veiculo_id))
+    if veiculo is None:
+        veiculo = executar_query(conexao, query, params, fetch_one=True, formato=Veiculo)
+        if veiculo:
+            cache_cadastro.guardar_veiculo(conexao, ('veiculo_id', veiculo_id), veiculo)
+    return veiculo
+
+def consultar_placas_existentes(conexao, placas):
+    """
+    Verifica de uma só vez quais placas já estão cadastradas.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        placas (iterable): Placas a verificar, em qualquer formato.
+
+    Returns:
+        set or None: Conjunto com as placas encontradas (na forma canônica), ou None em caso de erro.
+    """
+    lista_placas = list({normalizar_placa(placa) or placa for placa in placas})
+    if not lista_placas:
+        return set()
+    marcadores = ", ".join(["%s"] * len(lista_placas))
+    query = f"SELECT placa FROM veiculos WHERE placa IN ({marcadores})"
+    linhas = executar_query(conexao, query, tuple(lista_placas), fetch_all=True, formato='tupla')
+    if linhas is None:
+        return None
+    return {placa for placa, in linhas}
+
+def atualizar_veiculo(conexao, veiculo_id, marca=None, modelo=None, ano=None, cliente_id_novo=None):
+    """
+    Atualiza os dados de um veículo existente.
+    A placa não é atualizável por ser um identificador único.
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        veiculo_id (int): ID do veículo a ser atualizado.
+        marca (str, optional): Nova marca do veículo.
+        modelo (str, optional): Novo modelo do veículo.
+        ano (int, optional): Novo ano do veículo.
+        cliente_id_novo (int, optional): Novo ID do cliente proprietário.
+
+    Returns:
+        bool: True se a atualização foi bem-sucedida, False caso contrário (inclusive veículo ou
+        novo proprietário inexistentes).
+    """
+    campos_para_atualizar = []
+    params_valores = []
+
+    if marca is not None and marca.strip() != "":
+        campos_para_atualizar.append("marca = %s")
+        params_valores.append(marca)
+    if modelo is not None and modelo.strip() != "":
+        campos_para_atualizar.append("modelo = %s")
+        params_valores.append(modelo)
+    if ano is not None: # ano pode ser 0, mas aqui assumimos que None significa não alterar
+        try:
+            # Validar se o ano é um inteiro antes de adicionar
+            ano_int = int(ano)
+            campos_para_atualizar.append("ano = %s")
+            params_valores.append(ano_int)
+        except ValueError:
+            informar("Ano inválido fornecido para atualização. O ano não será alterado.")
+
+    if cliente_id_novo is not None:
+        # A existência do novo proprietário é garantida pela chave estrangeira
+        campos_para_atualizar.append("cliente_id = %s")
+        params_valores.append(cliente_id_novo)
+
+    if not campos_para_atualizar:
+        informar("Nenhum dado válido fornecido para atualização do veículo.")
+        return False
+
+    query = f"UPDATE veiculos SET {', '.join(campos_para_atualizar)} WHERE id = %s"
+    params_valores.append(veiculo_id) # Adiciona o ID do veículo ao final
+
+    # Um único comando: rowcount 0 significa que o veículo não existe, sem consultá-lo antes.
+    resultado_update = executar_com_log(conexao, query, tuple(params_valores), 'veiculos', 'UPDATE', registro_id=veiculo_id)
+    cache_cadastro.invalidar_veiculo(conexao, veiculo_id)
+    ao_desfazer(cache_cadastro.limpar) # Leituras feitas na transação podem ter guardado dados desfeitos
+    if resultado_update is None:
+        if ultimo_erro() == ERRO_REFERENCIA_INEXISTENTE:
+            informar(f"Novo cliente proprietário com ID {cliente_id_novo} não encontrado. O veículo não foi alterado.")
+        else:
+            informar(f"Falha ao atualizar dados do veículo ID {veiculo_id}.")
+        return False
+    if resultado_update == 0:
+        informar(f"Veículo com ID {veiculo_id} não encontrado. Não é possível atualizar.")
+        return False
+    informar(f"Dados do veículo ID {veiculo_id} atualizados com sucesso.")
+    return True
+
+def excluir_veiculo(conexao, veiculo_id):
+    """
+    Exclui um veículo do banco de dados.
+    A confirmação com o usuário fica a cargo da interface (ver main.py).
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        veiculo_id (int): ID do veículo a ser excluído.
+
+    Returns:
+        bool: True se a exclusão foi bem-sucedida, False caso contrário (inclusive veículo inexistente).
+    """
+    resultado_delete = executar_com_log(conexao, EXCLUIR_VEICULO, (veiculo_id,), 'veiculos', 'DELETE', registro_id=veiculo_id)
+    cache_cadastro.invalidar_veiculo(conexao, veiculo_id)
+    ao_desfazer(cache_cadastro.limpar)
+    if resultado_delete:
+        apos_confirmar(indice_placas.remover, veiculo_id)
+    if resultado_delete is None:
+        informar(f"Falha ao excluir veículo ID {veiculo_id}.")
+        return False
+    if resultado_delete == 0:
+        informar(f"Veículo com ID {veiculo_id} não encontrado. Não é possível excluir.")
+        return False
+    informar(f"Veículo ID {veiculo_id} excluído com sucesso.")
+    return True
+
+def excluir_veiculos(conexao, ids_veiculos):
+    """
+    Exclui vários veículos com um único comando DELETE ... WHERE id IN (...).
+
+    Args:
+        conexao: Objeto de conexão com o banco.
+        ids_veiculos (iterable): IDs dos veículos a excluir.
+
+    Returns:
+        int or None: Quantidade de veículos excluídos (IDs inexistentes são ignorados), ou None em caso de erro.
+    """
+    ids = list(set(ids_veiculos))
+    if not ids:
+        return 0
+    marcadores = ", ".join(["%s"] * len(ids))
+    query = f"DELETE FROM veiculos WHERE id IN ({marcadores})"
+    excluidos = executar_conjunto_com_log(conexao, query, tuple(ids), 'veiculos', 'DELETE', ids)
+    for veiculo_id in ids:
+        cache_cadastro.invalidar_veiculo(conexao, veiculo_id)
+        if excluidos:
+            apos_confirmar(indice_placas.remover, veiculo_id)
+    ao_desfazer(cache_cadastro.limpar)
+    if excluidos is None:
+        informar("Falha ao excluir os veículos informados.")
+    return excluidos